@@ -78,6 +78,58 @@ class RedfishSettings(BaseSettings):
     """
 
     redfish_encrypt_key: str = 'Ft4-9LT-WKT-bBq-HXO-wH2-MNv-KQY-GhX-LSq-TZ5-F3s='  # 默认加密密钥
+    redfish_http2: bool = True  # BMC支持时启用HTTP/2
+    redfish_pool_max_connections: int = 4  # 每个BMC的最大连接数
+    redfish_pool_keepalive_expiry: float = 60.0  # 空闲连接保持时间（秒）
+    redfish_connect_retries: int = 2  # 建立连接失败时的重试次数
+    redfish_session_cache: bool = True  # 是否在Redis中共享Redfish会话令牌
+    redfish_session_ttl: int = 1500  # 共享会话空闲过期时间（秒），应不大于BMC会话超时
+    redfish_session_lock_timeout: int = 30  # 登录锁超时时间（秒）
+    redfish_etag_cache: bool = True  # 是否启用ETag条件请求缓存
+    redfish_etag_cache_max_bytes: int = 64 * 1024 * 1024  # 进程内响应缓存上限（字节）
+    redfish_etag_cache_redis: bool = True  # 是否通过Redis在worker间共享响应缓存
+    redfish_etag_cache_ttl: int = 3600  # Redis中响应缓存的过期时间（秒）
+    redfish_monitor_worker_mode: bool = True  # 是否按批次投递监控任务，由worker常驻事件循环并发执行
+    redfish_monitor_concurrency: int = 50  # 每个worker进程同时监控的设备数
+    redfish_monitor_batch_size: int = 200  # 每个监控分块任务包含的设备数（消息只携带设备ID）
+    redfish_monitor_device_timeout: int = 200  # 单设备监控任务等待超时（秒），应小于任务软超时
+    redfish_monitor_batch_timeout: int = 800  # 监控分块与日志收集分块任务等待超时（秒），应小于任务软超时
+    redfish_schedule_healthy_interval: int = 900  # 自适应调度：健康设备轮询间隔（秒）
+    redfish_schedule_alert_interval: int = 120  # 自适应调度：有告警或状态变化设备的轮询间隔，也是不可达退避的起始间隔（秒）
+    redfish_schedule_backoff_max: int = 3600  # 自适应调度：不可达设备退避间隔上限（秒）
+    redfish_schedule_lease: int = 900  # 自适应调度：设备派发后的租约时长，超时未回写则重新派发（秒）
+    redfish_schedule_max_dispatch: int = 2000  # 自适应调度：单次调度最多派发的设备数
+    redfish_reachability_mode: str = 'auto'  # 可达性检测方式：auto（ICMP不可用时用TCP）/icmp/tcp
+    redfish_reachability_timeout: float = 2.0  # 可达性检测单个目标的超时时间（秒）
+    redfish_reachability_concurrency: int = 2000  # 同时进行的可达性检测数（TCP探测受文件描述符限制）
+    redfish_reachability_tcp_ports: str = '443,22,80'  # TCP探测使用的端口（逗号分隔）
+    redfish_probe_ports_business: str = 'ssh:22,http:80,https:443'  # ping失败时业务IP竞速检测的默认端口
+    redfish_probe_ports_oob: str = 'https:443,http:80,ssh:22'  # ping失败时带外IP竞速检测的端口
+    redfish_probe_ports_by_business_type: str = ''  # 按业务类型覆盖业务IP检测端口（JSON，如 {"DB": "ssh:22,mysql:3306"}）
+    redfish_urgency_rules_cache_ttl: int = 60  # 紧急度规则进程内缓存时间（秒），规则变更时所在worker立即失效
+    redfish_log_page_size: int = 200  # 日志条目分页大小（$top），BMC不支持分页时按nextLink或一次性读取
+    redfish_log_cursor_ttl: int = 30 * 86400  # 日志采集游标保留时间（秒），过期后退回全量采集
+    redfish_log_collect_concurrency: int = 10  # 批量日志收集时每个worker进程同时收集的设备数（每台设备占用一个数据库连接）
+    redfish_log_collect_chunk_size: int = 50  # 批量日志收集每个Celery分块任务的设备数
+    redfish_log_job_ttl: int = 86400  # 批量日志收集任务状态与检查点保留时间（秒）
+    redfish_log_payload_codec: str = 'zstd'  # 日志原始条目压缩算法（zstd/zlib），未安装zstandard时使用zlib
+    redfish_partitioning_enabled: bool = False  # redfish_log/alert_info是否已按月分区（仅PostgreSQL，先执行sql/partition_tables_pg.sql）
+    redfish_partition_months_ahead: int = 3  # 分区维护任务提前创建的月份数
+    redfish_partition_retention_mode: str = 'drop'  # 过期分区处理方式：drop删除/detach仅分离（保留表用于归档）
+    redfish_alert_rollup_recompute_days: int = 3  # 告警按天汇总任务每次重算的已结束天数（覆盖延迟入库与紧急度重算）
+    redfish_dashboard_cache_ttl: int = 30  # 首页完整数据快照缓存时间（秒），监控结果入库后立即失效
+    redfish_dashboard_build_timeout: int = 15  # 首页快照构建锁超时（秒），其他请求最多等待该时间后自行构建
+    redfish_dashboard_state_interval: float = 2.0  # 首页版本化状态两次重算的最小间隔（秒），期间的变化合并到下一次
+    redfish_dashboard_delta_buffer: int = 500  # Redis Stream中保留的首页状态增量条数，重连时据此补齐缺失版本
+    redfish_dashboard_state_top_n: int = 10  # 首页状态中实时/择期告警列表的条数
+    redfish_connectivity_max_age: int = 600  # 连通性记录有效期（秒），超过后统计中计为状态未知
+    redfish_connectivity_probe_skip: int = 120  # 后台连通性探测跳过该时间内已检测过（如监控周期刚检测）的设备（秒）
+    redfish_ws_send_queue_size: int = 256  # 每个WebSocket连接的发送队列长度，队列满时丢弃最旧的消息
+    redfish_ws_send_timeout: float = 10.0  # 单条WebSocket消息发送超时（秒），超时视为慢连接并关闭
+    redfish_ws_coalesce_window_ms: int = 500  # dashboard房间高频事件（进度/健康/告警变化）的合并窗口（毫秒），0为不合并
+    redfish_ws_heartbeat_interval: float = 10.0  # WebSocket节点在Redis房间注册表中的心跳间隔（秒）
+    redfish_ws_node_ttl: float = 30.0  # WebSocket节点心跳超时（秒），超时节点的连接与房间登记由其他节点清理
+    redfish_ws_route_cache_ttl: float = 1.0  # 发布方缓存房间->节点路由的时间（秒），新节点加入房间后最多延迟该时间收到推送
 
 
 class GenSettings:
@@ -1,3 +1,6 @@
+import asyncio
+import weakref
+from typing import Optional
 import redis
 from redis import asyncio as aioredis
 from redis.exceptions import AuthenticationError, TimeoutError, RedisError
@@ -8,21 +11,67 @@ from module_admin.service.dict_service import DictDataService
 from utils.log_util import logger
 
 
+# 同步Redis连接池（进程内共享，fork后的子进程由redis-py自动重建连接）
+_SYNC_POOL: Optional[redis.ConnectionPool] = None
+
+
 def get_redis() -> redis.Redis:
     """
-    获取同步Redis连接（用于Celery任务）
+    获取同步Redis连接（用于Celery任务，复用进程内连接池）
     
     Returns:
         redis.Redis: Redis连接对象
     """
-    return redis.Redis(
-        host=RedisConfig.redis_host,
-        port=RedisConfig.redis_port,
-        username=RedisConfig.redis_username,
-        password=RedisConfig.redis_password,
-        db=RedisConfig.redis_database,
-        decode_responses=True
-    )
+    global _SYNC_POOL
+    if _SYNC_POOL is None:
+        _SYNC_POOL = redis.ConnectionPool(
+            host=RedisConfig.redis_host,
+            port=RedisConfig.redis_port,
+            username=RedisConfig.redis_username,
+            password=RedisConfig.redis_password,
+            db=RedisConfig.redis_database,
+            decode_responses=True
+        )
+    return redis.Redis(connection_pool=_SYNC_POOL)
+
+
+# 异步Redis连接按事件循环隔离（连接绑定创建它的事件循环）
+_LOOP_REDIS: 'weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, aioredis.Redis]' = weakref.WeakKeyDictionary()
+
+
+def get_async_redis() -> aioredis.Redis:
+    """
+    获取当前事件循环内共享的异步Redis连接（用于Celery任务等非FastAPI上下文）
+
+    Returns:
+        aioredis.Redis: Redis连接对象
+    """
+    loop = asyncio.get_running_loop()
+    client = _LOOP_REDIS.get(loop)
+    if client is None:
+        client = aioredis.Redis(
+            host=RedisConfig.redis_host,
+            port=RedisConfig.redis_port,
+            username=RedisConfig.redis_username,
+            password=RedisConfig.redis_password,
+            db=RedisConfig.redis_database,
+            decode_responses=True,
+        )
+        _LOOP_REDIS[loop] = client
+    return client
+
+
+async def close_async_redis():
+    """
+    关闭当前事件循环内共享的异步Redis连接
+    """
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        return
+    client = _LOOP_REDIS.pop(loop, None)
+    if client is not None:
+        await client.aclose()
 
 
 class RedisUtil:
@@ -53,10 +53,16 @@ def make_celery():
         # 路由配置
         task_routes={
             'monitor_single_device': {'queue': 'monitoring'},
+            'monitor_device_batch': {'queue': 'monitoring'},
             'monitor_all_devices': {'queue': 'batch'},
+            'dispatch_due_devices': {'queue': 'batch'},
+            'collect_device_logs_chunk': {'queue': 'batch'},
             'check_device_availability': {'queue': 'availability'},
             'check_all_devices_availability': {'queue': 'availability'},
             'cleanup_old_logs': {'queue': 'maintenance'},
+            'compact_redfish_log_payloads': {'queue': 'maintenance'},
+            'maintain_partitions': {'queue': 'maintenance'},
+            'rollup_alert_daily': {'queue': 'maintenance'},
         },
         
         # 队列配置
@@ -93,6 +99,28 @@ def make_celery():
                     'interval_max': 300,
                 }
             },
+            'monitor_device_batch': {
+                'rate_limit': None,  # 批次内已由事件循环信号量限流
+                'time_limit': 900,
+                'soft_time_limit': 840,
+            },
+            'dispatch_due_devices': {
+                'time_limit': 120,  # 只查询设备ID并派发，不执行监控
+                'soft_time_limit': 100,
+            },
+            'collect_device_logs_chunk': {
+                'rate_limit': None,  # 分块内已由事件循环信号量限流
+                'time_limit': 900,
+                'soft_time_limit': 840,
+            },
+            'compact_redfish_log_payloads': {
+                'time_limit': 1800,  # 历史数据量大时分批转换
+                'soft_time_limit': 1740,
+            },
+            'rollup_alert_daily': {
+                'time_limit': 1800,  # 首次回填历史时扫描的日期范围较大
+                'soft_time_limit': 1740,
+            },
             'monitor_all_devices': {
                 'rate_limit': '1/m',  # 批量监控限制
                 'retry_policy': {
@@ -2,23 +2,32 @@
 Celery异步任务模块
 用于处理大规模设备监控任务，支持WebSocket实时推送
 """
-import asyncio
-from typing import Dict, List, Any
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+from typing import Dict, List, Any, Optional, Tuple
 from datetime import datetime, timedelta
 from celery import Celery, group
 from celery.result import GroupResult
 from loguru import logger
 from celery.schedules import crontab
+from celery.signals import worker_process_shutdown
 # from sqlalchemy.orm import Session  # 不再需要，使用config.get_db中的session
-import redis
 import json
 
-from .core.device_monitor import DeviceMonitor
+from .core.monitoring_worker import MonitoringWorker
+from .core.monitor_scheduler import MonitorScheduler
 from config.get_db import get_sync_db
 from .entity.do import DeviceInfoDO, AlertInfoDO, BusinessHardwareUrgencyRulesDO
 from .core.realtime_service import PushServiceManager
+from .core.event_bus import EventBus
+from .core.dashboard_snapshot import DashboardSnapshotCache
 from .utils.component_type_mapper import to_hardware_code
 from .utils.component_name_service import component_name_service
+from .utils.urgency_rule_cache import UrgencyRuleCache
+from .dao.partition_dao import PartitionDao
+from .dao.device_health_rollup_dao import DeviceHealthRollupDao
+from .dao.alert_daily_rollup_dao import AlertDailyRollupDao
+from .service.connectivity_service import ConnectivityService
+from sqlalchemy import insert, update
 
 # 导入统一的Celery配置
 from .celery_config import celery_app
@@ -27,7 +36,13 @@ from .celery_config import celery_app
 push_service = PushServiceManager()
 
 # Redis配置，用于同步发布消息
-from config.env import RedisConfig
+from config.env import RedfishConfig
+
+
+@worker_process_shutdown.connect
+def _shutdown_monitoring_worker(**kwargs):
+    """worker进程退出时关闭常驻监控事件循环"""
+    MonitoringWorker.shutdown_instance()
 
 
 # ===============================================================
@@ -41,6 +56,19 @@ def check_batch_completion(batch_id: str, task_success: bool = True):
         batch_id: 批次ID
         task_success: 当前任务是否成功
     """
+    update_batch_progress(batch_id, 1, 1 if task_success else 0, 0 if task_success else 1)
+
+
+def update_batch_progress(batch_id: str, completed: int, successful: int, failed: int):
+    """
+    累加批次进度（按设备分块时每个分块调用一次），全部完成时推送完成通知
+    
+    Args:
+        batch_id: 批次ID
+        completed: 本次完成的设备数
+        successful: 其中监控成功的设备数
+        failed: 其中监控失败的设备数
+    """
     try:
         from config.get_redis import get_redis
         redis_client = get_redis()
@@ -50,19 +78,18 @@ def check_batch_completion(batch_id: str, task_success: bool = True):
         success_key = f"monitoring_batch:{batch_id}:success"
         failed_key = f"monitoring_batch:{batch_id}:failed"
         
-        # 原子性增加计数器
-        current_count = redis_client.incr(counter_key)
-        total_count = int(redis_client.get(total_key) or 0)
+        # 原子性累加计数器
+        pipe = redis_client.pipeline()
+        pipe.incrby(counter_key, completed)
+        pipe.incrby(success_key, successful)
+        pipe.incrby(failed_key, failed)
+        pipe.get(total_key)
+        current_count, _, _, total_count = pipe.execute()
+        total_count = int(total_count or 0)
         
-        # 更新成功/失败计数器
-        if task_success:
-            redis_client.incr(success_key)
-        else:
-            redis_client.incr(failed_key)
-        
-        logger.info(f"Batch {batch_id}: {current_count}/{total_count} tasks completed")
+        logger.info(f"Batch {batch_id}: {current_count}/{total_count} devices completed")
         
-        # 推送监控进度更新（每次任务完成都推送）
+        # 推送监控进度更新（每个分块/任务完成推送一次）
         if current_count < total_count:
             progress_percentage = round((current_count / total_count) * 100, 2) if total_count > 0 else 0
             progress_message = {
@@ -76,7 +103,7 @@ def check_batch_completion(batch_id: str, task_success: bool = True):
             }
             
             # 推送进度更新
-            publish_sync_redis_message("websocket:dashboard", progress_message)
+            EventBus.publish_sync(["dashboard"], progress_message)
             logger.debug(f"Pushed monitoring progress: {current_count}/{total_count} ({progress_percentage}%)")
         
         # 如果所有任务都完成了，发送完成通知
@@ -94,7 +121,7 @@ def check_batch_completion(batch_id: str, task_success: bool = True):
                 "timestamp": datetime.now().isoformat()
             }
             
-            publish_sync_redis_message("websocket:dashboard", final_progress_message)
+            EventBus.publish_sync(["dashboard"], final_progress_message)
             logger.debug(f"Pushed final monitoring progress: {total_count}/{total_count} (100%)")
             
             # 获取成功和失败统计
@@ -118,31 +145,10 @@ def check_batch_completion(batch_id: str, task_success: bool = True):
             }
             
             # 使用同步Redis发布（只发送到dashboard频道，避免重复）
-            publish_sync_redis_message("websocket:dashboard", message)
+            EventBus.publish_sync(["dashboard"], message)
             
             logger.info(f"Pushed monitoring completed notification: {total_count} devices ({successful_devices} success, {failed_devices} failed)")
             
-            # 监控完成后清除设备状态缓存，确保下次请求获取最新数据
-            try:
-                from module_admin.service.cache_service import CacheService
-                import asyncio
-                
-                # 在同步任务中运行异步代码
-                async def clear_cache():
-                    await CacheService.delete_cache("connectivity_stats")
-                    logger.info("Monitoring completed: device status cache cleared")
-                
-                # 运行异步缓存清理
-                loop = asyncio.new_event_loop()
-                asyncio.set_event_loop(loop)
-                try:
-                    loop.run_until_complete(clear_cache())
-                finally:
-                    loop.close()
-                    
-            except Exception as e:
-                logger.warning(f"Failed to clear device status cache after monitoring: {str(e)}")
-            
             # 清理Redis计数器
             redis_client.delete(counter_key, total_key, success_key, failed_key)
             
@@ -150,24 +156,10 @@ def check_batch_completion(batch_id: str, task_success: bool = True):
         logger.error(f"Error checking batch completion for {batch_id}: {str(e)}")
 
 
-def publish_sync_redis_message(channel: str, message: dict):
-    """
-    一个同步的函数，用于从Celery任务中向Redis发布消息。
-    """
-    try:
-        r = redis.Redis(
-            host=RedisConfig.redis_host,
-            port=RedisConfig.redis_port,
-            username=RedisConfig.redis_username,
-            password=RedisConfig.redis_password,
-            db=RedisConfig.redis_database,
-            decode_responses=True
-        )
-        r.publish(channel, json.dumps(message, ensure_ascii=False))
-        logger.info(f"Successfully published message to Redis channel '{channel}'")
-        r.close()
-    except Exception as e:
-        logger.error(f"Failed to publish message to Redis channel '{channel}': {e}")
+def _log_push_failure(future: Future):
+    """记录后台推送的异常（推送结果不影响监控任务）"""
+    if not future.cancelled() and future.exception():
+        logger.warning(f"Failed to push device status change: {future.exception()}")
 
 
 @celery_app.task(bind=True, name='monitor_single_device')
@@ -184,41 +176,34 @@ def monitor_single_device(self, device_info: Dict[str, Any]) -> Dict[str, Any]:
     try:
         logger.info(f"Starting monitoring task for device: {device_info.get('hostname', 'Unknown')}")
         
-        # 创建设备监控器
-        monitor = DeviceMonitor()
-        
-        # 执行异步监控（在同步任务中运行异步代码）
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-        
+        # 在进程常驻事件循环中执行异步监控（复用连接池）
+        worker = MonitoringWorker.instance()
         try:
-            result = loop.run_until_complete(monitor.monitor_device(device_info))
-        finally:
-            loop.close()
+            result = worker.run(
+                worker.monitor_device(device_info), timeout=RedfishConfig.redfish_monitor_device_timeout
+            )
+        except FutureTimeoutError:
+            logger.error(f"Monitoring timed out for device: {device_info.get('hostname', 'Unknown')}")
+            result = _timeout_result(device_info)
         
-        # 保存监控结果到数据库
-        if result['success']:
-            save_monitoring_result(result, device_info)
-            
-            # 推送监控结果到WebSocket客户端
-            try:
-                loop = asyncio.get_running_loop()
-                loop.create_task(push_service.realtime.push_device_status_change(
-                    device_id=result.get('device_id'),
-                    old_status='unknown',
-                    new_status=result.get('overall_health', 'unknown'),
-                    device_info=device_info
-                ))
-            except RuntimeError:
-                # 如果没有运行的事件循环，跳过推送
-                logger.warning("No event loop running, skipping WebSocket push")
+        # 保存监控结果到数据库（保存失败按监控失败统计）
+        saved = bool(result['success']) and save_monitoring_result(result, device_info)
+        if saved:
+            # 推送监控结果到WebSocket客户端（在常驻事件循环中执行，不等待推送完成）
+            push_future = worker.submit(push_service.realtime.push_device_status_change(
+                device_id=result.get('device_id'),
+                old_status='unknown',
+                new_status=result.get('overall_health', 'unknown'),
+                device_info=device_info
+            ))
+            push_future.add_done_callback(_log_push_failure)
         
         logger.info(f"Completed monitoring task for device: {device_info.get('hostname', 'Unknown')}")
         
         # 检查是否是批次任务，如果是则更新计数器
         batch_id = device_info.get('batch_id')
         if batch_id:
-            check_batch_completion(batch_id, result['success'])
+            check_batch_completion(batch_id, saved)
         
         return result
         
@@ -227,6 +212,268 @@ def monitor_single_device(self, device_info: Dict[str, Any]) -> Dict[str, Any]:
         self.retry(countdown=60, max_retries=3)  # 1分钟后重试，最多3次
 
 
+def _timeout_result(device_info: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    监控超时（协程已取消）时的监控结果
+    
+    Args:
+        device_info: 设备信息字典
+        
+    Returns:
+        Dict: 监控结果
+    """
+    return {'device_id': device_info.get('device_id'), 'success': False, 'error': 'monitoring timed out'}
+
+
+def _device_to_dict(device: DeviceInfoDO) -> Dict[str, Any]:
+    """
+    将设备记录转换为监控使用的设备信息字典
+    
+    Args:
+        device: 设备记录
+        
+    Returns:
+        Dict: 设备信息字典
+    """
+    return {
+        "device_id": device.device_id,
+        "hostname": device.hostname,
+        "business_ip": device.business_ip,
+        "oob_ip": device.oob_ip,
+        "oob_port": device.oob_port,
+        "business_type": device.business_type,
+        "probe_ports": device.probe_ports,
+        "redfish_username": device.redfish_username,
+        "redfish_password": device.redfish_password,
+        "manufacturer": device.manufacturer,
+        "model": device.model,
+        "health_status": device.health_status
+    }
+
+
+def _schedule_outcome(result: Dict[str, Any], device_info: Dict[str, Any]) -> Tuple[bool, bool]:
+    """
+    从监控结果判断调度所需的设备状态
+    
+    Args:
+        result: 监控结果
+        device_info: 设备信息
+        
+    Returns:
+        Tuple[bool, bool]: (是否成功获取到设备状态, 是否存在告警或健康状态发生变化)
+    """
+    reachable = bool(result.get('success')) and not result.get('error')
+    overall_health = result.get('overall_health')
+    urgent = bool(result.get('alerts')) or overall_health not in ('ok', None) \
+        or overall_health != device_info.get('health_status')
+    return reachable, urgent
+
+
+@celery_app.task(name='monitor_device_batch')
+def monitor_device_batch(device_ids: List[int], batch_id: str = None) -> Dict[str, Any]:
+    """
+    监控一个设备分块的异步任务（常驻事件循环中按并发上限同时执行）
+    
+    消息只携带设备ID，设备信息（含加密密码）在worker内从数据库读取
+    
+    Args:
+        device_ids: 设备ID列表
+        batch_id: 批次ID，用于进度统计
+        
+    Returns:
+        Dict: 分块监控汇总
+    """
+    logger.info(f"Starting chunk monitoring task for {len(device_ids)} devices")
+    db = next(get_sync_db())
+    try:
+        devices = db.query(DeviceInfoDO).filter(
+            DeviceInfoDO.device_id.in_(device_ids),
+            DeviceInfoDO.monitor_enabled == 1
+        ).all()
+        device_list = [_device_to_dict(device) for device in devices]
+    except Exception as e:
+        logger.error(f"Error loading devices for monitoring chunk: {str(e)}")
+        device_list = []
+    finally:
+        db.close()
+    
+    worker = MonitoringWorker.instance()
+    try:
+        results = worker.run(
+            worker.monitor_devices(device_list), timeout=RedfishConfig.redfish_monitor_batch_timeout
+        ) if device_list else []
+    except FutureTimeoutError:
+        # 整个分块已取消，全部按失败统计并按不可达退避重新调度
+        logger.error(f"Chunk monitoring timed out for {len(device_list)} devices")
+        results = [_timeout_result(device_info) for device_info in device_list]
+    
+    # 整个分块的结果一次性对账入库（失败时逐台重试），入库失败的设备按失败统计
+    succeeded = [(result, device_info) for device_info, result in zip(device_list, results) if result.get('success')]
+    save_failed = set(save_monitoring_results(succeeded))
+    successful = len(succeeded) - len(save_failed)
+    
+    try:
+        # 入库失败的设备按需密切关注安排，尽快重新监控
+        MonitorScheduler.reschedule({
+            device_info['device_id']: (True, True) if device_info['device_id'] in save_failed
+            else _schedule_outcome(result, device_info)
+            for device_info, result in zip(device_list, results)
+        })
+    except Exception as e:
+        logger.warning(f"Failed to reschedule monitored devices: {str(e)}")
+    
+    # 派发后被删除或停用的设备不计入成功/失败，但计入完成数，保证批次能够结束
+    failed = len(device_list) - successful
+    if batch_id:
+        update_batch_progress(batch_id, len(device_ids), successful, failed)
+    
+    logger.info(
+        f"Completed chunk monitoring task: {successful}/{len(device_ids)} devices succeeded"
+        f"{f', {len(save_failed)} failed to save' if save_failed else ''}"
+    )
+    return {
+        "success": not save_failed,
+        "total_devices": len(device_ids),
+        "successful_devices": successful,
+        "failed_devices": failed,
+        "skipped_devices": len(device_ids) - len(device_list),
+        "save_failed_devices": sorted(save_failed),
+        "timestamp": datetime.now().isoformat()
+    }
+
+
+def _create_monitoring_batch(total: int) -> str:
+    """
+    创建监控批次并初始化Redis进度计数器
+    
+    Args:
+        total: 批次设备总数
+        
+    Returns:
+        str: 批次ID
+    """
+    import uuid
+    batch_id = str(uuid.uuid4())
+    
+    # 在Redis中设置计数器，用于跟踪任务完成情况
+    from config.get_redis import get_redis
+    redis_client = get_redis()
+    counter_key = f"monitoring_batch:{batch_id}:counter"
+    total_key = f"monitoring_batch:{batch_id}:total"
+    success_key = f"monitoring_batch:{batch_id}:success"
+    failed_key = f"monitoring_batch:{batch_id}:failed"
+    
+    # 设置总任务数和当前完成数
+    redis_client.set(total_key, total, ex=3600)  # 1小时过期
+    redis_client.set(counter_key, 0, ex=3600)
+    redis_client.set(success_key, 0, ex=3600)
+    redis_client.set(failed_key, 0, ex=3600)
+    return batch_id
+
+
+def _dispatch_device_chunks(device_ids: List[int], batch_id: Optional[str] = None):
+    """
+    按设备ID分块投递监控任务
+    
+    Args:
+        device_ids: 设备ID列表
+        batch_id: 批次ID（为空时不统计进度，也不推送完成通知）
+    """
+    chunk_size = max(1, RedfishConfig.redfish_monitor_batch_size)
+    group(
+        monitor_device_batch.s(device_ids[i:i + chunk_size], batch_id)
+        for i in range(0, len(device_ids), chunk_size)
+    ).apply_async()
+
+
+@celery_app.task(name='dispatch_due_devices')
+def dispatch_due_devices() -> Dict[str, Any]:
+    """
+    自适应调度：同步调度队列后，只派发已到期的设备
+    
+    Returns:
+        Dict: 派发结果
+    """
+    try:
+        db = next(get_sync_db())
+        try:
+            device_ids = [row.device_id for row in db.query(DeviceInfoDO.device_id).filter(
+                DeviceInfoDO.monitor_enabled == 1
+            ).all()]
+        finally:
+            db.close()
+        
+        MonitorScheduler.sync_devices(device_ids)
+        due_ids = MonitorScheduler.claim_due(RedfishConfig.redfish_schedule_max_dispatch)
+        if not due_ids:
+            return {
+                "success": True,
+                "total_devices": 0,
+                "timestamp": datetime.now().isoformat()
+            }
+        
+        # 调度周期的派发不创建进度批次：每30秒一次的完成通知会让首页反复提示和刷新，
+        # 监控结果引起的数据变化由告警/设备状态事件推送
+        _dispatch_device_chunks(due_ids)
+        logger.info(f"Dispatched {len(due_ids)} due devices out of {len(device_ids)}")
+        return {
+            "success": True,
+            "total_devices": len(due_ids),
+            "timestamp": datetime.now().isoformat()
+        }
+        
+    except Exception as e:
+        logger.error(f"Error dispatching due devices: {str(e)}")
+        return {
+            "success": False,
+            "error": str(e),
+            "timestamp": datetime.now().isoformat()
+        }
+
+
+def dispatch_log_collection_chunks(job_id: str, device_ids: List[int]):
+    """
+    按设备ID分块投递批量日志收集任务
+    
+    Args:
+        job_id: 日志收集任务ID
+        device_ids: 设备ID列表
+    """
+    chunk_size = max(1, RedfishConfig.redfish_log_collect_chunk_size)
+    group(
+        collect_device_logs_chunk.s(job_id, device_ids[i:i + chunk_size])
+        for i in range(0, len(device_ids), chunk_size)
+    ).apply_async()
+
+
+@celery_app.task(name='collect_device_logs_chunk')
+def collect_device_logs_chunk(job_id: str, device_ids: List[int]) -> Dict[str, Any]:
+    """
+    收集一个设备分块的日志（常驻事件循环中按并发上限执行，已完成的设备按检查点跳过）
+    
+    Args:
+        job_id: 日志收集任务ID
+        device_ids: 设备ID列表
+        
+    Returns:
+        Dict: 分块收集汇总
+    """
+    from .service.redfish_log_service import RedfishLogService
+    
+    worker = MonitoringWorker.instance()
+    summary = worker.run(
+        RedfishLogService.collect_log_job_chunk(job_id, device_ids),
+        timeout=RedfishConfig.redfish_monitor_batch_timeout
+    )
+    logger.info(f"Log collection job {job_id}: chunk of {len(device_ids)} devices finished ({summary})")
+    return {
+        "success": True,
+        "job_id": job_id,
+        **summary,
+        "timestamp": datetime.now().isoformat()
+    }
+
+
 @celery_app.task(name='monitor_all_devices')
 def monitor_all_devices() -> Dict[str, Any]:
     """
@@ -241,10 +488,20 @@ def monitor_all_devices() -> Dict[str, Any]:
         # 获取数据库会话
         db = next(get_sync_db())
         
-        # 查询所有启用监控的设备
-        devices = db.query(DeviceInfoDO).filter(
-            DeviceInfoDO.monitor_enabled == 1
-        ).all()
+        worker_mode = RedfishConfig.redfish_monitor_worker_mode
+        try:
+            if worker_mode:
+                # 分块模式只查询设备ID，设备详情由各分块任务在worker内读取
+                devices = [row.device_id for row in db.query(DeviceInfoDO.device_id).filter(
+                    DeviceInfoDO.monitor_enabled == 1
+                ).order_by(DeviceInfoDO.device_id).all()]
+            else:
+                # 查询所有启用监控的设备
+                devices = db.query(DeviceInfoDO).filter(
+                    DeviceInfoDO.monitor_enabled == 1
+                ).all()
+        finally:
+            db.close()
         
         if not devices:
             logger.warning("No devices found for monitoring")
@@ -257,50 +514,19 @@ def monitor_all_devices() -> Dict[str, Any]:
         
         logger.info(f"Found {len(devices)} devices to monitor")
         
-        # 将设备信息转换为字典格式
-        device_list = []
-        for device in devices:
-            device_dict = {
-                "device_id": device.device_id,
-                "hostname": device.hostname,
-                "business_ip": device.business_ip,
-                "oob_ip": device.oob_ip,
-                "oob_port": device.oob_port,
-                "business_type": device.business_type,
-                "redfish_username": device.redfish_username,
-                "redfish_password": device.redfish_password,
-                "manufacturer": device.manufacturer,
-                "model": device.model
-            }
-            device_list.append(device_dict)
-        
-        # 生成批次ID
-        import uuid
-        batch_id = str(uuid.uuid4())
+        batch_id = _create_monitoring_batch(len(devices))
         
-        # 在Redis中设置计数器，用于跟踪任务完成情况
-        from config.get_redis import get_redis
-        redis_client = get_redis()
-        counter_key = f"monitoring_batch:{batch_id}:counter"
-        total_key = f"monitoring_batch:{batch_id}:total"
-        success_key = f"monitoring_batch:{batch_id}:success"
-        failed_key = f"monitoring_batch:{batch_id}:failed"
-        
-        # 设置总任务数和当前完成数
-        redis_client.set(total_key, len(devices), ex=3600)  # 1小时过期
-        redis_client.set(counter_key, 0, ex=3600)
-        redis_client.set(success_key, 0, ex=3600)
-        redis_client.set(failed_key, 0, ex=3600)
-        
-        # 创建任务组，为每个任务传递batch_id
-        enhanced_device_list = []
-        for device in device_list:
-            enhanced_device = device.copy()
-            enhanced_device['batch_id'] = batch_id
-            enhanced_device_list.append(enhanced_device)
-        
-        job = group(monitor_single_device.s(device) for device in enhanced_device_list)
-        result = job.apply_async()
+        if worker_mode:
+            # 按设备ID分块投递，由常驻事件循环并发监控
+            _dispatch_device_chunks(devices, batch_id)
+        else:
+            # 创建任务组，为每个任务传递batch_id
+            enhanced_device_list = []
+            for device in devices:
+                enhanced_device = _device_to_dict(device)
+                enhanced_device['batch_id'] = batch_id
+                enhanced_device_list.append(enhanced_device)
+            group(monitor_single_device.s(device) for device in enhanced_device_list).apply_async()
         
         logger.info(f"Submitted {len(devices)} monitoring tasks, batch ID: {batch_id}")
         
@@ -324,7 +550,7 @@ def monitor_all_devices() -> Dict[str, Any]:
             }
             
             # 使用同步Redis发布，因为这是在同步任务中（只发送到dashboard频道，避免重复）
-            publish_sync_redis_message("websocket:dashboard", message)
+            EventBus.publish_sync(["dashboard"], message)
             
             logger.info(f"Pushed monitoring started notification: {len(devices)} devices")
             
@@ -339,7 +565,7 @@ def monitor_all_devices() -> Dict[str, Any]:
                 "timestamp": datetime.now().isoformat()
             }
             
-            publish_sync_redis_message("websocket:dashboard", initial_progress_message)
+            EventBus.publish_sync(["dashboard"], initial_progress_message)
             logger.debug(f"Pushed initial monitoring progress: 0/{len(devices)} (0%)")
             
         except Exception as e:
@@ -374,14 +600,23 @@ def cleanup_old_logs(days: int = 30) -> Dict[str, Any]:
         
         cutoff_time = datetime.now() - timedelta(days=days)
         
-        # 1. 清理已解决的告警 (alert_info)
-        # 只删除在截止日期前已解决（status='resolved'）且更新时间早于截止时间的告警
-        deleted_alerts_count = db.query(AlertInfoDO).filter(
-            AlertInfoDO.status == 'resolved',
-            AlertInfoDO.update_time < cutoff_time
+        # 1. 已按月分区时，整体移除只包含过期已解决告警的分区
+        deleted_alerts_count = 0
+        if PartitionDao.is_enabled():
+            deleted_alerts_count += PartitionDao.drop_expired_partitions(db, AlertInfoDO.__tablename__, cutoff_time)
+        
+        # 2. 清理已解决的告警 (alert_info)
+        # 只删除已解决（alert_status='resolved'）且更新时间早于截止时间的告警；
+        # 首次发生时间必然不晚于更新时间，附加该条件后分区表只扫描截止时间之前的分区
+        deleted_alerts_count += db.query(AlertInfoDO).filter(
+            AlertInfoDO.alert_status == 'resolved',
+            AlertInfoDO.update_time < cutoff_time,
+            AlertInfoDO.first_occurrence < cutoff_time
         ).delete(synchronize_session=False)
         
         db.commit()
+        if deleted_alerts_count:
+            DashboardSnapshotCache.invalidate()
         
         logger.info(f"Successfully deleted {deleted_alerts_count} resolved alerts older than {cutoff_time}")
         
@@ -403,205 +638,437 @@ def cleanup_old_logs(days: int = 30) -> Dict[str, Any]:
         db.close()
 
 
-def save_monitoring_result(result: Dict[str, Any], device_info: Dict[str, Any]):
+@celery_app.task(name='maintain_partitions')
+def maintain_partitions(months_ahead: int = None) -> Dict[str, Any]:
+    """
+    分区维护：为已按月分区的表提前创建未来分区
+    
+    Args:
+        months_ahead: 提前创建的月数，默认取配置
+        
+    Returns:
+        Dict: {表名: 新建的分区}
+    """
+    if not PartitionDao.is_enabled():
+        return {
+            "success": True,
+            "message": "Partitioning is disabled",
+            "timestamp": datetime.now().isoformat()
+        }
+    
+    db = next(get_sync_db())
+    try:
+        created = {
+            table: PartitionDao.ensure_partitions(db, table, months_ahead)
+            for table in PartitionDao.PARTITIONED_TABLES
+        }
+        return {
+            "success": True,
+            "created": created,
+            "timestamp": datetime.now().isoformat()
+        }
+    except Exception as e:
+        logger.error(f"Error maintaining partitions: {str(e)}")
+        db.rollback()
+        return {
+            "success": False,
+            "error": str(e),
+            "timestamp": datetime.now().isoformat()
+        }
+    finally:
+        db.close()
+
+
+@celery_app.task(name='rollup_alert_daily')
+def rollup_alert_daily(days: int = None) -> Dict[str, Any]:
+    """
+    告警按天汇总：重算最近N个已结束日期（截至昨天）的汇总行，覆盖延迟入库与紧急度重算的告警
+    
+    Args:
+        days: 重算的天数，默认取配置；首次启用时可传较大值回填历史
+        
+    Returns:
+        Dict: 汇总结果
+    """
+    days = days or RedfishConfig.redfish_alert_rollup_recompute_days
+    end_date = datetime.now().date() - timedelta(days=1)
+    start_date = end_date - timedelta(days=days - 1)
+    
+    db = next(get_sync_db())
+    try:
+        rows = AlertDailyRollupDao.rollup_days(db, start_date, end_date)
+        db.commit()
+        logger.info(f"Alert daily rollup completed: {start_date} ~ {end_date}, {rows} rows")
+        return {
+            "success": True,
+            "start_date": start_date.isoformat(),
+            "end_date": end_date.isoformat(),
+            "rows": rows,
+            "timestamp": datetime.now().isoformat()
+        }
+    except Exception as e:
+        logger.error(f"Error rolling up daily alerts: {str(e)}")
+        db.rollback()
+        return {
+            "success": False,
+            "error": str(e),
+            "timestamp": datetime.now().isoformat()
+        }
+    finally:
+        db.close()
+
+
+@celery_app.task(name='compact_redfish_log_payloads')
+def compact_redfish_log_payloads(batch_size: int = 1000, max_batches: int = 100) -> Dict[str, Any]:
+    """
+    把历史日志备注中的缩进JSON转存为压缩的原始条目并清空备注（PostgreSQL需VACUUM后才会复用空间）
+    
+    Args:
+        batch_size: 每批转换的日志数
+        max_batches: 单次执行最多转换的批数
+        
+    Returns:
+        Dict: 转换结果
+    """
+    from .entity.do.redfish_log_do import RedfishLogDO
+    from .utils.log_payload_codec import encode_log_payload
+    
+    db = next(get_sync_db())
+    compacted = 0
+    last_id = None
+    try:
+        for _ in range(max_batches):
+            query = db.query(RedfishLogDO.log_id, RedfishLogDO.remark).filter(
+                RedfishLogDO.raw_payload.is_(None),
+                RedfishLogDO.remark.isnot(None)
+            )
+            # 按主键翻页，无法解析为JSON的备注保持原样且不会被重复读取
+            if last_id is not None:
+                query = query.filter(RedfishLogDO.log_id > last_id)
+            rows = query.order_by(RedfishLogDO.log_id).limit(batch_size).all()
+            if not rows:
+                break
+            last_id = rows[-1].log_id
+            
+            updates = []
+            for row in rows:
+                try:
+                    payload = json.loads(row.remark)
+                except ValueError:
+                    continue
+                if isinstance(payload, dict):
+                    updates.append({'log_id': row.log_id, 'raw_payload': encode_log_payload(payload), 'remark': None})
+            if updates:
+                db.execute(update(RedfishLogDO), updates)
+                db.commit()
+                compacted += len(updates)
+        
+        logger.info(f"Compacted {compacted} Redfish log payloads")
+        return {
+            "success": True,
+            "compacted": compacted,
+            "timestamp": datetime.now().isoformat()
+        }
+        
+    except Exception as e:
+        logger.error(f"Error compacting Redfish log payloads: {str(e)}")
+        db.rollback()
+        return {
+            "success": False,
+            "compacted": compacted,
+            "error": str(e),
+            "timestamp": datetime.now().isoformat()
+        }
+    finally:
+        db.close()
+
+
+def save_monitoring_result(result: Dict[str, Any], device_info: Dict[str, Any]) -> bool:
     """
-    保存监控结果到数据库，并实现告警生命周期管理
+    保存单台设备的监控结果（见 save_monitoring_results）
     
     Args:
         result: 监控结果，包含 'alerts' 和 'all_components'
         device_info: 设备信息
+        
+    Returns:
+        bool: 是否保存成功
     """
-    db = next(get_sync_db())
+    return not save_monitoring_results([(result, device_info)])
+
+
+def _reconcile_device_alerts(
+    db,
+    result: Dict[str, Any],
+    business_type: str,
+    active_alerts_map: Dict[Tuple[str, str], Any]
+) -> Tuple[List[Dict[str, Any]], List[Tuple[str, str]], List[Any]]:
+    """
+    对比单台设备的监控结果与现有活跃告警，计算需要新建、刷新、解决的告警
+    
+    Args:
+        db: 同步数据库会话（用于加载规则缓存）
+        result: 监控结果
+        business_type: 设备业务类型
+        active_alerts_map: {(组件类型, 组件名称): 活跃告警行}，处理过的条目会被移除
+        
+    Returns:
+        Tuple: (新建告警字段列表, 需刷新最后发生时间的告警行列表, 需解决的告警行列表)
+    """
+    device_id = result['device_id']
+    alerts_to_create = []
+    alerts_to_refresh = []
+    alerts_to_resolve = []
+    
+    # 统一将内部 component_type 转为硬件字典码（小写）
+    normalized_components = []
+    for comp in result.get('all_components', []):
+        nc = comp.copy()
+        nc['component_type'] = to_hardware_code(comp.get('component_type'), comp)
+        normalized_components.append(nc)
+    monitored_components_map = {(comp['component_type'], comp['component_name']): comp for comp in normalized_components}
+
+    # 监控统计日志：记录各类型异常数量（帮助定位如memory未入库问题）
     try:
-        device_id = result['device_id']
-        business_type = device_info.get('business_type', '')
+        type_bad_counts = {}
+        for c in normalized_components:
+            if c.get('health_status') != 'ok':
+                key = c.get('component_type') or 'unknown'
+                type_bad_counts[key] = type_bad_counts.get(key, 0) + 1
+        logger.info(f"Monitored abnormal components by type (device {device_id}): {type_bad_counts}")
+    except Exception:
+        pass
+    
+    def create_alert(component_type: str, component_name: str, health_status: str):
+        urgency_level = UrgencyRuleCache.lookup(db, business_type, component_type)
+        alerts_to_create.append({
+            "device_id": device_id,
+            "component_type": component_type,
+            "component_name": component_name,
+            "health_status": health_status,
+            "urgency_level": urgency_level,
+            "alert_status": 'active',
+        })
+        logger.info(f"New alert for device {device_id}: {component_type}/{component_name} -> {health_status}, Urgency: {urgency_level}")
+    
+    # 记录已经处理过的组件，避免重复处理
+    processed_components = set()
+    
+    # 1. 首先处理直接生成的告警数据（如宕机检测、带外IP连通性等）
+    for alert_data in result.get('alerts', []):
+        component_name = alert_data.get('component_name')
+        normalized_component_type = to_hardware_code(alert_data.get('component_type'), alert_data)
+        alert_key = (normalized_component_type, component_name)
+        if alert_key in processed_components:
+            continue
+        processed_components.add(alert_key)
         
-        # 1. 批量获取数据
-        # 获取此设备所有现有 active 告警
-        active_alerts_query = db.query(AlertInfoDO).filter(
-            AlertInfoDO.device_id == device_id,
-            AlertInfoDO.alert_status == 'active'
-        ).all()
-        active_alerts_map = {(alert.component_type, alert.component_name): alert for alert in active_alerts_query}
+        existing_alert = active_alerts_map.pop(alert_key, None)
+        if existing_alert is None:
+            # 新的直接告警
+            create_alert(normalized_component_type, component_name, alert_data.get('health_status'))
+        else:
+            # 持续的直接告警，刷新最后发生时间
+            alerts_to_refresh.append(existing_alert)
+    
+    # 2. 然后遍历当前监控到的所有组件状态（跳过已处理的组件）
+    for alert_key, component_data in monitored_components_map.items():
+        if alert_key in processed_components:
+            continue
+        health_status = component_data['health_status']
+        existing_alert = active_alerts_map.pop(alert_key, None)
         
-        # 获取所有紧急度规则
-        rules_query = db.query(BusinessHardwareUrgencyRulesDO).filter(BusinessHardwareUrgencyRulesDO.is_active == 1).all()
-        urgency_rules_map = {(rule.business_type, rule.hardware_type.lower()): rule.urgency_level for rule in rules_query}
+        if health_status != 'ok':
+            if existing_alert is None:
+                # 情况1: 新告警
+                create_alert(alert_key[0], alert_key[1], health_status)
+            else:
+                # 情况2: 持续的告警，刷新最后发生时间
+                alerts_to_refresh.append(existing_alert)
+        elif existing_alert is not None:
+            # 情况3: 已恢复的告警
+            alerts_to_resolve.append(existing_alert)
+            logger.info(f"Alert resolved for device {device_id}: {alert_key[0]}/{alert_key[1]}")
+    
+    # 未在本次监控中出现的旧告警保持活跃（组件可能只是本次未采集到）
+    return alerts_to_create, alerts_to_refresh, alerts_to_resolve
 
-        # 获取设备当前状态
-        device = db.query(DeviceInfoDO).filter(DeviceInfoDO.device_id == device_id).first()
-        if not device:
-            logger.error(f"Device with id {device_id} not found in database.")
-            return
-            
-        old_health_status = device.health_status
-        device.last_check_time = datetime.now()
-        device.health_status = result.get('overall_health', 'unknown')
-        new_health_status = device.health_status
-
-        # 2. 状态对比与逻辑处理
-        all_monitored_components = result.get('all_components', [])
-        # 统一将内部 component_type 转为硬件字典码（小写）
-        normalized_components = []
-        for comp in all_monitored_components:
-            ct = to_hardware_code(comp.get('component_type'), comp)
-            nc = comp.copy()
-            nc['component_type'] = ct
-            normalized_components.append(nc)
-        monitored_components_map = {(comp['component_type'], comp['component_name']): comp for comp in normalized_components}
-
-        # 监控统计日志：记录各类型异常数量（帮助定位如memory未入库问题）
+
+def save_monitoring_results(items: List[Tuple[Dict[str, Any], Dict[str, Any]]]) -> List[int]:
+    """
+    批量保存监控结果，并实现告警生命周期管理
+    
+    一个分块内所有设备的告警差异在内存中计算，再以少量集合语句写入：
+    一次批量INSERT新告警、一条UPDATE刷新持续告警的最后发生时间、一条UPDATE解决已恢复告警、
+    一次按主键批量更新设备健康状态，并重算告警有变化设备的组件健康汇总；紧急度规则来自进程内缓存。
+    整块写入失败时回退为逐台设备独立事务，单台设备的异常数据不会丢弃其他设备的结果
+    
+    Args:
+        items: [(监控结果, 设备信息)]
+        
+    Returns:
+        List[int]: 保存失败的设备ID
+    """
+    items = [(result, device_info) for result, device_info in items if result.get('device_id') is not None]
+    if not items:
+        return []
+    
+    db = next(get_sync_db())
+    try:
+        saved = []
+        failed_device_ids = []
         try:
-            type_bad_counts = {}
-            for c in normalized_components:
-                if c.get('health_status') != 'ok':
-                    key = c.get('component_type') or 'unknown'
-                    type_bad_counts[key] = type_bad_counts.get(key, 0) + 1
-            logger.info(f"Monitored abnormal components by type: {type_bad_counts}")
-        except Exception:
-            pass
-        
-        alerts_to_create = []
-        alerts_to_resolve = []
-        
-        # 记录已经处理过的组件，避免重复处理
-        processed_components = set()
-        
-        # 1. 首先处理直接生成的告警数据（如宕机检测、带外IP连通性等）
-        direct_alerts = result.get('alerts', [])
-        for alert_data in direct_alerts:
-            component_type = alert_data.get('component_type')
-            component_name = alert_data.get('component_name')
-            health_status = alert_data.get('health_status')
-            alert_message = alert_data.get('alert_message', '')
-            
-            # 应用组件类型映射
-            normalized_component_type = to_hardware_code(component_type, alert_data)
-            alert_key = (normalized_component_type, component_name)
-            
-            # 记录已处理的组件
-            processed_components.add(alert_key)
-            
-            existing_alert = active_alerts_map.get(alert_key)
-            
-            if not existing_alert:
-                # 新的直接告警
-                urgency_level = urgency_rules_map.get((business_type, normalized_component_type.lower()), 'scheduled')
-                
-                new_alert = AlertInfoDO(
-                    device_id=device_id,
-                    component_type=normalized_component_type,
-                    component_name=component_name,
-                    health_status=health_status,
-                    urgency_level=urgency_level,
-                    alert_status='active',
-                    first_occurrence=datetime.now(),
-                    last_occurrence=datetime.now()
-                )
-                alerts_to_create.append(new_alert)
-                logger.info(f"New direct alert for device {device_id}: {normalized_component_type}/{component_name} -> {health_status}, Urgency: {urgency_level}")
-            else:
-                # 更新现有的直接告警
-                existing_alert.last_occurrence = datetime.now()
-                # 从map中移除，代表已处理
-                active_alerts_map.pop(alert_key)
-                logger.info(f"Updated direct alert for device {device_id}: {normalized_component_type}/{component_name}")
-        
-        # 2. 然后遍历当前监控到的所有组件状态（跳过已处理的组件）
-        for (component_type, component_name), component_data in monitored_components_map.items():
-            health_status = component_data['health_status']
-            alert_key = (component_type, component_name)
-            
-            # 跳过已经在直接告警中处理过的组件
-            if alert_key in processed_components:
-                logger.debug(f"Skipping already processed component: {component_type}/{component_name}")
-                continue
-            
-            existing_alert = active_alerts_map.get(alert_key)
-            
-            if health_status != 'ok':
+            saved.append(_write_monitoring_results(db, items))
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            logger.warning(f"Error saving monitoring results for {len(items)} devices, retrying per device: {str(e)}")
+            for item in items:
+                device_id = item[0]['device_id']
                 try:
-                    logger.info(f"Evaluating alert create/update | type={component_type} name={component_name} health={health_status}")
-                except Exception:
-                    pass
-                # 组件状态异常
-                if not existing_alert:
-                    # 情况1: 新告警
-                    urgency_level = urgency_rules_map.get((business_type, component_type.lower()), 'scheduled')
-                    
-                    new_alert = AlertInfoDO(
-                    device_id=device_id,
-                    component_type=component_type,
-                    component_name=component_name,
-                    health_status=health_status,
-                    urgency_level=urgency_level,
-                    alert_status='active',
-                        first_occurrence=datetime.now(),
-                        last_occurrence=datetime.now()
-                    )
-                    alerts_to_create.append(new_alert)
-                    logger.info(f"New alert for device {device_id}: {component_type}/{component_name} -> {health_status}, Urgency: {urgency_level}")
-                else:
-                    # 情况2: 持续的告警，更新最后发生时间
-                    existing_alert.last_occurrence = datetime.now()
-                    # 从map中移除，代表已处理
-                    active_alerts_map.pop(alert_key)
-            else:
-                # 组件状态正常
-                if existing_alert:
-                    # 情况3: 已恢复的告警
-                    existing_alert.alert_status = 'resolved'
-                    existing_alert.resolved_time = datetime.now()
-                    alerts_to_resolve.append(existing_alert)
-                    logger.info(f"Alert resolved for device {device_id}: {component_type}/{component_name}")
-                    # 从map中移除，代表已处理
-                    active_alerts_map.pop(alert_key)
-
-        # 3. 处理未在本次监控中出现的旧告警（可能由于组件被移除等原因）
-        # for (component_type, component_name), alert in active_alerts_map.items():
-        #     # 这些是数据库里有，但本次监控没返回的告警，也标记为解决
-        #     alert.alert_status = 'resolved'
-        #     alert.resolved_time = datetime.now()
-        #     alerts_to_resolve.append(alert)
-        #     logger.warning(f"Stale alert resolved for device {device_id}: {component_type}/{component_name} was not reported in this cycle.")
-
-        # 4. 批量数据库操作
-        if alerts_to_create:
-            db.add_all(alerts_to_create)
-        
-        # 所有变更（包括 alets_to_resolve 和持续告警的更新）将通过一次 commit 完成
-        db.commit()
+                    saved.append(_write_monitoring_results(db, [item]))
+                    db.commit()
+                except Exception as device_error:
+                    db.rollback()
+                    failed_device_ids.append(device_id)
+                    logger.error(f"Error saving monitoring result for device {device_id}: {str(device_error)}")
+        
+        notifications = [notification for outcome in saved for notification in outcome["notifications"]]
+        # 告警或设备健康状态有变化时使首页快照失效（仅刷新最后发生/检查时间的变化由快照TTL覆盖）
+        if any(outcome["created"] or outcome["resolved"] for outcome in saved) or any(
+            old_health_status != new_health_status for _, old_health_status, new_health_status, _ in notifications
+        ):
+            DashboardSnapshotCache.invalidate()
+        
+        # 4. 准备并推送通知
+        for device_info, old_health_status, new_health_status, changes in notifications:
+            if old_health_status != new_health_status or changes:
+                _schedule_push_notifications(device_info, old_health_status, new_health_status, changes)
+        
+        logger.info(
+            f"Saved monitoring results for {sum(outcome['devices'] for outcome in saved)} devices: "
+            f"{sum(outcome['created'] for outcome in saved)} new, "
+            f"{sum(outcome['refreshed'] for outcome in saved)} refreshed, "
+            f"{sum(outcome['resolved'] for outcome in saved)} resolved, "
+            f"{len(failed_device_ids)} failed."
+        )
+        return failed_device_ids
+    finally:
+        db.close()
+
+
+def _write_monitoring_results(db, items: List[Tuple[Dict[str, Any], Dict[str, Any]]]) -> Dict[str, Any]:
+    """
+    在当前事务中写入一组设备的监控结果（不提交，由调用方提交或回滚）
+    
+    Args:
+        db: 同步数据库会话
+        items: [(监控结果, 设备信息)]
+        
+    Returns:
+        Dict: 写入统计与待推送的通知 {devices, created, refreshed, resolved, notifications}
+    """
+    device_ids = [result['device_id'] for result, _ in items]
+    now = datetime.now()
+    
+    # 1. 批量获取数据：设备当前状态、所有活跃告警
+    devices_map = {
+        row.device_id: row for row in db.query(
+            DeviceInfoDO.device_id, DeviceInfoDO.hostname, DeviceInfoDO.health_status
+        ).filter(DeviceInfoDO.device_id.in_(device_ids)).all()
+    }
+    active_alerts_by_device: Dict[int, Dict[Tuple[str, str], Any]] = {}
+    for alert in db.query(
+        AlertInfoDO.alert_id, AlertInfoDO.device_id, AlertInfoDO.component_type,
+        AlertInfoDO.component_name, AlertInfoDO.urgency_level
+    ).filter(
+        AlertInfoDO.device_id.in_(device_ids),
+        AlertInfoDO.alert_status == 'active'
+    ).all():
+        active_alerts_by_device.setdefault(alert.device_id, {})[(alert.component_type, alert.component_name)] = alert
+    
+    # 2. 状态对比：计算新建/刷新/解决集合
+    alerts_to_create = []
+    refresh_ids = []
+    alerts_to_resolve = []
+    device_updates = []
+    notifications = []
+    rollup_device_ids = set()
+    for result, device_info in items:
+        device_id = result['device_id']
+        device = devices_map.get(device_id)
+        if device is None:
+            logger.error(f"Device with id {device_id} not found in database.")
+            continue
+        
+        creates, refreshes, resolves = _reconcile_device_alerts(
+            db, result, device_info.get('business_type', ''), active_alerts_by_device.get(device_id, {})
+        )
+        alerts_to_create.extend(creates)
+        refresh_ids.extend(alert.alert_id for alert in refreshes)
+        alerts_to_resolve.extend(resolves)
+        if creates or resolves:
+            rollup_device_ids.add(device_id)
+        
+        new_health_status = result.get('overall_health', 'unknown')
+        device_updates.append({
+            "device_id": device_id,
+            "health_status": new_health_status,
+            "last_check_time": now
+        })
         
-        # 5. 准备并推送通知 (此部分可以进一步细化)
         # 此处简化处理，只对新告警和已解决告警推送
-        new_alerts_data = [
+        changes = [
             {
-                "device_id": alert.device_id, "hostname": device.hostname, "component_type": alert.component_type,
-                "component_name": alert.component_name, "health_status": alert.health_status, "urgency_level": alert.urgency_level,
-                "action": "created"
-            } for alert in alerts_to_create
-        ]
-        resolved_alerts_data = [
+                "device_id": device_id, "hostname": device.hostname, "component_type": alert["component_type"],
+                "component_name": alert["component_name"], "health_status": alert["health_status"],
+                "urgency_level": alert["urgency_level"], "action": "created"
+            } for alert in creates
+        ] + [
             {
-                "device_id": alert.device_id, "hostname": device.hostname, "component_type": alert.component_type,
+                "device_id": device_id, "hostname": device.hostname, "component_type": alert.component_type,
                 "component_name": alert.component_name, "health_status": "ok", "urgency_level": alert.urgency_level,
                 "action": "resolved"
-            } for alert in alerts_to_resolve
+            } for alert in resolves
         ]
-        
-        all_changes = new_alerts_data + resolved_alerts_data
-        
-        if old_health_status != new_health_status or all_changes:
-            _schedule_push_notifications(device_info, old_health_status, new_health_status, all_changes)
-
-        logger.info(f"Saved monitoring result for device {device_id}: {len(alerts_to_create)} new, {len(alerts_to_resolve)} resolved.")
-        
-    except Exception as e:
-        logger.error(f"Error saving monitoring result for device {device_info.get('id', 'N/A')}: {str(e)}")
-        if 'db' in locals():
-            db.rollback()
-    finally:
-        db.close()
+        notifications.append((device_info, device.health_status, new_health_status, changes))
+        logger.info(f"Reconciled monitoring result for device {device_id}: {len(creates)} new, {len(resolves)} resolved.")
+    
+    # 3. 集合语句写入，所有变更一次提交
+    if alerts_to_create:
+        for alert in alerts_to_create:
+            alert["first_occurrence"] = now
+            alert["last_occurrence"] = now
+        db.execute(insert(AlertInfoDO), alerts_to_create)
+    if refresh_ids:
+        # 按本次读取到的活跃告警主键刷新（component_name 可能为空，按主键匹配更可靠）
+        db.execute(
+            update(AlertInfoDO)
+            .where(AlertInfoDO.alert_id.in_(refresh_ids), AlertInfoDO.alert_status == 'active')
+            .values(last_occurrence=now)
+            .execution_options(synchronize_session=False)
+        )
+    if alerts_to_resolve:
+        db.execute(
+            update(AlertInfoDO)
+            .where(AlertInfoDO.alert_id.in_([alert.alert_id for alert in alerts_to_resolve]))
+            .values(alert_status='resolved', resolved_time=now)
+            .execution_options(synchronize_session=False)
+        )
+    if device_updates:
+        # 按主键批量更新（executemany）
+        db.execute(update(DeviceInfoDO), device_updates)
+    # 告警有变化或尚无汇总行的设备重算组件健康汇总，与告警变更同一事务提交
+    rollup_device_ids |= DeviceHealthRollupDao.missing_device_ids(db, [update_row["device_id"] for update_row in device_updates])
+    if rollup_device_ids:
+        DeviceHealthRollupDao.refresh(db, list(rollup_device_ids))
+    return {
+        "devices": len(device_updates),
+        "created": len(alerts_to_create),
+        "refreshed": len(refresh_ids),
+        "resolved": len(alerts_to_resolve),
+        "notifications": notifications
+    }
 
 
 def _schedule_push_notifications(device_info: Dict[str, Any], old_health_status: str, new_health_status: str, all_alert_changes: List[Dict]):
@@ -614,10 +1081,6 @@ def _schedule_push_notifications(device_info: Dict[str, Any], old_health_status:
         new_health_status: 新健康状态
         all_alert_changes: 所有告警变化列表（新建和解决的告警）
     """
-    import threading
-    import asyncio
-    from concurrent.futures import ThreadPoolExecutor
-    
     # 推送前条件检查
     has_health_change = old_health_status != new_health_status
     has_alert_changes = len(all_alert_changes) > 0
@@ -630,84 +1093,64 @@ def _schedule_push_notifications(device_info: Dict[str, Any], old_health_status:
     # 记录推送决策
     logger.info(f"Push triggered for device {device_info['device_id']}: health_change={has_health_change}, alert_changes={len(all_alert_changes)}")
     
-    def push_notifications():
-        """在新线程中运行推送通知"""
+    async def async_push_notifications():
         try:
-            # 创建新的事件循环
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
+            push_count = 0
             
-            async def async_push_notifications():
-                try:
-                    push_count = 0
-                    
-                    # 1. 设备健康状态变化处理（静默更新健康图）
-                    if has_health_change:
-                        await push_service.realtime.push_dashboard_update({
-                            "device_id": device_info['device_id'],
-                            "hostname": device_info.get('hostname'),
-                            "old_health_status": old_health_status,
-                            "new_health_status": new_health_status,
-                            "update_type": "health_chart_only"
-                        }, "health_status_silent_update")
-                        push_count += 1
-                        logger.info(f"Silent health status update: {device_info['device_id']} {old_health_status} -> {new_health_status}")
-                    
-                    # 2. 推送告警变化
-                    if has_alert_changes:
-                        for alert_data in all_alert_changes:
-                            if alert_data.get('action') == 'created':
-                                await push_service.alert.push_new_alert(alert_data)
-                            elif alert_data.get('action') == 'resolved':
-                                await push_service.alert.push_resolved_alert(alert_data)
-                            push_count += 1
-                        
-                        # 推送告警列表刷新事件
-                        alert_refresh_message = {
-                            "device_id": device_info['device_id'],
-                            "hostname": device_info.get('hostname'),
-                            "alert_changes": len(all_alert_changes),
-                            "new_alerts": len([a for a in all_alert_changes if a.get('action') == 'created']),
-                            "resolved_alerts": len([a for a in all_alert_changes if a.get('action') == 'resolved'])
-                        }
-                        
-                        await push_service.realtime.push_dashboard_update(alert_refresh_message, "alert_list_refresh")
-                        push_count += 1
-                        logger.info(f"Alert list refresh: {device_info['device_id']} ({len(all_alert_changes)} changes)")
-                    
-                    # 3. 推送Dashboard数据更新通知
-                    if has_health_change or has_alert_changes:
-                        await push_service.realtime.push_dashboard_update({
-                            "device_id": device_info['device_id'],
-                            "hostname": device_info.get('hostname'),
-                            "health_status": new_health_status,
-                            "alert_count": len(all_alert_changes),
-                            "has_health_change": has_health_change,
-                            "has_alert_changes": has_alert_changes
-                        }, "device_updated")
-                        push_count += 1
-                    
-                    logger.info(f"Push completed for device {device_info['device_id']}: {push_count} messages sent")
-                        
-                except Exception as e:
-                    logger.error(f"Error in async push notifications: {str(e)}")
+            # 1. 设备健康状态变化处理（静默更新健康图）
+            if has_health_change:
+                await push_service.realtime.push_dashboard_update({
+                    "device_id": device_info['device_id'],
+                    "hostname": device_info.get('hostname'),
+                    "old_health_status": old_health_status,
+                    "new_health_status": new_health_status,
+                    "update_type": "health_chart_only"
+                }, "health_status_silent_update")
+                push_count += 1
+                logger.info(f"Silent health status update: {device_info['device_id']} {old_health_status} -> {new_health_status}")
+            
+            # 2. 推送告警变化
+            if has_alert_changes:
+                for alert_data in all_alert_changes:
+                    if alert_data.get('action') == 'created':
+                        await push_service.alert.push_new_alert(alert_data)
+                    elif alert_data.get('action') == 'resolved':
+                        await push_service.alert.push_alert_resolved(alert_data)
+                    push_count += 1
+                
+                # 推送告警列表刷新事件
+                alert_refresh_message = {
+                    "device_id": device_info['device_id'],
+                    "hostname": device_info.get('hostname'),
+                    "alert_changes": len(all_alert_changes),
+                    "new_alerts": len([a for a in all_alert_changes if a.get('action') == 'created']),
+                    "resolved_alerts": len([a for a in all_alert_changes if a.get('action') == 'resolved'])
+                }
+                
+                await push_service.realtime.push_dashboard_update(alert_refresh_message, "alert_list_refresh")
+                push_count += 1
+                logger.info(f"Alert list refresh: {device_info['device_id']} ({len(all_alert_changes)} changes)")
             
-            # 运行异步推送
-            loop.run_until_complete(async_push_notifications())
+            # 3. 推送Dashboard数据更新通知
+            if has_health_change or has_alert_changes:
+                await push_service.realtime.push_dashboard_update({
+                    "device_id": device_info['device_id'],
+                    "hostname": device_info.get('hostname'),
+                    "health_status": new_health_status,
+                    "alert_count": len(all_alert_changes),
+                    "has_health_change": has_health_change,
+                    "has_alert_changes": has_alert_changes
+                }, "device_updated")
+                push_count += 1
             
+            logger.info(f"Push completed for device {device_info['device_id']}: {push_count} messages sent")
+                
         except Exception as e:
-            logger.error(f"Error in push notifications thread: {str(e)}")
-        finally:
-            # 清理事件循环
-            try:
-                loop.close()
-            except:
-                pass
+            logger.error(f"Error in async push notifications: {str(e)}")
     
-    # 使用线程池执行推送任务
+    # 提交到进程常驻事件循环，不再为每次推送创建线程和事件循环
     try:
-        with ThreadPoolExecutor(max_workers=1) as executor:
-            executor.submit(push_notifications)
+        MonitoringWorker.instance().submit(async_push_notifications())
     except Exception as e:
         logger.error(f"Error scheduling push notifications: {str(e)}")
 
@@ -801,6 +1244,7 @@ def recalculate_urgency_for_device(device_id: int):
 
         if updated_count > 0:
             db.commit()
+            DashboardSnapshotCache.invalidate()
             logger.info(f"Urgency recalculation completed for device {device_id}. {updated_count} alerts updated.")
             
             # 发送WebSocket通知
@@ -813,7 +1257,7 @@ def recalculate_urgency_for_device(device_id: int):
                 "message": f"设备 {device.hostname or device_id} 的告警紧急度已更新",
                 "timestamp": datetime.now().isoformat()
             }
-            publish_sync_redis_message("websocket:alerts", message)
+            EventBus.publish_sync(["alerts"], message)
 
         else:
             logger.info(f"Urgency recalculation completed for device {device_id}. No changes needed.")
@@ -837,6 +1281,7 @@ def recalculate_urgency_for_rule_change(business_type: str, hardware_type: str):
     db = next(get_sync_db())
     try:
         logger.info(f"Starting urgency recalculation for rule change: business_type='{business_type}', hardware_type='{hardware_type}'")
+        UrgencyRuleCache.invalidate()
         
         # 1. 查找所有匹配该业务类型的设备
         devices = db.query(DeviceInfoDO.device_id).filter(DeviceInfoDO.business_type == business_type).all()
@@ -880,6 +1325,7 @@ def recalculate_urgency_for_rule_change(business_type: str, hardware_type: str):
 
         if updated_count > 0:
             db.commit()
+            DashboardSnapshotCache.invalidate()
             logger.info(f"Urgency recalculation for rule change completed. {updated_count} alerts updated.")
             
             # 发送WebSocket通知
@@ -892,7 +1338,7 @@ def recalculate_urgency_for_rule_change(business_type: str, hardware_type: str):
                 "message": f"因规则变更， {updated_count}条告警的紧急度已更新",
                 "timestamp": datetime.now().isoformat()
             }
-            publish_sync_redis_message("websocket:alerts", message)
+            EventBus.publish_sync(["alerts"], message)
 
         else:
             logger.info(f"Urgency recalculation for rule change completed. No changes needed.")
@@ -905,15 +1351,51 @@ def recalculate_urgency_for_rule_change(business_type: str, hardware_type: str):
 
 
 # ===============================================================
-# 删除了冗余的设备可用性检测任务
-# 现在统一在 DeviceMonitor 中进行业务IP连通性检测
+# 后台连通性探测：刷新首页/连通性统计读取的连通性记录
+# 宕机告警仍统一在 DeviceMonitor 中生成，此任务只负责可达性与时延记录
 # ===============================================================
 
 
-# 已删除 check_all_devices_availability 任务
-
-
-# 已删除 save_availability_result 函数
+@celery_app.task(name='check_all_devices_availability')
+def check_all_devices_availability(skip_seconds: int = None) -> Dict[str, Any]:
+    """
+    探测有业务IP设备的连通性并写入连通性记录，监控周期刚检测过的设备跳过
+    
+    Args:
+        skip_seconds: 记录在该时间内的设备跳过探测（秒），默认取配置，0表示全部探测
+        
+    Returns:
+        Dict: 探测结果统计
+    """
+    db = next(get_sync_db())
+    try:
+        devices = [
+            dict(row._mapping) for row in db.query(
+                DeviceInfoDO.device_id, DeviceInfoDO.hostname, DeviceInfoDO.business_ip, DeviceInfoDO.location,
+                DeviceInfoDO.business_type, DeviceInfoDO.probe_ports
+            ).filter(DeviceInfoDO.business_ip.isnot(None)).all()
+        ]
+    finally:
+        db.close()
+    
+    try:
+        result = MonitoringWorker.instance().run(ConnectivityService.probe_stale_devices(devices, skip_seconds))
+        logger.info(
+            f"Connectivity probe completed: {result['probed_devices']}/{result['total_devices']} devices probed, "
+            f"{result['offline_devices']} offline"
+        )
+        return {
+            "success": True,
+            **result,
+            "timestamp": datetime.now().isoformat()
+        }
+    except Exception as e:
+        logger.error(f"Error probing device connectivity: {str(e)}")
+        return {
+            "success": False,
+            "error": str(e),
+            "timestamp": datetime.now().isoformat()
+        }
 
 
 # Celery Beat 启动命令（示例）：
@@ -157,11 +157,12 @@ async def get_scheduled_alerts(
 @alertController.get('/distribution', dependencies=[Depends(CheckUserInterfaceAuth('redfish:alert:list'))])
 async def get_alert_distribution(
     request: Request,
+    days: Optional[int] = Query(default=None, ge=1, le=366, description="统计最近N天新增告警，为空时统计当前活跃告警"),
     query_db: AsyncSession = Depends(get_db)
 ):
     """获取告警分布统计"""
     try:
-        distribution = await AlertService.get_alert_distribution_services(query_db)
+        distribution = await AlertService.get_alert_distribution_services(query_db, days)
         logger.info('获取告警分布统计成功')
         return ResponseUtil.success(model_content=distribution)
     except Exception as e:
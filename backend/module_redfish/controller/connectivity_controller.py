@@ -9,6 +9,7 @@ from config.get_db import get_db
 from module_admin.aspect.interface_auth import CheckUserInterfaceAuth
 from module_admin.entity.vo.user_vo import CurrentUserModel
 from module_admin.service.login_service import LoginService
+from module_redfish.core.connectivity_store import ConnectivityStore
 from module_redfish.service.connectivity_service import ConnectivityService
 from module_redfish.entity.vo.connectivity_vo import (
     ConnectivityStatsQueryModel,
@@ -161,15 +162,7 @@ async def refresh_connectivity_cache(
 ):
     """刷新连通性统计缓存"""
     try:
-        # 先清理旧缓存
-        try:
-            from module_admin.service.cache_service import CacheService
-            await CacheService.delete_cache("connectivity_stats")
-            logger.info("已清理旧的连通性统计缓存")
-        except Exception as e:
-            logger.warning(f"清理缓存失败: {e}")
-        
-        # 强制刷新（不使用缓存）
+        # 投递后台探测任务全量刷新连通性记录，本次返回已有记录
         service_result = await ConnectivityService.get_connectivity_statistics(
             query_db, use_cache=False
         )
@@ -177,10 +170,10 @@ async def refresh_connectivity_cache(
         # 转换为响应模型（驼峰命名）
         response_model = ConnectivityStatsResponseModel.from_service_result(service_result)
         
-        logger.info(f'连通性统计缓存已刷新: {service_result.get("online_devices", 0)} 在线, {service_result.get("offline_devices", 0)} 离线')
+        logger.info(f'已投递连通性记录刷新任务: 当前 {service_result.get("online_devices", 0)} 在线, {service_result.get("offline_devices", 0)} 离线')
         return ResponseUtil.success(
             model_content=response_model,
-            msg='缓存已刷新'
+            msg='已提交后台刷新'
         )
         
     except Exception as e:
@@ -195,11 +188,10 @@ async def refresh_connectivity_cache(
 async def clear_connectivity_cache(
     request: Request
 ):
-    """清理连通性统计缓存"""
+    """清理连通性记录（清理后统计中的设备在下次检测前计为状态未知）"""
     try:
-        from module_admin.service.cache_service import CacheService
-        await CacheService.delete_cache("connectivity_stats")
-        logger.info("连通性统计缓存已清理")
+        await ConnectivityStore.clear()
+        logger.info("连通性记录已清理")
         return ResponseUtil.success(msg='缓存已清理')
         
     except Exception as e:
@@ -8,7 +8,7 @@ from typing import Union, Optional, Literal
 from config.get_db import get_db
 from module_admin.service.login_service import LoginService
 from module_admin.aspect.interface_auth import CheckUserInterfaceAuth
-from module_redfish.entity.vo.dashboard_vo import DashboardQueryModel
+from module_redfish.entity.vo.dashboard_vo import DashboardQueryModel, DeviceHealthSummaryQueryModel
 from module_redfish.service.dashboard_service import DashboardService
 from utils.response_util import ResponseUtil
 from utils.log_util import logger
@@ -114,6 +114,22 @@ async def get_device_health_summary(
         return ResponseUtil.failure(msg='获取设备健康汇总列表失败')
 
 
+@dashboardController.get('/device/summary/page', dependencies=[Depends(CheckUserInterfaceAuth('redfish:dashboard:device'))])
+async def get_device_health_summary_page(
+    request: Request,
+    query_model: DeviceHealthSummaryQueryModel = Depends(DeviceHealthSummaryQueryModel.as_query),
+    query_db: AsyncSession = Depends(get_db)
+):
+    """分页获取设备健康汇总（服务端分页排序）"""
+    try:
+        summary_page = await DashboardService.get_device_health_summary_page_services(query_db, query_model)
+        logger.info('分页获取设备健康汇总成功')
+        return ResponseUtil.success(model_content=summary_page)
+    except Exception as e:
+        logger.error(f'分页获取设备健康汇总失败: {str(e)}')
+        return ResponseUtil.failure(msg='分页获取设备健康汇总失败')
+
+
 @dashboardController.get('/metrics', dependencies=[Depends(CheckUserInterfaceAuth('redfish:dashboard:metrics'))])
 async def get_system_health_metrics(
     request: Request,
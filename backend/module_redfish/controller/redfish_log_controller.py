@@ -15,7 +15,7 @@ from module_admin.service.login_service import LoginService
 from module_redfish.entity.vo.redfish_log_vo import (
     RedfishLogPageQueryModel, RedfishLogDetailModel, DeviceLogCollectModel,
     RedfishLogPageResponseModel, RedfishLogStatsModel, RedfishLogCollectResultModel,
-    RedfishLogCleanupResultModel, RedfishLogTempCollectResultModel
+    RedfishLogCleanupResultModel, RedfishLogTempCollectResultModel, RedfishLogCollectJobModel
 )
 from module_redfish.service.redfish_log_service import RedfishLogService
 from utils.response_util import ResponseUtil
@@ -143,6 +143,49 @@ async def collect_device_logs(
         return ResponseUtil.failure(msg='收集设备日志失败')
 
 
+@redfishLogController.get(
+    '/collect/job/{job_id}',
+    response_model=RedfishLogCollectJobModel,
+    dependencies=[Depends(CheckUserInterfaceAuth('redfish:log:collect'))]
+)
+async def get_log_collection_job(
+    request: Request,
+    job_id: str
+):
+    """查询批量日志收集任务状态"""
+    try:
+        job_result = await RedfishLogService.get_log_collection_job_services(job_id)
+        return ResponseUtil.success(data=job_result)
+    except ValueError as e:
+        logger.warning(f'查询日志收集任务失败: {str(e)}')
+        return ResponseUtil.failure(msg=str(e))
+    except Exception as e:
+        logger.error(f'查询日志收集任务失败: {str(e)}')
+        return ResponseUtil.failure(msg='查询日志收集任务失败')
+
+
+@redfishLogController.post(
+    '/collect/job/{job_id}/resume',
+    response_model=RedfishLogCollectJobModel,
+    dependencies=[Depends(CheckUserInterfaceAuth('redfish:log:collect'))]
+)
+async def resume_log_collection_job(
+    request: Request,
+    job_id: str
+):
+    """恢复中断的批量日志收集任务"""
+    try:
+        job_result = await RedfishLogService.resume_log_collection_job_services(job_id)
+        logger.info(f'恢复日志收集任务: {job_id}')
+        return ResponseUtil.success(data=job_result)
+    except ValueError as e:
+        logger.warning(f'恢复日志收集任务失败: {str(e)}')
+        return ResponseUtil.failure(msg=str(e))
+    except Exception as e:
+        logger.error(f'恢复日志收集任务失败: {str(e)}')
+        return ResponseUtil.failure(msg='恢复日志收集任务失败')
+
+
 @redfishLogController.get(
     '/device/list',
     dependencies=[Depends(CheckUserInterfaceAuth(['redfish:log:temp', 'redfish:log:history', 'redfish:log:collect']))]
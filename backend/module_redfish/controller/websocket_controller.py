@@ -10,6 +10,8 @@ from loguru import logger
 from datetime import datetime
 
 from ..core.websocket_manager import websocket_manager
+from ..core.event_bus import EventBus
+from ..service.dashboard_service import DashboardService
 from module_task.redfish_monitor_tasks import manual_trigger_monitor_job
 from module_admin.annotation.log_annotation import Log
 from module_admin.aspect.interface_auth import CheckUserInterfaceAuth
@@ -72,34 +74,36 @@ class WebSocketController:
         
         logger.info(f"处理WebSocket连接请求: user_id={user_id}")
         
+        connection_id = None
         try:
-            # 建立连接
-            await websocket_manager.connect(websocket, user_id)
+            # 建立连接（同一用户的多个连接各自独立）
+            connection_id = await websocket_manager.connect(websocket, user_id)
             
             # 自动加入dashboard房间
-            await websocket_manager.join_room(user_id, "dashboard")
+            await websocket_manager.join_room(connection_id, "dashboard")
             
             # 发送初始状态信息
-            await WebSocketController._send_initial_status(user_id)
+            await WebSocketController._send_initial_status(connection_id)
             
             # 进入消息处理循环
-            await WebSocketController._handle_messages(websocket, user_id)
+            await WebSocketController._handle_messages(websocket, connection_id)
             
         except WebSocketDisconnect:
-            logger.info(f"WebSocket客户端断开连接: user_id={user_id}")
+            logger.info(f"WebSocket客户端断开连接: user_id={user_id}, connection_id={connection_id}")
         except Exception as e:
-            logger.error(f"WebSocket连接处理异常: user_id={user_id}, error={str(e)}")
+            logger.error(f"WebSocket连接处理异常: user_id={user_id}, connection_id={connection_id}, error={str(e)}")
         finally:
             # 清理连接
-            await websocket_manager.disconnect(user_id)
+            if connection_id:
+                await websocket_manager.disconnect(connection_id)
     
     @staticmethod
-    async def _send_initial_status(user_id: str):
+    async def _send_initial_status(connection_id: str):
         """
         发送初始状态信息
         
         Args:
-            user_id: 用户ID
+            connection_id: 连接ID
         """
         try:
             # 获取监控任务状态（简化版本）
@@ -123,28 +127,28 @@ class WebSocketController:
             }
             
             # 发送初始状态
-            await websocket_manager.send_to_user(user_id, {
+            await websocket_manager.send_to_connection(connection_id, {
                 "type": "initial_status",
                 "data": {
                     "monitor_status": monitor_status,
                     "monitor_config": monitor_config,
-                    "connections_count": websocket_manager.get_active_connections_count()
+                    "connections_count": await websocket_manager.get_active_connections_count()
                 },
                 "message": "已获取初始状态信息",
                 "timestamp": datetime.now().isoformat()
             })
             
         except Exception as e:
-            logger.error(f"发送初始状态信息失败: user_id={user_id}, error={str(e)}")
+            logger.error(f"发送初始状态信息失败: connection_id={connection_id}, error={str(e)}")
     
     @staticmethod
-    async def _handle_messages(websocket: WebSocket, user_id: str):
+    async def _handle_messages(websocket: WebSocket, connection_id: str):
         """
         处理WebSocket消息
         
         Args:
             websocket: WebSocket连接对象
-            user_id: 用户ID
+            connection_id: 连接ID
         """
         while True:
             try:
@@ -152,94 +156,96 @@ class WebSocketController:
                 data = await websocket.receive_text()
                 message = json.loads(data)
                 
-                logger.debug(f"收到WebSocket消息: user_id={user_id}, message={message}")
+                logger.debug(f"收到WebSocket消息: connection_id={connection_id}, message={message}")
                 
                 # 路由消息到相应的处理器
-                await WebSocketController._route_message(user_id, message)
+                await WebSocketController._route_message(connection_id, message)
                 
             except WebSocketDisconnect:
                 break
             except json.JSONDecodeError:
-                logger.warning(f"收到无效JSON消息: user_id={user_id}")
-                await websocket_manager.send_to_user(user_id, {
+                logger.warning(f"收到无效JSON消息: connection_id={connection_id}")
+                await websocket_manager.send_to_connection(connection_id, {
                     "type": "error",
                     "message": "消息格式错误，请发送有效的JSON格式",
                     "timestamp": datetime.now().isoformat()
                 })
             except Exception as e:
-                logger.error(f"处理WebSocket消息异常: user_id={user_id}, error={str(e)}")
-                await websocket_manager.send_to_user(user_id, {
+                logger.error(f"处理WebSocket消息异常: connection_id={connection_id}, error={str(e)}")
+                await websocket_manager.send_to_connection(connection_id, {
                     "type": "error",
                     "message": f"处理消息时发生错误: {str(e)}",
                     "timestamp": datetime.now().isoformat()
                 })
     
     @staticmethod
-    async def _route_message(user_id: str, message: Dict[str, Any]):
+    async def _route_message(connection_id: str, message: Dict[str, Any]):
         """
         路由消息到相应的处理器
         
         Args:
-            user_id: 用户ID
+            connection_id: 连接ID
             message: 消息内容
         """
         try:
             message_type = message.get("type")
             
             if message_type == "join_room":
-                await WebSocketController._handle_join_room(user_id, message)
+                await WebSocketController._handle_join_room(connection_id, message)
             elif message_type == "leave_room":
-                await WebSocketController._handle_leave_room(user_id, message)
+                await WebSocketController._handle_leave_room(connection_id, message)
             elif message_type == "manual_monitor":
-                await WebSocketController._handle_manual_monitor(user_id, message)
+                await WebSocketController._handle_manual_monitor(connection_id, message)
             elif message_type == "get_status":
-                await WebSocketController._handle_get_status(user_id, message)
+                await WebSocketController._handle_get_status(connection_id, message)
             elif message_type == "ping":
-                await WebSocketController._handle_ping(user_id, message)
+                await WebSocketController._handle_ping(connection_id, message)
+            elif message_type == "dashboard_sync":
+                await WebSocketController._handle_dashboard_sync(connection_id, message)
             else:
-                await websocket_manager.send_to_user(user_id, {
+                await websocket_manager.send_to_connection(connection_id, {
                     "type": "error",
                     "message": f"未知消息类型: {message_type}",
                     "timestamp": datetime.now().isoformat()
                 })
                 
         except Exception as e:
-            logger.error(f"路由消息失败: user_id={user_id}, error={str(e)}")
+            logger.error(f"路由消息失败: connection_id={connection_id}, error={str(e)}")
     
     @staticmethod
-    async def _handle_join_room(user_id: str, message: Dict[str, Any]):
+    async def _handle_join_room(connection_id: str, message: Dict[str, Any]):
         """处理加入房间请求"""
         room = message.get("room")
         if room:
-            await websocket_manager.join_room(user_id, room)
+            await websocket_manager.join_room(connection_id, room)
         else:
-            await websocket_manager.send_to_user(user_id, {
+            await websocket_manager.send_to_connection(connection_id, {
                 "type": "error",
                 "message": "缺少房间参数",
                 "timestamp": datetime.now().isoformat()
             })
     
     @staticmethod
-    async def _handle_leave_room(user_id: str, message: Dict[str, Any]):
+    async def _handle_leave_room(connection_id: str, message: Dict[str, Any]):
         """处理离开房间请求"""
         room = message.get("room")
         if room:
-            await websocket_manager.leave_room(user_id, room)
+            await websocket_manager.leave_room(connection_id, room)
         else:
-            await websocket_manager.send_to_user(user_id, {
+            await websocket_manager.send_to_connection(connection_id, {
                 "type": "error",
                 "message": "缺少房间参数",
                 "timestamp": datetime.now().isoformat()
             })
     
     @staticmethod
-    async def _handle_manual_monitor(user_id: str, message: Dict[str, Any]):
+    async def _handle_manual_monitor(connection_id: str, message: Dict[str, Any]):
         """处理手动触发监控请求"""
         try:
             # 调用手动触发监控函数
-            result = manual_trigger_monitor_job(user_id=user_id)
+            result = manual_trigger_monitor_job(user_id=websocket_manager.get_connection_user(connection_id))
             
-            await websocket_manager.send_to_user(user_id, {
+            await websocket_manager.send_to_connection(connection_id, {
                 "type": "manual_monitor_result",
                 "data": result,
                 "timestamp": datetime.now().isoformat()
@@ -252,25 +258,42 @@ class WebSocketController:
                 "message": "手动触发设备监控失败"
             }
             
-            await websocket_manager.send_to_user(user_id, {
+            await websocket_manager.send_to_connection(connection_id, {
                 "type": "manual_monitor_result",
                 "data": error_result,
                 "timestamp": datetime.now().isoformat()
             })
     
     @staticmethod
-    async def _handle_get_status(user_id: str, message: Dict[str, Any]):
+    async def _handle_get_status(connection_id: str, message: Dict[str, Any]):
         """处理获取状态请求"""
-        await WebSocketController._send_initial_status(user_id)
+        await WebSocketController._send_initial_status(connection_id)
     
     @staticmethod
-    async def _handle_ping(user_id: str, message: Dict[str, Any]):
+    async def _handle_ping(connection_id: str, message: Dict[str, Any]):
         """处理心跳请求"""
-        await websocket_manager.send_to_user(user_id, {
+        await websocket_manager.send_to_connection(connection_id, {
             "type": "pong",
             "message": "pong",
             "timestamp": datetime.now().isoformat()
         })
+    
+    @staticmethod
+    async def _handle_dashboard_sync(connection_id: str, message: Dict[str, Any]):
+        """处理首页状态同步请求（携带客户端当前版本时补发缺失的增量，否则下发完整状态）"""
+        try:
+            revision = message.get("revision")
+            sync_message = await DashboardService.get_dashboard_sync_message(
+                int(revision) if revision is not None else None
+            )
+            await websocket_manager.send_to_connection(connection_id, sync_message)
+        except Exception as e:
+            logger.error(f"首页状态同步失败: connection_id={connection_id}, error={str(e)}")
+            await websocket_manager.send_to_connection(connection_id, {
+                "type": "dashboard_sync_error",
+                "message": "首页状态同步失败",
+                "timestamp": datetime.now().isoformat()
+            })
 
 
 # WebSocket消息广播工具函数
@@ -293,7 +316,7 @@ class WebSocketBroadcaster:
                 "timestamp": datetime.now().isoformat()
             }
             
-            await websocket_manager.broadcast_to_room("dashboard", message)
+            await EventBus.publish(["dashboard"], message)
             
         except Exception as e:
             logger.error(f"广播告警更新失败: {str(e)}")
@@ -314,7 +337,7 @@ class WebSocketBroadcaster:
                 "timestamp": datetime.now().isoformat()
             }
             
-            await websocket_manager.broadcast_to_room("dashboard", message)
+            await EventBus.publish(["dashboard"], message)
             
         except Exception as e:
             logger.error(f"广播设备状态更新失败: {str(e)}")
@@ -335,7 +358,7 @@ class WebSocketBroadcaster:
                 "timestamp": datetime.now().isoformat()
             }
             
-            await websocket_manager.broadcast_to_room("dashboard", message)
+            await EventBus.publish(["dashboard"], message)
             
         except Exception as e:
             logger.error(f"广播监控结果失败: {str(e)}") 
\ No newline at end of file
@@ -0,0 +1,148 @@
+"""
+设备业务IP连通性记录
+监控周期与后台探测任务把每台设备的可达性与往返时延写入同一个Redis哈希（字段为设备ID），
+首页与连通性统计只读取汇总，不再在请求中批量ping；后台探测跳过监控周期刚检测过的设备
+"""
+import json
+import time
+from typing import Any, Dict, Iterable, List
+from loguru import logger
+from config.get_redis import get_async_redis
+
+
+class ConnectivityStore:
+    """设备连通性记录（Redis哈希，Redis不可用时读写降级为空）"""
+
+    KEY = 'redfish:connectivity'
+
+    @staticmethod
+    def entry_from_result(business_ip: str, result: Dict[str, Any], source: str) -> Dict[str, Any]:
+        """
+        由连通性检测结果生成记录
+
+        Args:
+            business_ip: 业务IP
+            result: ConnectivityService.check_device_business_ip_connectivity 的结果
+            source: 记录来源（monitor/prober/manual）
+
+        Returns:
+            Dict: {'business_ip', 'online', 'rtt_ms', 'method', 'error', 'source', 'checked_at'}
+        """
+        ping = result.get('ping') or {}
+        method = ping.get('method')
+        rtt_ms = ping.get('rtt_ms') if ping.get('success') else None
+        if not ping.get('success'):
+            for port_result in (result.get('port_checks') or {}).values():
+                if port_result.get('success'):
+                    method = port_result.get('method')
+                    break
+        return {
+            'business_ip': business_ip,
+            'online': bool(result.get('online')),
+            'rtt_ms': rtt_ms,
+            'method': method,
+            'error': None if result.get('online') else (result.get('error') or ping.get('error')),
+            'source': source,
+            'checked_at': time.time(),
+        }
+
+    @classmethod
+    async def put_many(cls, entries: Dict[int, Dict[str, Any]]):
+        """
+        写入设备连通性记录
+
+        Args:
+            entries: {设备ID: 记录}
+        """
+        if not entries:
+            return
+        try:
+            await get_async_redis().hset(
+                cls.KEY, mapping={str(device_id): json.dumps(entry) for device_id, entry in entries.items()}
+            )
+        except Exception as e:
+            logger.warning(f'Connectivity store write failed: {str(e)}')
+
+    @classmethod
+    async def get_many(cls, device_ids: Iterable[int]) -> Dict[int, Dict[str, Any]]:
+        """
+        读取设备连通性记录
+
+        Args:
+            device_ids: 设备ID
+
+        Returns:
+            Dict[int, Dict]: {设备ID: 记录}，无记录的设备不包含在内
+        """
+        device_ids = list(device_ids)
+        if not device_ids:
+            return {}
+        try:
+            values = await get_async_redis().hmget(cls.KEY, [str(device_id) for device_id in device_ids])
+        except Exception as e:
+            logger.warning(f'Connectivity store read failed: {str(e)}')
+            return {}
+        entries = {}
+        for device_id, value in zip(device_ids, values):
+            if value:
+                try:
+                    entries[device_id] = json.loads(value)
+                except ValueError:
+                    continue
+        return entries
+
+    @classmethod
+    async def prune(cls, device_ids: Iterable[int]):
+        """
+        删除已不存在（或已无业务IP）设备的记录
+
+        Args:
+            device_ids: 当前需要保留记录的设备ID
+        """
+        keep = {str(device_id) for device_id in device_ids}
+        try:
+            redis = get_async_redis()
+            stale = [field for field in await redis.hkeys(cls.KEY) if field not in keep]
+            if stale:
+                await redis.hdel(cls.KEY, *stale)
+        except Exception as e:
+            logger.warning(f'Connectivity store prune failed: {str(e)}')
+
+    @classmethod
+    async def clear(cls):
+        """清空所有连通性记录"""
+        await get_async_redis().delete(cls.KEY)
+
+    @staticmethod
+    def is_fresh(entry: Dict[str, Any], business_ip: str, max_age: float) -> bool:
+        """
+        记录是否仍有效（业务IP未变更且未超过有效期）
+
+        Args:
+            entry: 连通性记录
+            business_ip: 设备当前业务IP
+            max_age: 有效期（秒）
+
+        Returns:
+            bool: 是否有效
+        """
+        return bool(entry) and entry.get('business_ip') == business_ip and \
+            time.time() - float(entry.get('checked_at') or 0) <= max_age
+
+    @classmethod
+    async def stale_devices(cls, devices: List[Dict[str, Any]], max_age: float) -> List[Dict[str, Any]]:
+        """
+        筛选需要重新探测的设备（无记录、记录过期或业务IP已变更）
+
+        Args:
+            devices: 设备信息列表（含 device_id / business_ip）
+            max_age: 记录有效期（秒）
+
+        Returns:
+            List[Dict]: 需要探测的设备
+        """
+        entries = await cls.get_many(device['device_id'] for device in devices)
+        return [
+            device for device in devices
+            if not cls.is_fresh(entries.get(device['device_id']), device['business_ip'], max_age)
+        ]
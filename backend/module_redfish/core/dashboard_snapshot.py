@@ -0,0 +1,140 @@
+"""
+首页完整数据快照缓存
+快照按世代号存放在Redis中：监控结果入库或告警变更提交后递增世代号，旧快照（包括正在构建中的旧世代快照）不再被读取；
+同一时刻只有一个请求构建快照，进程内并发请求共享同一次构建，其他进程的请求等待Redis中的结果（single-flight）
+"""
+import asyncio
+import uuid
+from typing import Awaitable, Callable, Dict
+from loguru import logger
+from config.env import RedfishConfig
+from config.get_redis import get_async_redis, get_redis
+
+
+_RELEASE_LOCK = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('del', KEYS[1])
+end
+return 0
+"""
+
+
+class DashboardSnapshotCache:
+    """首页快照缓存（Redis不可用时降级为直接构建）"""
+
+    KEY_PREFIX = 'redfish:dashboard:snapshot'
+    GENERATION_KEY = f'{KEY_PREFIX}:generation'
+
+    # 进程内进行中的构建 {快照变体: 构建任务}
+    _inflight: Dict[str, 'asyncio.Task[str]'] = {}
+
+    @classmethod
+    def _key(cls, variant: str, generation: str) -> str:
+        return f'{cls.KEY_PREFIX}:{variant}:{generation}'
+
+    @classmethod
+    async def get_or_build(cls, variant: str, builder: Callable[[], Awaitable[str]], force_refresh: bool = False) -> str:
+        """
+        读取快照，不存在时构建并写入
+
+        Args:
+            variant: 快照变体（如时间范围 7d/30d/90d）
+            builder: 快照构建函数，返回序列化后的快照
+            force_refresh: 是否跳过缓存重新构建（结果仍写入缓存供其他请求使用）
+
+        Returns:
+            str: 序列化后的快照
+        """
+        if force_refresh:
+            return await cls._build_and_store(variant, builder)
+
+        task = cls._inflight.get(variant)
+        if task is None:
+            task = asyncio.ensure_future(cls._load_or_build(variant, builder))
+            cls._inflight[variant] = task
+
+            def _forget(finished):
+                if cls._inflight.get(variant) is finished:
+                    cls._inflight.pop(variant, None)
+
+            task.add_done_callback(_forget)
+        # 单个请求被取消时不影响其他等待同一构建的请求
+        return await asyncio.shield(task)
+
+    @classmethod
+    async def _load_or_build(cls, variant: str, builder: Callable[[], Awaitable[str]]) -> str:
+        try:
+            redis = get_async_redis()
+            generation = await redis.get(cls.GENERATION_KEY) or '0'
+            key = cls._key(variant, generation)
+            cached = await redis.get(key)
+            if cached:
+                return cached
+            lock_id = uuid.uuid4().hex
+            locked = await redis.set(f'{key}:lock', lock_id, nx=True, ex=RedfishConfig.redfish_dashboard_build_timeout)
+        except Exception as e:
+            logger.warning(f'Dashboard snapshot cache read failed: {str(e)}')
+            return await builder()
+
+        if not locked:
+            # 其他进程正在构建，等待其写入；超时（构建方异常退出）则自行构建
+            loop = asyncio.get_running_loop()
+            deadline = loop.time() + RedfishConfig.redfish_dashboard_build_timeout
+            while loop.time() < deadline:
+                await asyncio.sleep(0.1)
+                try:
+                    cached = await redis.get(key)
+                except Exception:
+                    break
+                if cached:
+                    return cached
+
+        try:
+            value = await builder()
+            try:
+                await redis.set(key, value, ex=RedfishConfig.redfish_dashboard_cache_ttl)
+            except Exception as e:
+                logger.warning(f'Dashboard snapshot cache write failed: {str(e)}')
+            return value
+        finally:
+            if locked:
+                try:
+                    await redis.eval(_RELEASE_LOCK, 1, f'{key}:lock', lock_id)
+                except Exception as e:
+                    logger.warning(f'Dashboard snapshot unlock failed: {str(e)}')
+
+    @classmethod
+    async def _build_and_store(cls, variant: str, builder: Callable[[], Awaitable[str]]) -> str:
+        # 先读取世代号再构建：构建期间发生失效时写入的是旧世代，不会被读取
+        try:
+            redis = get_async_redis()
+            generation = await redis.get(cls.GENERATION_KEY) or '0'
+        except Exception as e:
+            logger.warning(f'Dashboard snapshot cache read failed: {str(e)}')
+            return await builder()
+        value = await builder()
+        try:
+            await redis.set(cls._key(variant, generation), value, ex=RedfishConfig.redfish_dashboard_cache_ttl)
+        except Exception as e:
+            logger.warning(f'Dashboard snapshot cache write failed: {str(e)}')
+        return value
+
+    @classmethod
+    def invalidate(cls):
+        """
+        使所有快照失效（同步，供Celery任务在监控结果提交后调用）
+        """
+        try:
+            get_redis().incr(cls.GENERATION_KEY)
+        except Exception as e:
+            logger.warning(f'Dashboard snapshot invalidate failed: {str(e)}')
+
+    @classmethod
+    async def invalidate_async(cls):
+        """
+        使所有快照失效（异步，供接口在告警变更提交后调用）
+        """
+        try:
+            await get_async_redis().incr(cls.GENERATION_KEY)
+        except Exception as e:
+            logger.warning(f'Dashboard snapshot invalidate failed: {str(e)}')
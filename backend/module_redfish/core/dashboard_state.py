@@ -0,0 +1,194 @@
+"""
+首页版本化状态
+首页概览计数、健康分布与Top-N告警列表作为一份状态保存在Redis中，每次变化递增版本号，
+与上一版本的差异（JSON Patch 风格的操作列表）追加到一个短的Redis Stream；
+前端按版本号应用增量，重连时从Stream补齐缺失的版本，版本已被裁剪时改为下发完整状态
+"""
+import asyncio
+import json
+import time
+import uuid
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+from loguru import logger
+from config.env import RedfishConfig
+from config.get_redis import get_async_redis
+
+
+_RELEASE_LOCK = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('del', KEYS[1])
+end
+return 0
+"""
+
+
+# 仅当当前版本仍是构建时读取的版本时写入，锁过期后其他进程已提交新版本时放弃本次结果
+_COMMIT_STATE = """
+local value = redis.call('get', KEYS[1])
+local revision = 0
+if value then
+    revision = cjson.decode(value)['revision']
+end
+if revision ~= tonumber(ARGV[1]) then
+    return 0
+end
+redis.call('set', KEYS[1], ARGV[2])
+if ARGV[3] ~= '' then
+    redis.call('xadd', KEYS[2], 'MAXLEN', '~', ARGV[4], '*', 'revision', ARGV[5], 'delta', ARGV[3])
+end
+return 1
+"""
+
+
+def _escape(token: str) -> str:
+    """JSON Pointer 路径片段转义"""
+    return str(token).replace('~', '~0').replace('/', '~1')
+
+
+def diff_state(old: Any, new: Any, path: str = '') -> List[Dict[str, Any]]:
+    """
+    计算两份状态的差异（对象逐字段比较，列表与标量整体替换）
+
+    Args:
+        old: 旧状态
+        new: 新状态
+        path: 当前 JSON Pointer 路径
+
+    Returns:
+        List[Dict]: 操作列表 [{'op': 'add'|'remove'|'replace', 'path': ..., 'value': ...}]
+    """
+    if isinstance(old, dict) and isinstance(new, dict):
+        ops = []
+        for key in old:
+            if key not in new:
+                ops.append({'op': 'remove', 'path': f'{path}/{_escape(key)}'})
+        for key, value in new.items():
+            child = f'{path}/{_escape(key)}'
+            if key not in old:
+                ops.append({'op': 'add', 'path': child, 'value': value})
+            else:
+                ops.extend(diff_state(old[key], value, child))
+        return ops
+    if old == new:
+        return []
+    return [{'op': 'replace', 'path': path, 'value': new}]
+
+
+class DashboardStateStore:
+    """首页版本化状态（Redis不可用时不产生增量，前端仍可通过接口获取数据）"""
+
+    KEY = 'redfish:dashboard:state'
+    STREAM_KEY = 'redfish:dashboard:deltas'
+    LOCK_KEY = f'{KEY}:lock'
+
+    @classmethod
+    async def snapshot(cls) -> Optional[Dict[str, Any]]:
+        """
+        读取当前状态
+
+        Returns:
+            Optional[Dict]: {'revision': 版本号, 'state': 状态, 'built_at': 构建时间}，尚未生成时为None
+        """
+        value = await get_async_redis().get(cls.KEY)
+        return json.loads(value) if value else None
+
+    @classmethod
+    async def commit(
+        cls,
+        builder: Callable[[], Awaitable[Dict[str, Any]]],
+        requested_at: Optional[float] = None
+    ) -> Optional[Dict[str, Any]]:
+        """
+        构建最新状态并与当前版本比较，有变化时写入新版本并追加增量（多进程间串行执行）
+
+        锁只用于避免重复构建，构建超过锁超时时间后其他进程可能已提交新版本，
+        因此写入时再按版本号比较并设置，版本已变化时丢弃本次结果
+
+        Args:
+            builder: 状态构建函数
+            requested_at: 触发重算的变化时间，当前版本在该时间之后构建时（其他进程已重算）不再构建
+
+        Returns:
+            Optional[Dict]: 增量 {'revision', 'base_revision', 'ops'}，无变化时为None
+        """
+        redis = get_async_redis()
+        lock_id = uuid.uuid4().hex
+        timeout = RedfishConfig.redfish_dashboard_build_timeout
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        while not await redis.set(cls.LOCK_KEY, lock_id, nx=True, ex=timeout):
+            if loop.time() >= deadline:
+                logger.warning('Dashboard state lock wait timed out, skipping this revision')
+                return None
+            await asyncio.sleep(0.1)
+
+        try:
+            # 持锁构建：其他进程已在变化之后重算过时跳过；与已提交版本无差异时只更新构建时间，不产生新版本
+            current = await cls.snapshot()
+            if current and requested_at is not None and current.get('built_at', 0) >= requested_at:
+                return None
+            built_at = time.time()
+            state = await builder()
+            base_revision = current['revision'] if current else 0
+            ops = diff_state(current['state'], state) if current else [{'op': 'replace', 'path': '', 'value': state}]
+            if not ops:
+                await cls._write(base_revision, {**current, 'built_at': built_at})
+                return None
+
+            delta = {'revision': base_revision + 1, 'base_revision': base_revision, 'ops': ops}
+            written = await cls._write(
+                base_revision, {'revision': delta['revision'], 'state': state, 'built_at': built_at}, delta
+            )
+            return delta if written else None
+        finally:
+            try:
+                await redis.eval(_RELEASE_LOCK, 1, cls.LOCK_KEY, lock_id)
+            except Exception as e:
+                logger.warning(f'Dashboard state unlock failed: {str(e)}')
+
+    @classmethod
+    async def _write(cls, base_revision: int, value: Dict[str, Any], delta: Optional[Dict[str, Any]] = None) -> bool:
+        """
+        按版本号比较并写入状态，有增量时同时追加到Stream
+
+        Args:
+            base_revision: 构建时读取的版本号
+            value: 要写入的状态
+            delta: 增量，无变化时为None
+
+        Returns:
+            bool: 是否写入（版本已被其他进程推进时为False）
+        """
+        written = await get_async_redis().eval(
+            _COMMIT_STATE, 2, cls.KEY, cls.STREAM_KEY,
+            base_revision,
+            json.dumps(value, ensure_ascii=False),
+            json.dumps(delta, ensure_ascii=False) if delta else '',
+            RedfishConfig.redfish_dashboard_delta_buffer,
+            delta['revision'] if delta else 0
+        )
+        if not written:
+            logger.warning(f'Dashboard state revision moved past {base_revision} during build, discarding this build')
+        return bool(written)
+
+    @classmethod
+    async def replay(cls, since_revision: int, current_revision: int) -> Optional[List[Dict[str, Any]]]:
+        """
+        读取客户端版本之后的所有增量
+
+        Args:
+            since_revision: 客户端当前版本
+            current_revision: 服务端当前版本
+
+        Returns:
+            Optional[List[Dict]]: 按版本排序的增量；缓冲中的增量无法连续衔接两个版本时为None（需下发完整状态）
+        """
+        if since_revision == current_revision:
+            return []
+        deltas = []
+        for _, fields in await get_async_redis().xrange(cls.STREAM_KEY):
+            if since_revision < int(fields.get('revision') or 0) <= current_revision:
+                deltas.append(json.loads(fields['delta']))
+        if not deltas or deltas[0]['base_revision'] != since_revision or deltas[-1]['revision'] != current_revision:
+            return None
+        return deltas
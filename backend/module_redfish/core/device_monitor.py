@@ -8,6 +8,7 @@ from datetime import datetime, timedelta
 from loguru import logger
 from .redfish_client import RedfishClient, decrypt_password
 from ..service.connectivity_service import ConnectivityService
+from .connectivity_store import ConnectivityStore
 from ..adapters import get_vendor_adaptor
 from ..utils.component_type_mapper import to_hardware_code
 from ..utils.component_name_service import component_name_service
@@ -53,12 +54,14 @@ class DeviceMonitor:
         
         return health_status, state
 
-    async def monitor_device(self, device_info: Dict[str, Any]) -> Dict[str, Any]:
+    async def monitor_device(self, device_info: Dict[str, Any],
+                             reachability: Optional[Dict[str, Dict[str, Any]]] = None) -> Dict[str, Any]:
         """
         监控单个设备
         
         Args:
             device_info: 设备信息字典
+            reachability: 批量可达性检测结果 {IP: 检测结果}，为空时单独检测
             
         Returns:
             Dict: 监控结果（已移除日志生成）
@@ -69,7 +72,9 @@ class DeviceMonitor:
         status_data = {}
         
         # 首先执行连通性检测（独立于redfish接口）
-        connectivity_alerts, connectivity_components, connectivity_status = await self._check_connectivity(device_info)
+        connectivity_alerts, connectivity_components, connectivity_status = await self._check_connectivity(
+            device_info, reachability
+        )
         alerts.extend(connectivity_alerts)
         all_components.extend(connectivity_components)
         
@@ -115,7 +120,8 @@ class DeviceMonitor:
                 username=device_info['redfish_username'],
                 password=password,
                 port=device_info.get('oob_port', 443),
-                timeout=30
+                timeout=30,
+                model=' '.join(filter(None, [device_info.get('manufacturer'), device_info.get('model')])) or None
             )
             
             # 获取所有状态信息
@@ -187,12 +193,15 @@ class DeviceMonitor:
                 "raw_data": {}
             }
     
-    async def _check_connectivity(self, device_info: Dict[str, Any]) -> Tuple[List[Dict], List[Dict], Dict[str, bool]]:
+    async def _check_connectivity(self, device_info: Dict[str, Any],
+                                  reachability: Optional[Dict[str, Dict[str, Any]]] = None
+                                  ) -> Tuple[List[Dict], List[Dict], Dict[str, bool]]:
         """
         检查设备连通性（独立于redfish接口）
         
         Args:
             device_info: 设备信息
+            reachability: 批量可达性检测结果 {IP: 检测结果}
             
         Returns:
             Tuple[List[Dict], List[Dict], Dict[str, bool]]: (告警列表, 组件状态列表, 连通性状态)
@@ -204,14 +213,26 @@ class DeviceMonitor:
             "oob_ip_online": False
         }
         
+        reachability = reachability or {}
+        
         # 检查业务IP连通性
         business_ip = device_info.get('business_ip')
         if business_ip:
             try:
                 connectivity_result = await ConnectivityService.check_device_business_ip_connectivity(
-                    db=None, business_ip=business_ip
+                    db=None,
+                    business_ip=business_ip,
+                    ping_result=reachability.get(business_ip),
+                    probe_ports=ConnectivityService.resolve_probe_ports(
+                        device_info.get('business_type'), device_info.get('probe_ports')
+                    )
                 )
                 
+                # 记录本次检测结果，首页连通性统计直接读取，后台探测跳过该设备
+                await ConnectivityStore.put_many({
+                    device_info['device_id']: ConnectivityStore.entry_from_result(business_ip, connectivity_result, 'monitor')
+                })
+                
                 # 根据连通性结果生成组件状态
                 is_online = connectivity_result.get('online', False)
                 connectivity_status["business_ip_online"] = is_online
@@ -254,7 +275,7 @@ class DeviceMonitor:
         if oob_ip:
             try:
                 oob_connectivity_result = await ConnectivityService.check_device_oob_ip_connectivity(
-                    db=None, oob_ip=oob_ip
+                    db=None, oob_ip=oob_ip, ping_result=reachability.get(oob_ip)
                 )
                 
                 # 根据连通性结果生成组件状态
@@ -0,0 +1,211 @@
+"""
+实时事件总线
+Web进程与Celery worker的WebSocket推送统一经由此处发布：每条消息只序列化一次（目标房间随消息携带），
+按房间注册表只发布到房间内有成员的节点频道（全员广播与路由查询失败时发布到公共频道），
+消息带消息ID与来源ID；发布方进程已在本地投递的消息不再发给自己，同一消息ID在每个进程只投递一次，
+同时属于多个目标房间的连接只收到一份
+"""
+import json
+import os
+import socket
+import uuid
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+from loguru import logger
+from config.get_redis import get_async_redis, get_redis
+from .room_registry import RoomRegistry
+
+
+# 状态类消息：后一条完整覆盖前一条，发送队列中同类（同一设备/批次/任务）只保留最新一条
+COALESCE_MESSAGE_TYPES = {
+    "dashboard_update",
+    "dashboard_statistics",
+    "alert_statistics_update",
+    "device_health_summary",
+    "monitoring_progress",
+    "monitoring_task_status",
+    "log_collection_progress",
+}
+
+
+def coalesce_key(message: Dict[str, Any]) -> Optional[str]:
+    """
+    获取消息的合并键（非状态类消息返回None，不合并）
+
+    Args:
+        message: 消息内容
+
+    Returns:
+        Optional[str]: 合并键
+    """
+    message_type = message.get("type")
+    if message_type not in COALESCE_MESSAGE_TYPES:
+        return None
+    data = message.get("data") if isinstance(message.get("data"), dict) else {}
+    for field in ("device_id", "batch_id", "job_id"):
+        scope = message.get(field) or data.get(field)
+        if scope is not None:
+            return f"{message_type}:{scope}"
+    return message_type
+
+
+# 本地投递函数签名：(房间列表, 消息, 序列化后的消息, 合并键, 是否全员广播) -> 是否已在本进程投递
+LocalDelivery = Callable[[Iterable[str], Dict[str, Any], str, Optional[str], bool], bool]
+
+
+class EventBus:
+    """实时事件总线"""
+
+    CHANNEL = "websocket:events"  # 公共频道：全员广播，所有节点订阅
+    # 每个进程记住的最近消息ID数量
+    RECENT_IDS_LIMIT = 10000
+
+    _origin: Optional[str] = None
+    _origin_pid: Optional[int] = None
+    _local_delivery: Optional[LocalDelivery] = None
+    _recent_ids: "OrderedDict[str, None]" = OrderedDict()
+
+    @classmethod
+    def origin(cls) -> str:
+        """当前进程的来源ID（fork后的子进程重新生成）"""
+        if cls._origin_pid != os.getpid():
+            cls._origin = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+            cls._origin_pid = os.getpid()
+            cls._recent_ids = OrderedDict()
+        return cls._origin
+
+    @classmethod
+    def register_local_delivery(cls, delivery: LocalDelivery):
+        """
+        注册本进程的本地投递函数（由WebSocket管理器注册）
+
+        Args:
+            delivery: 本地投递函数
+        """
+        cls._local_delivery = delivery
+
+    @classmethod
+    def _envelope(cls, rooms: Iterable[str], message: Dict[str, Any], broadcast: bool, local: bool) -> Tuple[str, bool]:
+        """序列化消息并在本地投递（可投递时），返回 (发布到Redis的消息信封, 是否已本地投递)"""
+        rooms = list(rooms or [])
+        text = json.dumps(message, ensure_ascii=False)
+        key = coalesce_key(message)
+        message_id = uuid.uuid4().hex
+
+        delivered = False
+        if local and cls._local_delivery:
+            try:
+                delivered = cls._local_delivery(rooms, message, text, key, broadcast)
+            except Exception as e:
+                logger.error(f"Local event delivery failed: {str(e)}")
+        if delivered:
+            cls._remember(message_id)
+
+        return json.dumps({
+            "id": message_id,
+            # 只有本地已投递时才带来源ID，本进程订阅循环据此跳过
+            "origin": cls.origin() if delivered else None,
+            "rooms": rooms,
+            "broadcast": broadcast,
+            # 消息类型：订阅方据此判断是否需要反序列化消息内容（事件合并）
+            "type": message.get("type"),
+            "key": key,
+            "payload": text,
+        }, ensure_ascii=False), delivered
+
+    @classmethod
+    async def publish(cls, rooms: Iterable[str], message: Dict[str, Any], broadcast: bool = False):
+        """
+        发布消息（异步）：本进程持有WebSocket连接时先本地投递，再发布给房间内有成员的其他节点
+
+        Args:
+            rooms: 目标房间
+            message: 消息内容
+            broadcast: 是否推送给所有连接（忽略rooms）
+        """
+        rooms = list(rooms or [])
+        envelope, delivered = cls._envelope(rooms, message, broadcast, local=True)
+        try:
+            redis = get_async_redis()
+            try:
+                nodes = None if broadcast else await RoomRegistry.room_nodes(rooms)
+            except Exception as e:
+                logger.warning(f"Room registry lookup failed, publishing to all nodes: {str(e)}")
+                nodes = None
+            pipe = redis.pipeline()
+            for channel in cls._channels(nodes, delivered):
+                pipe.publish(channel, envelope)
+            await pipe.execute()
+        except Exception as e:
+            logger.error(f"Error publishing event to Redis: {str(e)}")
+
+    @classmethod
+    def publish_sync(cls, rooms: Iterable[str], message: Dict[str, Any], broadcast: bool = False):
+        """
+        发布消息（同步，供Celery任务与定时任务使用，复用进程内Redis连接池）
+
+        Args:
+            rooms: 目标房间
+            message: 消息内容
+            broadcast: 是否推送给所有连接（忽略rooms）
+        """
+        rooms = list(rooms or [])
+        envelope, delivered = cls._envelope(rooms, message, broadcast, local=False)
+        try:
+            redis = get_redis()
+            try:
+                nodes = None if broadcast else RoomRegistry.room_nodes_sync(rooms)
+            except Exception as e:
+                logger.warning(f"Room registry lookup failed, publishing to all nodes: {str(e)}")
+                nodes = None
+            pipe = redis.pipeline()
+            for channel in cls._channels(nodes, delivered):
+                pipe.publish(channel, envelope)
+            pipe.execute()
+        except Exception as e:
+            logger.error(f"Error publishing event to Redis: {str(e)}")
+    
+    @classmethod
+    def _channels(cls, nodes: Optional[Set[str]], delivered: bool) -> List[str]:
+        """
+        消息需要发布到的频道
+
+        Args:
+            nodes: 目标房间内有成员的节点（为None时发布到公共频道）
+            delivered: 本进程是否已本地投递
+
+        Returns:
+            List[str]: 频道列表
+        """
+        if nodes is None:
+            return [cls.CHANNEL]
+        if delivered:
+            nodes = nodes - {cls.origin()}
+        return [RoomRegistry.node_channel(node) for node in sorted(nodes)]
+
+    @classmethod
+    def _remember(cls, message_id: str) -> bool:
+        """记录消息ID，已记录过时返回False"""
+        cls.origin()
+        if message_id in cls._recent_ids:
+            return False
+        cls._recent_ids[message_id] = None
+        if len(cls._recent_ids) > cls.RECENT_IDS_LIMIT:
+            cls._recent_ids.popitem(last=False)
+        return True
+
+    @classmethod
+    def accept(cls, envelope: Dict[str, Any]) -> bool:
+        """
+        订阅循环收到消息后判断是否需要在本进程投递
+
+        Args:
+            envelope: 消息信封
+
+        Returns:
+            bool: 是否投递（本进程发布且已本地投递、或消息ID重复时为False）
+        """
+        if envelope.get("origin") and envelope["origin"] == cls.origin():
+            return False
+        message_id = envelope.get("id")
+        return not message_id or cls._remember(message_id)
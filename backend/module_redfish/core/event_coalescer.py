@@ -0,0 +1,264 @@
+"""
+仪表盘事件合并器
+巡检期间每台设备完成都会产生进度、健康状态、告警与设备更新等多条推送；发往合并房间的这类事件在Web进程内
+按房间缓冲一个时间窗口，窗口结束时合并为一帧增量消息（dashboard_batch）：进度只保留最新一条，
+设备健康变化按设备合并，告警只计数并保留最近几条，前端每个窗口最多刷新一次数据
+"""
+import asyncio
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterable, List, Optional
+from loguru import logger
+from config.env import RedfishConfig
+
+
+# 可合并的dashboard_update操作类型（其他操作如手动刷新、完整数据更新直接推送）
+BATCH_DASHBOARD_ACTIONS = {
+    "health_status_silent_update",
+    "alert_list_refresh",
+    "device_updated",
+}
+
+# 可合并的消息类型
+BATCH_MESSAGE_TYPES = {
+    "dashboard_update",
+    "monitoring_progress",
+    "device_status_change",
+    "new_alert",
+    "alert_resolved",
+    "alert_statistics_update",
+}
+
+
+class DashboardBatch:
+    """单个房间一个时间窗口内的合并结果"""
+
+    # 每帧保留的最近新增告警条数
+    LATEST_ALERTS_LIMIT = 10
+
+    def __init__(self):
+        self.event_count = 0
+        self.devices: Dict[str, Optional[str]] = {}
+        self.health_changes: Dict[str, Dict[str, Any]] = {}
+        self.alerts_created = 0
+        self.alerts_resolved = 0
+        self.alerts_urgent = 0
+        self.latest_alerts: List[Dict[str, Any]] = []
+        self.resolved_alert_ids: List[Any] = []
+        self.progress: Optional[Dict[str, Any]] = None
+        self.statistics: Optional[Dict[str, Any]] = None
+
+    def _touch(self, device_id: Any, hostname: Optional[str] = None):
+        """记录有变化的设备"""
+        if device_id is None:
+            return
+        device_id = str(device_id)
+        if hostname or device_id not in self.devices:
+            self.devices[device_id] = hostname
+
+    def _health_change(self, device_id: Any, hostname: Optional[str], old_status: Any, new_status: Any):
+        """合并设备健康状态变化（保留窗口内最早的旧状态和最新的新状态）"""
+        if device_id is None:
+            return
+        device_id = str(device_id)
+        change = self.health_changes.get(device_id)
+        if change is None:
+            self.health_changes[device_id] = {
+                "device_id": device_id,
+                "hostname": hostname,
+                "old_status": old_status,
+                "new_status": new_status,
+            }
+        else:
+            change["new_status"] = new_status
+            change["hostname"] = hostname or change["hostname"]
+
+    def merge(self, message: Dict[str, Any]):
+        """
+        合并一条事件
+
+        Args:
+            message: 消息内容
+        """
+        self.event_count += 1
+        message_type = message.get("type")
+        data = message.get("data") if isinstance(message.get("data"), dict) else {}
+
+        if message_type == "monitoring_progress":
+            # 多个worker的进度可能乱序到达，同一次巡检内只保留完成数最大的一条
+            current = self.progress
+            if current is None or current.get("total") != message.get("total") or \
+                    (message.get("completed") or 0) >= (current.get("completed") or 0):
+                self.progress = message
+
+        elif message_type == "dashboard_update":
+            self._touch(data.get("device_id"), data.get("hostname"))
+            if message.get("action") == "health_status_silent_update":
+                self._health_change(
+                    data.get("device_id"), data.get("hostname"),
+                    data.get("old_health_status"), data.get("new_health_status")
+                )
+
+        elif message_type == "device_status_change":
+            self._touch(message.get("device_id"), message.get("hostname"))
+            self._health_change(
+                message.get("device_id"), message.get("hostname"),
+                message.get("old_status"), message.get("new_status")
+            )
+
+        elif message_type == "new_alert":
+            alert = message.get("alert") or {}
+            self._touch(alert.get("device_id"), alert.get("hostname"))
+            self.alerts_created += 1
+            if alert.get("urgency_level") == "urgent" or alert.get("alert_type") == "urgent":
+                self.alerts_urgent += 1
+            self.latest_alerts.append(alert)
+            if len(self.latest_alerts) > self.LATEST_ALERTS_LIMIT:
+                self.latest_alerts.pop(0)
+
+        elif message_type == "alert_resolved":
+            alert = message.get("alert") or {}
+            self._touch(alert.get("device_id"), alert.get("hostname"))
+            self.alerts_resolved += 1
+            if alert.get("alert_id") is not None:
+                self.resolved_alert_ids.append(alert.get("alert_id"))
+
+        elif message_type == "alert_statistics_update":
+            self.statistics = message.get("statistics") or data or None
+
+    def to_message(self, room: str, window_ms: int) -> Dict[str, Any]:
+        """
+        生成增量消息
+
+        Args:
+            room: 房间名称
+            window_ms: 合并窗口（毫秒）
+
+        Returns:
+            Dict: dashboard_batch 消息
+        """
+        return {
+            "type": "dashboard_batch",
+            "action": "batch_update",
+            "room": room,
+            "data": {
+                "event_count": self.event_count,
+                "window_ms": window_ms,
+                "devices": [
+                    {"device_id": device_id, "hostname": hostname} for device_id, hostname in self.devices.items()
+                ],
+                "health_changes": [
+                    change for change in self.health_changes.values()
+                    if change["old_status"] != change["new_status"]
+                ],
+                "alerts": {
+                    "created": self.alerts_created,
+                    "resolved": self.alerts_resolved,
+                    "urgent": self.alerts_urgent,
+                    "latest": self.latest_alerts,
+                    "resolved_ids": self.resolved_alert_ids,
+                },
+                "progress": self.progress,
+                "statistics": self.statistics,
+            },
+            "timestamp": datetime.now().isoformat()
+        }
+
+
+class DashboardEventCoalescer:
+    """按房间的事件合并器（只在持有WebSocket连接的事件循环中使用）"""
+
+    # 需要合并的房间（所有连接都会加入dashboard房间）
+    ROOMS = {"dashboard"}
+
+    def __init__(self, emit: Callable[[str, Dict[str, Any]], None]):
+        """
+        Args:
+            emit: 窗口结束时的发送函数 (房间, 合并后的消息)
+        """
+        self._emit = emit
+        self._batches: Dict[str, DashboardBatch] = {}
+        self._timers: Dict[str, asyncio.TimerHandle] = {}
+
+    @property
+    def window_ms(self) -> int:
+        """合并窗口（毫秒），配置为0时不合并"""
+        return max(0, int(RedfishConfig.redfish_ws_coalesce_window_ms))
+
+    @staticmethod
+    def candidate(message_type: Optional[str]) -> bool:
+        """消息类型是否可能被合并（用于决定是否需要反序列化消息）"""
+        return message_type in BATCH_MESSAGE_TYPES
+
+    def accepts(self, message: Dict[str, Any]) -> bool:
+        """
+        消息是否进入合并窗口
+
+        Args:
+            message: 消息内容
+
+        Returns:
+            bool: 是否合并
+        """
+        if self.window_ms <= 0 or message.get("type") not in BATCH_MESSAGE_TYPES:
+            return False
+        if message.get("type") == "dashboard_update":
+            return message.get("action") in BATCH_DASHBOARD_ACTIONS
+        return True
+
+    def rooms(self, rooms: Iterable[str]) -> List[str]:
+        """目标房间中需要合并的房间"""
+        return [room for room in rooms if room in self.ROOMS]
+
+    def add(self, room: str, message: Dict[str, Any]):
+        """
+        把事件放入房间当前窗口（窗口不存在时开启新窗口）
+
+        Args:
+            room: 房间名称
+            message: 消息内容
+        """
+        batch = self._batches.get(room)
+        if batch is None:
+            batch = self._batches[room] = DashboardBatch()
+            self._timers[room] = asyncio.get_running_loop().call_later(
+                self.window_ms / 1000, self.flush_room, room
+            )
+        batch.merge(message)
+
+    def flush_room(self, room: str):
+        """
+        立即结束房间当前窗口并发送合并消息
+
+        Args:
+            room: 房间名称
+        """
+        timer = self._timers.pop(room, None)
+        if timer is not None:
+            timer.cancel()
+        batch = self._batches.pop(room, None)
+        if batch is None or batch.event_count == 0:
+            return
+        try:
+            self._emit(room, batch.to_message(room, self.window_ms))
+            logger.debug(f"Flushed dashboard batch for room {room}: {batch.event_count} events")
+        except Exception as e:
+            logger.error(f"Error flushing dashboard batch for room {room}: {str(e)}")
+
+    def flush(self, rooms: Optional[Iterable[str]] = None):
+        """
+        立即结束窗口（在不合并的消息之前调用，保证前端收到的顺序与发布顺序一致）
+
+        Args:
+            rooms: 目标房间（为空时结束所有房间的窗口）
+        """
+        targets = list(self._batches.keys()) if rooms is None else self.rooms(rooms)
+        for room in targets:
+            if room in self._batches:
+                self.flush_room(room)
+
+    def close(self):
+        """丢弃所有未发送的窗口"""
+        for timer in self._timers.values():
+            timer.cancel()
+        self._timers.clear()
+        self._batches.clear()
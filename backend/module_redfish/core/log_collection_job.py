@@ -0,0 +1,198 @@
+"""
+批量日志收集任务状态
+任务参数、设备清单与逐设备检查点保存在Redis中：分块任务中断后重新投递（或手动恢复）时跳过已完成的设备，
+任务进度可随时通过接口查询
+"""
+import json
+import time
+import uuid
+from typing import Any, Dict, List, Optional
+from config.env import RedfishConfig
+from config.get_redis import get_async_redis
+
+
+# 设备首次完成时才累加计数，分块任务重复投递时不会重复统计
+_RECORD_DEVICE_SCRIPT = """
+local added = redis.call('SADD', KEYS[2], ARGV[1])
+if added == 1 then
+    redis.call('HINCRBY', KEYS[1], 'completed', 1)
+    if ARGV[2] == '1' then
+        redis.call('HINCRBY', KEYS[1], 'collected', ARGV[3])
+        redis.call('HINCRBY', KEYS[1], 'critical', ARGV[4])
+        redis.call('HINCRBY', KEYS[1], 'warning', ARGV[5])
+    else
+        redis.call('HINCRBY', KEYS[1], 'failed', 1)
+        redis.call('HSET', KEYS[3], ARGV[1], ARGV[6])
+    end
+end
+redis.call('HSET', KEYS[1], 'updated_at', ARGV[7])
+-- 检查点集合与任务记录同时过期
+local ttl = redis.call('TTL', KEYS[1])
+if ttl > 0 then
+    redis.call('EXPIRE', KEYS[2], ttl)
+    redis.call('EXPIRE', KEYS[3], ttl)
+end
+local completed = tonumber(redis.call('HGET', KEYS[1], 'completed'))
+local total = tonumber(redis.call('HGET', KEYS[1], 'total'))
+if completed >= total then
+    redis.call('HSET', KEYS[1], 'status', 'completed')
+end
+return {completed, total, added}
+"""
+
+
+class LogCollectionJobStore:
+    """批量日志收集任务状态（Redis）"""
+
+    KEY_PREFIX = 'redfish:log_job'
+    # 运行中的任务超过该时间（秒，与分块任务硬超时一致）没有任何设备完成，视为已中断
+    STALL_SECONDS = 900
+
+    @classmethod
+    def _keys(cls, job_id: str) -> Dict[str, str]:
+        base = f'{cls.KEY_PREFIX}:{job_id}'
+        return {'meta': base, 'devices': f'{base}:devices', 'done': f'{base}:done', 'failed': f'{base}:failed'}
+
+    @classmethod
+    async def create(cls, device_ids: List[int], params: Dict[str, Any], operator: str) -> str:
+        """
+        创建任务
+
+        Args:
+            device_ids: 待收集的设备ID
+            params: 收集参数（log_type / max_entries / force_refresh）
+            operator: 操作者
+
+        Returns:
+            str: 任务ID
+        """
+        job_id = str(uuid.uuid4())
+        keys = cls._keys(job_id)
+        now = time.time()
+        ttl = RedfishConfig.redfish_log_job_ttl
+        pipe = get_async_redis().pipeline(transaction=True)
+        pipe.hset(keys['meta'], mapping={
+            'status': 'running' if device_ids else 'completed',
+            'total': len(device_ids),
+            'completed': 0,
+            'collected': 0,
+            'critical': 0,
+            'warning': 0,
+            'failed': 0,
+            'params': json.dumps(params),
+            'operator': operator,
+            'created_at': now,
+            'updated_at': now,
+        })
+        pipe.expire(keys['meta'], ttl)
+        pipe.set(keys['devices'], json.dumps(device_ids), ex=ttl)
+        await pipe.execute()
+        return job_id
+
+    @classmethod
+    async def get(cls, job_id: str) -> Optional[Dict[str, Any]]:
+        """
+        查询任务状态
+
+        Args:
+            job_id: 任务ID
+
+        Returns:
+            Optional[Dict]: 任务状态，任务不存在或已过期返回None
+        """
+        keys = cls._keys(job_id)
+        client = get_async_redis()
+        meta = await client.hgetall(keys['meta'])
+        if not meta:
+            return None
+        failed_devices = await client.hvals(keys['failed'])
+        total = int(meta.get('total', 0))
+        completed = int(meta.get('completed', 0))
+        updated_at = float(meta.get('updated_at', 0))
+        status = meta.get('status')
+        if status == 'running' and time.time() - updated_at > cls.STALL_SECONDS:
+            status = 'interrupted'
+        return {
+            'job_id': job_id,
+            'status': status,
+            'total': total,
+            'completed': completed,
+            'progress': round(completed / total * 100, 2) if total else 100.0,
+            'collected': int(meta.get('collected', 0)),
+            'critical': int(meta.get('critical', 0)),
+            'warning': int(meta.get('warning', 0)),
+            'failed': int(meta.get('failed', 0)),
+            'failed_devices': failed_devices,
+            'params': json.loads(meta.get('params') or '{}'),
+            'operator': meta.get('operator'),
+            'created_at': float(meta.get('created_at', 0)),
+            'updated_at': updated_at,
+        }
+
+    @classmethod
+    async def pending_devices(cls, job_id: str) -> List[int]:
+        """
+        查询尚未完成的设备（用于恢复中断的任务）
+
+        Args:
+            job_id: 任务ID
+
+        Returns:
+            List[int]: 设备ID
+        """
+        keys = cls._keys(job_id)
+        client = get_async_redis()
+        devices = await client.get(keys['devices'])
+        if not devices:
+            return []
+        done = await client.smembers(keys['done'])
+        return [device_id for device_id in json.loads(devices) if str(device_id) not in done]
+
+    @classmethod
+    async def done_devices(cls, job_id: str) -> set:
+        """
+        查询已完成的设备
+
+        Args:
+            job_id: 任务ID
+
+        Returns:
+            set: 设备ID字符串集合
+        """
+        return await get_async_redis().smembers(cls._keys(job_id)['done'])
+
+    @classmethod
+    async def record_device(cls, job_id: str, device_id: int, device_ip: str,
+                            result: Optional[Dict[str, int]]) -> Dict[str, int]:
+        """
+        记录单台设备的收集结果（检查点）
+
+        Args:
+            job_id: 任务ID
+            device_id: 设备ID
+            device_ip: 设备带外IP
+            result: 收集统计 {'total', 'critical', 'warning'}，失败时为None
+
+        Returns:
+            Dict[str, int]: {'completed': 已完成设备数, 'total': 设备总数, 'added': 是否首次记录该设备}
+        """
+        keys = cls._keys(job_id)
+        succeeded = result is not None
+        result = result or {}
+        completed, total, added = await get_async_redis().eval(
+            _RECORD_DEVICE_SCRIPT, 3, keys['meta'], keys['done'], keys['failed'],
+            device_id, '1' if succeeded else '0',
+            result.get('total', 0), result.get('critical', 0), result.get('warning', 0),
+            device_ip or str(device_id), time.time()
+        )
+        return {'completed': int(completed), 'total': int(total), 'added': int(added)}
+
+    @classmethod
+    async def mark_running(cls, job_id: str):
+        """
+        恢复任务时重新标记为运行中
+
+        Args:
+            job_id: 任务ID
+        """
+        await get_async_redis().hset(cls._keys(job_id)['meta'], mapping={'status': 'running', 'updated_at': time.time()})
@@ -0,0 +1,137 @@
+"""
+设备自适应轮询调度
+每台设备在Redis有序集合中记录下一次到期时间（score），调度任务只派发已到期的设备：
+健康设备使用长间隔，存在告警或状态变化的设备使用短间隔，不可达设备按指数退避
+"""
+import os
+import random
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+import redis
+from loguru import logger
+from config.env import RedfishConfig
+from config.get_redis import get_redis
+
+
+# 原子地取出已到期设备，并把它们的到期时间推迟到租约结束（worker异常退出时租约到期后会被重新派发）
+_CLAIM_DUE_SCRIPT = """
+local due = redis.call('ZRANGEBYSCORE', KEYS[1], '-inf', ARGV[1], 'LIMIT', 0, ARGV[2])
+for _, member in ipairs(due) do
+    redis.call('ZADD', KEYS[1], 'XX', ARGV[3], member)
+end
+return due
+"""
+
+
+class MonitorScheduler:
+    """设备自适应轮询调度（Redis有序集合）"""
+
+    SCHEDULE_KEY = 'redfish:monitor:schedule'
+    FAILURES_KEY = 'redfish:monitor:failures'
+    # 到期时间随机抖动比例，避免同一批设备再次同时到期
+    JITTER = 0.1
+
+    _redis: Optional[redis.Redis] = None
+    _redis_pid: Optional[int] = None
+
+    @classmethod
+    def _client(cls) -> redis.Redis:
+        # 同步连接池不能跨fork复用
+        if cls._redis is None or cls._redis_pid != os.getpid():
+            cls._redis = get_redis()
+            cls._redis_pid = os.getpid()
+        return cls._redis
+
+    @classmethod
+    def _jitter(cls, interval: float) -> float:
+        return interval * random.uniform(1 - cls.JITTER, 1 + cls.JITTER)
+
+    @classmethod
+    def sync_devices(cls, device_ids: Iterable[int]):
+        """
+        同步调度队列与启用监控的设备：新设备在短间隔内分散到期，移除已停用或删除的设备
+
+        Args:
+            device_ids: 启用监控的设备ID
+        """
+        client = cls._client()
+        enabled = {str(device_id) for device_id in device_ids}
+        scheduled = set(client.zrange(cls.SCHEDULE_KEY, 0, -1))
+        now = time.time()
+
+        pipe = client.pipeline(transaction=False)
+        added = enabled - scheduled
+        if added:
+            spread = RedfishConfig.redfish_schedule_alert_interval
+            pipe.zadd(cls.SCHEDULE_KEY, {member: now + random.uniform(0, spread) for member in added}, nx=True)
+        removed = scheduled - enabled
+        if removed:
+            pipe.zrem(cls.SCHEDULE_KEY, *removed)
+            pipe.hdel(cls.FAILURES_KEY, *removed)
+        pipe.execute()
+        if added or removed:
+            logger.info(f'Monitor schedule synced: {len(added)} added, {len(removed)} removed')
+
+    @classmethod
+    def claim_due(cls, limit: int) -> List[int]:
+        """
+        取出已到期的设备（多个调度实例并发调用时不会重复派发）
+
+        Args:
+            limit: 单次最多取出的设备数
+
+        Returns:
+            List[int]: 到期设备ID（按到期时间先后）
+        """
+        now = time.time()
+        due = cls._client().eval(
+            _CLAIM_DUE_SCRIPT, 1, cls.SCHEDULE_KEY, now, limit, now + RedfishConfig.redfish_schedule_lease
+        )
+        return [int(member) for member in due]
+
+    @classmethod
+    def next_interval(cls, reachable: bool, urgent: bool, failures: int) -> float:
+        """
+        计算设备下一次轮询间隔
+
+        Args:
+            reachable: 本次是否成功获取到设备状态
+            urgent: 是否存在告警或健康状态刚发生变化
+            failures: 连续不可达次数（含本次）
+
+        Returns:
+            float: 间隔秒数
+        """
+        if not reachable:
+            backoff = RedfishConfig.redfish_schedule_alert_interval * (2 ** max(0, failures - 1))
+            return cls._jitter(min(backoff, RedfishConfig.redfish_schedule_backoff_max))
+        if urgent:
+            return cls._jitter(RedfishConfig.redfish_schedule_alert_interval)
+        return cls._jitter(RedfishConfig.redfish_schedule_healthy_interval)
+
+    @classmethod
+    def reschedule(cls, outcomes: Dict[int, Tuple[bool, bool]]):
+        """
+        根据监控结果安排设备下一次到期时间
+
+        Args:
+            outcomes: {设备ID: (是否可达, 是否需要密切关注)}
+        """
+        if not outcomes:
+            return
+        client = cls._client()
+        pipe = client.pipeline(transaction=False)
+        for device_id, (reachable, _) in outcomes.items():
+            if reachable:
+                pipe.hdel(cls.FAILURES_KEY, device_id)
+            else:
+                pipe.hincrby(cls.FAILURES_KEY, device_id, 1)
+        counters = pipe.execute()
+
+        now = time.time()
+        schedule = {}
+        for (device_id, (reachable, urgent)), counter in zip(outcomes.items(), counters):
+            failures = 0 if reachable else int(counter)
+            schedule[str(device_id)] = now + cls.next_interval(reachable, urgent, failures)
+        # XX：期间被停用移除的设备不再加回
+        client.zadd(cls.SCHEDULE_KEY, schedule, xx=True)
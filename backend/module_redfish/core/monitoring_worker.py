@@ -0,0 +1,161 @@
+"""
+常驻监控事件循环
+每个worker进程只运行一个事件循环，Celery任务线程把设备批次提交到该循环中并发执行，
+BMC连接池、共享Redis连接与DeviceMonitor在设备之间复用
+"""
+import asyncio
+import os
+import threading
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+from typing import Any, Awaitable, Dict, List, Optional
+from loguru import logger
+from config.env import RedfishConfig
+from config.get_redis import close_async_redis
+from .device_monitor import DeviceMonitor
+from .reachability import ReachabilityEngine, close_reachability_engine
+from .redfish_transport import close_http_clients
+
+
+class MonitoringWorker:
+    """进程级常驻监控事件循环"""
+
+    _instance: Optional['MonitoringWorker'] = None
+    _instance_lock = threading.Lock()
+
+    def __init__(self, concurrency: int):
+        """
+        初始化监控事件循环
+
+        Args:
+            concurrency: 同时监控的设备数上限
+        """
+        self.pid = os.getpid()
+        self.concurrency = concurrency
+        self.monitor = DeviceMonitor()
+        self.loop = asyncio.new_event_loop()
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._thread = threading.Thread(target=self._run, name='redfish-monitoring-loop', daemon=True)
+        self._thread.start()
+
+    @classmethod
+    def instance(cls) -> 'MonitoringWorker':
+        """
+        获取当前进程的监控事件循环（prefork子进程中按PID重新创建）
+
+        Returns:
+            MonitoringWorker: 监控事件循环
+        """
+        with cls._instance_lock:
+            if cls._instance is None or cls._instance.pid != os.getpid():
+                cls._instance = cls(RedfishConfig.redfish_monitor_concurrency)
+                logger.info(
+                    f'Monitoring event loop started in process {cls._instance.pid} '
+                    f'(concurrency={cls._instance.concurrency})'
+                )
+            return cls._instance
+
+    @classmethod
+    def shutdown_instance(cls):
+        """关闭当前进程的监控事件循环"""
+        with cls._instance_lock:
+            if cls._instance is not None and cls._instance.pid == os.getpid():
+                cls._instance.shutdown()
+            cls._instance = None
+
+    def _run(self):
+        asyncio.set_event_loop(self.loop)
+        self.loop.run_forever()
+
+    def submit(self, coro: Awaitable[Any]) -> Future:
+        """
+        提交协程到常驻事件循环（不等待结果）
+
+        Args:
+            coro: 协程
+
+        Returns:
+            Future: 结果
+        """
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+    def run(self, coro: Awaitable[Any], timeout: Optional[float] = None) -> Any:
+        """
+        在常驻事件循环中执行协程并等待结果（供Celery任务线程调用）
+
+        线程池模式下Celery的任务时间限制不生效，超时后取消协程，释放并发槽位与BMC连接
+
+        Args:
+            coro: 协程
+            timeout: 等待超时时间（秒）
+
+        Returns:
+            Any: 协程返回值
+
+        Raises:
+            concurrent.futures.TimeoutError: 等待超时（协程已取消）
+        """
+        future = self.submit(coro)
+        try:
+            return future.result(timeout)
+        except FutureTimeoutError:
+            future.cancel()
+            raise
+
+    async def monitor_device(
+        self, device_info: Dict[str, Any], reachability: Optional[Dict[str, Dict[str, Any]]] = None
+    ) -> Dict[str, Any]:
+        """
+        在并发上限内监控单个设备
+
+        Args:
+            device_info: 设备信息字典
+            reachability: 批量可达性检测结果
+
+        Returns:
+            Dict: 监控结果
+        """
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.concurrency)
+        async with self._semaphore:
+            try:
+                return await self.monitor.monitor_device(device_info, reachability)
+            except Exception as e:
+                logger.error(f"Error monitoring device {device_info.get('hostname', 'Unknown')}: {str(e)}")
+                return {'device_id': device_info.get('device_id'), 'success': False, 'error': str(e)}
+
+    async def monitor_devices(self, device_infos: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        并发监控一批设备
+
+        Args:
+            device_infos: 设备信息列表
+
+        Returns:
+            List[Dict]: 监控结果列表（与输入顺序一致）
+        """
+        # 整批设备的业务IP与带外IP先通过同一个套接字一次性探测
+        ips = [ip for device_info in device_infos for ip in (device_info.get('business_ip'), device_info.get('oob_ip'))]
+        try:
+            reachability = await ReachabilityEngine.get().probe_many(ips)
+        except Exception as e:
+            logger.warning(f'Batch reachability probe failed, falling back to per-device checks: {str(e)}')
+            reachability = {}
+        return await asyncio.gather(
+            *(self.monitor_device(device_info, reachability) for device_info in device_infos)
+        )
+
+    def shutdown(self):
+        """释放连接池并停止事件循环"""
+
+        async def _close():
+            await close_http_clients()
+            await close_async_redis()
+            await close_reachability_engine()
+
+        try:
+            self.run(_close(), timeout=10)
+        except Exception as e:
+            logger.warning(f'Error closing monitoring connection pools: {str(e)}')
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self._thread.join(timeout=10)
+        logger.info(f'Monitoring event loop stopped in process {self.pid}')
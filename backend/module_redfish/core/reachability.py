@@ -0,0 +1,269 @@
+"""
+批量可达性检测引擎
+同一事件循环内所有目标共用一个ICMP套接字（优先使用无特权的ping套接字，其次原始套接字），
+ICMP不可用时退化为异步TCP连接探测；每个目标独立超时并记录往返时延，不再为每个IP启动ping子进程
+"""
+import asyncio
+import ipaddress
+import os
+import socket
+import struct
+import time
+import weakref
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from loguru import logger
+from config.env import RedfishConfig
+
+
+_ICMP_ECHO_REQUEST = 8
+_ICMP_ECHO_REPLY = 0
+
+# 引擎按事件循环隔离：套接字读回调注册在创建它的事件循环上
+_ENGINES: 'weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, ReachabilityEngine]' = weakref.WeakKeyDictionary()
+
+
+def _checksum(data: bytes) -> int:
+    if len(data) % 2:
+        data += b'\x00'
+    total = sum(struct.unpack(f'!{len(data) // 2}H', data))
+    total = (total >> 16) + (total & 0xFFFF)
+    total += total >> 16
+    return ~total & 0xFFFF
+
+
+def _tcp_ports() -> List[int]:
+    return [int(port) for port in RedfishConfig.redfish_reachability_tcp_ports.split(',') if port.strip()]
+
+
+class ReachabilityEngine:
+    """批量可达性检测引擎（每个事件循环一个实例）"""
+
+    def __init__(self, loop: asyncio.AbstractEventLoop):
+        """
+        初始化检测引擎，按配置选择ICMP套接字或TCP探测
+
+        Args:
+            loop: 所属事件循环
+        """
+        self.loop = loop
+        self.sock: Optional[socket.socket] = None
+        self.raw = False
+        self.mode = 'tcp'
+        self._ident = os.getpid() & 0xFFFF
+        self._sequence = 0
+        self._pending: Dict[Tuple[str, int], Tuple[asyncio.Future, float]] = {}
+        self._semaphore = asyncio.Semaphore(RedfishConfig.redfish_reachability_concurrency)
+        if RedfishConfig.redfish_reachability_mode in ('auto', 'icmp'):
+            self._open_icmp_socket()
+        logger.info(f'Reachability engine started in {self.mode} mode')
+
+    @classmethod
+    def get(cls) -> 'ReachabilityEngine':
+        """
+        获取当前事件循环的检测引擎
+
+        Returns:
+            ReachabilityEngine: 检测引擎
+        """
+        loop = asyncio.get_running_loop()
+        engine = _ENGINES.get(loop)
+        if engine is None:
+            engine = cls(loop)
+            _ENGINES[loop] = engine
+        return engine
+
+    def _open_icmp_socket(self):
+        """依次尝试无特权ping套接字与原始套接字，均无权限时使用TCP探测"""
+        for sock_type, raw in ((socket.SOCK_DGRAM, False), (socket.SOCK_RAW, True)):
+            try:
+                sock = socket.socket(socket.AF_INET, sock_type, socket.IPPROTO_ICMP)
+            except (PermissionError, OSError):
+                continue
+            sock.setblocking(False)
+            try:
+                # 大量目标同时应答时避免接收缓冲区溢出丢包
+                sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 4 * 1024 * 1024)
+            except OSError:
+                pass
+            self.sock = sock
+            self.raw = raw
+            self.mode = 'icmp'
+            self.loop.add_reader(sock.fileno(), self._on_readable)
+            return
+        if RedfishConfig.redfish_reachability_mode == 'icmp':
+            logger.warning('ICMP sockets are not permitted for this process, falling back to TCP probes')
+
+    def close(self):
+        """关闭ICMP套接字并结束所有未完成的探测"""
+        if self.sock is not None:
+            try:
+                self.loop.remove_reader(self.sock.fileno())
+            except Exception:
+                pass
+            self.sock.close()
+            self.sock = None
+        for future, _ in self._pending.values():
+            if not future.done():
+                future.set_result(None)
+        self._pending.clear()
+
+    def _next_sequence(self) -> int:
+        self._sequence = (self._sequence + 1) & 0xFFFF
+        return self._sequence
+
+    def _on_readable(self):
+        """读取所有已到达的ICMP应答并唤醒对应的探测"""
+        while self.sock is not None:
+            try:
+                data, address = self.sock.recvfrom(2048)
+            except (BlockingIOError, InterruptedError):
+                return
+            except OSError as e:
+                logger.debug(f'ICMP receive error: {str(e)}')
+                return
+            # 原始套接字（及部分平台的ping套接字）返回的数据包含IP头
+            if data and data[0] >> 4 == 4:
+                data = data[(data[0] & 0x0F) * 4:]
+            if len(data) < 8:
+                continue
+            icmp_type, _, _, ident, sequence = struct.unpack('!BBHHH', data[:8])
+            if icmp_type != _ICMP_ECHO_REPLY:
+                continue
+            # ping套接字的标识由内核改写并过滤，原始套接字需自行核对
+            if self.raw and ident != self._ident:
+                continue
+            pending = self._pending.pop((address[0], sequence), None)
+            if pending is None:
+                continue
+            future, sent_at = pending
+            if not future.done():
+                future.set_result((time.perf_counter() - sent_at) * 1000)
+
+    async def _send_echo(self, ip: str, sequence: int) -> float:
+        packet = struct.pack('!BBHHH', _ICMP_ECHO_REQUEST, 0, 0, self._ident, sequence) + b'redhawk-probe'
+        packet = packet[:2] + struct.pack('!H', _checksum(packet)) + packet[4:]
+        while True:
+            try:
+                self.sock.sendto(packet, (ip, 0))
+                return time.perf_counter()
+            except (BlockingIOError, InterruptedError):
+                # 发送缓冲区已满，让出事件循环等待发送
+                await asyncio.sleep(0.001)
+
+    async def _probe_icmp(self, ip: str, timeout: float, attempts: int) -> Dict[str, Any]:
+        per_attempt = timeout / attempts
+        for _ in range(attempts):
+            sequence = self._next_sequence()
+            future = self.loop.create_future()
+            key = (ip, sequence)
+            try:
+                sent_at = await self._send_echo(ip, sequence)
+            except OSError as e:
+                return self._result('ping', False, error=str(e))
+            self._pending[key] = (future, sent_at)
+            try:
+                rtt = await asyncio.wait_for(future, per_attempt)
+            except asyncio.TimeoutError:
+                rtt = None
+            finally:
+                self._pending.pop(key, None)
+            if rtt is not None:
+                return self._result('ping', True, rtt)
+        return self._result('ping', False, error=f'Ping timeout ({timeout}s)')
+
+    async def _probe_tcp(self, ip: str, timeout: float) -> Dict[str, Any]:
+        """并发连接多个端口，任一端口建立连接即判定可达（与端口检测保持一致，连接被拒绝不算可达）"""
+        started = time.perf_counter()
+
+        async def connect(port: int) -> int:
+            _, writer = await asyncio.open_connection(ip, port)
+            writer.close()
+            return port
+
+        tasks = [asyncio.ensure_future(connect(port)) for port in _tcp_ports()]
+        error = None
+        try:
+            for completed in asyncio.as_completed(tasks, timeout=timeout):
+                try:
+                    port = await completed
+                except asyncio.TimeoutError:
+                    raise
+                except OSError as e:
+                    error = str(e)
+                    continue
+                rtt = (time.perf_counter() - started) * 1000
+                return self._result('tcp_connect', True, rtt, port=port)
+        except asyncio.TimeoutError:
+            error = f'连接超时 ({timeout}s)'
+        finally:
+            for task in tasks:
+                task.cancel()
+        return self._result('tcp_connect', False, error=error or '连接失败')
+
+    @staticmethod
+    def _result(method: str, success: bool, rtt: Optional[float] = None, error: Optional[str] = None,
+                port: Optional[int] = None) -> Dict[str, Any]:
+        result = {
+            "success": success,
+            "method": method,
+            "rtt_ms": round(rtt, 3) if rtt is not None else None,
+            "response_time": f"{rtt:.3f}ms" if rtt is not None else None,
+            "error": None if success else error
+        }
+        if port is not None:
+            result["port"] = port
+        return result
+
+    async def probe(self, ip: str, timeout: Optional[float] = None, attempts: int = 2) -> Dict[str, Any]:
+        """
+        检测单个目标
+
+        Args:
+            ip: 目标IP
+            timeout: 超时时间（秒），默认取配置
+            attempts: ICMP请求次数（在超时时间内平均分配）
+
+        Returns:
+            Dict: {'success', 'method', 'rtt_ms', 'response_time', 'error'}
+        """
+        timeout = timeout or RedfishConfig.redfish_reachability_timeout
+        async with self._semaphore:
+            try:
+                is_ipv4 = ipaddress.ip_address(ip).version == 4
+            except ValueError:
+                # 主机名：交给TCP探测解析
+                is_ipv4 = False
+            if self.sock is not None and is_ipv4:
+                return await self._probe_icmp(ip, timeout, max(1, attempts))
+            return await self._probe_tcp(ip, timeout)
+
+    async def probe_many(self, ips: Iterable[str], timeout: Optional[float] = None) -> Dict[str, Dict[str, Any]]:
+        """
+        批量检测多个目标（去重后并发发出，共用同一个套接字）
+
+        Args:
+            ips: 目标IP
+            timeout: 每个目标的超时时间（秒）
+
+        Returns:
+            Dict[str, Dict]: {IP: 检测结果}
+        """
+        targets = list(dict.fromkeys(ip for ip in ips if ip))
+        if not targets:
+            return {}
+        results = await asyncio.gather(*(self.probe(ip, timeout) for ip in targets), return_exceptions=True)
+        return {
+            ip: result if not isinstance(result, Exception) else self._result(self.mode, False, error=str(result))
+            for ip, result in zip(targets, results)
+        }
+
+
+async def close_reachability_engine():
+    """关闭当前事件循环的检测引擎"""
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        return
+    engine = _ENGINES.pop(loop, None)
+    if engine is not None:
+        engine.close()
@@ -1,24 +1,18 @@
 """
 实时推送服务模块
-提供统一的WebSocket推送接口和消息管理功能
+提供统一的WebSocket推送接口和消息管理功能（经事件总线发布，Web进程与Celery worker均可调用，每个连接只收到一份）
 """
 import asyncio
 from datetime import datetime
 from typing import Dict, List, Any, Optional
 from loguru import logger
 
-from .websocket_manager import websocket_manager
+from .event_bus import EventBus
 
 
 class RealtimePushService:
     """实时推送服务"""
     
-    @staticmethod
-    async def _ensure_redis_connection():
-        """确保Redis连接已初始化（用于独立进程）"""
-        if not websocket_manager.redis_client:
-            await websocket_manager.init_redis()
-    
     @staticmethod
     async def push_dashboard_update(data: Dict[str, Any], action: str = "data_refresh"):
         """
@@ -29,9 +23,6 @@ class RealtimePushService:
             action: 操作类型（默认为data_refresh）
         """
         try:
-            # 确保Redis连接
-            await RealtimePushService._ensure_redis_connection()
-            
             message = {
                 "type": "dashboard_update",
                 "action": action,
@@ -39,11 +30,7 @@ class RealtimePushService:
                 "timestamp": datetime.now().isoformat()
             }
             
-            # 首先尝试直接广播
-            await websocket_manager.broadcast_to_room("dashboard", message)
-            
-            # 然后通过Redis发布，确保跨进程通信
-            await websocket_manager.publish_redis_message("websocket:dashboard", message)
+            await EventBus.publish(["dashboard"], message)
             
             logger.info(f"Pushed dashboard update with action: {action}")
             
@@ -62,9 +49,6 @@ class RealtimePushService:
             device_info: 设备信息
         """
         try:
-            # 确保Redis连接
-            await RealtimePushService._ensure_redis_connection()
-            
             message = {
                 "type": "device_status_change",
                 "action": "status_updated",
@@ -77,13 +61,7 @@ class RealtimePushService:
             }
             
             # 推送到多个相关房间
-            await websocket_manager.broadcast_to_room("dashboard", message)
-            await websocket_manager.broadcast_to_room("device_monitoring", message)
-            await websocket_manager.broadcast_to_room(f"device_{device_id}", message)
-            
-            # Redis发布
-            await websocket_manager.publish_redis_message("websocket:dashboard", message)
-            await websocket_manager.publish_redis_message("websocket:device_monitoring", message)
+            await EventBus.publish(["dashboard", "device_monitoring", f"device_{device_id}"], message)
             
             logger.info(f"Pushed device status change: {device_id} {old_status} -> {new_status}")
             
@@ -99,9 +77,6 @@ class RealtimePushService:
             statistics: 统计数据
         """
         try:
-            # 确保Redis连接
-            await RealtimePushService._ensure_redis_connection()
-            
             message = {
                 "type": "alert_statistics_update",
                 "action": "statistics_updated",
@@ -109,12 +84,7 @@ class RealtimePushService:
                 "timestamp": datetime.now().isoformat()
             }
             
-            await websocket_manager.broadcast_to_room("dashboard", message)
-            await websocket_manager.broadcast_to_room("alerts", message)
-            
-            # Redis发布
-            await websocket_manager.publish_redis_message("websocket:dashboard", message)
-            await websocket_manager.publish_redis_message("websocket:alerts", message)
+            await EventBus.publish(["dashboard", "alerts"], message)
             
             logger.info("Pushed alert statistics update")
             
@@ -133,9 +103,6 @@ class RealtimePushService:
             level: 级别（info, warning, error, success）
         """
         try:
-            # 确保Redis连接
-            await RealtimePushService._ensure_redis_connection()
-            
             notification = {
                 "type": "system_notification",
                 "action": "notification",
@@ -149,12 +116,10 @@ class RealtimePushService:
             # 根据级别选择推送范围
             if level == "error":
                 # 错误通知推送给所有用户
-                await websocket_manager.broadcast_to_all(notification)
-                await websocket_manager.publish_redis_message("websocket:broadcast", notification)
+                await EventBus.publish([], notification, broadcast=True)
             else:
                 # 其他通知只推送到dashboard
-                await websocket_manager.broadcast_to_room("dashboard", notification)
-                await websocket_manager.publish_redis_message("websocket:dashboard", notification)
+                await EventBus.publish(["dashboard"], notification)
             
             logger.info(f"Pushed system notification: {title}")
             
@@ -171,9 +136,6 @@ class RealtimePushService:
             action: 操作类型（notice_published, notice_updated, notice_deleted）
         """
         try:
-            # 确保Redis连接
-            await RealtimePushService._ensure_redis_connection()
-            
             message = {
                 "type": "new_notice",
                 "action": action,
@@ -182,10 +144,7 @@ class RealtimePushService:
             }
             
             # 推送到dashboard房间，所有在首页的用户都能接收
-            await websocket_manager.broadcast_to_room("dashboard", message)
-            
-            # 通过Redis发布，确保跨进程通信
-            await websocket_manager.publish_redis_message("websocket:dashboard", message)
+            await EventBus.publish(["dashboard"], message)
             
             logger.info(f"Pushed notice notification: {action} - {notice_data.get('notice_title')}")
             
@@ -212,8 +171,7 @@ class RealtimePushService:
                 "timestamp": datetime.now().isoformat()
             }
             
-            await websocket_manager.broadcast_to_room("dashboard", message)
-            await websocket_manager.broadcast_to_room("device_monitoring", message)
+            await EventBus.publish(["dashboard", "device_monitoring"], message)
             
             logger.info(f"Pushed monitoring task status: {task_id} - {status}")
             
@@ -245,9 +203,7 @@ class AlertPushService:
             
             if alert_type == 'urgent':
                 # 紧急告警：推送到所有相关房间
-                await websocket_manager.broadcast_to_room("dashboard", message)
-                await websocket_manager.broadcast_to_room("alerts", message)
-                await websocket_manager.broadcast_to_room("urgent_alerts", message)
+                await EventBus.publish(["dashboard", "alerts", "urgent_alerts"], message)
                 
                 # 发送紧急告警特殊通知
                 urgent_notification = {
@@ -259,12 +215,11 @@ class AlertPushService:
                     "message": f"设备 {alert_data.get('hostname')} 出现紧急告警",
                     "timestamp": datetime.now().isoformat()
                 }
-                await websocket_manager.broadcast_to_all(urgent_notification)
+                await EventBus.publish([], urgent_notification, broadcast=True)
                 
             else:
                 # 择期告警：推送到普通房间
-                await websocket_manager.broadcast_to_room("dashboard", message)
-                await websocket_manager.broadcast_to_room("alerts", message)
+                await EventBus.publish(["dashboard", "alerts"], message)
             
             logger.info(f"Pushed new alert: {alert_type} - {alert_data.get('alert_message')}")
             
@@ -287,8 +242,7 @@ class AlertPushService:
                 "timestamp": datetime.now().isoformat()
             }
             
-            await websocket_manager.broadcast_to_room("dashboard", message)
-            await websocket_manager.broadcast_to_room("alerts", message)
+            await EventBus.publish(["dashboard", "alerts"], message)
             
             logger.info(f"Pushed alert resolved: {alert_data.get('alert_id')}")
             
@@ -328,7 +282,7 @@ class DashboardPushService:
                 "timestamp": datetime.now().isoformat()
             }
             
-            await websocket_manager.broadcast_to_room("dashboard", message)
+            await EventBus.publish(["dashboard"], message)
             logger.info("Pushed real-time dashboard statistics")
             
         except Exception as e:
@@ -350,7 +304,7 @@ class DashboardPushService:
                 "timestamp": datetime.now().isoformat()
             }
             
-            await websocket_manager.broadcast_to_room("dashboard", message)
+            await EventBus.publish(["dashboard"], message)
             logger.info(f"Pushed device health summary for {len(devices_health)} devices")
             
         except Exception as e:
@@ -376,8 +330,7 @@ class MonitoringPushService:
                 "timestamp": datetime.now().isoformat()
             }
             
-            await websocket_manager.broadcast_to_room("dashboard", message)
-            await websocket_manager.broadcast_to_room("device_monitoring", message)
+            await EventBus.publish(["dashboard", "device_monitoring"], message)
             
             logger.info(f"Pushed monitoring started for {total_devices} devices")
             
@@ -407,8 +360,7 @@ class MonitoringPushService:
                 "timestamp": datetime.now().isoformat()
             }
             
-            await websocket_manager.broadcast_to_room("dashboard", message)
-            await websocket_manager.broadcast_to_room("device_monitoring", message)
+            await EventBus.publish(["dashboard", "device_monitoring"], message)
             
             logger.debug(f"Pushed monitoring progress: {completed}/{total} ({progress}%)")
             
@@ -431,8 +383,7 @@ class MonitoringPushService:
                 "timestamp": datetime.now().isoformat()
             }
             
-            await websocket_manager.broadcast_to_room("dashboard", message)
-            await websocket_manager.broadcast_to_room("device_monitoring", message)
+            await EventBus.publish(["dashboard", "device_monitoring"], message)
             
             logger.info(f"Pushed monitoring completed: {results.get('total_devices')} devices")
             
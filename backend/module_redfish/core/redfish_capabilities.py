@@ -0,0 +1,101 @@
+"""
+Redfish服务能力缓存
+记录BMC对 $expand / $select / $top / $skip / $filter 查询参数的支持情况，同型号只探测一次（进程内 + Redis共享）
+"""
+import json
+from typing import Any, Dict, Optional
+from loguru import logger
+from config.get_redis import get_async_redis
+
+
+class RedfishCapabilityCache:
+    """Redfish服务能力缓存"""
+
+    KEY_PREFIX = 'redfish:capabilities'
+    # 固件升级后能力可能变化，定期重新探测
+    TTL_SECONDS = 86400
+
+    _local: Dict[str, Dict[str, Any]] = {}
+
+    @staticmethod
+    def parse_service_root(service_root: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        从服务根的 ProtocolFeaturesSupported 解析查询能力
+
+        Args:
+            service_root: /redfish/v1 响应
+
+        Returns:
+            Dict: {'expand': '.'/'*'/None, 'levels': bool, 'max_levels': int, 'select': bool,
+                   'top_skip': bool, 'filter': bool}
+        """
+        features = service_root.get('ProtocolFeaturesSupported') or {}
+        expand_query = features.get('ExpandQuery') or {}
+        # '.' 仅展开下级资源（集合成员），不展开Links；不支持时退而使用 '*'
+        if expand_query.get('NoLinks'):
+            expand = '.'
+        elif expand_query.get('ExpandAll'):
+            expand = '*'
+        else:
+            expand = None
+        return {
+            'expand': expand,
+            'levels': bool(expand_query.get('Levels')),
+            'max_levels': int(expand_query.get('MaxLevels') or 1),
+            'select': bool(features.get('SelectQuery')),
+            'top_skip': bool(features.get('TopSkipQuery')),
+            'filter': bool(features.get('FilterQuery')),
+        }
+
+    @classmethod
+    async def get(cls, key: str) -> Optional[Dict[str, Any]]:
+        """
+        读取能力记录
+
+        Args:
+            key: 型号键（无型号时为BMC地址）
+
+        Returns:
+            Optional[Dict]: 能力记录，未探测过返回None
+        """
+        capabilities = cls._local.get(key)
+        if capabilities is not None:
+            return capabilities
+        try:
+            value = await get_async_redis().get(f'{cls.KEY_PREFIX}:{key}')
+        except Exception as e:
+            logger.warning(f'Redfish capability cache read failed for {key}: {str(e)}')
+            return None
+        if value:
+            capabilities = json.loads(value)
+            cls._local[key] = capabilities
+        return capabilities
+
+    @classmethod
+    async def put(cls, key: str, capabilities: Dict[str, Any]):
+        """
+        写入能力记录
+
+        Args:
+            key: 型号键
+            capabilities: 能力记录
+        """
+        cls._local[key] = capabilities
+        try:
+            await get_async_redis().set(f'{cls.KEY_PREFIX}:{key}', json.dumps(capabilities), ex=cls.TTL_SECONDS)
+        except Exception as e:
+            logger.warning(f'Redfish capability cache write failed for {key}: {str(e)}')
+
+    @classmethod
+    async def disable(cls, key: str, capability: str):
+        """
+        标记某项能力不可用（BMC声明支持但实际请求失败时）
+
+        Args:
+            key: 型号键
+            capability: 能力名称，如 'expand'
+        """
+        capabilities = dict(await cls.get(key) or {})
+        capabilities[capability] = None if capability == 'expand' else False
+        logger.info(f'Redfish {capability} query disabled for {key}')
+        await cls.put(key, capabilities)
@@ -4,20 +4,35 @@ Redfish客户端模块
 """
 import json
 import asyncio
-from typing import Dict, List, Optional, Any
-from datetime import datetime
-import redfish
-from redfish.rest.v1 import ServerDownOrUnreachableError
+from typing import Callable, Dict, List, Optional, Any, Tuple
+from datetime import datetime, timezone
+from urllib.parse import quote
+import httpx
 from loguru import logger
 from cryptography.fernet import Fernet
 import os
 from config.env import RedfishConfig
+from .redfish_transport import RedfishTransport
+from .redfish_capabilities import RedfishCapabilityCache
+from .redfish_log_cursor import RedfishLogCursorStore
 
 
 class RedfishClient:
     """Redfish客户端类"""
     
-    def __init__(self, host: str, username: str, password: str, port: int = 443, timeout: int = 30):
+    # 各组件适配器实际使用的字段（$select投影）
+    PROCESSOR_FIELDS = ("Model", "Manufacturer", "Socket", "TotalCores", "TotalThreads", "Temperature")
+    MEMORY_FIELDS = ("Manufacturer", "PartNumber", "SerialNumber", "CapacityMiB", "OperatingSpeedMhz",
+                     "MemoryType", "DeviceLocator")
+    STORAGE_FIELDS = ("Drives",)
+    DRIVE_FIELDS = ("Manufacturer", "Model", "SerialNumber", "CapacityBytes", "MediaType", "Protocol",
+                    "PredictedMediaLifeLeftPercent")
+    BASE_FIELDS = ("@odata.id", "Id", "Name", "Status")
+    # 单个日志服务最多读取的页数，防止BMC分页实现异常时无限翻页
+    MAX_LOG_PAGES = 500
+    
+    def __init__(self, host: str, username: str, password: str, port: int = 443, timeout: int = 30,
+                 use_session_cache: bool = True, model: Optional[str] = None):
         """
         初始化Redfish客户端
         
@@ -27,14 +42,22 @@ class RedfishClient:
             password: 密码
             port: 端口号，默认443
             timeout: 超时时间，默认30秒
+            use_session_cache: 是否复用Redis中共享的会话令牌，默认True
+            model: 设备型号，用于按型号缓存服务能力（$expand/$select），未提供时按BMC地址缓存
         """
         self.host = host
         self.username = username
         self.password = password
         self.port = port
         self.timeout = timeout
+        self.use_session_cache = use_session_cache
+        self.capability_key = model or host
         self.client = None
         self.session_active = False
+        self._system_uri: Optional[str] = None
+        self._discovery_lock = asyncio.Lock()
+        self._log_cursors: Dict[str, Dict[str, Any]] = {}
+        self._pending_log_cursors: Dict[str, Dict[str, Any]] = {}
         
     async def connect(self) -> bool:
         """
@@ -44,26 +67,18 @@ class RedfishClient:
             bool: 连接是否成功
         """
         try:
-            # 构建连接URL
-            base_url = f"https://{self.host}:{self.port}"
-            
-            # 创建redfish客户端
-            self.client = redfish.redfish_client(
-                base_url=base_url,
-                username=self.username,
-                password=self.password,
-                timeout=self.timeout,
-                max_retry=3
-            )
+            # 创建异步传输（同一BMC共享连接池）
+            self.client = RedfishTransport(host=self.host, port=self.port, timeout=self.timeout)
             
-            # 登录
-            self.client.login(auth="session")
+            # 登录（优先复用共享会话）
+            if not await self.client.open_session(self.username, self.password, use_cache=self.use_session_cache):
+                return False
             self.session_active = True
             
             logger.info(f"Successfully connected to Redfish service at {self.host}")
             return True
             
-        except ServerDownOrUnreachableError:
+        except (httpx.ConnectError, httpx.TimeoutException):
             logger.error(f"Server {self.host} is down or unreachable")
             return False
         except Exception as e:
@@ -71,15 +86,95 @@ class RedfishClient:
             return False
     
     async def disconnect(self):
-        """断开连接"""
+        """断开连接（共享会话保留复用，不注销）"""
         try:
             if self.client and self.session_active:
-                self.client.logout()
+                await self.client.close_session()
                 self.session_active = False
                 logger.info(f"Disconnected from {self.host}")
         except Exception as e:
             logger.error(f"Error disconnecting from {self.host}: {str(e)}")
     
+    async def _get_capabilities(self) -> Dict[str, Any]:
+        """
+        获取服务查询能力（同型号只探测一次服务根）
+        
+        Returns:
+            Dict: 能力记录
+        """
+        async with self._discovery_lock:
+            capabilities = await RedfishCapabilityCache.get(self.capability_key)
+            if capabilities is None:
+                response = await self.client.get("/redfish/v1/")
+                if response.status != 200:
+                    return {}
+                capabilities = RedfishCapabilityCache.parse_service_root(response.dict)
+                logger.info(f"Redfish query capabilities for {self.capability_key}: {capabilities}")
+                await RedfishCapabilityCache.put(self.capability_key, capabilities)
+            return capabilities
+    
+    async def _get_system_uri(self) -> Optional[str]:
+        """获取第一个系统的URI（各组件并发查询时只请求一次）"""
+        async with self._discovery_lock:
+            if self._system_uri is None:
+                systems_response = await self.client.get("/redfish/v1/Systems")
+                if systems_response.status != 200 or not systems_response.dict.get("Members"):
+                    return None
+                self._system_uri = systems_response.dict["Members"][0]["@odata.id"]
+            return self._system_uri
+    
+    @staticmethod
+    def _is_expanded(member: Dict[str, Any]) -> bool:
+        """成员是否已展开（不只有@odata.id引用）"""
+        return any(key != "@odata.id" for key in member)
+    
+    def _with_select(self, uri: str, fields: Tuple[str, ...], capabilities: Dict[str, Any]) -> str:
+        """支持$select时只请求适配器使用的字段"""
+        if not capabilities.get("select") or not fields:
+            return uri
+        return f"{uri}?$select={','.join(self.BASE_FIELDS + fields)}"
+    
+    async def _get_collection_members(self, collection_uri: str, fields: Tuple[str, ...] = (),
+                                      levels: int = 1) -> Optional[List[Dict[str, Any]]]:
+        """
+        获取集合内所有成员的详情
+        BMC支持$expand时一次请求取回整个集合；否则逐个成员并发获取（支持$select时只取所需字段）
+        
+        Args:
+            collection_uri: 集合URI
+            fields: 适配器使用的字段（不含Id/Name/Status）
+            levels: 期望展开层级（受BMC的MaxLevels限制，未展开的下级由调用方补取）
+            
+        Returns:
+            Optional[List[Dict]]: 成员列表，集合不存在时返回None
+        """
+        capabilities = await self._get_capabilities()
+        expand = capabilities.get("expand")
+        if expand:
+            if capabilities.get("levels"):
+                query = f"$expand={expand}($levels={min(levels, capabilities.get('max_levels', 1))})"
+            else:
+                query = f"$expand={expand}"
+            response = await self.client.get(f"{collection_uri}?{query}")
+            if response.status == 404:
+                return None
+            if response.status == 200:
+                members = response.dict.get("Members", [])
+                if all(self._is_expanded(member) for member in members):
+                    return members
+            # 声明支持但未生效，记录后改为逐个获取
+            logger.warning(f"$expand not honoured by {self.host} ({self.capability_key}): {response.status}")
+            await RedfishCapabilityCache.disable(self.capability_key, "expand")
+        
+        collection_response = await self.client.get(collection_uri)
+        if collection_response.status != 200:
+            return None
+        member_responses = await asyncio.gather(*(
+            self.client.get(self._with_select(member["@odata.id"], fields, capabilities))
+            for member in collection_response.dict.get("Members", [])
+        ))
+        return [response.dict for response in member_responses if response.status == 200]
+    
     async def get_system_info(self) -> Optional[Dict[str, Any]]:
         """
         获取系统基本信息
@@ -91,21 +186,12 @@ class RedfishClient:
             if not self.session_active:
                 await self.connect()
             
-            # 获取系统信息
-            systems_uri = "/redfish/v1/Systems"
-            response = self.client.get(systems_uri)
-            
-            if response.status != 200:
-                logger.error(f"Failed to get systems info from {self.host}: {response.status}")
-                return None
-            
-            systems_data = response.dict
-            if not systems_data.get("Members"):
-                return None
-            
             # 获取第一个系统的详细信息
-            system_uri = systems_data["Members"][0]["@odata.id"]
-            system_response = self.client.get(system_uri)
+            system_uri = await self._get_system_uri()
+            if not system_uri:
+                logger.error(f"Failed to get systems info from {self.host}")
+                return None
+            system_response = await self.client.get(system_uri)
             
             if system_response.status != 200:
                 return None
@@ -144,39 +230,29 @@ class RedfishClient:
             processors = []
             
             # 获取系统URI
-            systems_response = self.client.get("/redfish/v1/Systems")
-            if systems_response.status != 200:
+            system_uri = await self._get_system_uri()
+            if not system_uri:
                 return processors
             
-            system_uri = systems_response.dict["Members"][0]["@odata.id"]
-            
-            # 获取处理器集合
-            processors_uri = f"{system_uri}/Processors"
-            processors_response = self.client.get(processors_uri)
-            
-            if processors_response.status != 200:
+            # 获取处理器集合（支持时一次$expand取回全部成员）
+            processor_members = await self._get_collection_members(f"{system_uri}/Processors", self.PROCESSOR_FIELDS)
+            if processor_members is None:
                 return processors
             
-            # 遍历每个处理器
-            for member in processors_response.dict.get("Members", []):
-                processor_uri = member["@odata.id"]
-                processor_response = self.client.get(processor_uri)
-                
-                if processor_response.status == 200:
-                    processor_data = processor_response.dict
-                    processors.append({
-                        "id": processor_data.get("Id", ""),
-                        "name": processor_data.get("Name", ""),
-                        "model": processor_data.get("Model", ""),
-                        "manufacturer": processor_data.get("Manufacturer", ""),
-                        "socket": processor_data.get("Socket", ""),
-                        "cores": processor_data.get("TotalCores", 0),
-                        "threads": processor_data.get("TotalThreads", 0),
-                        "health_status": processor_data.get("Status", {}).get("Health", "Unknown"),
-                        "state": processor_data.get("Status", {}).get("State", "Unknown"),
-                        "temperature": processor_data.get("Temperature", {}),
-                        "raw_data": processor_data
-                    })
+            for processor_data in processor_members:
+                processors.append({
+                    "id": processor_data.get("Id", ""),
+                    "name": processor_data.get("Name", ""),
+                    "model": processor_data.get("Model", ""),
+                    "manufacturer": processor_data.get("Manufacturer", ""),
+                    "socket": processor_data.get("Socket", ""),
+                    "cores": processor_data.get("TotalCores", 0),
+                    "threads": processor_data.get("TotalThreads", 0),
+                    "health_status": processor_data.get("Status", {}).get("Health", "Unknown"),
+                    "state": processor_data.get("Status", {}).get("State", "Unknown"),
+                    "temperature": processor_data.get("Temperature", {}),
+                    "raw_data": processor_data
+                })
             
             return processors
             
@@ -198,40 +274,30 @@ class RedfishClient:
             memory_modules = []
             
             # 获取系统URI
-            systems_response = self.client.get("/redfish/v1/Systems")
-            if systems_response.status != 200:
+            system_uri = await self._get_system_uri()
+            if not system_uri:
                 return memory_modules
             
-            system_uri = systems_response.dict["Members"][0]["@odata.id"]
-            
-            # 获取内存集合
-            memory_uri = f"{system_uri}/Memory"
-            memory_response = self.client.get(memory_uri)
-            
-            if memory_response.status != 200:
+            # 获取内存集合（支持时一次$expand取回全部成员）
+            memory_members = await self._get_collection_members(f"{system_uri}/Memory", self.MEMORY_FIELDS)
+            if memory_members is None:
                 return memory_modules
             
-            # 遍历每个内存模块
-            for member in memory_response.dict.get("Members", []):
-                memory_module_uri = member["@odata.id"]
-                module_response = self.client.get(memory_module_uri)
-                
-                if module_response.status == 200:
-                    module_data = module_response.dict
-                    memory_modules.append({
-                        "id": module_data.get("Id", ""),
-                        "name": module_data.get("Name", ""),
-                        "manufacturer": module_data.get("Manufacturer", ""),
-                        "part_number": module_data.get("PartNumber", ""),
-                        "serial_number": module_data.get("SerialNumber", ""),
-                        "capacity_mb": module_data.get("CapacityMiB", 0),
-                        "speed_mhz": module_data.get("OperatingSpeedMhz", 0),
-                        "memory_type": module_data.get("MemoryType", ""),
-                        "device_locator": module_data.get("DeviceLocator", ""),
-                        "health_status": module_data.get("Status", {}).get("Health", "Unknown"),
-                        "state": module_data.get("Status", {}).get("State", "Unknown"),
-                        "raw_data": module_data
-                    })
+            for module_data in memory_members:
+                memory_modules.append({
+                    "id": module_data.get("Id", ""),
+                    "name": module_data.get("Name", ""),
+                    "manufacturer": module_data.get("Manufacturer", ""),
+                    "part_number": module_data.get("PartNumber", ""),
+                    "serial_number": module_data.get("SerialNumber", ""),
+                    "capacity_mb": module_data.get("CapacityMiB", 0),
+                    "speed_mhz": module_data.get("OperatingSpeedMhz", 0),
+                    "memory_type": module_data.get("MemoryType", ""),
+                    "device_locator": module_data.get("DeviceLocator", ""),
+                    "health_status": module_data.get("Status", {}).get("Health", "Unknown"),
+                    "state": module_data.get("Status", {}).get("State", "Unknown"),
+                    "raw_data": module_data
+                })
             
             return memory_modules
             
@@ -253,48 +319,43 @@ class RedfishClient:
             storage_devices = []
             
             # 获取系统URI
-            systems_response = self.client.get("/redfish/v1/Systems")
-            if systems_response.status != 200:
+            system_uri = await self._get_system_uri()
+            if not system_uri:
                 return storage_devices
             
-            system_uri = systems_response.dict["Members"][0]["@odata.id"]
-            
-            # 获取存储集合
-            storage_uri = f"{system_uri}/Storage"
-            storage_response = self.client.get(storage_uri)
-            
-            if storage_response.status != 200:
+            # 获取存储控制器集合（支持两级展开时驱动器随控制器一并返回）
+            controllers = await self._get_collection_members(f"{system_uri}/Storage", self.STORAGE_FIELDS, levels=2)
+            if controllers is None:
                 return storage_devices
             
-            # 遍历每个存储控制器
-            for member in storage_response.dict.get("Members", []):
-                storage_controller_uri = member["@odata.id"]
-                controller_response = self.client.get(storage_controller_uri)
+            capabilities = await self._get_capabilities()
+            for controller_data in controllers:
+                drive_refs = controller_data.get("Drives", [])
+                if all(self._is_expanded(drive_ref) for drive_ref in drive_refs):
+                    drives = drive_refs
+                else:
+                    # 并发获取驱动器信息
+                    drive_responses = await asyncio.gather(*(
+                        self.client.get(self._with_select(drive_ref["@odata.id"], self.DRIVE_FIELDS, capabilities))
+                        for drive_ref in drive_refs
+                    ))
+                    drives = [response.dict for response in drive_responses if response.status == 200]
                 
-                if controller_response.status == 200:
-                    controller_data = controller_response.dict
-                    
-                    # 获取驱动器信息
-                    for drive_ref in controller_data.get("Drives", []):
-                        drive_uri = drive_ref["@odata.id"]
-                        drive_response = self.client.get(drive_uri)
-                        
-                        if drive_response.status == 200:
-                            drive_data = drive_response.dict
-                            storage_devices.append({
-                                "id": drive_data.get("Id", ""),
-                                "name": drive_data.get("Name", ""),
-                                "manufacturer": drive_data.get("Manufacturer", ""),
-                                "model": drive_data.get("Model", ""),
-                                "serial_number": drive_data.get("SerialNumber", ""),
-                                "capacity_gb": drive_data.get("CapacityBytes", 0) // (1024**3),
-                                "media_type": drive_data.get("MediaType", ""),
-                                "protocol": drive_data.get("Protocol", ""),
-                                "health_status": drive_data.get("Status", {}).get("Health", "Unknown"),
-                                "state": drive_data.get("Status", {}).get("State", "Unknown"),
-                                "predicted_media_life_left": drive_data.get("PredictedMediaLifeLeftPercent", None),
-                                "raw_data": drive_data
-                            })
+                for drive_data in drives:
+                    storage_devices.append({
+                        "id": drive_data.get("Id", ""),
+                        "name": drive_data.get("Name", ""),
+                        "manufacturer": drive_data.get("Manufacturer", ""),
+                        "model": drive_data.get("Model", ""),
+                        "serial_number": drive_data.get("SerialNumber", ""),
+                        "capacity_gb": drive_data.get("CapacityBytes", 0) // (1024**3),
+                        "media_type": drive_data.get("MediaType", ""),
+                        "protocol": drive_data.get("Protocol", ""),
+                        "health_status": drive_data.get("Status", {}).get("Health", "Unknown"),
+                        "state": drive_data.get("Status", {}).get("State", "Unknown"),
+                        "predicted_media_life_left": drive_data.get("PredictedMediaLifeLeftPercent", None),
+                        "raw_data": drive_data
+                    })
             
             return storage_devices
             
@@ -316,7 +377,7 @@ class RedfishClient:
             power_supplies = []
             
             # 获取机箱信息
-            chassis_response = self.client.get("/redfish/v1/Chassis")
+            chassis_response = await self.client.get("/redfish/v1/Chassis")
             if chassis_response.status != 200:
                 return power_supplies
             
@@ -326,7 +387,7 @@ class RedfishClient:
                 
                 # 获取电源信息
                 power_uri = f"{chassis_uri}/Power"
-                power_response = self.client.get(power_uri)
+                power_response = await self.client.get(power_uri)
                 
                 if power_response.status == 200:
                     power_data = power_response.dict
@@ -370,7 +431,7 @@ class RedfishClient:
             fans = []
             
             # 获取机箱信息
-            chassis_response = self.client.get("/redfish/v1/Chassis")
+            chassis_response = await self.client.get("/redfish/v1/Chassis")
             if chassis_response.status != 200:
                 return {"temperatures": temperatures, "fans": fans}
             
@@ -380,7 +441,7 @@ class RedfishClient:
                 
                 # 获取热管理信息
                 thermal_uri = f"{chassis_uri}/Thermal"
-                thermal_response = self.client.get(thermal_uri)
+                thermal_response = await self.client.get(thermal_uri)
                 
                 if thermal_response.status == 200:
                     thermal_data = thermal_response.dict
@@ -485,16 +546,18 @@ class RedfishClient:
     async def get_event_logs(self, log_type: str = "all", max_entries: int = 100,
                            since_entry_id: Optional[str] = None,
                            since_timestamp: Optional[datetime] = None,
-                           deduplicate: bool = True) -> List[Dict[str, Any]]:
+                           deduplicate: bool = True,
+                           incremental: bool = False) -> List[Dict[str, Any]]:
         """
         获取事件日志
         
         Args:
             log_type: 日志类型 ("sel", "mel", "all")
-            max_entries: 每个日志服务的最大条目数
+            max_entries: 返回的最大条目数（增量采集时不截断，游标之后的新条目全部返回）
             since_entry_id: 从此条目ID后获取日志
             since_timestamp: 从此时间戳后获取日志
             deduplicate: 是否去重相同消息内容的日志
+            incremental: 是否按日志服务游标只拉取上次采集之后的新条目（新游标需调用commit_log_cursors持久化）
             
         Returns:
             List[Dict]: 事件日志列表
@@ -503,6 +566,9 @@ class RedfishClient:
             if not self.session_active:
                 await self.connect()
             
+            # 非增量采集同样暂存新的游标，供后续增量采集使用
+            self._log_cursors = await RedfishLogCursorStore.get_all(self.host, self.port) if incremental else {}
+            self._pending_log_cursors = {}
             all_logs = []
             
             # 获取系统事件日志 (SEL)
@@ -522,12 +588,22 @@ class RedfishClient:
             if deduplicate:
                 all_logs = self._deduplicate_logs(all_logs)
             
-            return all_logs[:max_entries] if max_entries > 0 else all_logs
+            # 游标已越过本次读取的全部条目，增量采集截断会永久丢失被截掉的新条目
+            if incremental or max_entries <= 0 or len(all_logs) <= max_entries:
+                return all_logs
+            # 全量采集被截断时不暂存游标，下次增量采集从原游标继续
+            self._pending_log_cursors = {}
+            return all_logs[:max_entries]
             
         except Exception as e:
             logger.error(f"Error getting event logs from {self.host}: {str(e)}")
             return []
     
+    async def commit_log_cursors(self):
+        """持久化本次采集暂存的日志游标（应在日志入库提交之后调用）"""
+        pending, self._pending_log_cursors = self._pending_log_cursors, {}
+        await RedfishLogCursorStore.put_many(self.host, self.port, pending)
+    
     async def _get_system_event_logs(self, max_entries: int = 100,
                                    since_entry_id: Optional[str] = None,
                                    since_timestamp: Optional[datetime] = None) -> List[Dict[str, Any]]:
@@ -535,7 +611,7 @@ class RedfishClient:
         logs = []
         try:
             # 获取系统URI
-            systems_response = self.client.get("/redfish/v1/Systems")
+            systems_response = await self.client.get("/redfish/v1/Systems")
             if systems_response.status != 200:
                 return logs
             
@@ -544,25 +620,16 @@ class RedfishClient:
                 
                 # 获取日志服务
                 log_services_uri = f"{system_uri}/LogServices"
-                log_services_response = self.client.get(log_services_uri)
+                log_services_response = await self.client.get(log_services_uri)
                 
                 if log_services_response.status != 200:
                     continue
                 
                 # 遍历日志服务
                 for log_service_member in log_services_response.dict.get("Members", []):
-                    log_service_uri = log_service_member["@odata.id"]
-                    
-                    # 获取日志条目
-                    entries_uri = f"{log_service_uri}/Entries"
-                    entries_response = self.client.get(entries_uri)
-                    
-                    if entries_response.status == 200:
-                        entries_data = entries_response.dict
-                        for entry in entries_data.get("Members", []):
-                            log_entry = self._parse_log_entry(entry, "SEL")
-                            if self._should_include_log(log_entry, since_entry_id, since_timestamp):
-                                logs.append(log_entry)
+                    logs.extend(await self._get_log_service_entries(
+                        log_service_member["@odata.id"], "SEL", since_entry_id, since_timestamp
+                    ))
             
         except Exception as e:
             logger.error(f"Error getting system event logs: {str(e)}")
@@ -576,7 +643,7 @@ class RedfishClient:
         logs = []
         try:
             # 获取管理器URI
-            managers_response = self.client.get("/redfish/v1/Managers")
+            managers_response = await self.client.get("/redfish/v1/Managers")
             if managers_response.status != 200:
                 return logs
             
@@ -585,31 +652,221 @@ class RedfishClient:
                 
                 # 获取日志服务
                 log_services_uri = f"{manager_uri}/LogServices"
-                log_services_response = self.client.get(log_services_uri)
+                log_services_response = await self.client.get(log_services_uri)
                 
                 if log_services_response.status != 200:
                     continue
                 
                 # 遍历日志服务
                 for log_service_member in log_services_response.dict.get("Members", []):
-                    log_service_uri = log_service_member["@odata.id"]
-                    
-                    # 获取日志条目
-                    entries_uri = f"{log_service_uri}/Entries"
-                    entries_response = self.client.get(entries_uri)
-                    
-                    if entries_response.status == 200:
-                        entries_data = entries_response.dict
-                        for entry in entries_data.get("Members", []):
-                            log_entry = self._parse_log_entry(entry, "MEL")
-                            if self._should_include_log(log_entry, since_entry_id, since_timestamp):
-                                logs.append(log_entry)
+                    logs.extend(await self._get_log_service_entries(
+                        log_service_member["@odata.id"], "MEL", since_entry_id, since_timestamp
+                    ))
             
         except Exception as e:
             logger.error(f"Error getting manager event logs: {str(e)}")
         
         return logs
     
+    async def _get_log_service_entries(self, log_service_uri: str, log_source: str,
+                                       since_entry_id: Optional[str] = None,
+                                       since_timestamp: Optional[datetime] = None) -> List[Dict[str, Any]]:
+        """
+        获取单个日志服务的条目，并暂存该服务的新游标
+        
+        Args:
+            log_service_uri: 日志服务URI
+            log_source: 日志来源（SEL 或 MEL）
+            since_entry_id: 从此条目ID后获取日志
+            since_timestamp: 从此时间戳后获取日志
+            
+        Returns:
+            List[Dict]: 解析并过滤后的日志条目
+        """
+        members, cursor = await self._fetch_log_members(
+            f"{log_service_uri}/Entries", self._log_cursors.get(log_service_uri)
+        )
+        if cursor is not None:
+            self._pending_log_cursors[log_service_uri] = cursor
+        
+        logs = []
+        for entry in members:
+            log_entry = self._parse_log_entry(entry, log_source)
+            if self._should_include_log(log_entry, since_entry_id, since_timestamp):
+                logs.append(log_entry)
+        return logs
+    
+    async def _fetch_log_members(self, entries_uri: str,
+                                 cursor: Optional[Dict[str, Any]]) -> Tuple[List[Dict[str, Any]], Optional[Dict[str, Any]]]:
+        """
+        读取日志条目集合中游标之后的新条目
+        
+        有游标时依次尝试：
+        1. $filter 按 Created 由BMC过滤；
+        2. 最旧在前且支持 $skip 时，从上次的最后一条开始读取（该条目Id不符说明日志被清空或回绕，改为逐页读取）；
+        3. 逐页读取（$top/$skip 或 nextLink），最新在前的日志遇到已采集的条目即停止翻页。
+        
+        Args:
+            entries_uri: 条目集合URI
+            cursor: 该日志服务的游标，无游标时全量读取
+            
+        Returns:
+            Tuple[List[Dict], Optional[Dict]]: (新条目, 新游标)，读取不完整时新游标为None
+        """
+        capabilities = await self._get_capabilities()
+        paged = bool(capabilities.get("top_skip"))
+        
+        if cursor and cursor.get("last_created") and capabilities.get("filter"):
+            # ge：同一秒内的后续条目也需要返回，已采集的条目再按游标剔除
+            query = "$filter=" + quote(f"Created ge '{cursor['last_created']}'", safe="")
+            status, members, _ = await self._read_log_pages(entries_uri, query=query)
+            if status == 200:
+                new_members = [m for m in members if not self._is_known_log_entry(m, cursor)]
+                # 过滤结果不含集合总数，$skip 定位需要在下一次逐页读取后重新获得
+                return new_members, self._next_log_cursor(cursor, new_members, None, cursor.get("newest_first"))
+            if status in (400, 501):
+                logger.warning(f"$filter not honoured by {self.host} ({self.capability_key}): {status}")
+                await RedfishCapabilityCache.disable(self.capability_key, "filter")
+        
+        if cursor and paged and cursor.get("newest_first") is False and cursor.get("count"):
+            skip = cursor["count"] - 1
+            status, members, total = await self._read_log_pages(entries_uri, skip=skip, paged=True)
+            if status == 200 and members and str(members[0].get("Id")) == str(cursor.get("last_id")):
+                new_members = members[1:]
+                total = total if total is not None else skip + len(members)
+                return new_members, self._next_log_cursor(cursor, new_members, total, False)
+            if status == 200:
+                logger.info(f"Log service {entries_uri} on {self.host} was cleared or wrapped, re-reading entries")
+        
+        stop_at = None
+        if cursor and cursor.get("newest_first"):
+            def stop_at(member: Dict[str, Any]) -> bool:
+                return self._is_known_log_entry(member, cursor)
+        status, members, total = await self._read_log_pages(entries_uri, paged=paged, stop_at=stop_at)
+        if total is None and stop_at is None:
+            total = len(members)
+        newest_first = self._detect_newest_first(members)
+        if newest_first is None:
+            newest_first = cursor.get("newest_first") if cursor else None
+        if cursor and stop_at is None:
+            members = [m for m in members if not self._is_known_log_entry(m, cursor)]
+        # 中途翻页失败时不推进游标，下次重新读取缺失的部分
+        return members, self._next_log_cursor(cursor, members, total, newest_first) if status == 200 else None
+    
+    async def _read_log_pages(self, entries_uri: str, query: str = "", skip: int = 0, paged: bool = False,
+                              stop_at: Optional[Callable[[Dict[str, Any]], bool]] = None
+                              ) -> Tuple[int, List[Dict[str, Any]], Optional[int]]:
+        """
+        逐页读取日志条目
+        
+        Args:
+            entries_uri: 条目集合URI
+            query: 额外查询参数（如 $filter）
+            skip: 起始偏移
+            paged: 是否使用 $top/$skip 分页（BMC返回nextLink时优先跟随nextLink）
+            stop_at: 遇到使其返回True的条目时停止读取（该条目不返回）
+            
+        Returns:
+            Tuple[int, List[Dict], Optional[int]]: (最后一次请求的状态码, 条目列表, 集合总数)
+        """
+        page_size = RedfishConfig.redfish_log_page_size if paged else 0
+        members: List[Dict[str, Any]] = []
+        total = None
+        url = self._log_page_url(entries_uri, query, skip, page_size)
+        for _ in range(self.MAX_LOG_PAGES):
+            response = await self.client.get(url)
+            if response.status != 200:
+                return response.status, members, total
+            data = response.dict
+            if total is None:
+                total = data.get("Members@odata.count")
+            page = data.get("Members", [])
+            for member in page:
+                if stop_at is not None and stop_at(member):
+                    return 200, members, total
+                members.append(member)
+            
+            next_link = data.get("Members@odata.nextLink")
+            skip += len(page)
+            if next_link:
+                url = next_link
+            # 返回条数超过 $top 说明BMC忽略了分页参数，已是全部条目
+            elif page_size and len(page) == page_size and (total is None or skip < total):
+                url = self._log_page_url(entries_uri, query, skip, page_size)
+            else:
+                break
+        return 200, members, total
+    
+    @staticmethod
+    def _log_page_url(entries_uri: str, query: str, skip: int, top: int) -> str:
+        params = [query] if query else []
+        if top:
+            if skip:
+                params.append(f"$skip={skip}")
+            params.append(f"$top={top}")
+        return f"{entries_uri}?{'&'.join(params)}" if params else entries_uri
+    
+    @staticmethod
+    def _parse_log_time(value: Optional[str]) -> Optional[datetime]:
+        """解析条目创建时间，统一为无时区的UTC时间"""
+        if not value:
+            return None
+        try:
+            parsed = datetime.fromisoformat(str(value).replace("Z", "+00:00"))
+        except ValueError:
+            return None
+        if parsed.tzinfo is not None:
+            parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+        return parsed
+    
+    @classmethod
+    def _log_entry_order_key(cls, entry: Dict[str, Any]) -> Tuple[datetime, int]:
+        entry_id = str(entry.get("Id", ""))
+        return cls._parse_log_time(entry.get("Created")) or datetime.min, int(entry_id) if entry_id.isdigit() else 0
+    
+    @classmethod
+    def _is_known_log_entry(cls, entry: Dict[str, Any], cursor: Dict[str, Any]) -> bool:
+        """条目是否已在游标之前采集过（同一条目，或创建时间早于高水位）"""
+        if cursor.get("last_id") is not None and str(entry.get("Id")) == str(cursor["last_id"]):
+            return True
+        last_created = cls._parse_log_time(cursor.get("last_created"))
+        created = cls._parse_log_time(entry.get("Created"))
+        return bool(last_created and created and created < last_created)
+    
+    @classmethod
+    def _detect_newest_first(cls, members: List[Dict[str, Any]]) -> Optional[bool]:
+        """根据首尾条目判断集合是否按最新在前排列，无法判断时返回None"""
+        if len(members) < 2:
+            return None
+        first, last = cls._log_entry_order_key(members[0]), cls._log_entry_order_key(members[-1])
+        if first == last:
+            return None
+        return first > last
+    
+    @classmethod
+    def _next_log_cursor(cls, cursor: Optional[Dict[str, Any]], new_members: List[Dict[str, Any]],
+                         total: Optional[int], newest_first: Optional[bool]) -> Dict[str, Any]:
+        """
+        计算新游标：高水位取新条目中最新的一条（按严重程度过滤之前），没有新条目时沿用原高水位
+        
+        Args:
+            cursor: 原游标
+            new_members: 本次读取到的新条目
+            total: 集合条目总数（未知时为None）
+            newest_first: 集合是否最新在前
+            
+        Returns:
+            Dict: {'last_id', 'last_created', 'count', 'newest_first'}
+        """
+        next_cursor = dict(cursor or {"last_id": None, "last_created": None})
+        if new_members:
+            newest = max(new_members, key=cls._log_entry_order_key)
+            next_cursor["last_id"] = newest.get("Id")
+            next_cursor["last_created"] = newest.get("Created")
+        next_cursor["count"] = total
+        next_cursor["newest_first"] = newest_first
+        return next_cursor
+    
     def _parse_log_entry(self, entry_data: Dict[str, Any], log_source: str) -> Dict[str, Any]:
         """解析日志条目"""
         # 标准化严重程度格式
@@ -0,0 +1,67 @@
+"""
+Redfish日志游标
+按 (BMC, 日志服务) 在Redis中记录已采集的高水位（最后条目Id / Created / 条目总数 / 排列顺序），
+增量采集时只拉取高水位之后的新条目
+"""
+import json
+from typing import Any, Dict
+from loguru import logger
+from config.env import RedfishConfig
+from config.get_redis import get_async_redis
+
+
+class RedfishLogCursorStore:
+    """Redfish日志游标存储（Redis哈希，Redis不可用时降级为全量采集）"""
+
+    KEY_PREFIX = 'redfish:log_cursor'
+
+    @classmethod
+    def _key(cls, host: str, port: int) -> str:
+        return f'{cls.KEY_PREFIX}:{host}:{port}'
+
+    @classmethod
+    async def get_all(cls, host: str, port: int) -> Dict[str, Dict[str, Any]]:
+        """
+        读取BMC所有日志服务的游标
+
+        Args:
+            host: BMC IP地址
+            port: 端口号
+
+        Returns:
+            Dict[str, Dict]: {日志服务URI: {'last_id', 'last_created', 'count', 'newest_first'}}
+        """
+        try:
+            values = await get_async_redis().hgetall(cls._key(host, port))
+        except Exception as e:
+            logger.warning(f'Redfish log cursor read failed for {host}: {str(e)}')
+            return {}
+        cursors = {}
+        for service_uri, value in values.items():
+            try:
+                cursors[service_uri] = json.loads(value)
+            except ValueError:
+                continue
+        return cursors
+
+    @classmethod
+    async def put_many(cls, host: str, port: int, cursors: Dict[str, Dict[str, Any]]):
+        """
+        写入日志服务游标（应在日志入库提交之后调用，避免游标领先于已保存的数据）
+
+        Args:
+            host: BMC IP地址
+            port: 端口号
+            cursors: {日志服务URI: 游标}
+        """
+        if not cursors:
+            return
+        key = cls._key(host, port)
+        try:
+            pipe = get_async_redis().pipeline(transaction=False)
+            pipe.hset(key, mapping={uri: json.dumps(cursor) for uri, cursor in cursors.items()})
+            pipe.expire(key, RedfishConfig.redfish_log_cursor_ttl)
+            await pipe.execute()
+        except Exception as e:
+            logger.warning(f'Redfish log cursor write failed for {host}: {str(e)}')
+
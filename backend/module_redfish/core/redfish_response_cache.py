@@ -0,0 +1,113 @@
+"""
+Redfish条件请求（ETag / If-None-Match）响应缓存
+进程内按响应体字节数做LRU淘汰，并可通过Redis在worker间共享；
+缓存保存原始响应文本，每次命中重新解析，调用方修改响应体不会影响缓存
+"""
+import json
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+from loguru import logger
+from config.env import RedfishConfig
+from config.get_redis import get_async_redis
+
+
+class RedfishResponseCache:
+    """Redfish响应缓存，条目为 (etag, 原始响应体)"""
+
+    KEY_PREFIX = 'redfish:etag'
+
+    _entries: 'OrderedDict[str, Tuple[str, str]]' = OrderedDict()
+    _size = 0
+
+    @classmethod
+    def key(cls, host: str, port: int, path: str) -> str:
+        """
+        缓存键
+
+        Args:
+            host: BMC IP地址
+            port: 端口号
+            path: 资源路径（含查询参数）
+
+        Returns:
+            str: 缓存键
+        """
+        return f'{cls.KEY_PREFIX}:{host}:{port}:{path}'
+
+    @classmethod
+    async def get(cls, key: str) -> Optional[Tuple[str, Dict[str, Any]]]:
+        """
+        读取缓存：先查进程内LRU，未命中再查Redis
+
+        Args:
+            key: 缓存键
+
+        Returns:
+            Optional[Tuple[str, Dict]]: (etag, 新解析的响应体)
+        """
+        entry = cls._entries.get(key)
+        if entry is not None:
+            cls._entries.move_to_end(key)
+            return entry[0], json.loads(entry[1])
+        if not RedfishConfig.redfish_etag_cache_redis:
+            return None
+        try:
+            value = await get_async_redis().hgetall(key)
+            if not value or 'etag' not in value or 'body' not in value:
+                return None
+            body = json.loads(value['body'])
+        except ValueError as e:
+            # 损坏的共享条目按未命中处理并删除
+            logger.warning(f'Redfish response cache entry {key} is corrupt, dropping it: {str(e)}')
+            await cls._drop_shared(key)
+            return None
+        except Exception as e:
+            logger.warning(f'Redfish response cache read failed: {str(e)}')
+            return None
+        cls._store_local(key, value['etag'], value['body'])
+        return value['etag'], body
+
+    @classmethod
+    async def _drop_shared(cls, key: str):
+        """删除Redis中的缓存条目"""
+        try:
+            await get_async_redis().delete(key)
+        except Exception as e:
+            logger.warning(f'Redfish response cache delete failed: {str(e)}')
+
+    @classmethod
+    async def put(cls, key: str, etag: str, body: Dict[str, Any], text: str):
+        """
+        写入缓存
+
+        Args:
+            key: 缓存键
+            etag: 响应ETag
+            body: 已解析的响应体（只用于确认响应是有效JSON，缓存不持有该对象）
+            text: 原始响应体（缓存内容，用于计量与Redis共享）
+        """
+        # 单个响应过大时不缓存，避免挤出大量常用条目
+        if body is None or len(text) > RedfishConfig.redfish_etag_cache_max_bytes // 8:
+            return
+        cls._store_local(key, etag, text)
+        if not RedfishConfig.redfish_etag_cache_redis:
+            return
+        try:
+            async with get_async_redis().pipeline(transaction=False) as pipe:
+                pipe.hset(key, mapping={'etag': etag, 'body': text})
+                pipe.expire(key, RedfishConfig.redfish_etag_cache_ttl)
+                await pipe.execute()
+        except Exception as e:
+            logger.warning(f'Redfish response cache write failed: {str(e)}')
+
+    @classmethod
+    def _store_local(cls, key: str, etag: str, text: str):
+        """写入进程内LRU，超出字节上限时淘汰最久未使用的条目"""
+        previous = cls._entries.pop(key, None)
+        if previous is not None:
+            cls._size -= len(previous[1])
+        cls._entries[key] = (etag, text)
+        cls._size += len(text)
+        while cls._size > RedfishConfig.redfish_etag_cache_max_bytes and cls._entries:
+            _, (_, evicted_text) = cls._entries.popitem(last=False)
+            cls._size -= len(evicted_text)
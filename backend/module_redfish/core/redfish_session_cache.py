@@ -0,0 +1,165 @@
+"""
+Redfish会话令牌缓存
+按 (oob_ip, username) 在Redis中共享 X-Auth-Token，所有Celery worker复用同一个BMC会话
+"""
+import asyncio
+import hashlib
+import hmac
+import json
+import uuid
+from typing import Any, Dict, Optional
+from loguru import logger
+from config.env import RedfishConfig
+from config.get_redis import get_async_redis
+
+
+# 仅当缓存中的令牌仍是调用方看到的那个时才删除，避免误删其他worker刚写入的新会话
+_COMPARE_AND_DELETE = """
+local value = redis.call('get', KEYS[1])
+if value and cjson.decode(value)['token'] == ARGV[1] then
+    return redis.call('del', KEYS[1])
+end
+return 0
+"""
+
+_RELEASE_LOCK = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('del', KEYS[1])
+end
+return 0
+"""
+
+
+class RedfishSessionCache:
+    """Redfish会话令牌缓存（Redis共享，所有方法在Redis不可用时降级为未命中）"""
+
+    KEY_PREFIX = 'redfish:session'
+
+    @classmethod
+    def _key(cls, host: str, username: str) -> str:
+        return f'{cls.KEY_PREFIX}:{host}:{username}'
+
+    @staticmethod
+    def credential_fingerprint(host: str, username: str, password: str) -> str:
+        """
+        凭据指纹，设备密码变更后缓存的会话不再复用
+        使用服务端密钥做HMAC，Redis中的指纹无法离线穷举出设备密码
+
+        Args:
+            host: BMC IP地址
+            username: 用户名
+            password: 密码
+
+        Returns:
+            str: 指纹
+        """
+        return hmac.new(
+            RedfishConfig.redfish_encrypt_key.encode(), f'{host}\0{username}\0{password}'.encode(), hashlib.sha256
+        ).hexdigest()
+
+    @classmethod
+    async def get(cls, host: str, username: str) -> Optional[Dict[str, Any]]:
+        """
+        读取缓存的会话，并顺延过期时间（BMC会话空闲超时同样随请求顺延）
+
+        Args:
+            host: BMC IP地址
+            username: 用户名
+
+        Returns:
+            Optional[Dict]: {'token', 'location', 'fingerprint'}，不存在时返回None
+        """
+        try:
+            value = await get_async_redis().getex(cls._key(host, username), ex=RedfishConfig.redfish_session_ttl)
+            return json.loads(value) if value else None
+        except Exception as e:
+            logger.warning(f'Redfish session cache read failed for {host}: {str(e)}')
+            return None
+
+    @classmethod
+    async def put(
+        cls, host: str, username: str, token: str, location: Optional[str], fingerprint: str
+    ) -> Optional[Dict[str, Any]]:
+        """
+        写入会话（仅当不存在时写入）
+
+        Returns:
+            Optional[Dict]: 写入成功返回None；已被其他worker写入时返回已有会话；Redis不可用时抛出异常
+        """
+        redis = get_async_redis()
+        key = cls._key(host, username)
+        entry = {'token': token, 'location': location, 'fingerprint': fingerprint}
+        if await redis.set(key, json.dumps(entry), nx=True, ex=RedfishConfig.redfish_session_ttl):
+            return None
+        value = await redis.get(key)
+        return json.loads(value) if value else None
+
+    @classmethod
+    async def invalidate(cls, host: str, username: str, token: str):
+        """
+        令牌失效（401）时移除缓存
+
+        Args:
+            host: BMC IP地址
+            username: 用户名
+            token: 已失效的令牌
+        """
+        try:
+            await get_async_redis().eval(_COMPARE_AND_DELETE, 1, cls._key(host, username), token)
+        except Exception as e:
+            logger.warning(f'Redfish session cache invalidate failed for {host}: {str(e)}')
+
+    @classmethod
+    async def acquire_login_lock(cls, host: str, username: str) -> Optional[str]:
+        """
+        获取登录锁，同一BMC账号同一时刻只允许一个worker创建会话，避免会话槽位被占满
+
+        Returns:
+            Optional[str]: 锁标识，未获取到返回None
+        """
+        lock_id = uuid.uuid4().hex
+        try:
+            acquired = await get_async_redis().set(
+                f'{cls._key(host, username)}:lock', lock_id, nx=True, ex=RedfishConfig.redfish_session_lock_timeout
+            )
+            return lock_id if acquired else None
+        except Exception as e:
+            logger.warning(f'Redfish session lock failed for {host}: {str(e)}')
+            return None
+
+    @classmethod
+    async def release_login_lock(cls, host: str, username: str, lock_id: str):
+        """释放登录锁"""
+        try:
+            await get_async_redis().eval(_RELEASE_LOCK, 1, f'{cls._key(host, username)}:lock', lock_id)
+        except Exception as e:
+            logger.warning(f'Redfish session unlock failed for {host}: {str(e)}')
+
+    @classmethod
+    async def wait_for_session(cls, host: str, username: str, timeout: float) -> Optional[Dict[str, Any]]:
+        """
+        等待持锁的worker完成登录并写入会话；锁已释放仍无会话（持锁方登录失败）时立即返回
+
+        Args:
+            host: BMC IP地址
+            username: 用户名
+            timeout: 最长等待时间（秒）
+
+        Returns:
+            Optional[Dict]: 会话，超时或锁已释放时返回None
+        """
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        lock_key = f'{cls._key(host, username)}:lock'
+        while loop.time() < deadline:
+            await asyncio.sleep(0.2)
+            entry = await cls.get(host, username)
+            if entry:
+                return entry
+            try:
+                if not await get_async_redis().exists(lock_key):
+                    return None
+            except Exception as e:
+                logger.warning(f'Redfish session lock check failed for {host}: {str(e)}')
+                return None
+        return None
@@ -0,0 +1,345 @@
+"""
+Redfish异步传输层
+基于httpx实现，按BMC复用连接池（keep-alive、HTTP/2、共享TLS上下文），通过Redis共享会话令牌，
+GET请求使用ETag条件请求缓存
+"""
+import asyncio
+import ssl
+import weakref
+from typing import Any, Dict, Optional, Tuple
+import httpx
+from loguru import logger
+from config.env import RedfishConfig
+from .redfish_session_cache import RedfishSessionCache
+from .redfish_response_cache import RedfishResponseCache
+
+try:
+    import h2  # noqa: F401
+
+    _HTTP2_AVAILABLE = True
+except ImportError:  # pragma: no cover
+    _HTTP2_AVAILABLE = False
+
+
+# BMC普遍使用自签名证书，与原redfish库行为保持一致：不校验证书
+# 所有连接池共用同一个SSL上下文，避免每个BMC重复构建上下文
+_SSL_CONTEXT = ssl.create_default_context()
+_SSL_CONTEXT.check_hostname = False
+_SSL_CONTEXT.verify_mode = ssl.CERT_NONE
+
+# 连接池按事件循环隔离：httpx连接绑定创建它的事件循环
+_POOLS: 'weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[Tuple[str, int], httpx.AsyncClient]]' = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def get_http_client(host: str, port: int) -> httpx.AsyncClient:
+    """
+    获取指定BMC的共享连接池（当前事件循环内复用）
+
+    Args:
+        host: BMC IP地址
+        port: 端口号
+
+    Returns:
+        httpx.AsyncClient: 该BMC的连接池
+    """
+    loop = asyncio.get_running_loop()
+    pools = _POOLS.setdefault(loop, {})
+    key = (host, port)
+    client = pools.get(key)
+    if client is None or client.is_closed:
+        client = httpx.AsyncClient(
+            base_url=f'https://{host}:{port}',
+            transport=httpx.AsyncHTTPTransport(
+                verify=_SSL_CONTEXT,
+                http2=RedfishConfig.redfish_http2 and _HTTP2_AVAILABLE,
+                limits=httpx.Limits(
+                    max_connections=RedfishConfig.redfish_pool_max_connections,
+                    max_keepalive_connections=RedfishConfig.redfish_pool_max_connections,
+                    keepalive_expiry=RedfishConfig.redfish_pool_keepalive_expiry,
+                ),
+                retries=RedfishConfig.redfish_connect_retries,
+            ),
+            headers={'Accept': 'application/json', 'OData-Version': '4.0'},
+        )
+        pools[key] = client
+    return client
+
+
+async def close_http_clients():
+    """关闭当前事件循环内的所有BMC连接池"""
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        return
+    pools = _POOLS.pop(loop, {})
+    for (host, port), client in pools.items():
+        try:
+            await client.aclose()
+        except Exception as e:
+            logger.debug(f'Error closing Redfish connection pool for {host}:{port}: {str(e)}')
+
+
+class RedfishResponse:
+    """Redfish响应，保持与redfish库响应一致的 status / dict 接口"""
+
+    def __init__(self, status: int, headers: httpx.Headers, body: Optional[Dict[str, Any]], text: str = ''):
+        self.status = status
+        self.headers = headers
+        self.text = text
+        self._body = body
+
+    @property
+    def dict(self) -> Dict[str, Any]:
+        return self._body if self._body is not None else {}
+
+
+class RedfishTransport:
+    """单个BMC的异步Redfish传输（会话认证 + 共享连接池 + 共享会话令牌）"""
+
+    SESSIONS_URI = '/redfish/v1/SessionService/Sessions'
+
+    def __init__(self, host: str, port: int = 443, timeout: int = 30):
+        """
+        初始化传输层
+
+        Args:
+            host: BMC IP地址
+            port: 端口号
+            timeout: 单次请求超时时间（秒）
+        """
+        self.host = host
+        self.port = port
+        self.timeout = timeout
+        self.auth_token: Optional[str] = None
+        self.session_location: Optional[str] = None
+        # 会话是否登记在共享缓存中（共享会话关闭时不注销）
+        self.session_cached = False
+        self._credentials: Optional[Tuple[str, str]] = None
+        self._use_cache = False
+        self._auth_lock = asyncio.Lock()
+
+    @property
+    def _client(self) -> httpx.AsyncClient:
+        return get_http_client(self.host, self.port)
+
+    def _headers(self, extra: Optional[Dict[str, str]] = None) -> Dict[str, str]:
+        headers = {}
+        if self.auth_token:
+            headers['X-Auth-Token'] = self.auth_token
+        if extra:
+            headers.update(extra)
+        return headers
+
+    async def request(
+        self, method: str, path: str, json: Optional[Dict[str, Any]] = None, headers: Optional[Dict[str, str]] = None
+    ) -> RedfishResponse:
+        """
+        发送Redfish请求
+
+        Args:
+            method: HTTP方法
+            path: 资源路径（/redfish/v1/...）或完整URL
+            json: 请求体
+            headers: 额外请求头
+
+        Returns:
+            RedfishResponse: 响应对象
+        """
+        token_used = self.auth_token
+        response = await self._client.request(
+            method, path, json=json, headers=self._headers(headers), timeout=self.timeout
+        )
+        # 会话已被BMC回收（超时/重启），重新登录后重试一次；并发请求只重新登录一次
+        if response.status_code == 401 and self._credentials and path != self.SESSIONS_URI:
+            async with self._auth_lock:
+                if self.auth_token == token_used:
+                    if self.session_cached and token_used:
+                        await RedfishSessionCache.invalidate(self.host, self._credentials[0], token_used)
+                    self.auth_token = None
+                    self.session_location = None
+                    await self._create_session()
+            if self.auth_token and self.auth_token != token_used:
+                response = await self._client.request(
+                    method, path, json=json, headers=self._headers(headers), timeout=self.timeout
+                )
+        body = None
+        text = ''
+        if response.content:
+            text = response.text
+            try:
+                body = response.json()
+            except ValueError:
+                body = None
+        return RedfishResponse(response.status_code, response.headers, body, text)
+
+    async def get(self, path: str, headers: Optional[Dict[str, str]] = None) -> RedfishResponse:
+        """
+        GET请求：命中缓存时携带If-None-Match，304时复用缓存的响应体（每次命中重新解析，互不影响）
+
+        Args:
+            path: 资源路径
+            headers: 额外请求头
+
+        Returns:
+            RedfishResponse: 响应对象（304会转换为200 + 缓存响应体）
+        """
+        if not RedfishConfig.redfish_etag_cache or (headers and 'If-None-Match' in headers):
+            return await self.request('GET', path, headers=headers)
+
+        cache_key = RedfishResponseCache.key(self.host, self.port, path)
+        cached = await RedfishResponseCache.get(cache_key)
+        request_headers = dict(headers or {})
+        if cached:
+            request_headers['If-None-Match'] = cached[0]
+        response = await self.request('GET', path, headers=request_headers)
+
+        if response.status == 304 and cached:
+            return RedfishResponse(200, response.headers, cached[1])
+        etag = response.headers.get('ETag')
+        if response.status == 200 and etag and response._body is not None:
+            await RedfishResponseCache.put(cache_key, etag, response._body, response.text)
+        return response
+
+    async def login(self, username: str, password: str) -> bool:
+        """
+        创建Redfish会话
+
+        Args:
+            username: 用户名
+            password: 密码
+
+        Returns:
+            bool: 是否登录成功
+        """
+        response = await self.request('POST', self.SESSIONS_URI, json={'UserName': username, 'Password': password})
+        if response.status not in (200, 201, 204):
+            logger.error(f'Redfish session login to {self.host} failed: {response.status}')
+            return False
+        self.auth_token = response.headers.get('X-Auth-Token')
+        self.session_location = response.headers.get('Location') or response.dict.get('@odata.id')
+        return bool(self.auth_token)
+
+    async def logout(self):
+        """删除Redfish会话"""
+        if self.session_location:
+            await self.request('DELETE', self.session_location)
+        self.auth_token = None
+        self.session_location = None
+
+    async def open_session(self, username: str, password: str, use_cache: bool = True) -> bool:
+        """
+        打开会话：优先复用共享缓存中的令牌，否则登录并登记到缓存
+
+        Args:
+            username: 用户名
+            password: 密码
+            use_cache: 是否使用共享会话缓存
+
+        Returns:
+            bool: 是否成功
+        """
+        self._credentials = (username, password)
+        self._use_cache = use_cache and RedfishConfig.redfish_session_cache
+        if not self._use_cache:
+            self.session_cached = False
+            return await self.login(username, password)
+
+        entry = await RedfishSessionCache.get(self.host, username)
+        if entry and self._adopt(entry, password):
+            return True
+        return await self._create_session(stale=entry)
+
+    async def close_session(self):
+        """关闭会话：共享会话保留给后续轮询复用，未登记的会话立即注销以释放槽位"""
+        self._credentials = None
+        if not self.session_cached:
+            await self.logout()
+        self.auth_token = None
+        self.session_location = None
+        self.session_cached = False
+
+    def _adopt(self, entry: Dict[str, Any], password: str) -> bool:
+        """采用缓存中的会话（凭据指纹一致时）"""
+        fingerprint = RedfishSessionCache.credential_fingerprint(self.host, self._credentials[0], password)
+        if entry.get('fingerprint') != fingerprint or not entry.get('token'):
+            return False
+        self.auth_token = entry['token']
+        self.session_location = entry.get('location')
+        self.session_cached = True
+        return True
+
+    async def _create_session(self, stale: Optional[Dict[str, Any]] = None) -> bool:
+        """
+        登录并登记共享会话
+
+        同一BMC账号由登录锁串行化：未抢到锁的worker等待持锁方写入的会话；
+        写入时发现已有会话（竞争失败）则改用已有会话并注销自己的会话，避免泄漏BMC会话槽位。
+
+        Args:
+            stale: 凭据已变更的旧会话，登录前先注销
+
+        Returns:
+            bool: 是否成功
+        """
+        username, password = self._credentials
+        self.session_cached = False
+        if not self._use_cache:
+            return await self.login(username, password)
+
+        lock_id = await RedfishSessionCache.acquire_login_lock(self.host, username)
+        try:
+            # 等锁期间其他worker可能已完成登录
+            if lock_id is None:
+                entry = await RedfishSessionCache.wait_for_session(
+                    self.host, username, RedfishConfig.redfish_session_lock_timeout
+                )
+                # 持锁方未写入会话就释放了锁，改由本worker持锁登录并登记
+                if not entry:
+                    lock_id = await RedfishSessionCache.acquire_login_lock(self.host, username)
+                    if lock_id is not None:
+                        entry = await RedfishSessionCache.get(self.host, username)
+            else:
+                entry = await RedfishSessionCache.get(self.host, username)
+            if entry and self._adopt(entry, password):
+                return True
+            if lock_id is not None and stale and stale.get('token'):
+                await self._delete_session(stale)
+                await RedfishSessionCache.invalidate(self.host, username, stale['token'])
+
+            if not await self.login(username, password):
+                return False
+            # 未持锁时不登记，会话在close_session时注销
+            if lock_id is None:
+                return True
+
+            fingerprint = RedfishSessionCache.credential_fingerprint(self.host, username, password)
+            try:
+                existing = await RedfishSessionCache.put(
+                    self.host, username, self.auth_token, self.session_location, fingerprint
+                )
+            except Exception as e:
+                logger.warning(f'Redfish session cache write failed for {self.host}: {str(e)}')
+                return True
+            if existing is None:
+                self.session_cached = True
+                return True
+            own = {'token': self.auth_token, 'location': self.session_location}
+            if self._adopt(existing, password):
+                await self._delete_session(own)
+            return True
+        finally:
+            if lock_id is not None:
+                await RedfishSessionCache.release_login_lock(self.host, username, lock_id)
+
+    async def _delete_session(self, entry: Dict[str, Any]):
+        """使用指定令牌注销会话（尽力而为）"""
+        if not entry.get('location'):
+            return
+        try:
+            await self._client.request(
+                'DELETE', entry['location'], headers={'X-Auth-Token': entry['token']}, timeout=self.timeout
+            )
+        except Exception as e:
+            logger.debug(f'Failed to delete Redfish session on {self.host}: {str(e)}')
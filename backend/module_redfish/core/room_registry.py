@@ -0,0 +1,235 @@
+"""
+WebSocket房间注册表
+在线连接与房间成员保存在Redis中：每个持有WebSocket连接的API进程（节点）登记自己的连接及其房间，
+按房间记录各节点的成员数，并定时心跳；事件总线据此只向房间内有成员的节点频道发布消息，
+心跳超时的节点（进程异常退出）由其他节点清理
+"""
+import json
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+from loguru import logger
+from config.env import RedfishConfig
+from config.get_redis import get_async_redis, get_redis
+
+
+class RoomRegistry:
+    """WebSocket房间注册表（每个节点一个实例，路由查询为类方法）"""
+
+    NODES_KEY = 'websocket:nodes'  # ZSET 节点 -> 最近心跳时间
+    ROOMS_KEY = 'websocket:rooms'  # SET 有过成员的房间
+    CHANNEL_PREFIX = 'websocket:events:node:'
+
+    # 进程内房间路由缓存 {房间: (过期时间, 节点集合)}
+    _route_cache: Dict[str, Tuple[float, Set[str]]] = {}
+
+    def __init__(self, node: str):
+        """
+        Args:
+            node: 节点ID（即事件总线的来源ID）
+        """
+        self.node = node
+
+    @classmethod
+    def node_channel(cls, node: str) -> str:
+        """节点的消息频道"""
+        return f'{cls.CHANNEL_PREFIX}{node}'
+
+    @staticmethod
+    def room_key(room: str) -> str:
+        """房间的节点成员数哈希（节点 -> 该节点在房间内的连接数）"""
+        return f'websocket:room:{room}'
+
+    @staticmethod
+    def connections_key(node: str) -> str:
+        """节点的连接哈希（连接ID -> {user_id, rooms, connected_at}）"""
+        return f'websocket:node:{node}:connections'
+
+    async def save_connection(
+        self,
+        connection_id: str,
+        user_id: str,
+        rooms: Iterable[str],
+        connected_at: float,
+        room_counts: Optional[Dict[str, int]] = None
+    ):
+        """
+        登记（或更新）本节点的连接及其房间
+
+        Args:
+            connection_id: 连接ID
+            user_id: 用户ID
+            rooms: 连接所在房间
+            connected_at: 连接建立时间
+            room_counts: 成员数有变化的房间 {房间: 本节点成员数}
+        """
+        pipe = get_async_redis().pipeline()
+        pipe.zadd(self.NODES_KEY, {self.node: time.time()})
+        pipe.hset(self.connections_key(self.node), connection_id, json.dumps({
+            'user_id': user_id, 'rooms': sorted(rooms), 'connected_at': connected_at
+        }))
+        self._write_room_counts(pipe, room_counts or {})
+        await pipe.execute()
+
+    async def remove_connection(self, connection_id: str, room_counts: Optional[Dict[str, int]] = None):
+        """
+        注销本节点的连接
+
+        Args:
+            connection_id: 连接ID
+            room_counts: 成员数有变化的房间 {房间: 本节点成员数}
+        """
+        pipe = get_async_redis().pipeline()
+        pipe.hdel(self.connections_key(self.node), connection_id)
+        self._write_room_counts(pipe, room_counts or {})
+        await pipe.execute()
+
+    def _write_room_counts(self, pipe, room_counts: Dict[str, int]):
+        """写入本节点在各房间的成员数（为0时移除）"""
+        for room, count in room_counts.items():
+            if count > 0:
+                pipe.hset(self.room_key(room), self.node, count)
+                pipe.sadd(self.ROOMS_KEY, room)
+            else:
+                pipe.hdel(self.room_key(room), self.node)
+
+    async def heartbeat(self, snapshot: Callable[[], Tuple[Dict[str, Dict[str, Any]], Dict[str, int]]]):
+        """
+        心跳：刷新本节点的存活时间并重写完整的连接与房间登记（Redis数据丢失后自动恢复），再清理超时节点
+
+        Args:
+            snapshot: 返回 (本节点所有连接 {连接ID: {user_id, rooms, connected_at}}, 本节点在各房间的成员数)；
+                在读取房间列表之后调用，避免等待期间加入/离开房间的变化被旧快照覆盖
+        """
+        redis = get_async_redis()
+        registered = set(await redis.smembers(self.ROOMS_KEY))
+        # 取快照到写入管道之间没有await，写入的是同一时刻的完整登记
+        connections, room_counts = snapshot()
+        pipe = redis.pipeline()
+        pipe.zadd(self.NODES_KEY, {self.node: time.time()})
+        pipe.delete(self.connections_key(self.node))
+        if connections:
+            pipe.hset(self.connections_key(self.node), mapping={
+                connection_id: json.dumps(info) for connection_id, info in connections.items()
+            })
+        self._write_room_counts(pipe, {
+            **{room: 0 for room in registered}, **room_counts
+        })
+        await pipe.execute()
+        await self.prune_dead_nodes()
+
+    async def prune_dead_nodes(self):
+        """清理心跳超时的节点"""
+        redis = get_async_redis()
+        dead = await redis.zrangebyscore(self.NODES_KEY, '-inf', time.time() - RedfishConfig.redfish_ws_node_ttl)
+        for node in dead:
+            if node == self.node:
+                continue
+            await self._remove_node(node)
+            logger.warning(f"Pruned dead WebSocket node from room registry: {node}")
+
+    async def unregister(self):
+        """注销本节点（进程退出时调用）"""
+        await self._remove_node(self.node)
+
+    async def _remove_node(self, node: str):
+        redis = get_async_redis()
+        rooms = await redis.smembers(self.ROOMS_KEY)
+        pipe = redis.pipeline()
+        for room in rooms:
+            pipe.hdel(self.room_key(room), node)
+        pipe.delete(self.connections_key(node))
+        pipe.zrem(self.NODES_KEY, node)
+        await pipe.execute()
+
+    @classmethod
+    def _cached_routes(cls, rooms: List[str]) -> Tuple[Set[str], List[str]]:
+        """读取路由缓存，返回 (已缓存房间的节点并集, 需要查询的房间)"""
+        now = time.monotonic()
+        nodes, missing = set(), []
+        for room in rooms:
+            cached = cls._route_cache.get(room)
+            if cached and cached[0] > now:
+                nodes.update(cached[1])
+            else:
+                missing.append(room)
+        return nodes, missing
+
+    @classmethod
+    def _store_routes(cls, rooms: List[str], results: List[Iterable[str]]) -> Set[str]:
+        expires = time.monotonic() + RedfishConfig.redfish_ws_route_cache_ttl
+        nodes = set()
+        for room, room_nodes in zip(rooms, results):
+            room_nodes = set(room_nodes)
+            cls._route_cache[room] = (expires, room_nodes)
+            nodes.update(room_nodes)
+        return nodes
+
+    @classmethod
+    async def room_nodes(cls, rooms: Iterable[str]) -> Set[str]:
+        """
+        目标房间内有成员的节点（异步）
+
+        Args:
+            rooms: 目标房间
+
+        Returns:
+            Set[str]: 节点ID集合
+        """
+        rooms = list(rooms)
+        nodes, missing = cls._cached_routes(rooms)
+        if missing:
+            pipe = get_async_redis().pipeline()
+            for room in missing:
+                pipe.hkeys(cls.room_key(room))
+            nodes.update(cls._store_routes(missing, await pipe.execute()))
+        return nodes
+
+    @classmethod
+    def room_nodes_sync(cls, rooms: Iterable[str]) -> Set[str]:
+        """
+        目标房间内有成员的节点（同步，供Celery任务使用）
+
+        Args:
+            rooms: 目标房间
+
+        Returns:
+            Set[str]: 节点ID集合
+        """
+        rooms = list(rooms)
+        nodes, missing = cls._cached_routes(rooms)
+        if missing:
+            pipe = get_redis().pipeline()
+            for room in missing:
+                pipe.hkeys(cls.room_key(room))
+            nodes.update(cls._store_routes(missing, pipe.execute()))
+        return nodes
+
+    @classmethod
+    async def room_member_count(cls, room: str) -> int:
+        """
+        房间在所有节点的连接数
+
+        Args:
+            room: 房间名称
+
+        Returns:
+            int: 连接数
+        """
+        return sum(int(count) for count in await get_async_redis().hvals(cls.room_key(room)))
+
+    @classmethod
+    async def connection_count(cls) -> int:
+        """
+        所有存活节点的连接数
+
+        Returns:
+            int: 连接数
+        """
+        redis = get_async_redis()
+        nodes = await redis.zrangebyscore(cls.NODES_KEY, time.time() - RedfishConfig.redfish_ws_node_ttl, '+inf')
+        if not nodes:
+            return 0
+        pipe = redis.pipeline()
+        for node in nodes:
+            pipe.hlen(cls.connections_key(node))
+        return sum(await pipe.execute())
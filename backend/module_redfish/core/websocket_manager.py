@@ -1,15 +1,102 @@
 """
 WebSocket连接管理器
 用于管理WebSocket连接、房间订阅和消息广播
+广播时消息只序列化一次，逐连接放入有界发送队列后立即返回，由每个连接自己的写协程发送：
+慢连接不会阻塞房间内其他连接和Redis订阅循环；队列满时丢弃最旧的消息，状态类消息只保留最新一条
+连接按连接ID管理（同一用户可同时持有多个连接），连接与房间成员登记到Redis房间注册表并定时心跳，
+本节点只订阅自己的频道与公共广播频道，事件总线只向房间内有成员的节点发布；发往dashboard房间的高频事件先经合并器按时间窗口合并
 """
 import json
+import time
+import uuid
 import asyncio
-from typing import Dict, Set, List, Optional, Any
+from collections import deque
+from typing import Any, Callable, Deque, Dict, Iterable, Set, List, Optional, Tuple
 from datetime import datetime
 from fastapi import WebSocket, WebSocketDisconnect
 from loguru import logger
 import redis.asyncio as aioredis
-from config.env import RedisConfig
+from config.env import RedisConfig, RedfishConfig
+from .event_bus import EventBus, coalesce_key
+from .event_coalescer import DashboardEventCoalescer
+from .room_registry import RoomRegistry
+
+
+# 表示首页数据已变化的消息类型（可合并事件之外）
+DATA_CHANGE_MESSAGE_TYPES = {
+    "dashboard_update",
+    "monitoring_completed",
+    "urgency_recalculation_completed",
+}
+
+
+class ConnectionSender:
+    """单个连接的有界发送队列与写协程"""
+    
+    def __init__(self, manager: "WebSocketManager", connection_id: str, user_id: str, websocket: WebSocket):
+        self.manager = manager
+        self.connection_id = connection_id
+        self.user_id = user_id
+        self.websocket = websocket
+        self.dropped = 0  # 队列满被丢弃的消息数
+        self.coalesced = 0  # 被更新状态覆盖的消息数
+        self._queue: Deque[Tuple[Optional[str], str]] = deque()
+        self._wakeup = asyncio.Event()
+        self._task = asyncio.create_task(self._run())
+    
+    def enqueue(self, text: str, key: Optional[str] = None):
+        """
+        放入发送队列（不等待发送）
+        
+        Args:
+            text: 已序列化的消息
+            key: 合并键，队列中已有同键消息时原位替换为最新内容
+        """
+        if key is not None:
+            for index, (queued_key, _) in enumerate(self._queue):
+                if queued_key == key:
+                    self._queue[index] = (key, text)
+                    self.coalesced += 1
+                    return
+        
+        if len(self._queue) >= RedfishConfig.redfish_ws_send_queue_size:
+            self._queue.popleft()
+            self.dropped += 1
+            if self.dropped % RedfishConfig.redfish_ws_send_queue_size == 1:
+                logger.warning(f"WebSocket send queue full, dropping oldest messages: connection_id={self.connection_id}, user_id={self.user_id}, dropped={self.dropped}")
+        
+        self._queue.append((key, text))
+        self._wakeup.set()
+    
+    async def _run(self):
+        """写协程：按顺序发送队列中的消息，发送超时（客户端长时间不读取）时关闭连接"""
+        try:
+            while True:
+                if not self._queue:
+                    self._wakeup.clear()
+                    await self._wakeup.wait()
+                    continue
+                _, text = self._queue.popleft()
+                await asyncio.wait_for(self.websocket.send_text(text), RedfishConfig.redfish_ws_send_timeout)
+        except asyncio.CancelledError:
+            raise
+        except asyncio.TimeoutError:
+            logger.warning(f"WebSocket send timed out, closing slow connection: connection_id={self.connection_id}, user_id={self.user_id}, dropped={self.dropped}")
+            try:
+                await asyncio.wait_for(self.websocket.close(code=1013), 1)
+            except Exception:
+                pass
+        except WebSocketDisconnect:
+            logger.warning(f"WebSocket disconnected when sending message: connection_id={self.connection_id}")
+        except Exception as e:
+            logger.error(f"Error sending message: connection_id={self.connection_id}, error={str(e)}")
+        await self.manager.disconnect(self.connection_id)
+    
+    def close(self):
+        """停止写协程并丢弃未发送的消息"""
+        self._queue.clear()
+        if self._task is not asyncio.current_task():
+            self._task.cancel()
 
 
 class WebSocketManager:
@@ -17,13 +104,25 @@ class WebSocketManager:
     
     def __init__(self):
         """初始化连接管理器"""
-        self.active_connections: Dict[str, WebSocket] = {}  # 用户ID -> WebSocket连接
-        self.user_rooms: Dict[str, Set[str]] = {}  # 用户ID -> 订阅的房间集合
-        self.room_users: Dict[str, Set[str]] = {}  # 房间 -> 用户ID集合
+        self.active_connections: Dict[str, WebSocket] = {}  # 连接ID -> WebSocket连接
+        self.connection_info: Dict[str, Dict[str, Any]] = {}  # 连接ID -> {user_id, connected_at}
+        self.connection_rooms: Dict[str, Set[str]] = {}  # 连接ID -> 订阅的房间集合
+        self.room_connections: Dict[str, Set[str]] = {}  # 房间 -> 连接ID集合
+        self.user_connections: Dict[str, Set[str]] = {}  # 用户ID -> 连接ID集合
+        self.senders: Dict[str, ConnectionSender] = {}  # 连接ID -> 发送队列
         self.redis_client: Optional[aioredis.Redis] = None
-        
+        self.loop: Optional[asyncio.AbstractEventLoop] = None  # 持有WebSocket连接的事件循环
+        self.registry: Optional[RoomRegistry] = None  # 本节点的Redis房间注册表
+        self._heartbeat_task: Optional[asyncio.Task] = None
+        self.coalescer = DashboardEventCoalescer(self._emit_batch)  # dashboard房间高频事件合并器
+        self.change_listeners: List[Callable[[], None]] = []  # 首页数据变化监听（触发版本化状态重算）
+    
     async def init_redis(self):
         """初始化Redis连接"""
+        # 本进程的WebSocket连接都属于该事件循环，事件总线在此循环中发布时直接本地投递
+        self.loop = asyncio.get_running_loop()
+        # 节点ID与事件总线来源ID一致，其他进程按房间注册表向该节点频道发布
+        self.registry = RoomRegistry(EventBus.origin())
         try:
             self.redis_client = await aioredis.from_url(
                 f"redis://{RedisConfig.redis_host}:{RedisConfig.redis_port}",
@@ -32,206 +131,391 @@ class WebSocketManager:
                 db=RedisConfig.redis_database,
                 decode_responses=True
             )
-            logger.info("Redis connection initialized for WebSocket manager")
+            logger.info(f"Redis connection initialized for WebSocket manager: node={self.registry.node}")
             
-            # 启动Redis订阅任务
+            # 启动Redis订阅任务与注册表心跳
             asyncio.create_task(self._subscribe_redis_messages())
-            
+            self._heartbeat_task = asyncio.create_task(self._heartbeat())
+        
         except Exception as e:
             logger.error(f"Failed to initialize Redis connection: {str(e)}")
     
-    async def connect(self, websocket: WebSocket, user_id: str):
+    async def connect(self, websocket: WebSocket, user_id: str) -> str:
         """
         接受WebSocket连接
         
         Args:
             websocket: WebSocket连接对象
             user_id: 用户ID
+        
+        Returns:
+            str: 连接ID
         """
+        connection_id = uuid.uuid4().hex
         try:
             await websocket.accept()
-            self.active_connections[user_id] = websocket
-            self.user_rooms[user_id] = set()
-            logger.info(f"WebSocket connected: user_id={user_id}")
+            self.active_connections[connection_id] = websocket
+            self.connection_info[connection_id] = {"user_id": user_id, "connected_at": time.time()}
+            self.connection_rooms[connection_id] = set()
+            self.user_connections.setdefault(user_id, set()).add(connection_id)
+            self.senders[connection_id] = ConnectionSender(self, connection_id, user_id, websocket)
+            await self._update_registry(connection_id)
+            logger.info(f"WebSocket connected: connection_id={connection_id}, user_id={user_id}")
             
             # 发送连接成功消息
-            await self.send_to_user(user_id, {
+            await self.send_to_connection(connection_id, {
                 "type": "connection",
                 "status": "connected",
+                "connection_id": connection_id,
                 "message": "WebSocket连接成功",
                 "timestamp": datetime.now().isoformat()
             })
-            
+        
         except Exception as e:
             logger.error(f"Error connecting WebSocket for user {user_id}: {str(e)}")
+        return connection_id
     
-    async def disconnect(self, user_id: str):
+    async def disconnect(self, connection_id: str):
         """
-        断开WebSocket连接
+        断开WebSocket连接（重复调用时忽略）
         
         Args:
-            user_id: 用户ID
+            connection_id: 连接ID
         """
         try:
-            # 从所有订阅的房间中移除用户
-            if user_id in self.user_rooms:
-                for room in self.user_rooms[user_id].copy():
-                    await self.leave_room(user_id, room)
-                del self.user_rooms[user_id]
+            if connection_id not in self.active_connections:
+                return
             
-
-            if user_id in self.active_connections:
-                del self.active_connections[user_id]
+            # 从所有订阅的房间中移除连接
+            rooms = self.connection_rooms.pop(connection_id, set())
+            for room in rooms:
+                self._remove_member(room, connection_id)
+            
+            del self.active_connections[connection_id]
+            user_id = self.connection_info.pop(connection_id, {}).get("user_id")
+            if user_id in self.user_connections:
+                self.user_connections[user_id].discard(connection_id)
+                if not self.user_connections[user_id]:
+                    del self.user_connections[user_id]
             
-            logger.info(f"WebSocket disconnected: user_id={user_id}")
+            if connection_id in self.senders:
+                self.senders.pop(connection_id).close()
             
+            await self._update_registry(connection_id, rooms, removed=True)
+            logger.info(f"WebSocket disconnected: connection_id={connection_id}, user_id={user_id}")
+        
         except Exception as e:
-            logger.error(f"Error disconnecting WebSocket for user {user_id}: {str(e)}")
+            logger.error(f"Error disconnecting WebSocket {connection_id}: {str(e)}")
     
-    async def join_room(self, user_id: str, room: str):
+    async def join_room(self, connection_id: str, room: str):
         """
         加入房间
         
         Args:
-            user_id: 用户ID
+            connection_id: 连接ID
             room: 房间名称
         """
         try:
-            if user_id not in self.user_rooms:
-                self.user_rooms[user_id] = set()
-            
-            if room not in self.room_users:
-                self.room_users[room] = set()
+            if connection_id not in self.active_connections:
+                return
             
-            self.user_rooms[user_id].add(room)
-            self.room_users[room].add(user_id)
+            self.connection_rooms.setdefault(connection_id, set()).add(room)
+            self.room_connections.setdefault(room, set()).add(connection_id)
+            await self._update_registry(connection_id, [room])
             
-            logger.info(f"User {user_id} joined room {room}")
+            logger.info(f"Connection {connection_id} joined room {room}")
             
-            # 通知用户加入房间成功
-            await self.send_to_user(user_id, {
+            # 通知连接加入房间成功
+            await self.send_to_connection(connection_id, {
                 "type": "room",
                 "action": "joined",
                 "room": room,
                 "message": f"已加入房间: {room}",
                 "timestamp": datetime.now().isoformat()
             })
-            
+        
         except Exception as e:
-            logger.error(f"Error joining room {room} for user {user_id}: {str(e)}")
+            logger.error(f"Error joining room {room} for connection {connection_id}: {str(e)}")
     
-    async def leave_room(self, user_id: str, room: str):
+    async def leave_room(self, connection_id: str, room: str):
         """
         离开房间
         
         Args:
-            user_id: 用户ID
+            connection_id: 连接ID
             room: 房间名称
         """
         try:
-            if user_id in self.user_rooms and room in self.user_rooms[user_id]:
-                self.user_rooms[user_id].remove(room)
-            
-            if room in self.room_users and user_id in self.room_users[room]:
-                self.room_users[room].remove(user_id)
-                
-                # 如果房间没有用户了，删除房间
-                if not self.room_users[room]:
-                    del self.room_users[room]
-            
-            logger.info(f"User {user_id} left room {room}")
+            if connection_id in self.connection_rooms:
+                self.connection_rooms[connection_id].discard(room)
+            self._remove_member(room, connection_id)
+            await self._update_registry(connection_id, [room])
             
+            logger.info(f"Connection {connection_id} left room {room}")
+        
         except Exception as e:
-            logger.error(f"Error leaving room {room} for user {user_id}: {str(e)}")
+            logger.error(f"Error leaving room {room} for connection {connection_id}: {str(e)}")
+    
+    def _remove_member(self, room: str, connection_id: str):
+        """从房间成员中移除连接（房间没有连接时删除房间）"""
+        if room in self.room_connections:
+            self.room_connections[room].discard(connection_id)
+            if not self.room_connections[room]:
+                del self.room_connections[room]
+    
+    def _registry_entry(self, connection_id: str) -> Dict[str, Any]:
+        """连接在房间注册表中的登记内容"""
+        info = self.connection_info.get(connection_id, {})
+        return {
+            "user_id": info.get("user_id"),
+            "rooms": sorted(self.connection_rooms.get(connection_id, ())),
+            "connected_at": info.get("connected_at"),
+        }
+    
+    def _registry_snapshot(self) -> Tuple[Dict[str, Dict[str, Any]], Dict[str, int]]:
+        """本节点全部连接登记与各房间成员数（心跳时调用）"""
+        return (
+            {connection_id: self._registry_entry(connection_id) for connection_id in self.active_connections},
+            {room: len(connection_ids) for room, connection_ids in self.room_connections.items()}
+        )
+    
+    async def _update_registry(self, connection_id: str, rooms: Iterable[str] = (), removed: bool = False):
+        """
+        同步连接及相关房间成员数到Redis房间注册表（失败时由下一次心跳修复）
+        
+        Args:
+            connection_id: 连接ID
+            rooms: 成员有变化的房间
+            removed: 连接是否已断开
+        """
+        if self.registry is None:
+            return
+        room_counts = {room: len(self.room_connections.get(room, ())) for room in rooms}
+        try:
+            if removed:
+                await self.registry.remove_connection(connection_id, room_counts)
+            else:
+                entry = self._registry_entry(connection_id)
+                await self.registry.save_connection(
+                    connection_id, entry["user_id"], entry["rooms"], entry["connected_at"], room_counts
+                )
+        except Exception as e:
+            logger.warning(f"Room registry update failed: connection_id={connection_id}, error={str(e)}")
+    
+    async def _heartbeat(self):
+        """定时刷新本节点在房间注册表中的登记并清理心跳超时的节点"""
+        while True:
+            try:
+                await self.registry.heartbeat(self._registry_snapshot)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Room registry heartbeat failed: {str(e)}")
+            await asyncio.sleep(RedfishConfig.redfish_ws_heartbeat_interval)
+    
+    async def send_to_connection(self, connection_id: str, message: Dict[str, Any]):
+        """
+        发送消息给特定连接（放入该连接的发送队列）
+        
+        Args:
+            connection_id: 连接ID
+            message: 消息内容
+        """
+        try:
+            sender = self.senders.get(connection_id)
+            if sender:
+                sender.enqueue(json.dumps(message, ensure_ascii=False), coalesce_key(message))
+        
+        except Exception as e:
+            logger.error(f"Error sending message to connection {connection_id}: {str(e)}")
     
     async def send_to_user(self, user_id: str, message: Dict[str, Any]):
         """
-        发送消息给特定用户
+        发送消息给特定用户在本节点的所有连接
         
         Args:
             user_id: 用户ID
             message: 消息内容
         """
         try:
-            if user_id in self.active_connections:
-                websocket = self.active_connections[user_id]
-                await websocket.send_text(json.dumps(message, ensure_ascii=False))
-                
-        except WebSocketDisconnect:
-            logger.warning(f"WebSocket disconnected when sending message to user {user_id}")
-            await self.disconnect(user_id)
+            connection_ids = self.user_connections.get(user_id)
+            if connection_ids:
+                self._fan_out(list(connection_ids), json.dumps(message, ensure_ascii=False), coalesce_key(message))
+        
         except Exception as e:
             logger.error(f"Error sending message to user {user_id}: {str(e)}")
     
-    async def broadcast_to_room(self, room: str, message: Dict[str, Any], exclude_user: Optional[str] = None):
+    def _fan_out(self, connection_ids: Iterable[str], text: str, key: Optional[str] = None):
         """
-        向房间内所有用户广播消息
+        将同一条已序列化的消息放入多个连接的发送队列
         
         Args:
-            room: 房间名称
+            connection_ids: 连接ID
+            text: 已序列化的消息
+            key: 合并键
+        """
+        for connection_id in connection_ids:
+            sender = self.senders.get(connection_id)
+            if sender:
+                sender.enqueue(text, key)
+    
+    def _recipients(self, rooms: Iterable[str], broadcast: bool = False) -> Set[str]:
+        """
+        目标房间的连接并集（同时在多个目标房间的连接只计一次）
+        
+        Args:
+            rooms: 目标房间
+            broadcast: 是否为所有连接
+        
+        Returns:
+            Set[str]: 连接ID集合
+        """
+        if broadcast:
+            return set(self.senders.keys())
+        connection_ids = set()
+        for room in rooms:
+            connection_ids.update(self.room_connections.get(room, ()))
+        return connection_ids
+    
+    def deliver(
+        self,
+        rooms: Iterable[str],
+        message: Dict[str, Any],
+        text: str,
+        key: Optional[str],
+        broadcast: bool = False
+    ) -> bool:
+        """
+        本地投递事件总线消息（目标房间的连接并集，每个连接只投递一份）
+        
+        Args:
+            rooms: 目标房间
             message: 消息内容
-            exclude_user: 排除的用户ID
+            text: 已序列化的消息
+            key: 合并键
+            broadcast: 是否推送给所有连接
+        
+        Returns:
+            bool: 是否已投递（当前不在持有连接的事件循环中时返回False，由订阅循环投递）
         """
         try:
-            if room not in self.room_users:
+            if self.loop is None or asyncio.get_running_loop() is not self.loop:
+                return False
+        except RuntimeError:
+            return False
+        
+        self._dispatch(rooms, text, key, broadcast, message.get("type"), lambda: message)
+        return True
+    
+    def _dispatch(
+        self,
+        rooms: Iterable[str],
+        text: str,
+        key: Optional[str],
+        broadcast: bool,
+        message_type: Optional[str],
+        load_message: Callable[[], Dict[str, Any]]
+    ):
+        """
+        投递一条消息：可合并的事件进入合并房间的当前窗口，合并房间之外的目标连接直接收到原消息；
+        不合并的消息投递前先结束所有窗口，保证前端收到的顺序与发布顺序一致
+        
+        Args:
+            rooms: 目标房间
+            text: 已序列化的消息
+            key: 合并键
+            broadcast: 是否推送给所有连接
+            message_type: 消息类型
+            load_message: 获取消息内容（只有可能合并的消息才反序列化）
+        """
+        rooms = list(rooms or [])
+        batch_rooms = [] if broadcast else self.coalescer.rooms(rooms)
+        if batch_rooms and self.coalescer.candidate(message_type):
+            message = load_message()
+            if self.coalescer.accepts(message):
+                batched = set()
+                for room in batch_rooms:
+                    self.coalescer.add(room, message)
+                    batched.update(self.room_connections.get(room, ()))
+                self._fan_out(self._recipients(rooms) - batched, text, key)
+                self._notify_change()
                 return
-            
-            disconnected_users = []
-            
-            for user_id in self.room_users[room]:
-                if exclude_user and user_id == exclude_user:
-                    continue
-                
-                try:
-                    await self.send_to_user(user_id, message)
-                except Exception as e:
-                    logger.error(f"Error sending broadcast to user {user_id}: {str(e)}")
-                    disconnected_users.append(user_id)
-            
-            # 清理断开连接的用户
-            for user_id in disconnected_users:
-                await self.disconnect(user_id)
-                
-        except Exception as e:
-            logger.error(f"Error broadcasting to room {room}: {str(e)}")
+        
+        self.coalescer.flush()
+        self._fan_out(self._recipients(rooms, broadcast), text, key)
+        if message_type in DATA_CHANGE_MESSAGE_TYPES:
+            self._notify_change()
+    
+    def add_change_listener(self, listener: Callable[[], None]):
+        """
+        注册首页数据变化监听（在持有连接的事件循环中同步调用，监听方自行合并与限频）
+        
+        Args:
+            listener: 监听函数
+        """
+        self.change_listeners.append(listener)
+    
+    def _notify_change(self):
+        """通知首页数据有变化"""
+        for listener in self.change_listeners:
+            try:
+                listener()
+            except Exception as e:
+                logger.error(f"Error notifying dashboard change listener: {str(e)}")
+    
+    def _emit_batch(self, room: str, message: Dict[str, Any]):
+        """
+        发送合并窗口的增量消息
+        
+        Args:
+            room: 房间名称
+            message: dashboard_batch 消息
+        """
+        connection_ids = self.room_connections.get(room)
+        if connection_ids:
+            self._fan_out(list(connection_ids), json.dumps(message, ensure_ascii=False))
     
-    async def broadcast_to_all(self, message: Dict[str, Any]):
+    async def broadcast_to_room(
+        self,
+        room: str,
+        message: Dict[str, Any],
+        exclude_connection: Optional[str] = None,
+        text: Optional[str] = None
+    ):
         """
-        向所有连接的用户广播消息
+        向本节点房间内所有连接广播消息（跨节点推送请使用 EventBus.publish）
         
         Args:
+            room: 房间名称
             message: 消息内容
+            exclude_connection: 排除的连接ID
+            text: 已序列化的消息（为空时序列化message）
         """
         try:
-            disconnected_users = []
-            
-            for user_id in list(self.active_connections.keys()):
-                try:
-                    await self.send_to_user(user_id, message)
-                except Exception as e:
-                    logger.error(f"Error sending global broadcast to user {user_id}: {str(e)}")
-                    disconnected_users.append(user_id)
-            
-            # 清理断开连接的用户
-            for user_id in disconnected_users:
-                await self.disconnect(user_id)
-                
+            connection_ids = [
+                connection_id for connection_id in self.room_connections.get(room, ())
+                if connection_id != exclude_connection
+            ]
+            if connection_ids:
+                self._fan_out(connection_ids, text or json.dumps(message, ensure_ascii=False), coalesce_key(message))
+        
         except Exception as e:
-            logger.error(f"Error broadcasting to all users: {str(e)}")
+            logger.error(f"Error broadcasting to room {room}: {str(e)}")
     
-    async def publish_redis_message(self, channel: str, message: Dict[str, Any]):
+    async def broadcast_to_all(self, message: Dict[str, Any], text: Optional[str] = None):
         """
-        向Redis发布消息（用于跨实例通信）
+        向本节点所有连接广播消息（跨节点推送请使用 EventBus.publish）
         
         Args:
-            channel: Redis频道
             message: 消息内容
+            text: 已序列化的消息（为空时序列化message）
         """
         try:
-            if self.redis_client:
-                await self.redis_client.publish(channel, json.dumps(message, ensure_ascii=False))
+            if self.senders:
+                self._fan_out(list(self.senders.keys()), text or json.dumps(message, ensure_ascii=False), coalesce_key(message))
+        
         except Exception as e:
-            logger.error(f"Error publishing Redis message to channel {channel}: {str(e)}")
+            logger.error(f"Error broadcasting to all connections: {str(e)}")
     
     async def _subscribe_redis_messages(self):
         """订阅Redis消息（用于跨进程通信）"""
@@ -243,14 +527,8 @@ class WebSocketManager:
             # 创建Redis订阅客户端
             pubsub = self.redis_client.pubsub()
             
-            # 订阅WebSocket相关频道
-            await pubsub.subscribe(
-                "websocket:dashboard",
-                "websocket:alerts", 
-                "websocket:urgent_alerts",
-                "websocket:device_monitoring",
-                "websocket:broadcast"
-            )
+            # 订阅公共广播频道与本节点频道
+            await pubsub.subscribe(EventBus.CHANNEL, RoomRegistry.node_channel(self.registry.node))
             
             logger.info("Started Redis subscription for WebSocket channels")
             
@@ -258,63 +536,89 @@ class WebSocketManager:
             async for message in pubsub.listen():
                 if message['type'] == 'message':
                     try:
-                        channel = message['channel']
-                        data = json.loads(message['data'])
+                        envelope = json.loads(message['data'])
+                        if not EventBus.accept(envelope):
+                            continue
                         
-                        logger.debug(f"Received Redis message on channel {channel}: {data}")
+                        logger.debug(f"Received event {envelope.get('id')} for rooms {envelope.get('rooms')}")
                         
-                        # 根据频道转发消息
-                        if channel == "websocket:broadcast":
-                            await self.broadcast_to_all(data)
-                        elif channel.startswith("websocket:"):
-                            room = channel.replace("websocket:", "")
-                            await self.broadcast_to_room(room, data)
-                            
+                        # 直接复用消息中的序列化结果，只有可能合并的消息才反序列化
+                        payload = envelope['payload']
+                        self._dispatch(
+                            envelope.get('rooms') or [],
+                            payload,
+                            envelope.get('key'),
+                            envelope.get('broadcast', False),
+                            envelope.get('type'),
+                            lambda: json.loads(payload)
+                        )
+                    
                     except Exception as e:
                         logger.error(f"Error processing Redis message: {str(e)}")
-                        
+        
         except Exception as e:
             logger.error(f"Error in Redis subscription: {str(e)}")
             # 重试订阅
             await asyncio.sleep(5)
             asyncio.create_task(self._subscribe_redis_messages())
     
-    def get_room_users_count(self, room: str) -> int:
+    def get_connection_user(self, connection_id: str) -> Optional[str]:
         """
-        获取房间用户数量
+        获取连接所属的用户ID
         
         Args:
-            room: 房间名称
-            
+            connection_id: 连接ID
+        
         Returns:
-            int: 用户数量
+            Optional[str]: 用户ID
         """
-        return len(self.room_users.get(room, set()))
+        return self.connection_info.get(connection_id, {}).get("user_id")
     
-    def get_active_connections_count(self) -> int:
+    def get_connection_rooms(self, connection_id: str) -> List[str]:
         """
-        获取活跃连接数量
+        获取连接订阅的房间列表
+        
+        Args:
+            connection_id: 连接ID
         
         Returns:
-            int: 连接数量
+            List[str]: 房间列表
         """
-        return len(self.active_connections)
+        return list(self.connection_rooms.get(connection_id, set()))
     
-    def get_user_rooms(self, user_id: str) -> List[str]:
+    async def get_room_connections_count(self, room: str) -> int:
         """
-        获取用户订阅的房间列表
+        获取房间在所有节点的连接数（注册表不可用时返回本节点的连接数）
         
         Args:
-            user_id: 用户ID
-            
+            room: 房间名称
+        
         Returns:
-            List[str]: 房间列表
+            int: 连接数
+        """
+        try:
+            return await RoomRegistry.room_member_count(room)
+        except Exception as e:
+            logger.warning(f"Room registry count failed: {str(e)}")
+            return len(self.room_connections.get(room, set()))
+    
+    async def get_active_connections_count(self) -> int:
+        """
+        获取所有节点的活跃连接数（注册表不可用时返回本节点的连接数）
+        
+        Returns:
+            int: 连接数
         """
-        return list(self.user_rooms.get(user_id, set()))
+        try:
+            return await RoomRegistry.connection_count()
+        except Exception as e:
+            logger.warning(f"Room registry count failed: {str(e)}")
+            return len(self.active_connections)
 
 
 # 全局WebSocket管理器实例
 websocket_manager = WebSocketManager()
+EventBus.register_local_delivery(websocket_manager.deliver)
 
 
 async def init_websocket_manager():
@@ -324,5 +628,15 @@ async def init_websocket_manager():
 
 async def cleanup_websocket_manager():
     """清理WebSocket管理器"""
+    websocket_manager.coalescer.close()
+    if websocket_manager._heartbeat_task:
+        websocket_manager._heartbeat_task.cancel()
+    if websocket_manager.registry:
+        try:
+            await websocket_manager.registry.unregister()
+        except Exception as e:
+            logger.warning(f"Room registry unregister failed: {str(e)}")
+    for sender in list(websocket_manager.senders.values()):
+        sender.close()
     if websocket_manager.redis_client:
-        await websocket_manager.redis_client.close() 
\ No newline at end of file
+        await websocket_manager.redis_client.close()
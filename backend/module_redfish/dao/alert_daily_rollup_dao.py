@@ -0,0 +1,160 @@
+"""
+告警按天汇总数据访问对象(DAO)
+已结束的日期由每日汇总任务重算（同步会话）并逐日标记，趋势与历史分布按维度读取已标记日期的汇总行，未标记的日期（含当天）实时统计
+"""
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Tuple
+from sqlalchemy import and_, cast, Date, DateTime, delete, func, insert, literal, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from module_redfish.entity.do import AlertDailyRollupDO, AlertDailyRollupDayDO, AlertInfoDO, DeviceInfoDO
+
+
+class AlertDailyRollupDao:
+    """告警按天汇总"""
+
+    # 支持的统计维度
+    DIMENSIONS = ('urgency_level', 'component_type', 'location', 'manufacturer')
+
+    @classmethod
+    def _live_dimension(cls, dimension: str):
+        """实时统计时维度对应的告警/设备列（设备已删除时位置与厂商为空字符串，与汇总表一致）"""
+        return {
+            'urgency_level': AlertInfoDO.urgency_level,
+            'component_type': AlertInfoDO.component_type,
+            'location': func.coalesce(DeviceInfoDO.location, ''),
+            'manufacturer': func.coalesce(DeviceInfoDO.manufacturer, ''),
+        }[dimension]
+
+    @classmethod
+    def rollup_days(cls, db: Session, start_date: date, end_date: date) -> int:
+        """
+        重算指定日期范围（含首尾）的汇总行并逐日标记为已汇总（不提交，由调用方提交）
+
+        Args:
+            db: 同步数据库会话
+            start_date: 开始日期
+            end_date: 结束日期
+
+        Returns:
+            int: 写入的汇总行数
+        """
+        day = cast(AlertInfoDO.first_occurrence, Date)
+        dimensions = [cls._live_dimension(dimension) for dimension in cls.DIMENSIONS]
+        source = (
+            select(
+                day, *dimensions, func.count(AlertInfoDO.alert_id), literal(datetime.now(), DateTime)
+            )
+            .select_from(AlertInfoDO)
+            .outerjoin(DeviceInfoDO, AlertInfoDO.device_id == DeviceInfoDO.device_id)
+            .where(
+                and_(
+                    AlertInfoDO.first_occurrence >= datetime.combine(start_date, datetime.min.time()),
+                    AlertInfoDO.first_occurrence < datetime.combine(end_date + timedelta(days=1), datetime.min.time())
+                )
+            )
+            .group_by(day, *dimensions)
+        )
+
+        db.execute(
+            delete(AlertDailyRollupDO).where(AlertDailyRollupDO.stat_date.between(start_date, end_date))
+        )
+        result = db.execute(
+            insert(AlertDailyRollupDO).from_select(
+                ['stat_date', *cls.DIMENSIONS, 'alert_count', 'update_time'], source
+            )
+        )
+
+        # 范围内每天都记标记（包括无告警的日期），读取时只信任已标记的日期
+        db.execute(
+            delete(AlertDailyRollupDayDO).where(AlertDailyRollupDayDO.stat_date.between(start_date, end_date))
+        )
+        now = datetime.now()
+        db.execute(
+            insert(AlertDailyRollupDayDO),
+            [
+                {'stat_date': start_date + timedelta(days=offset), 'update_time': now}
+                for offset in range((end_date - start_date).days + 1)
+            ]
+        )
+        return result.rowcount or 0
+
+    @classmethod
+    async def _rolled_days(cls, db: AsyncSession, start_date: date, end_date: date) -> List[date]:
+        """指定范围内已标记为汇总完成的日期"""
+        result = await db.execute(
+            select(AlertDailyRollupDayDO.stat_date)
+            .where(AlertDailyRollupDayDO.stat_date.between(start_date, end_date))
+        )
+        return [row[0] for row in result.fetchall()]
+
+    @classmethod
+    def _live_ranges(cls, start_date: date, end_date: date, rolled_days: List[date]) -> List[Tuple[date, date]]:
+        """把未汇总的日期合并为连续区间，每个区间一次实时查询"""
+        rolled = set(rolled_days)
+        ranges: List[Tuple[date, date]] = []
+        day = start_date
+        while day <= end_date:
+            if day in rolled:
+                day += timedelta(days=1)
+                continue
+            range_start = day
+            while day + timedelta(days=1) <= end_date and day + timedelta(days=1) not in rolled:
+                day += timedelta(days=1)
+            ranges.append((range_start, day))
+            day += timedelta(days=1)
+        return ranges
+
+    @classmethod
+    async def get_daily_counts(
+        cls,
+        db: AsyncSession,
+        start_date: date,
+        end_date: date,
+        dimension: str
+    ) -> Dict[Tuple[str, str], int]:
+        """
+        按天和维度统计新增告警数（已标记的日期读汇总表，其余日期实时统计）
+
+        Args:
+            db: 数据库会话
+            start_date: 开始日期
+            end_date: 结束日期（含）
+            dimension: 统计维度（见 DIMENSIONS）
+
+        Returns:
+            Dict[Tuple[str, str], int]: {(日期YYYY-MM-DD, 维度值): 告警数}
+        """
+        rolled_days = await cls._rolled_days(db, start_date, end_date)
+        live_ranges = cls._live_ranges(start_date, end_date, rolled_days)
+        counts: Dict[Tuple[str, str], int] = {}
+
+        if rolled_days:
+            column = getattr(AlertDailyRollupDO, dimension)
+            result = await db.execute(
+                select(AlertDailyRollupDO.stat_date, column, func.sum(AlertDailyRollupDO.alert_count))
+                .join(AlertDailyRollupDayDO, AlertDailyRollupDayDO.stat_date == AlertDailyRollupDO.stat_date)
+                .where(AlertDailyRollupDO.stat_date.between(start_date, end_date))
+                .group_by(AlertDailyRollupDO.stat_date, column)
+            )
+            for stat_date, value, count in result.fetchall():
+                counts[(str(stat_date)[:10], value)] = int(count or 0)
+
+        day = cast(AlertInfoDO.first_occurrence, Date)
+        column = cls._live_dimension(dimension)
+        for range_start, range_end in live_ranges:
+            query = select(day, column, func.count(AlertInfoDO.alert_id)).select_from(AlertInfoDO)
+            if dimension in ('location', 'manufacturer'):
+                query = query.outerjoin(DeviceInfoDO, AlertInfoDO.device_id == DeviceInfoDO.device_id)
+            result = await db.execute(
+                query.where(
+                    and_(
+                        AlertInfoDO.first_occurrence >= datetime.combine(range_start, datetime.min.time()),
+                        AlertInfoDO.first_occurrence < datetime.combine(range_end + timedelta(days=1), datetime.min.time())
+                    )
+                ).group_by(day, column)
+            )
+            for stat_date, value, count in result.fetchall():
+                counts[(str(stat_date)[:10], value)] = count
+
+        return counts
@@ -2,12 +2,15 @@
 告警管理DAO层（优化版）
 适配精简版alert_info表结构
 """
-from sqlalchemy import and_, or_, func, desc, asc, select, update, delete
+from sqlalchemy import and_, or_, func, desc, asc, select, update, delete, case
 from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional, Tuple, Dict, Any
 from datetime import datetime, timedelta
 from module_redfish.entity.do import AlertInfoDO, DeviceInfoDO
 from module_redfish.entity.vo.alert_vo import AlertPageQueryModel
+from module_redfish.dao.alert_daily_rollup_dao import AlertDailyRollupDao
+from module_redfish.dao.device_health_rollup_dao import DeviceHealthRollupDao
+from module_redfish.core.dashboard_snapshot import DashboardSnapshotCache
 from utils.page_util import PageUtil
 from utils.log_util import logger
 
@@ -290,6 +293,7 @@ class AlertDao:
                 existing_alert.last_occurrence = current_time
                 existing_alert.update_time = current_time
                 await db.commit()
+                await DashboardSnapshotCache.invalidate_async()
                 await db.refresh(existing_alert)
                 logger.info(f"更新告警: device_id={device_id}, component={component_type}, alert_id={existing_alert.alert_id}")
                 return existing_alert.alert_id
@@ -309,6 +313,7 @@ class AlertDao:
                 )
                 db.add(new_alert)
                 await db.commit()
+                await DashboardSnapshotCache.invalidate_async()
                 await db.refresh(new_alert)
                 logger.info(f"创建新告警: device_id={device_id}, component={component_type}, alert_id={new_alert.alert_id}")
                 return new_alert.alert_id
@@ -335,70 +340,71 @@ class AlertDao:
         end_date = datetime.now()
         start_date = end_date - timedelta(days=days)
         
-        # 总告警数 - 移除del_flag条件，统计所有历史告警
-        total_result = await db.execute(
-            select(func.count(AlertInfoDO.alert_id))
-            .where(
-                AlertInfoDO.first_occurrence >= start_date
-            )
-        )
-        total_alerts = total_result.scalar() or 0
-        
-        # 紧急告警数 - 移除del_flag条件，统计所有历史告警
-        urgent_result = await db.execute(
-            select(func.count(AlertInfoDO.alert_id))
-            .where(
-                and_(
-                    AlertInfoDO.first_occurrence >= start_date,
-                    AlertInfoDO.urgency_level == 'urgent'
-                )
-            )
-        )
-        urgent_alerts = urgent_result.scalar() or 0
-        
-        # 择期告警数 - 移除del_flag条件，统计所有历史告警
-        scheduled_result = await db.execute(
-            select(func.count(AlertInfoDO.alert_id))
-            .where(
-                and_(
-                    AlertInfoDO.first_occurrence >= start_date,
-                    AlertInfoDO.urgency_level == 'scheduled'
-                )
-            )
+        # 单次扫描条件聚合：时间窗口内的统计不区分del_flag（统计所有历史告警），活跃告警只统计未删除的
+        in_window = AlertInfoDO.first_occurrence >= start_date
+        is_active = and_(AlertInfoDO.alert_status == 'active', AlertInfoDO.del_flag == 0)
+        result = await db.execute(
+            select(
+                func.count(case((in_window, 1))).label('total_alerts'),
+                func.count(case((and_(in_window, AlertInfoDO.urgency_level == 'urgent'), 1))).label('urgent_alerts'),
+                func.count(case((and_(in_window, AlertInfoDO.urgency_level == 'scheduled'), 1))).label('scheduled_alerts'),
+                func.count(case((is_active, 1))).label('active_alerts'),
+                func.count(case((and_(in_window, AlertInfoDO.alert_status == 'resolved'), 1))).label('resolved_alerts')
+            ).where(or_(in_window, is_active))
         )
-        scheduled_alerts = scheduled_result.scalar() or 0
+        row = result.one()
         
-        # 活跃告警数 - 保留del_flag条件，只统计未删除的活跃告警
-        active_result = await db.execute(
-            select(func.count(AlertInfoDO.alert_id))
-            .where(
-                and_(
-                    AlertInfoDO.alert_status == 'active',
-                    AlertInfoDO.del_flag == 0
-                )
-            )
-        )
-        active_alerts = active_result.scalar() or 0
+        return {
+            'total_alerts': row.total_alerts or 0,
+            'urgent_alerts': row.urgent_alerts or 0,
+            'scheduled_alerts': row.scheduled_alerts or 0,
+            'active_alerts': row.active_alerts or 0,
+            'resolved_alerts': row.resolved_alerts or 0,
+            'ignored_alerts': 0
+        }
+    
+    @classmethod
+    async def get_alert_window_statistics(cls, db: AsyncSession, windows: List[int]) -> Dict[str, Any]:
+        """
+        一次查询统计多个时间窗口的告警数与当前活跃告警数（首页概览）
         
-        # 已解决告警数 - 移除del_flag条件，统计所有历史告警
-        resolved_result = await db.execute(
-            select(func.count(AlertInfoDO.alert_id))
-            .where(
-                and_(
-                    AlertInfoDO.first_occurrence >= start_date,
-                    AlertInfoDO.alert_status == 'resolved'
-                )
-            )
+        Args:
+            db: 数据库会话
+            windows: 统计天数列表，如 [7, 30]
+            
+        Returns:
+            Dict[str, Any]: {'windows': {天数: {'total_alerts', 'urgent_alerts', 'scheduled_alerts'}},
+                             'current_urgent_alerts', 'current_scheduled_alerts'}
+        """
+        now = datetime.now()
+        is_active = and_(AlertInfoDO.alert_status == 'active', AlertInfoDO.del_flag == 0)
+        columns = []
+        for days in windows:
+            in_window = AlertInfoDO.first_occurrence >= now - timedelta(days=days)
+            columns.extend([
+                func.count(case((in_window, 1))).label(f'total_{days}'),
+                func.count(case((and_(in_window, AlertInfoDO.urgency_level == 'urgent'), 1))).label(f'urgent_{days}'),
+                func.count(case((and_(in_window, AlertInfoDO.urgency_level == 'scheduled'), 1))).label(f'scheduled_{days}')
+            ])
+        columns.extend([
+            func.count(case((and_(is_active, AlertInfoDO.urgency_level == 'urgent'), 1))).label('current_urgent'),
+            func.count(case((and_(is_active, AlertInfoDO.urgency_level == 'scheduled'), 1))).label('current_scheduled')
+        ])
+        result = await db.execute(
+            select(*columns).where(or_(AlertInfoDO.first_occurrence >= now - timedelta(days=max(windows)), is_active))
         )
-        resolved_alerts = resolved_result.scalar() or 0
+        row = result.one()._mapping
         
         return {
-            'total_alerts': total_alerts,
-            'urgent_alerts': urgent_alerts,
-            'scheduled_alerts': scheduled_alerts,
-            'active_alerts': active_alerts,
-            'resolved_alerts': resolved_alerts,
-            'ignored_alerts': 0
+            'windows': {
+                days: {
+                    'total_alerts': row[f'total_{days}'] or 0,
+                    'urgent_alerts': row[f'urgent_{days}'] or 0,
+                    'scheduled_alerts': row[f'scheduled_{days}'] or 0
+                } for days in windows
+            },
+            'current_urgent_alerts': row['current_urgent'] or 0,
+            'current_scheduled_alerts': row['current_scheduled'] or 0
         }
     
     @classmethod
@@ -517,39 +523,19 @@ class AlertDao:
         Returns:
             List[Dict[str, Any]]: 趋势数据
         """
-        start_date = datetime.now().date() - timedelta(days=days-1)
+        today = datetime.now().date()
+        start_date = today - timedelta(days=days-1)
+        
+        # 按天、紧急程度统计（统计所有历史告警，不区分del_flag）：已汇总的日期读按天汇总表，其余（含当天）实时统计，无告警的日期补零
+        counts = await AlertDailyRollupDao.get_daily_counts(db, start_date, today, 'urgency_level')
         
         trend_data = []
         for i in range(days):
-            current_date = start_date + timedelta(days=i)
-            next_date = current_date + timedelta(days=1)
-            
-            # 当日紧急告警数 - 移除del_flag条件，统计所有历史告警
-            urgent_result = await db.execute(
-                select(func.count(AlertInfoDO.alert_id)).where(
-                    and_(
-                        AlertInfoDO.first_occurrence >= current_date,
-                        AlertInfoDO.first_occurrence < next_date,
-                        AlertInfoDO.urgency_level == 'urgent'
-                    )
-                )
-            )
-            urgent_count = urgent_result.scalar() or 0
-            
-            # 当日择期告警数 - 移除del_flag条件，统计所有历史告警
-            scheduled_result = await db.execute(
-                select(func.count(AlertInfoDO.alert_id)).where(
-                    and_(
-                        AlertInfoDO.first_occurrence >= current_date,
-                        AlertInfoDO.first_occurrence < next_date,
-                        AlertInfoDO.urgency_level == 'scheduled'
-                    )
-                )
-            )
-            scheduled_count = scheduled_result.scalar() or 0
-            
+            current_date = (start_date + timedelta(days=i)).strftime('%Y-%m-%d')
+            urgent_count = counts.get((current_date, 'urgent'), 0)
+            scheduled_count = counts.get((current_date, 'scheduled'), 0)
             trend_data.append({
-                'date': current_date.strftime('%Y-%m-%d'),
+                'date': current_date,
                 'urgent_count': urgent_count,
                 'scheduled_count': scheduled_count,
                 'total_count': urgent_count + scheduled_count
@@ -558,16 +544,32 @@ class AlertDao:
         return trend_data
     
     @classmethod
-    async def get_alert_distribution(cls, db: AsyncSession) -> Dict[str, Dict[str, int]]:
+    async def get_alert_distribution(cls, db: AsyncSession, days: Optional[int] = None) -> Dict[str, Dict[str, int]]:
         """
         获取告警分布统计（优化版）
         
         Args:
             db: 数据库会话
+            days: 为空时统计当前活跃告警；否则统计最近N天新增告警（读按天汇总表）
             
         Returns:
             Dict[str, Dict[str, int]]: 分布统计
         """
+        if days:
+            today = datetime.now().date()
+            start_date = today - timedelta(days=days-1)
+            distribution = {}
+            for key, dimension in (
+                ('by_level', 'urgency_level'), ('by_component', 'component_type'),
+                ('by_location', 'location'), ('by_manufacturer', 'manufacturer')
+            ):
+                totals: Dict[str, int] = {}
+                counts = await AlertDailyRollupDao.get_daily_counts(db, start_date, today, dimension)
+                for (_, value), count in counts.items():
+                    totals[value] = totals.get(value, 0) + count
+                distribution[key] = totals
+            return distribution
+        
         # 按紧急程度分布
         level_result = await db.execute(
             select(AlertInfoDO.urgency_level, func.count(AlertInfoDO.alert_id))
@@ -661,6 +663,7 @@ class AlertDao:
             result = await db.execute(update_stmt)
             if result.rowcount > 0:
                 await db.commit()
+                await DashboardSnapshotCache.invalidate_async()
                 logger.info(f"为告警 {alert_id} 安排维修时间成功")
                 return True
             else:
@@ -708,6 +711,7 @@ class AlertDao:
             result = await db.execute(update_stmt)
             if result.rowcount > 0:
                 await db.commit()
+                await DashboardSnapshotCache.invalidate_async()
                 logger.info(f"更新告警 {alert_id} 维修计划成功")
                 return True
             else:
@@ -752,6 +756,7 @@ class AlertDao:
             
             if updated_count > 0:
                 await db.commit()
+                await DashboardSnapshotCache.invalidate_async()
                 logger.info(f"批量安排维修时间成功，更新了 {updated_count} 条记录")
             
             return updated_count
@@ -950,8 +955,13 @@ class AlertDao:
                 update_time=datetime.now()
             )
             
+            device_ids = (await db.execute(
+                select(AlertInfoDO.device_id).where(AlertInfoDO.alert_id == alert_id)
+            )).scalars().all()
             result = await db.execute(stmt)
+            await db.run_sync(lambda session: DeviceHealthRollupDao.refresh(session, device_ids))
             await db.commit()
+            await DashboardSnapshotCache.invalidate_async()
             
             return result.rowcount > 0
             
@@ -990,8 +1000,13 @@ class AlertDao:
                 update_time=datetime.now()
             )
             
+            device_ids = (await db.execute(
+                select(AlertInfoDO.device_id).where(AlertInfoDO.alert_id.in_(alert_ids)).distinct()
+            )).scalars().all()
             result = await db.execute(stmt)
+            await db.run_sync(lambda session: DeviceHealthRollupDao.refresh(session, device_ids))
             await db.commit()
+            await DashboardSnapshotCache.invalidate_async()
             
             return result.rowcount
             
@@ -225,6 +225,24 @@ class DeviceDao:
         )
         return result.scalars().all()
     
+    @classmethod
+    async def get_monitoring_device_ids(cls, db: AsyncSession) -> List[int]:
+        """
+        获取启用监控的设备ID列表（只查询主键，用于投递批量任务）
+        
+        Args:
+            db: 数据库会话
+            
+        Returns:
+            List[int]: 设备ID列表
+        """
+        result = await db.execute(
+            select(DeviceInfoDO.device_id).where(
+                DeviceInfoDO.monitor_enabled == 1
+            ).order_by(DeviceInfoDO.device_id)
+        )
+        return list(result.scalars().all())
+    
     @classmethod
     async def get_devices_by_location(cls, db: AsyncSession, location_pattern: str) -> List[DeviceInfoDO]:
         """
@@ -0,0 +1,162 @@
+"""
+设备组件健康汇总数据访问对象(DAO)
+按设备重算汇总行（同步会话，异步会话通过 run_sync 调用），首页设备健康汇总以一次联表查询分页读取
+"""
+import math
+from datetime import datetime
+from typing import Dict, List, Set
+from sqlalchemy import and_, case, delete, func, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from module_redfish.entity.do import AlertInfoDO, DeviceHealthRollupDO, DeviceInfoDO
+from utils.page_util import PageResponseModel
+
+
+class DeviceHealthRollupDao:
+    """设备组件健康汇总"""
+
+    # 告警组件类型（硬件字典码）-> 汇总列
+    COMPONENT_COLUMNS: Dict[str, str] = {
+        'cpu': 'processor_health',
+        'memory': 'memory_health',
+        'storage': 'storage_health',
+        'temperature': 'thermal_health',
+        'fan': 'thermal_health',
+        'power': 'power_health',
+    }
+    HEALTH_RANK: Dict[str, int] = {'ok': 0, 'warning': 1, 'critical': 2}
+    # 允许的排序字段
+    SORT_COLUMNS = ('device_id', 'hostname', 'overall_health', 'alert_count', 'last_check_time')
+
+    @classmethod
+    def missing_device_ids(cls, db: Session, device_ids: List[int]) -> Set[int]:
+        """
+        查询尚无汇总行的设备（首次监控或新部署时补齐）
+
+        Args:
+            db: 同步数据库会话
+            device_ids: 设备ID列表
+
+        Returns:
+            Set[int]: 缺少汇总行的设备ID
+        """
+        if not device_ids:
+            return set()
+        existing = db.execute(
+            select(DeviceHealthRollupDO.device_id).where(DeviceHealthRollupDO.device_id.in_(device_ids))
+        ).scalars().all()
+        return set(device_ids) - set(existing)
+
+    @classmethod
+    def refresh(cls, db: Session, device_ids: List[int]) -> int:
+        """
+        按未删除的活跃告警重算设备汇总行（不提交，由调用方与告警变更一起提交）
+
+        Args:
+            db: 同步数据库会话
+            device_ids: 设备ID列表
+
+        Returns:
+            int: 重算的设备数
+        """
+        device_ids = sorted({device_id for device_id in device_ids if device_id is not None})
+        if not device_ids:
+            return 0
+
+        now = datetime.now()
+        rollups = {
+            device_id: {
+                'device_id': device_id, 'processor_health': 'ok', 'memory_health': 'ok', 'storage_health': 'ok',
+                'thermal_health': 'ok', 'power_health': 'ok', 'alert_count': 0, 'update_time': now
+            } for device_id in device_ids
+        }
+        for row in db.execute(
+            select(
+                AlertInfoDO.device_id, AlertInfoDO.component_type, AlertInfoDO.health_status,
+                func.count(AlertInfoDO.alert_id).label('count')
+            ).where(
+                and_(
+                    AlertInfoDO.device_id.in_(device_ids),
+                    AlertInfoDO.alert_status == 'active',
+                    AlertInfoDO.del_flag == 0
+                )
+            ).group_by(AlertInfoDO.device_id, AlertInfoDO.component_type, AlertInfoDO.health_status)
+        ):
+            rollup = rollups[row.device_id]
+            rollup['alert_count'] += row.count
+            column = cls.COMPONENT_COLUMNS.get((row.component_type or '').lower())
+            health = (row.health_status or 'warning').lower()
+            if column and cls.HEALTH_RANK.get(health, 1) > cls.HEALTH_RANK.get(rollup[column], 0):
+                rollup[column] = health
+
+        db.execute(delete(DeviceHealthRollupDO).where(DeviceHealthRollupDO.device_id.in_(device_ids)))
+        db.execute(insert(DeviceHealthRollupDO), list(rollups.values()))
+        return len(device_ids)
+
+    @classmethod
+    async def get_summary_page(
+        cls,
+        db: AsyncSession,
+        page_num: int = 1,
+        page_size: int = 20,
+        sort_by: str = 'device_id',
+        sort_order: str = 'asc'
+    ) -> PageResponseModel:
+        """
+        分页查询启用监控设备的健康汇总（设备表联表汇总表，一次查询）
+
+        Args:
+            db: 数据库会话
+            page_num: 页码
+            page_size: 每页记录数
+            sort_by: 排序字段（见 SORT_COLUMNS）
+            sort_order: asc/desc
+
+        Returns:
+            PageResponseModel: rows 为查询行（设备字段 + 汇总字段，未汇总的设备按健康处理）
+        """
+        health_rank = case(
+            (DeviceInfoDO.health_status == 'critical', 2),
+            (DeviceInfoDO.health_status == 'warning', 1),
+            (DeviceInfoDO.health_status == 'ok', 0),
+            else_=-1
+        )
+        alert_count = func.coalesce(DeviceHealthRollupDO.alert_count, 0)
+        sort_expressions = {
+            'device_id': DeviceInfoDO.device_id,
+            'hostname': DeviceInfoDO.hostname,
+            'overall_health': health_rank,
+            'alert_count': alert_count,
+            'last_check_time': DeviceInfoDO.last_check_time,
+        }
+        sort_expression = sort_expressions.get(sort_by, DeviceInfoDO.device_id)
+        sort_expression = sort_expression.desc() if sort_order == 'desc' else sort_expression.asc()
+
+        condition = DeviceInfoDO.monitor_enabled == 1
+        total = (await db.execute(select(func.count(DeviceInfoDO.device_id)).where(condition))).scalar() or 0
+        result = await db.execute(
+            select(
+                DeviceInfoDO.device_id, DeviceInfoDO.hostname, DeviceInfoDO.business_ip, DeviceInfoDO.location,
+                DeviceInfoDO.manufacturer, DeviceInfoDO.model, DeviceInfoDO.health_status,
+                DeviceInfoDO.operating_system, DeviceInfoDO.last_check_time,
+                func.coalesce(DeviceHealthRollupDO.processor_health, 'ok').label('processor_health'),
+                func.coalesce(DeviceHealthRollupDO.memory_health, 'ok').label('memory_health'),
+                func.coalesce(DeviceHealthRollupDO.storage_health, 'ok').label('storage_health'),
+                func.coalesce(DeviceHealthRollupDO.thermal_health, 'ok').label('thermal_health'),
+                func.coalesce(DeviceHealthRollupDO.power_health, 'ok').label('power_health'),
+                alert_count.label('alert_count')
+            )
+            .outerjoin(DeviceHealthRollupDO, DeviceHealthRollupDO.device_id == DeviceInfoDO.device_id)
+            .where(condition)
+            # 排序字段相同时按设备ID稳定分页
+            .order_by(sort_expression, DeviceInfoDO.device_id)
+            .offset((page_num - 1) * page_size)
+            .limit(page_size)
+        )
+        return PageResponseModel(
+            rows=result.fetchall(),
+            pageNum=page_num,
+            pageSize=page_size,
+            total=total,
+            hasNext=math.ceil(total / page_size) > page_num if page_size else False
+        )
@@ -0,0 +1,176 @@
+"""
+按月范围分区维护数据访问对象(DAO)
+仅用于PostgreSQL：redfish_log 按 created_time、alert_info 按 first_occurrence 按月分区（表结构转换见 sql/partition_tables_pg.sql），
+提前创建未来分区，过期分区整体分离/删除，保留期清理的代价与行数无关
+"""
+import re
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+from config.env import DataBaseConfig, RedfishConfig
+from utils.log_util import logger
+
+
+class PartitionDao:
+    """按月范围分区维护（同步会话，异步会话通过 run_sync 调用）"""
+
+    # 分区表及分区键
+    PARTITIONED_TABLES: Dict[str, str] = {
+        'redfish_log': 'created_time',
+        'alert_info': 'first_occurrence',
+    }
+    # 过期分区中仍有这些数据时不整体删除（未解决或保留期内刚更新的告警），改为只删除分区内已过期的行
+    RETAIN_CONDITIONS: Dict[str, str] = {
+        'alert_info': "alert_status <> 'resolved' OR update_time >= :cutoff",
+    }
+
+    @staticmethod
+    def is_enabled() -> bool:
+        """
+        是否启用分区维护
+
+        Returns:
+            bool: 配置开启且数据库为PostgreSQL
+        """
+        return RedfishConfig.redfish_partitioning_enabled and DataBaseConfig.db_type == 'postgresql'
+
+    @staticmethod
+    def _month_start(value: datetime) -> datetime:
+        return datetime(value.year, value.month, 1)
+
+    @staticmethod
+    def _add_months(value: datetime, months: int) -> datetime:
+        month = value.month - 1 + months
+        return datetime(value.year + month // 12, month % 12 + 1, 1)
+
+    @classmethod
+    def partition_name(cls, table: str, month: datetime) -> str:
+        """
+        月分区表名
+
+        Args:
+            table: 父表名
+            month: 分区所在月份
+
+        Returns:
+            str: 如 redfish_log_p202610
+        """
+        return f'{table}_p{month:%Y%m}'
+
+    @classmethod
+    def is_partitioned(cls, db: Session, table: str) -> bool:
+        """
+        表是否已转换为分区表
+
+        Args:
+            db: 同步数据库会话
+            table: 表名
+
+        Returns:
+            bool: 是否为分区表
+        """
+        return bool(db.execute(
+            text('SELECT EXISTS (SELECT 1 FROM pg_partitioned_table WHERE partrelid = to_regclass(:table))'),
+            {'table': f'public.{table}'}
+        ).scalar())
+
+    @classmethod
+    def list_partitions(cls, db: Session, table: str) -> List[Tuple[str, datetime]]:
+        """
+        列出按月命名的分区（不含默认分区）
+
+        Args:
+            db: 同步数据库会话
+            table: 父表名
+
+        Returns:
+            List[Tuple[str, datetime]]: [(分区表名, 分区月份)]，按月份升序
+        """
+        rows = db.execute(text(
+            'SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid '
+            'WHERE i.inhparent = to_regclass(:table)'
+        ), {'table': f'public.{table}'}).scalars().all()
+        pattern = re.compile(rf'^{re.escape(table)}_p(\d{{6}})$')
+        partitions = []
+        for name in rows:
+            match = pattern.match(name)
+            if match:
+                partitions.append((name, datetime.strptime(match.group(1), '%Y%m')))
+        return sorted(partitions, key=lambda item: item[1])
+
+    @classmethod
+    def ensure_partitions(cls, db: Session, table: str, months_ahead: Optional[int] = None) -> List[str]:
+        """
+        创建当月及未来若干个月的分区，以及承接超出范围数据的默认分区
+
+        Args:
+            db: 同步数据库会话
+            table: 父表名
+            months_ahead: 提前创建的月数，默认取配置
+
+        Returns:
+            List[str]: 新创建的分区表名
+        """
+        if not cls.is_partitioned(db, table):
+            return []
+        months_ahead = RedfishConfig.redfish_partition_months_ahead if months_ahead is None else months_ahead
+        existing = {name for name, _ in cls.list_partitions(db, table)}
+        created = []
+        db.execute(text(f'CREATE TABLE IF NOT EXISTS public.{table}_default PARTITION OF public.{table} DEFAULT'))
+
+        current = cls._month_start(datetime.now())
+        for offset in range(months_ahead + 1):
+            month = cls._add_months(current, offset)
+            name = cls.partition_name(table, month)
+            if name in existing:
+                continue
+            try:
+                # 单个分区创建失败（如默认分区中已有该月数据）不影响其他分区
+                with db.begin_nested():
+                    db.execute(text(
+                        f"CREATE TABLE public.{name} PARTITION OF public.{table} "
+                        f"FOR VALUES FROM ('{month:%Y-%m-%d}') TO ('{cls._add_months(month, 1):%Y-%m-%d}')"
+                    ))
+                created.append(name)
+            except Exception as e:
+                logger.warning(f'创建分区 {name} 失败: {str(e)}')
+        db.commit()
+        if created:
+            logger.info(f'{table} 新建分区: {", ".join(created)}')
+        return created
+
+    @classmethod
+    def drop_expired_partitions(cls, db: Session, table: str, cutoff: datetime) -> int:
+        """
+        分离并删除（或仅分离）整月早于截止时间的分区
+
+        Args:
+            db: 同步数据库会话
+            table: 父表名
+            cutoff: 截止时间，分区上界不晚于该时间时整体过期
+
+        Returns:
+            int: 已移除分区的估算行数（来自统计信息，不扫描数据）
+        """
+        if not cls.is_partitioned(db, table):
+            return 0
+        retain_condition = cls.RETAIN_CONDITIONS.get(table)
+        removed_rows = 0
+        for name, month in cls.list_partitions(db, table):
+            if cls._add_months(month, 1) > cutoff:
+                break
+            if retain_condition and db.execute(
+                text(f'SELECT EXISTS (SELECT 1 FROM public.{name} WHERE {retain_condition})'), {'cutoff': cutoff}
+            ).scalar():
+                continue
+            estimated = db.execute(
+                text('SELECT GREATEST(reltuples, 0)::bigint FROM pg_class WHERE oid = to_regclass(:name)'),
+                {'name': f'public.{name}'}
+            ).scalar() or 0
+            db.execute(text(f'ALTER TABLE public.{table} DETACH PARTITION public.{name}'))
+            if RedfishConfig.redfish_partition_retention_mode == 'drop':
+                db.execute(text(f'DROP TABLE public.{name}'))
+            removed_rows += estimated
+            logger.info(f'{table} 过期分区 {name} 已{"删除" if RedfishConfig.redfish_partition_retention_mode == "drop" else "分离"}')
+        return removed_rows
@@ -1,12 +1,17 @@
 """
 Redfish日志数据访问对象(DAO)
 """
+import uuid
 from datetime import datetime, timedelta
 from typing import List, Optional, Tuple, Dict, Any
-from sqlalchemy import and_, or_, func, text, desc, asc
+from sqlalchemy import and_, or_, func, text, desc, asc, delete, case, tuple_
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
+from sqlalchemy.orm import defer, selectinload
 from sqlalchemy.future import select
+from sqlalchemy.dialects.mysql import insert as mysql_insert
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from config.env import DataBaseConfig
+from module_redfish.dao.partition_dao import PartitionDao
 from module_redfish.entity.do.redfish_log_do import RedfishLogDO
 from module_redfish.entity.vo.redfish_log_vo import RedfishLogQueryModel, AddRedfishLogModel
 from utils.page_util import PageUtil
@@ -15,6 +20,9 @@ from utils.page_util import PageUtil
 class RedfishLogDao:
     """Redfish日志数据访问类"""
     
+    # 单条INSERT语句包含的最大行数（受数据库绑定参数数量限制）
+    INSERT_BATCH_SIZE = 1000
+    
     @classmethod
     async def get_redfish_log_list(cls, db: AsyncSession, query_object: RedfishLogQueryModel, is_page: bool = False):
         """
@@ -28,7 +36,8 @@ class RedfishLogDao:
         Returns:
             分页结果或列表
         """
-        query = select(RedfishLogDO)
+        # 列表不展示原始条目，不读取压缩报文列
+        query = select(RedfishLogDO).options(defer(RedfishLogDO.raw_payload))
         
         # 构建查询条件
         query = cls._build_query_conditions(query, query_object)
@@ -161,20 +170,71 @@ class RedfishLogDao:
         Returns:
             新增的日志对象列表
         """
-        log_objects = []
-        for log_data in logs_data:
-            log_obj = RedfishLogDO(**log_data.dict())
-            log_objects.append(log_obj)
-        
+        log_objects = [RedfishLogDO(**log_data.model_dump()) for log_data in logs_data]
         db.add_all(log_objects)
+        # 主键在客户端生成，flush后无需逐条refresh
         await db.flush()
-        
-        # 刷新所有对象
-        for log_obj in log_objects:
-            await db.refresh(log_obj)
-        
         return log_objects
     
+    @classmethod
+    async def add_redfish_logs_ignore_duplicates(cls, db: AsyncSession, logs_data: List[AddRedfishLogModel]) -> List[str]:
+        """
+        批量插入日志，已存在的 (device_id, entry_id, created_time) 由唯一索引跳过
+        PostgreSQL 使用 INSERT ... ON CONFLICT DO NOTHING，MySQL 使用 INSERT IGNORE；每批只有一次插入往返
+        
+        Args:
+            db: 数据库会话
+            logs_data: 日志数据列表
+            
+        Returns:
+            实际插入日志的严重程度列表
+        """
+        # 同一批次内先去重
+        rows = {}
+        for log_data in logs_data:
+            row = log_data.model_dump()
+            rows.setdefault((row['device_id'], row['entry_id'], row['created_time']), row)
+        rows = list(rows.values())
+        if not rows:
+            return []
+        
+        now = datetime.now()
+        for row in rows:
+            row['log_id'] = uuid.uuid4()
+            row['collected_time'] = now
+            row['create_time'] = row.get('create_time') or now
+            row['update_time'] = now
+        
+        inserted_severities = []
+        for i in range(0, len(rows), cls.INSERT_BATCH_SIZE):
+            chunk = rows[i:i + cls.INSERT_BATCH_SIZE]
+            if DataBaseConfig.db_type == 'postgresql':
+                stmt = pg_insert(RedfishLogDO).values(chunk).on_conflict_do_nothing(
+                    index_elements=['device_id', 'entry_id', 'created_time']
+                ).returning(RedfishLogDO.severity)
+                result = await db.execute(stmt)
+                inserted_severities.extend(result.scalars().all())
+            else:
+                # INSERT IGNORE 无法返回实际插入的行，先查出本批已存在的键，只统计新行
+                key_columns = (RedfishLogDO.device_id, RedfishLogDO.entry_id, RedfishLogDO.created_time)
+                existing = await db.execute(
+                    select(*key_columns).where(
+                        tuple_(*key_columns).in_(
+                            [(row['device_id'], row['entry_id'], row['created_time']) for row in chunk]
+                        )
+                    )
+                )
+                existing_keys = set(existing.tuples().all())
+                new_rows = [
+                    row for row in chunk
+                    if (row['device_id'], row['entry_id'], row['created_time']) not in existing_keys
+                ]
+                if not new_rows:
+                    continue
+                await db.execute(mysql_insert(RedfishLogDO).values(new_rows).prefix_with('IGNORE'))
+                inserted_severities.extend(row['severity'] for row in new_rows)
+        return inserted_severities
+    
     @classmethod
     async def delete_redfish_log(cls, db: AsyncSession, log_id: str) -> bool:
         """
@@ -223,28 +283,23 @@ class RedfishLogDao:
     @classmethod
     async def cleanup_old_logs(cls, db: AsyncSession, before_date: datetime) -> int:
         """
-        清理指定日期之前的日志
+        清理指定时间之前创建的日志
+        已按月分区时先整体移除过期分区，再删除边界分区内的剩余过期日志（分区裁剪后只扫描该分区）
         
         Args:
             db: 数据库会话
-            before_date: 清理此日期之前的日志
+            before_date: 截止时间
             
         Returns:
-            清理的日志数量
+            清理的日志数量（整体移除的分区按统计信息估算）
         """
-        # 查询要删除的日志
-        query = select(RedfishLogDO).where(RedfishLogDO.created_time < before_date)
-        result = await db.execute(query)
-        logs_to_delete = result.scalars().all()
-        
-        count = len(logs_to_delete)
-        
-        # 批量删除
-        for log_obj in logs_to_delete:
-            await db.delete(log_obj)
-        
-        await db.flush()
-        return count
+        removed_rows = 0
+        if PartitionDao.is_enabled():
+            removed_rows = await db.run_sync(
+                lambda session: PartitionDao.drop_expired_partitions(session, RedfishLogDO.__tablename__, before_date)
+            )
+        result = await db.execute(delete(RedfishLogDO).where(RedfishLogDO.created_time < before_date))
+        return removed_rows + result.rowcount
     
     @classmethod
     async def get_redfish_log_stats(cls, db: AsyncSession) -> Dict[str, int]:
@@ -257,59 +312,36 @@ class RedfishLogDao:
         Returns:
             统计信息字典
         """
-        # 总数量
-        total_query = select(func.count(RedfishLogDO.log_id))
-        total_result = await db.execute(total_query)
-        total_count = total_result.scalar() or 0
-        
-        # 按严重程度统计
-        critical_query = select(func.count(RedfishLogDO.log_id)).where(RedfishLogDO.severity == 'CRITICAL')
-        critical_result = await db.execute(critical_query)
-        critical_count = critical_result.scalar() or 0
-        
-        warning_query = select(func.count(RedfishLogDO.log_id)).where(RedfishLogDO.severity == 'WARNING')
-        warning_result = await db.execute(warning_query)
-        warning_count = warning_result.scalar() or 0
-        
-        # 按日志来源统计
-        sel_query = select(func.count(RedfishLogDO.log_id)).where(RedfishLogDO.log_source == 'SEL')
-        sel_result = await db.execute(sel_query)
-        sel_count = sel_result.scalar() or 0
-        
-        mel_query = select(func.count(RedfishLogDO.log_id)).where(RedfishLogDO.log_source == 'MEL')
-        mel_result = await db.execute(mel_query)
-        mel_count = mel_result.scalar() or 0
-        
-        # 今日日志数量
-        today = datetime.now().date()
-        today_start = datetime.combine(today, datetime.min.time())
-        today_end = datetime.combine(today, datetime.max.time())
+        today_start = datetime.combine(datetime.now().date(), datetime.min.time())
+        seven_days_ago = datetime.now() - timedelta(days=7)
         
-        today_query = select(func.count(RedfishLogDO.log_id)).where(
-            and_(
-                RedfishLogDO.created_time >= today_start,
-                RedfishLogDO.created_time <= today_end
+        # 单次扫描条件聚合
+        result = await db.execute(
+            select(
+                func.count(RedfishLogDO.log_id).label('total_count'),
+                func.count(case((RedfishLogDO.severity == 'CRITICAL', 1))).label('critical_count'),
+                func.count(case((RedfishLogDO.severity == 'WARNING', 1))).label('warning_count'),
+                func.count(case((RedfishLogDO.log_source == 'SEL', 1))).label('sel_count'),
+                func.count(case((RedfishLogDO.log_source == 'MEL', 1))).label('mel_count'),
+                func.count(case((
+                    and_(
+                        RedfishLogDO.created_time >= today_start,
+                        RedfishLogDO.created_time < today_start + timedelta(days=1)
+                    ), 1
+                ))).label('today_count'),
+                func.count(case((RedfishLogDO.created_time >= seven_days_ago, 1))).label('recent_7days_count')
             )
         )
-        today_result = await db.execute(today_query)
-        today_count = today_result.scalar() or 0
-        
-        # 近7天日志数量
-        seven_days_ago = datetime.now() - timedelta(days=7)
-        recent_query = select(func.count(RedfishLogDO.log_id)).where(
-            RedfishLogDO.created_time >= seven_days_ago
-        )
-        recent_result = await db.execute(recent_query)
-        recent_7days_count = recent_result.scalar() or 0
+        row = result.one()
         
         return {
-            'total_count': total_count,
-            'critical_count': critical_count,
-            'warning_count': warning_count,
-            'sel_count': sel_count,
-            'mel_count': mel_count,
-            'today_count': today_count,
-            'recent_7days_count': recent_7days_count
+            'total_count': row.total_count or 0,
+            'critical_count': row.critical_count or 0,
+            'warning_count': row.warning_count or 0,
+            'sel_count': row.sel_count or 0,
+            'mel_count': row.mel_count or 0,
+            'today_count': row.today_count or 0,
+            'recent_7days_count': row.recent_7days_count or 0
         }
     
     @classmethod
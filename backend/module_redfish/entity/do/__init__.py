@@ -8,6 +8,8 @@ from .business_urgency_rule_do import BusinessHardwareUrgencyRulesDO
 from .maintenance_schedule_do import MaintenanceScheduleDO
 from .business_type_dict_do import BusinessTypeDictDO
 from .hardware_type_dict_do import HardwareTypeDictDO
+from .device_health_rollup_do import DeviceHealthRollupDO
+from .alert_daily_rollup_do import AlertDailyRollupDO, AlertDailyRollupDayDO
 
 # 导出所有DO模型
 __all__ = [
@@ -21,4 +23,7 @@ __all__ = [
     'MaintenanceScheduleDO',
     'BusinessTypeDictDO',
     'HardwareTypeDictDO',
+    'DeviceHealthRollupDO',
+    'AlertDailyRollupDO',
+    'AlertDailyRollupDayDO',
 ] 
\ No newline at end of file
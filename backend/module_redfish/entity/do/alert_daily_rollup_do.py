@@ -0,0 +1,39 @@
+"""
+告警按天汇总DO模型
+"""
+from datetime import datetime
+from sqlalchemy import Column, Date, Integer, String, DateTime, Index
+
+from .base import Base
+
+
+class AlertDailyRollupDO(Base):
+    """
+    告警按天汇总表
+    按首次发生日期、紧急程度、组件类型、设备位置与厂商统计新增告警数，由每日汇总任务重算已结束的日期；
+    告警趋势与历史分布读取该表，未汇总的日期（含当天）实时统计
+    """
+    __tablename__ = 'alert_daily_rollup'
+
+    stat_date = Column(Date, primary_key=True, comment='统计日期（告警首次发生日期）')
+    urgency_level = Column(String(20), primary_key=True, comment='紧急程度（urgent/scheduled）')
+    component_type = Column(String(50), primary_key=True, comment='组件类型')
+    location = Column(String(200), primary_key=True, default='', comment='设备位置（设备已删除时为空字符串）')
+    manufacturer = Column(String(100), primary_key=True, default='', comment='设备厂商（设备已删除时为空字符串）')
+    alert_count = Column(Integer, nullable=False, default=0, comment='新增告警数')
+    update_time = Column(DateTime, default=datetime.now, onupdate=datetime.now, comment='汇总时间')
+
+    __table_args__ = (
+        Index('idx_alert_daily_rollup_urgency', 'urgency_level', 'stat_date'),
+    )
+
+
+class AlertDailyRollupDayDO(Base):
+    """
+    告警汇总日期标记表
+    每个已重算的日期一行（无告警的日期同样记录），未标记的日期一律实时统计
+    """
+    __tablename__ = 'alert_daily_rollup_day'
+
+    stat_date = Column(Date, primary_key=True, comment='已汇总日期')
+    update_time = Column(DateTime, default=datetime.now, onupdate=datetime.now, comment='汇总时间')
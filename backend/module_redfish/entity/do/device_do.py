@@ -26,6 +26,7 @@ class DeviceInfoDO(Base):
     technical_system = Column(String(100), comment='技术系统')
     system_owner = Column(String(100), comment='系统负责人')
     business_type = Column(String(50), comment='业务类型')
+    probe_ports = Column(String(100), comment='连通性检测的TCP端口（如 ssh:22,https:443），为空时按业务类型/默认配置')
     redfish_username = Column(String(100), comment='Redfish用户名')
     redfish_password = Column(String(255), comment='Redfish密码（加密存储）')
     monitor_enabled = Column(SmallInteger, default=1, comment='是否启用监控')
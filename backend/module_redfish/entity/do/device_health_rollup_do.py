@@ -0,0 +1,28 @@
+"""
+设备组件健康汇总DO模型
+"""
+from datetime import datetime
+from sqlalchemy import Column, BigInteger, Integer, String, DateTime, ForeignKey, Index
+
+from .base import Base
+
+
+class DeviceHealthRollupDO(Base):
+    """
+    设备组件健康汇总表
+    由监控结果入库与告警删除时按设备重算（来源为未删除的活跃告警），首页设备健康汇总直接读取
+    """
+    __tablename__ = 'device_health_rollup'
+
+    device_id = Column(BigInteger, ForeignKey('device_info.device_id', ondelete='CASCADE'), primary_key=True, comment='设备ID')
+    processor_health = Column(String(20), nullable=False, default='ok', comment='处理器健康状态')
+    memory_health = Column(String(20), nullable=False, default='ok', comment='内存健康状态')
+    storage_health = Column(String(20), nullable=False, default='ok', comment='存储健康状态')
+    thermal_health = Column(String(20), nullable=False, default='ok', comment='温度/风扇健康状态')
+    power_health = Column(String(20), nullable=False, default='ok', comment='电源健康状态')
+    alert_count = Column(Integer, nullable=False, default=0, comment='活跃告警数')
+    update_time = Column(DateTime, default=datetime.now, onupdate=datetime.now, comment='更新时间')
+
+    __table_args__ = (
+        Index('idx_device_health_rollup_alert_count', 'alert_count'),
+    )
@@ -2,7 +2,7 @@
 Redfish日志数据对象(DO)
 """
 from datetime import datetime
-from sqlalchemy import Column, String, Integer, Text, DateTime, Index
+from sqlalchemy import Column, String, Integer, Text, DateTime, Index, UniqueConstraint, LargeBinary
 from sqlalchemy.dialects.postgresql import UUID
 from module_redfish.entity.do.base import Base
 import uuid
@@ -23,7 +23,8 @@ class RedfishLogDO(Base):
     device_ip = Column(String(45), nullable=False, comment='设备IP地址')
     
     # 日志基本信息
-    entry_id = Column(String(100), comment='原始条目ID')
+    # 去重键的一部分，不能为空（NULL在唯一索引中互不冲突）
+    entry_id = Column(String(100), nullable=False, comment='原始条目ID')
     entry_type = Column(String(50), comment='条目类型')
     log_source = Column(String(10), nullable=False, comment='日志来源(SEL/MEL)')
     
@@ -36,6 +37,8 @@ class RedfishLogDO(Base):
     
     # 消息内容
     message = Column(Text, comment='日志消息')
+    # 原始Redfish条目：紧凑JSON压缩存储（历史数据保存在remark中）
+    raw_payload = Column(LargeBinary, comment='原始条目（压缩JSON）')
     
     # 传感器信息字段已删除（不再使用）
     
@@ -55,6 +58,8 @@ class RedfishLogDO(Base):
         Index('idx_redfish_log_collected_time', 'collected_time'),
         Index('idx_redfish_log_source', 'log_source'),
         Index('idx_redfish_log_device_time', 'device_id', 'created_time'),
+        # 去重键：批量插入时跳过已收集的日志
+        UniqueConstraint('device_id', 'entry_id', 'created_time', name='uq_redfish_log_entry'),
         {'comment': 'Redfish设备日志表'}
     )
     
@@ -13,8 +13,8 @@ class ConnectivityStatsQueryModel(BaseModel):
     """连通性统计查询参数模型"""
     model_config = ConfigDict(alias_generator=to_camel, populate_by_name=True)
     
-    use_cache: bool = Field(default=True, description="是否使用缓存")
-    cache_ttl_minutes: int = Field(default=5, ge=1, le=60, description="缓存时间（分钟）")
+    use_cache: bool = Field(default=True, description="是否仅读取连通性记录（否则另行投递后台全量探测）")
+    cache_ttl_minutes: Optional[int] = Field(default=None, ge=1, le=60, description="记录有效期（分钟），为空时使用配置")
 
 
 @as_query
@@ -46,6 +46,7 @@ class ConnectivityStatsResponseModel(BaseModel):
     total_devices: int = Field(..., description="总设备数")
     online_devices: int = Field(..., description="在线设备数")
     offline_devices: int = Field(..., description="离线设备数")
+    unknown_devices: int = Field(default=0, description="状态未知设备数（无有效检测记录）")
     check_duration_ms: float = Field(..., description="检测耗时（毫秒）")
     check_time: str = Field(..., description="检测时间")
     details: List[ConnectivityResultModel] = Field(default_factory=list, description="详细结果")
@@ -71,6 +72,7 @@ class ConnectivityStatsResponseModel(BaseModel):
             total_devices=service_result.get("total_devices", 0),
             online_devices=service_result.get("online_devices", 0),
             offline_devices=service_result.get("offline_devices", 0),
+            unknown_devices=service_result.get("unknown_devices", 0),
             check_duration_ms=service_result.get("check_duration_ms", 0),
             check_time=service_result.get("check_time", ""),
             details=details,
@@ -2,7 +2,7 @@
 首页数据VO模型
 """
 from datetime import datetime, date
-from typing import Optional, List, Dict
+from typing import Optional, List, Dict, Literal
 from pydantic import BaseModel, Field, ConfigDict
 from pydantic.alias_generators import to_camel
 from module_admin.annotation.pydantic_annotation import as_query
@@ -153,13 +153,26 @@ class DashboardQueryModel(BaseModel):
     """首页数据查询模型"""
     model_config = ConfigDict(alias_generator=to_camel)
     
-    time_range: str = Field(default="7d", description="时间范围(7d/30d/90d)")
+    time_range: str = Field(default="7d", description="时间范围(7d/30d/90d/365d)")
     include_resolved: bool = Field(default=False, description="是否包含已解决告警")
     location_filter: Optional[str] = Field(default=None, description="位置过滤")
     manufacturer_filter: Optional[str] = Field(default=None, description="制造商过滤")
     force_refresh: bool = Field(default=False, description="是否强制刷新，跳过缓存")
 
 
+@as_query
+class DeviceHealthSummaryQueryModel(BaseModel):
+    """设备健康汇总分页查询模型"""
+    model_config = ConfigDict(alias_generator=to_camel)
+    
+    page_num: int = Field(default=1, ge=1, description="当前页码")
+    page_size: int = Field(default=20, ge=1, le=500, description="每页记录数")
+    sort_by: Literal['device_id', 'hostname', 'overall_health', 'alert_count', 'last_check_time'] = Field(
+        default='device_id', description="排序字段"
+    )
+    sort_order: Literal['asc', 'desc'] = Field(default='asc', description="排序方向")
+
+
 class DashboardDataModel(BaseModel):
     """首页完整数据模型"""
     model_config = ConfigDict(alias_generator=to_camel, populate_by_name=True)
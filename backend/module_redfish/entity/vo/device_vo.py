@@ -25,6 +25,7 @@ class DeviceModel(BaseModel):
     technical_system: Optional[str] = Field(default=None, description="技术系统")
     system_owner: Optional[str] = Field(default=None, description="系统负责人")
     business_type: Optional[str] = Field(default=None, description="业务类型")
+    probe_ports: Optional[str] = Field(default=None, description="连通性检测的TCP端口（如 ssh:22,https:443）")
     redfish_username: Optional[str] = Field(default=None, description="Redfish用户名")
     redfish_password: Optional[str] = Field(default=None, description="Redfish密码（加密存储）")
     monitor_enabled: int = Field(default=1, description="是否启用监控")
@@ -53,6 +54,7 @@ class AddDeviceModel(BaseModel):
     technical_system: Optional[str] = Field(default=None, description="技术系统")
     system_owner: Optional[str] = Field(default=None, description="系统负责人")
     business_type: Optional[str] = Field(default=None, description="业务类型")
+    probe_ports: Optional[str] = Field(default=None, description="连通性检测的TCP端口（如 ssh:22,https:443）")
     redfish_username: Optional[str] = Field(default=None, description="Redfish用户名")
     redfish_password: Optional[str] = Field(default=None, description="Redfish密码（加密存储）")
     monitor_enabled: int = Field(default=1, description="是否启用监控")
@@ -79,6 +81,7 @@ class EditDeviceModel(BaseModel):
     technical_system: Optional[str] = Field(default=None, description="技术系统")
     system_owner: Optional[str] = Field(default=None, description="系统负责人")
     business_type: Optional[str] = Field(default=None, description="业务类型")
+    probe_ports: Optional[str] = Field(default=None, description="连通性检测的TCP端口（如 ssh:22,https:443）")
     redfish_username: Optional[str] = Field(default=None, description="Redfish用户名")
     redfish_password: Optional[str] = Field(default=None, description="Redfish密码（加密存储）")
     monitor_enabled: Optional[int] = Field(default=None, description="是否启用监控")
@@ -195,6 +198,7 @@ class DeviceResponseModel(BaseModel):
     technical_system: Optional[str] = Field(default=None, description="技术系统")
     system_owner: Optional[str] = Field(default=None, description="系统负责人")
     business_type: Optional[str] = Field(default=None, description="业务类型")
+    probe_ports: Optional[str] = Field(default=None, description="连通性检测的TCP端口（如 ssh:22,https:443）")
     redfish_username: Optional[str] = Field(default=None, description="Redfish用户名")
     monitor_enabled: int = Field(..., description="是否启用监控")
     health_status: str = Field(..., description="健康状态")
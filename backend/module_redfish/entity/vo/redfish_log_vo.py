@@ -117,12 +117,13 @@ class AddRedfishLogModel(BaseModel):
     
     device_id: int = Field(..., description="设备ID")
     device_ip: str = Field(..., description="设备IP地址")
-    entry_id: Optional[str] = Field(None, description="原始条目ID")
+    entry_id: str = Field(..., description="原始条目ID")
     entry_type: Optional[str] = Field(None, description="条目类型")
     log_source: str = Field(..., description="日志来源")
     severity: str = Field(..., description="严重程度")
     created_time: datetime = Field(..., description="日志创建时间")
     message: Optional[str] = Field(None, description="日志消息")
+    raw_payload: Optional[bytes] = Field(None, description="原始条目（压缩JSON）")
     remark: Optional[str] = Field(None, description="备注")
     
     # 系统字段
@@ -202,6 +203,24 @@ class RedfishLogCollectResultModel(BaseModel):
     message: str = Field("", description="结果消息")
 
 
+class RedfishLogCollectJobModel(BaseModel):
+    """批量日志收集任务模型"""
+    model_config = ConfigDict(alias_generator=to_camel, from_attributes=True, populate_by_name=True)
+    
+    success: bool = Field(True, description="是否成功")
+    job_id: str = Field(..., description="任务ID")
+    status: str = Field(..., description="任务状态(running/completed/interrupted)")
+    total: int = Field(0, description="设备总数")
+    completed: int = Field(0, description="已完成设备数")
+    progress: float = Field(0, description="完成百分比")
+    collected: int = Field(0, description="总收集数量")
+    critical: int = Field(0, description="严重错误收集数量")
+    warning: int = Field(0, description="警告收集数量")
+    failed: int = Field(0, description="失败设备数")
+    failed_devices: List[str] = Field([], description="收集失败的设备IP")
+    message: str = Field("", description="结果消息")
+
+
 class RedfishLogCleanupResultModel(BaseModel):
     """日志清理结果模型"""
     model_config = ConfigDict(alias_generator=to_camel, from_attributes=True, populate_by_name=True)
@@ -181,17 +181,18 @@ class AlertService:
         ]
     
     @classmethod
-    async def get_alert_distribution_services(cls, db: AsyncSession) -> AlertDistributionModel:
+    async def get_alert_distribution_services(cls, db: AsyncSession, days: Optional[int] = None) -> AlertDistributionModel:
         """
         获取告警分布统计
         
         Args:
             db: 数据库会话
+            days: 为空时统计当前活跃告警；否则统计最近N天新增告警
             
         Returns:
             AlertDistributionModel: 分布统计
         """
-        distribution = await AlertDao.get_alert_distribution(db)
+        distribution = await AlertDao.get_alert_distribution(db, days)
         
         return AlertDistributionModel(
             byLevel=distribution['by_level'],
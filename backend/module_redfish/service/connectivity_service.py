@@ -3,7 +3,7 @@
 基于业务IP判断设备在线/离线状态
 """
 import asyncio
-import platform
+import json
 import time
 from typing import Dict, Any, List, Optional
 from datetime import datetime, timedelta
@@ -12,18 +12,26 @@ from sqlalchemy import select
 
 from module_redfish.entity.do.device_do import DeviceInfoDO
 from module_redfish.dao.device_dao import DeviceDao
+from module_redfish.core.connectivity_store import ConnectivityStore
+from module_redfish.core.reachability import ReachabilityEngine
+from config.env import RedfishConfig
 from utils.log_util import logger
 
 
 class ConnectivityService:
     """设备连通性检测服务"""
     
+    # 未命名端口的默认名称
+    _PORT_NAMES = {22: "ssh", 80: "http", 443: "https"}
+    
     @classmethod
     async def check_device_business_ip_connectivity(
         cls,
         db: AsyncSession,
         device_id: int = None,
-        business_ip: str = None
+        business_ip: str = None,
+        ping_result: Optional[Dict[str, Any]] = None,
+        probe_ports: Optional[Dict[str, int]] = None
     ) -> Dict[str, Any]:
         """
         检测单个设备的业务IP连通性
@@ -32,6 +40,8 @@ class ConnectivityService:
             db: 数据库会话
             device_id: 设备ID（与business_ip二选一）
             business_ip: 业务IP（与device_id二选一）
+            ping_result: 批量检测已得到的结果（为空时单独检测）
+            probe_ports: ping失败时竞速检测的TCP端口 {名称: 端口}（为空时按设备/业务类型配置）
             
         Returns:
             Dict[str, Any]: 连通性检测结果
@@ -46,6 +56,8 @@ class ConnectivityService:
                 }
             target_ip = device.business_ip
             hostname = device.hostname
+            if probe_ports is None:
+                probe_ports = cls.resolve_probe_ports(device.business_type, device.probe_ports)
         elif business_ip:
             target_ip = business_ip
             hostname = business_ip
@@ -67,28 +79,16 @@ class ConnectivityService:
         start_time = time.time()
         
         # 主要方法：ping检测
-        ping_result = await cls._ping_check(target_ip)
+        if ping_result is None:
+            ping_result = await cls._ping_check(target_ip)
         
-        # 辅助方法：常用端口检测（只在ping失败时执行，提高效率）
+        # 辅助方法：常用端口检测（只在ping失败时执行，提高效率；引擎已TCP探测过的端口不再重复）
         port_results = {}
         if not ping_result.get("success", False):
-            # 并发检测常用端口
-            port_tasks = {
-                "ssh": cls._tcp_port_check(target_ip, 22, timeout=2),
-                "http": cls._tcp_port_check(target_ip, 80, timeout=2),
-                "https": cls._tcp_port_check(target_ip, 443, timeout=2),
-            }
-            
-            port_results = {}
-            for port_name, task in port_tasks.items():
-                try:
-                    port_results[port_name] = await task
-                except Exception as e:
-                    port_results[port_name] = {
-                        "success": False,
-                        "method": f"tcp_port_{port_name}",
-                        "error": str(e)
-                    }
+            # 所有端口同时竞速检测，任一端口连通即返回
+            ports = cls._untried_probe_ports(ping_result, probe_ports or cls.resolve_probe_ports())
+            if ports:
+                port_results = await cls._race_port_checks(target_ip, ports, timeout=2)
         
         # 综合判断在线状态
         online = ping_result.get("success", False) or any(
@@ -117,7 +117,8 @@ class ConnectivityService:
         cls,
         db: AsyncSession,
         device_id: int = None,
-        oob_ip: str = None
+        oob_ip: str = None,
+        ping_result: Optional[Dict[str, Any]] = None
     ) -> Dict[str, Any]:
         """
         检测单个设备的带外IP连通性
@@ -126,6 +127,7 @@ class ConnectivityService:
             db: 数据库会话
             device_id: 设备ID（与oob_ip二选一）
             oob_ip: 带外IP（与device_id二选一）
+            ping_result: 批量检测已得到的结果（为空时单独检测）
             
         Returns:
             Dict[str, Any]: 带外IP连通性检测结果
@@ -161,28 +163,18 @@ class ConnectivityService:
         start_time = time.time()
         
         # 主要方法：ping检测
-        ping_result = await cls._ping_check(target_ip)
+        if ping_result is None:
+            ping_result = await cls._ping_check(target_ip)
         
-        # 辅助方法：常用端口检测（只在ping失败时执行，提高效率）
+        # 辅助方法：常用端口检测（只在ping失败时执行，提高效率；引擎已TCP探测过的端口不再重复）
         port_results = {}
         if not ping_result.get("success", False):
-            # 并发检测常用端口（带外IP常用端口）
-            port_tasks = {
-                "https": cls._tcp_port_check(target_ip, 443, timeout=2),
-                "http": cls._tcp_port_check(target_ip, 80, timeout=2),
-                "ssh": cls._tcp_port_check(target_ip, 22, timeout=2),
-            }
-            
-            port_results = {}
-            for port_name, task in port_tasks.items():
-                try:
-                    port_results[port_name] = await task
-                except Exception as e:
-                    port_results[port_name] = {
-                        "success": False,
-                        "method": f"tcp_port_{port_name}",
-                        "error": str(e)
-                    }
+            # 带外IP常用端口同时竞速检测，任一端口连通即返回
+            ports = cls._untried_probe_ports(
+                ping_result, cls.parse_probe_ports(RedfishConfig.redfish_probe_ports_oob)
+            )
+            if ports:
+                port_results = await cls._race_port_checks(target_ip, ports, timeout=2)
         
         # 综合判断在线状态
         online = ping_result.get("success", False) or any(
@@ -206,6 +198,84 @@ class ConnectivityService:
         
         return result
     
+    @classmethod
+    async def probe_devices(
+        cls,
+        devices: List[Dict[str, Any]],
+        source: str,
+        max_concurrent: int = 20
+    ) -> List[Dict[str, Any]]:
+        """
+        探测一组设备的业务IP连通性并写入连通性记录
+
+        Args:
+            devices: 设备信息列表（device_id/hostname/business_ip/location/business_type/probe_ports）
+            source: 记录来源（prober/manual）
+            max_concurrent: 最大并发检测数
+
+        Returns:
+            List[Dict[str, Any]]: 每台设备的检测明细
+        """
+        # 所有业务IP先一次性批量探测
+        ping_results = await ReachabilityEngine.get().probe_many(device["business_ip"] for device in devices)
+        
+        # 使用信号量限制并发数
+        semaphore = asyncio.Semaphore(max_concurrent)
+        
+        async def check_single_device(device):
+            async with semaphore:
+                # 设备信息已随批量查询得到，不再逐台查库
+                connectivity = await cls.check_device_business_ip_connectivity(
+                    None,
+                    business_ip=device["business_ip"],
+                    ping_result=ping_results.get(device["business_ip"]),
+                    probe_ports=cls.resolve_probe_ports(device.get("business_type"), device.get("probe_ports"))
+                )
+                connectivity["hostname"] = device["hostname"]
+                return connectivity
+        
+        # 并发执行检测
+        tasks = [check_single_device(device) for device in devices]
+        results = await asyncio.gather(*tasks, return_exceptions=True)
+        
+        # 处理异常结果
+        details = []
+        entries = {}
+        for device, connectivity in zip(devices, results):
+            if isinstance(connectivity, Exception):
+                logger.error(f"检测设备 {device['hostname']} 连通性时发生异常: {connectivity}")
+                connectivity = {
+                    "online": False,
+                    "error": str(connectivity),
+                    "check_time": datetime.now().isoformat()
+                }
+            entries[device["device_id"]] = ConnectivityStore.entry_from_result(device["business_ip"], connectivity, source)
+            details.append({
+                "device_id": device["device_id"],
+                "hostname": device["hostname"],
+                "business_ip": device["business_ip"],
+                "location": device.get("location"),
+                "online": connectivity["online"],
+                "check_details": connectivity
+            })
+        
+        await ConnectivityStore.put_many(entries)
+        return details
+    
+    @classmethod
+    async def _query_business_ip_devices(cls, db: AsyncSession, device_ids: List[int] = None) -> List[Dict[str, Any]]:
+        """
+        查询有业务IP的设备（只取连通性检测需要的列）
+        """
+        query = select(
+            DeviceInfoDO.device_id, DeviceInfoDO.hostname, DeviceInfoDO.business_ip, DeviceInfoDO.location,
+            DeviceInfoDO.business_type, DeviceInfoDO.probe_ports
+        ).where(DeviceInfoDO.business_ip.isnot(None))
+        if device_ids:
+            query = query.where(DeviceInfoDO.device_id.in_(device_ids))
+        result = await db.execute(query)
+        return [dict(row._mapping) for row in result]
+    
     @classmethod
     async def batch_check_connectivity(
         cls,
@@ -214,7 +284,7 @@ class ConnectivityService:
         max_concurrent: int = 20
     ) -> Dict[str, Any]:
         """
-        批量检测设备连通性
+        批量实时检测设备连通性（结果同时写入连通性记录）
         
         Args:
             db: 数据库会话
@@ -224,17 +294,7 @@ class ConnectivityService:
         Returns:
             Dict[str, Any]: 批量检测结果
         """
-        # 查询设备
-        if device_ids:
-                    query = select(DeviceInfoDO).where(
-            DeviceInfoDO.device_id.in_(device_ids),
-            DeviceInfoDO.business_ip.isnot(None)
-        )
-        else:
-            query = select(DeviceInfoDO).where(DeviceInfoDO.business_ip.isnot(None))
-        
-        result = await db.execute(query)
-        devices = result.scalars().all()
+        devices = await cls._query_business_ip_devices(db, device_ids)
         
         if not devices:
             return {
@@ -249,47 +309,7 @@ class ConnectivityService:
         start_time = time.time()
         logger.info(f"开始批量检测 {len(devices)} 台设备的业务IP连通性")
         
-        # 使用信号量限制并发数
-        semaphore = asyncio.Semaphore(max_concurrent)
-        
-        async def check_single_device(device):
-            async with semaphore:
-                connectivity = await cls.check_device_business_ip_connectivity(
-                    db, device_id=device.device_id
-                )
-                return {
-                    "device_id": device.device_id,
-                    "hostname": device.hostname,
-                    "business_ip": device.business_ip,
-                    "location": device.location,
-                    "online": connectivity["online"],
-                    "check_details": connectivity
-                }
-        
-        # 并发执行检测
-        tasks = [check_single_device(device) for device in devices]
-        results = await asyncio.gather(*tasks, return_exceptions=True)
-        
-        # 处理异常结果
-        valid_results = []
-        for i, result in enumerate(results):
-            if isinstance(result, Exception):
-                device = devices[i]
-                logger.error(f"检测设备 {device.hostname} 连通性时发生异常: {result}")
-                valid_results.append({
-                    "device_id": device.device_id,
-                    "hostname": device.hostname,
-                    "business_ip": device.business_ip,
-                    "location": device.location,
-                    "online": False,
-                    "check_details": {
-                        "online": False,
-                        "error": str(result),
-                        "check_time": datetime.now().isoformat()
-                    }
-                })
-            else:
-                valid_results.append(result)
+        valid_results = await cls.probe_devices(devices, "manual", max_concurrent)
         
         # 统计结果
         online_count = sum(1 for result in valid_results if result["online"])
@@ -350,13 +370,16 @@ class ConnectivityService:
         start_time = time.time()
         logger.info(f"开始批量检测 {len(devices)} 台设备的带外IP连通性")
         
+        # 所有带外IP先一次性批量探测
+        ping_results = await ReachabilityEngine.get().probe_many(device.oob_ip for device in devices)
+        
         # 使用信号量限制并发数
         semaphore = asyncio.Semaphore(max_concurrent)
         
         async def check_single_device_oob(device):
             async with semaphore:
                 connectivity = await cls.check_device_oob_ip_connectivity(
-                    db, device_id=device.device_id
+                    db, device_id=device.device_id, ping_result=ping_results.get(device.oob_ip)
                 )
                 return {
                     "device_id": device.device_id,
@@ -413,47 +436,68 @@ class ConnectivityService:
         cls,
         db: AsyncSession,
         use_cache: bool = True,
-        cache_ttl_minutes: int = 5
+        cache_ttl_minutes: Optional[int] = None
     ) -> Dict[str, Any]:
         """
-        获取设备连通性统计（支持缓存）
+        获取设备连通性统计
+        读取监控周期与后台探测写入的连通性记录（一次查库 + 一次Redis读取），不在请求中探测设备
         
         Args:
             db: 数据库会话
-            use_cache: 是否使用缓存
-            cache_ttl_minutes: 缓存时间（分钟）
+            use_cache: 为False时另行投递后台探测任务全量刷新连通性记录，本次仍返回已有记录
+            cache_ttl_minutes: 记录有效期（分钟），超过的设备计为状态未知；为空时使用配置
             
         Returns:
             Dict[str, Any]: 连通性统计
         """
-        cache_key = "connectivity_stats"
-        
-        if use_cache:
-            try:
-                from module_admin.service.cache_service import CacheService
-                cached_result = await CacheService.get_cache(cache_key)
-                if cached_result:
-                    return cached_result
-            except Exception as e:
-                logger.warning(f"获取缓存失败，将执行实时检测: {e}")
-        
         try:
-            # 执行批量连通性检测
-            connectivity_result = await cls.batch_check_connectivity(db)
+            if not use_cache:
+                cls.request_background_probe(skip_seconds=0)
             
-            # 缓存结果
-            if use_cache:
-                try:
-                    from module_admin.service.cache_service import CacheService
-                    await CacheService.set_cache(
-                        cache_key, 
-                        connectivity_result, 
-                        cache_ttl_minutes * 60
-                    )
-                except Exception as e:
-                    logger.warning(f"设置缓存失败: {e}")
+            max_age = cache_ttl_minutes * 60 if cache_ttl_minutes else RedfishConfig.redfish_connectivity_max_age
+            devices = await cls._query_business_ip_devices(db)
+            entries = await ConnectivityStore.get_many(device["device_id"] for device in devices)
             
-            return connectivity_result
+            details = []
+            online_count = 0
+            unknown_count = 0
+            latest_check = 0.0
+            for device in devices:
+                entry = entries.get(device["device_id"])
+                if ConnectivityStore.is_fresh(entry, device["business_ip"], max_age):
+                    online = entry["online"]
+                    latest_check = max(latest_check, entry["checked_at"])
+                    check_details = {
+                        "online": online,
+                        "rtt_ms": entry.get("rtt_ms"),
+                        "method": entry.get("method"),
+                        "error": entry.get("error"),
+                        "source": entry.get("source"),
+                        "check_time": datetime.fromtimestamp(entry["checked_at"]).isoformat()
+                    }
+                else:
+                    online = False
+                    unknown_count += 1
+                    check_details = {"online": False, "unknown": True, "error": "暂无有效检测结果"}
+                online_count += 1 if online else 0
+                details.append({
+                    "device_id": device["device_id"],
+                    "hostname": device["hostname"],
+                    "business_ip": device["business_ip"],
+                    "location": device["location"],
+                    "online": online,
+                    "check_details": check_details
+                })
+            
+            return {
+                "total_devices": len(details),
+                "online_devices": online_count,
+                "offline_devices": len(details) - online_count - unknown_count,
+                "unknown_devices": unknown_count,
+                "check_duration_ms": 0,
+                "check_time": (datetime.fromtimestamp(latest_check) if latest_check else datetime.now()).isoformat(),
+                "details": details
+            }
             
         except Exception as e:
             logger.error(f"获取连通性统计失败: {e}")
@@ -468,36 +512,52 @@ class ConnectivityService:
                 "error": str(e)
             }
     
+    @classmethod
+    async def probe_stale_devices(cls, devices: List[Dict[str, Any]], skip_seconds: Optional[int] = None) -> Dict[str, Any]:
+        """
+        后台探测：只探测连通性记录已过期的设备（监控周期刚检测过的设备跳过），并清理已删除设备的记录
+        
+        Args:
+            devices: 有业务IP的设备信息列表
+            skip_seconds: 记录在该时间内的设备跳过探测（秒）；为空时使用配置，0表示全部探测
+            
+        Returns:
+            Dict[str, Any]: {'total_devices', 'probed_devices', 'online_devices', 'offline_devices'}
+        """
+        if skip_seconds is None:
+            skip_seconds = RedfishConfig.redfish_connectivity_probe_skip
+        await ConnectivityStore.prune(device["device_id"] for device in devices)
+        stale = await ConnectivityStore.stale_devices(devices, skip_seconds) if skip_seconds else devices
+        details = await cls.probe_devices(stale, "prober") if stale else []
+        online_count = sum(1 for detail in details if detail["online"])
+        return {
+            "total_devices": len(devices),
+            "probed_devices": len(details),
+            "online_devices": online_count,
+            "offline_devices": len(details) - online_count
+        }
+    
+    @classmethod
+    def request_background_probe(cls, skip_seconds: Optional[int] = None):
+        """
+        投递后台连通性探测任务（首页强制刷新与连通性统计刷新时调用，不在请求中等待探测结果）
+        
+        Args:
+            skip_seconds: 同 probe_stale_devices
+        """
+        try:
+            from module_redfish.celery_tasks import check_all_devices_availability
+            check_all_devices_availability.delay(skip_seconds)
+        except Exception as e:
+            logger.warning(f"投递后台连通性探测任务失败: {e}")
+    
     @classmethod
     async def _ping_check(cls, ip: str, timeout: int = 3, count: int = 1) -> Dict[str, Any]:
         """
-        跨平台Ping检测
+        Ping检测（共用事件循环内的ICMP套接字，不再启动ping子进程）
         """
         try:
-            # 根据操作系统选择ping命令参数
-            system = platform.system().lower()
-            if system == 'windows':
-                cmd = ['ping', '-n', str(count), '-w', str(timeout * 1000), ip]
-            else:  # Linux/macOS
-                cmd = ['ping', '-c', str(count), '-W', str(timeout), ip]
-            
-            # 执行ping命令
-            process = await asyncio.create_subprocess_exec(
-                *cmd,
-                stdout=asyncio.subprocess.PIPE,
-                stderr=asyncio.subprocess.PIPE
-            )
-            stdout, stderr = await process.communicate()
-            
-            success = process.returncode == 0
-            output = stdout.decode() if stdout else stderr.decode()
-            
-            return {
-                "success": success,
-                "method": "ping",
-                "response_time": cls._extract_ping_time(output) if success else None,
-                "error": None if success else f"Ping failed (返回码: {process.returncode})"
-            }
+            return await ReachabilityEngine.get().probe(ip, timeout=timeout, attempts=count)
         except Exception as e:
             return {
                 "success": False,
@@ -506,6 +566,115 @@ class ConnectivityService:
                 "error": str(e)
             }
     
+    @classmethod
+    def parse_probe_ports(cls, value: Optional[str]) -> Dict[str, int]:
+        """
+        解析端口配置，支持 "ssh:22,https:443" 或 "22,443"
+        
+        Args:
+            value: 端口配置字符串
+            
+        Returns:
+            Dict[str, int]: {名称: 端口}
+        """
+        ports = {}
+        for item in (value or '').split(','):
+            item = item.strip()
+            if not item:
+                continue
+            name, _, port = item.rpartition(':')
+            try:
+                port = int(port)
+            except ValueError:
+                logger.warning(f"忽略无效的检测端口配置: {item}")
+                continue
+            ports[name or cls._PORT_NAMES.get(port, f"tcp_{port}")] = port
+        return ports
+    
+    @classmethod
+    def resolve_probe_ports(cls, business_type: Optional[str] = None, device_ports: Optional[str] = None) -> Dict[str, int]:
+        """
+        确定业务IP的TCP检测端口：设备配置 > 业务类型配置 > 默认配置
+        
+        Args:
+            business_type: 业务类型
+            device_ports: 设备上配置的端口
+            
+        Returns:
+            Dict[str, int]: {名称: 端口}
+        """
+        ports = cls.parse_probe_ports(device_ports)
+        if ports:
+            return ports
+        if business_type and RedfishConfig.redfish_probe_ports_by_business_type:
+            try:
+                by_business_type = json.loads(RedfishConfig.redfish_probe_ports_by_business_type)
+            except ValueError:
+                logger.warning("REDFISH_PROBE_PORTS_BY_BUSINESS_TYPE 不是有效的JSON，已忽略")
+                by_business_type = {}
+            ports = cls.parse_probe_ports(by_business_type.get(business_type))
+            if ports:
+                return ports
+        return cls.parse_probe_ports(RedfishConfig.redfish_probe_ports_business)
+    
+    @classmethod
+    def _untried_probe_ports(cls, ping_result: Dict[str, Any], ports: Dict[str, int]) -> Dict[str, int]:
+        """
+        去掉探测引擎在TCP模式下已检测失败的端口，其余配置端口仍需竞速检测
+        
+        Args:
+            ping_result: 探测引擎的检测结果
+            ports: 配置的检测端口 {名称: 端口}
+            
+        Returns:
+            Dict[str, int]: 需要补充检测的端口 {名称: 端口}
+        """
+        if ping_result.get("method") != "tcp_connect":
+            return ports
+        tried = {
+            int(port) for port in RedfishConfig.redfish_reachability_tcp_ports.split(',') if port.strip()
+        }
+        return {name: port for name, port in ports.items() if port not in tried}
+    
+    @classmethod
+    async def _race_port_checks(cls, ip: str, ports: Dict[str, int], timeout: int = 2) -> Dict[str, Dict[str, Any]]:
+        """
+        并发检测多个TCP端口，首个端口连通后取消其余检测
+        
+        Args:
+            ip: 目标IP
+            ports: {名称: 端口}
+            timeout: 单个端口超时时间（秒）
+            
+        Returns:
+            Dict[str, Dict]: 已完成的端口检测结果（被取消的端口不包含在内）
+        """
+        tasks = {
+            asyncio.ensure_future(cls._tcp_port_check(ip, port, timeout=timeout)): name
+            for name, port in ports.items()
+        }
+        results = {}
+        pending = set(tasks)
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    name = tasks[task]
+                    try:
+                        results[name] = task.result()
+                    except Exception as e:
+                        results[name] = {
+                            "success": False,
+                            "method": f"tcp_port_{name}",
+                            "error": str(e)
+                        }
+                if any(result.get("success", False) for result in results.values()):
+                    break
+        finally:
+            for task in pending:
+                task.cancel()
+        return results
+    
     @classmethod
     async def _tcp_port_check(cls, ip: str, port: int, timeout: int = 3) -> Dict[str, Any]:
         """
@@ -538,29 +707,3 @@ class ConnectivityService:
                 "port": port,
                 "error": str(e)
             }
-    
-    @classmethod
-    def _extract_ping_time(cls, ping_output: str) -> Optional[str]:
-        """
-        从ping输出中提取响应时间（跨平台）
-        """
-        try:
-            import re
-            # 支持多种格式
-            patterns = [
-                r'时间[=<](\d+\.?\d*)ms',                    # Windows中文
-                r'time[=<](\d+\.?\d*)\s*ms',                # Linux/macOS英文 time=XXms
-                r'time=(\d+\.?\d*)\s*ms',                   # 通用格式
-                r'平均\s*=\s*(\d+\.?\d*)ms',                # Windows中文平均值
-                r'round-trip.*?=\s*(\d+\.?\d*)/.*?ms',      # macOS格式: round-trip min/avg/max/stddev = 23.523/...
-                r'rtt.*?=\s*(\d+\.?\d*)/.*?ms',             # 某些Linux: rtt min/avg/max/mdev = XX.XX/...
-                r'(\d+\.?\d*)\s*ms',                        # 简单匹配任何数字+ms
-            ]
-            
-            for pattern in patterns:
-                match = re.search(pattern, ping_output, re.IGNORECASE)
-                if match:
-                    return f"{match.group(1)}ms"
-        except Exception:
-            pass
-        return None 
\ No newline at end of file
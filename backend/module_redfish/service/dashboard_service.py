@@ -1,27 +1,40 @@
 """
 首页数据Service层
 """
+import asyncio
+import time
 from datetime import datetime, timedelta
 from typing import List, Optional, Dict, Any
 from sqlalchemy.ext.asyncio import AsyncSession
+from config.database import AsyncSessionLocal
 from module_redfish.dao.device_dao import DeviceDao
 from module_redfish.dao.alert_dao import AlertDao
+from module_redfish.dao.device_health_rollup_dao import DeviceHealthRollupDao
 from module_redfish.service.device_service import DeviceService
 from module_redfish.service.alert_service import AlertService
 from module_redfish.entity.vo.dashboard_vo import (
     DashboardOverviewModel, AlertTrendChartModel, DeviceHealthChartModel,
     RealtimeAlertListModel, ScheduledAlertListModel, DeviceHealthSummaryListModel,
     AlertDistributionModel, SystemHealthMetricsModel, DashboardDataModel,
-    DashboardQueryModel
+    DashboardQueryModel, DeviceHealthSummaryQueryModel
 )
+from utils.page_util import PageResponseModel
 from utils.response_util import ResponseUtil
 from utils.log_util import logger
 from module_redfish.service.connectivity_service import ConnectivityService
+from module_redfish.core.dashboard_snapshot import DashboardSnapshotCache
+from module_redfish.core.dashboard_state import DashboardStateStore
+from module_redfish.core.event_bus import EventBus
+from config.env import RedfishConfig
 
 
 class DashboardService:
     """首页数据服务"""
     
+    # 进程内首页状态重算任务与待处理的变化（首个未处理变化的时间）
+    _state_sync_task: Optional[asyncio.Task] = None
+    _state_sync_requested_at: Optional[float] = None
+    
     @classmethod
     async def get_dashboard_overview_services(
         cls,
@@ -49,27 +62,21 @@ class DashboardService:
         # 将critical设备合并到warning中
         combined_warning_devices = health_distribution['warning'] + health_distribution['critical']
         
-        # 获取基于业务IP的真实在线/离线设备统计
-        # 如果force_refresh为True，则不使用缓存；否则使用3分钟缓存
-        use_cache = not force_refresh
-        cache_ttl = 3 if not force_refresh else 0
+        # 获取基于业务IP的真实在线/离线设备统计（读取监控周期与后台探测写入的连通性记录，不在请求中探测）
+        # 如果force_refresh为True，另行投递后台探测任务全量刷新连通性记录
+        if force_refresh:
+            ConnectivityService.request_background_probe(skip_seconds=0)
         
-        connectivity_stats = await ConnectivityService.get_connectivity_statistics(
-            db, use_cache=use_cache, cache_ttl_minutes=cache_ttl
-        )
+        connectivity_stats = await ConnectivityService.get_connectivity_statistics(db)
         online_devices = connectivity_stats.get('online_devices', 0)
         offline_devices = connectivity_stats.get('offline_devices', 0)
         
-        # 获取7天告警统计
-        alert_stats_7d = await AlertDao.get_alert_statistics(db, 7)
-        
-        # 获取30天告警统计
-        alert_stats_30d = await AlertDao.get_alert_statistics(db, 30)
-        
-        # 获取当前告警统计
-        current_urgent_alerts = await cls._get_current_alert_count(db, 'urgent')
-        current_scheduled_alerts = await cls._get_current_alert_count(db, 'scheduled')
-
+        # 7天、30天告警统计及当前告警统计（一次查询）
+        alert_stats = await AlertDao.get_alert_window_statistics(db, [7, 30])
+        alert_stats_7d = alert_stats['windows'][7]
+        alert_stats_30d = alert_stats['windows'][30]
+        current_urgent_alerts = alert_stats['current_urgent_alerts']
+        current_scheduled_alerts = alert_stats['current_scheduled_alerts']
         
         return DashboardOverviewModel(
             totalDevices=device_stats['total_devices'],
@@ -256,7 +263,7 @@ class DashboardService:
         limit: int = 20
     ) -> List[DeviceHealthSummaryListModel]:
         """
-        获取设备健康汇总列表
+        获取设备健康汇总列表（第一页）
         
         Args:
             db: 数据库会话
@@ -265,52 +272,51 @@ class DashboardService:
         Returns:
             List[DeviceHealthSummaryListModel]: 设备健康汇总列表
         """
-        # 获取监控设备列表
-        devices = await DeviceDao.get_monitoring_devices(db)
-        
-        result = []
-        for device in devices[:limit]:
-            # 读取真实的设备健康状态（来自 device_info 表与告警表）
-            overallHealth = (device.health_status or "unknown").lower()
-            # 组件健康：用最近活跃告警推断（有告警则标记 warning，否则 ok）
-            deviceAlerts = await AlertService.get_device_alerts_services(db, device.device_id)
-            alertCount = len(deviceAlerts)
-
-            def comp_health(component: str) -> str:
-                for a in deviceAlerts:
-                    if a.component_type.lower() in component:
-                        return a.health_status
-                return "ok"
-
-            processorHealth = comp_health("processor")
-            memoryHealth = comp_health("memory")
-            storageHealth = comp_health("storage")
-            thermalHealth = "ok"  # 无专门热告警则视为ok
-            powerHealth = comp_health("power")
-
-            # 设备连接状态基于业务 IP 连通性缓存统计（简化：有业务IP则 Connected，否则 Unknown）
-            connectionStatus = "Connected" if device.business_ip else "Unknown"
-
-            result.append(DeviceHealthSummaryListModel(
-                deviceId=device.device_id,
-                hostname=device.hostname,
-                businessIp=device.business_ip,
-                location=device.location or "Unknown",
-                manufacturer=device.manufacturer or "Unknown",
-                model=device.model or "Unknown",
-                overallHealth=overallHealth,
-                powerState=device.operating_system or "On",
-                processorHealth=processorHealth,
-                memoryHealth=memoryHealth,
-                storageHealth=storageHealth,
-                thermalHealth=thermalHealth,
-                powerHealth=powerHealth,
-                alertCount=alertCount,
-                lastCheckTime=device.last_check_time or datetime.now(),
-                connectionStatus=connectionStatus
-            ))
+        page = await cls.get_device_health_summary_page_services(db, DeviceHealthSummaryQueryModel(pageSize=limit))
+        return page.rows
+    
+    @classmethod
+    async def get_device_health_summary_page_services(
+        cls,
+        db: AsyncSession,
+        query_model: DeviceHealthSummaryQueryModel
+    ) -> PageResponseModel:
+        """
+        分页获取设备健康汇总（读取设备组件健康汇总表，服务端分页排序）
         
-        return result
+        Args:
+            db: 数据库会话
+            query_model: 分页排序参数
+            
+        Returns:
+            PageResponseModel: rows 为 DeviceHealthSummaryListModel 列表
+        """
+        page = await DeviceHealthRollupDao.get_summary_page(
+            db, query_model.page_num, query_model.page_size, query_model.sort_by, query_model.sort_order
+        )
+        page.rows = [
+            DeviceHealthSummaryListModel(
+                deviceId=row.device_id,
+                hostname=row.hostname or "",
+                businessIp=row.business_ip or "",
+                location=row.location or "Unknown",
+                manufacturer=row.manufacturer or "Unknown",
+                model=row.model or "Unknown",
+                overallHealth=(row.health_status or "unknown").lower(),
+                powerState=row.operating_system or "On",
+                processorHealth=row.processor_health,
+                memoryHealth=row.memory_health,
+                storageHealth=row.storage_health,
+                thermalHealth=row.thermal_health,
+                powerHealth=row.power_health,
+                alertCount=row.alert_count,
+                lastCheckTime=row.last_check_time or datetime.now(),
+                # 设备连接状态简化处理：有业务IP则 Connected，否则 Unknown
+                connectionStatus="Connected" if row.business_ip else "Unknown"
+            )
+            for row in page.rows
+        ]
+        return page
     
     @classmethod
     async def get_system_health_metrics_services(
@@ -362,8 +368,10 @@ class DashboardService:
         """
         获取完整的首页数据
         
+        快照在Redis中短时缓存并在监控结果入库后失效，多个用户同时刷新首页时只构建一次
+        
         Args:
-            db: 数据库会话
+            db: 数据库会话（快照构建使用独立会话，此处不使用）
             query_model: 查询模型
             force_refresh: 是否强制刷新，跳过缓存
             
@@ -372,20 +380,50 @@ class DashboardService:
         """
         # 解析时间范围
         days = 7
-        if query_model.timeRange == "30d":
+        if query_model.time_range == "30d":
             days = 30
-        elif query_model.timeRange == "90d":
+        elif query_model.time_range == "90d":
             days = 90
+        elif query_model.time_range == "365d":
+            days = 365
         
-        # 并行获取各种数据
-        overview = await cls.get_dashboard_overview_services(db, query_model, force_refresh)
-        alert_trend = await cls.get_alert_trend_chart_services(db, days)
-        device_health_chart = await cls.get_device_health_chart_services(db)
-        realtime_alerts = await cls.get_realtime_alert_list_services(db, 10)
-        scheduled_alerts = await cls.get_scheduled_alert_list_services(db, 10)
-        device_health_summary = await cls.get_device_health_summary_services(db, 20)
-        alert_distribution = await AlertService.get_alert_distribution_services(db)
-        system_metrics = await cls.get_system_health_metrics_services(db)
+        snapshot = await DashboardSnapshotCache.get_or_build(
+            f'{days}d',
+            lambda: cls._build_dashboard_snapshot(query_model, days, force_refresh),
+            force_refresh
+        )
+        return DashboardDataModel.model_validate_json(snapshot)
+    
+    @classmethod
+    async def _build_dashboard_snapshot(cls, query_model: DashboardQueryModel, days: int, force_refresh: bool) -> str:
+        """
+        构建首页完整数据快照：各部分互不依赖，分别使用连接池中的独立会话并发查询
+        
+        Args:
+            query_model: 查询模型
+            days: 告警趋势统计天数
+            force_refresh: 是否强制刷新连通性统计
+            
+        Returns:
+            str: 序列化后的 DashboardDataModel
+        """
+        async def with_session(service, *args):
+            async with AsyncSessionLocal() as session:
+                return await service(session, *args)
+        
+        (
+            overview, alert_trend, device_health_chart, realtime_alerts,
+            scheduled_alerts, device_health_summary, alert_distribution, system_metrics
+        ) = await asyncio.gather(
+            with_session(cls.get_dashboard_overview_services, query_model, force_refresh),
+            with_session(cls.get_alert_trend_chart_services, days),
+            with_session(cls.get_device_health_chart_services),
+            with_session(cls.get_realtime_alert_list_services, 10),
+            with_session(cls.get_scheduled_alert_list_services, 10),
+            with_session(cls.get_device_health_summary_services, 20),
+            with_session(AlertService.get_alert_distribution_services),
+            with_session(cls.get_system_health_metrics_services)
+        )
         
         return DashboardDataModel(
             overview=overview,
@@ -396,7 +434,119 @@ class DashboardService:
             deviceHealthSummary=device_health_summary,
             alertDistribution=alert_distribution,
             systemMetrics=system_metrics
+        ).model_dump_json()
+    
+    @classmethod
+    async def _build_dashboard_state(cls) -> Dict[str, Any]:
+        """
+        构建首页版本化状态：概览计数、健康分布与Top-N告警列表（字段与对应接口的返回一致）
+        
+        Returns:
+            Dict[str, Any]: 首页状态
+        """
+        async def with_session(service, *args):
+            async with AsyncSessionLocal() as session:
+                return await service(session, *args)
+        
+        top_n = RedfishConfig.redfish_dashboard_state_top_n
+        overview, device_health_chart, realtime_alerts, scheduled_alerts = await asyncio.gather(
+            with_session(cls.get_dashboard_overview_services, DashboardQueryModel()),
+            with_session(cls.get_device_health_chart_services),
+            with_session(cls.get_realtime_alert_list_services, top_n),
+            with_session(cls.get_scheduled_alert_list_services, top_n)
         )
+        
+        # 生成时间与告警持续时间随当前时间变化，不计入状态，避免每次重算都整体替换；持续时间由前端按首次发生时间计算
+        overview = overview.model_dump(mode='json', by_alias=True, exclude={'lastUpdateTime'})
+        return {
+            'overview': overview,
+            'deviceHealthChart': device_health_chart.model_dump(mode='json', by_alias=True),
+            'realtimeAlerts': [
+                alert.model_dump(mode='json', by_alias=True, exclude={'duration'}) for alert in realtime_alerts
+            ],
+            'scheduledAlerts': [alert.model_dump(mode='json', by_alias=True) for alert in scheduled_alerts]
+        }
+    
+    @classmethod
+    async def sync_dashboard_state(cls, requested_at: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """
+        重算首页状态，有变化时向dashboard房间推送增量
+        
+        Args:
+            requested_at: 触发重算的变化时间（其他进程已在此之后重算时跳过）
+            
+        Returns:
+            Optional[Dict[str, Any]]: 增量，无变化时为None
+        """
+        delta = await DashboardStateStore.commit(cls._build_dashboard_state, requested_at)
+        if delta:
+            await EventBus.publish(["dashboard"], {
+                "type": "dashboard_delta",
+                "action": "state_patch",
+                **delta,
+                "timestamp": datetime.now().isoformat()
+            })
+            logger.debug(f'首页状态更新到版本 {delta["revision"]}: {len(delta["ops"])} 项变化')
+        return delta
+    
+    @classmethod
+    def request_dashboard_state_sync(cls):
+        """
+        标记首页数据有变化（由WebSocket管理器在持有连接的事件循环中调用）：
+        重算在后台串行执行，两次重算至少间隔 redfish_dashboard_state_interval 秒，期间的变化合并到下一次
+        """
+        if cls._state_sync_requested_at is None:
+            cls._state_sync_requested_at = time.time()
+        if cls._state_sync_task is None or cls._state_sync_task.done():
+            cls._state_sync_task = asyncio.create_task(cls._run_dashboard_state_sync())
+    
+    @classmethod
+    async def _run_dashboard_state_sync(cls):
+        """后台重算首页状态，直到没有待处理的变化"""
+        while cls._state_sync_requested_at is not None:
+            requested_at, cls._state_sync_requested_at = cls._state_sync_requested_at, None
+            try:
+                await cls.sync_dashboard_state(requested_at)
+            except Exception as e:
+                logger.error(f'首页状态重算失败: {str(e)}')
+            await asyncio.sleep(RedfishConfig.redfish_dashboard_state_interval)
+    
+    @classmethod
+    async def get_dashboard_sync_message(cls, revision: Optional[int] = None) -> Dict[str, Any]:
+        """
+        客户端（重）连接后的状态同步：版本连续时补发缺失的增量，否则下发完整状态
+        
+        Args:
+            revision: 客户端当前版本（首次连接为空）
+            
+        Returns:
+            Dict[str, Any]: dashboard_replay（增量列表）或 dashboard_state（完整状态）消息
+        """
+        current = await DashboardStateStore.snapshot()
+        if current is None:
+            await cls.sync_dashboard_state()
+            current = await DashboardStateStore.snapshot()
+        if current is None:
+            raise RuntimeError('首页状态不可用')
+        
+        if revision is not None and 0 <= revision <= current['revision']:
+            deltas = await DashboardStateStore.replay(revision, current['revision'])
+            if deltas is not None:
+                return {
+                    "type": "dashboard_replay",
+                    "action": "state_replay",
+                    "revision": current['revision'],
+                    "deltas": deltas,
+                    "timestamp": datetime.now().isoformat()
+                }
+        
+        return {
+            "type": "dashboard_state",
+            "action": "state_snapshot",
+            "revision": current['revision'],
+            "state": current['state'],
+            "timestamp": datetime.now().isoformat()
+        }
     
     @classmethod
     async def _get_device_health_distribution(cls, db: AsyncSession) -> Dict[str, int]:
@@ -431,32 +581,6 @@ class DashboardService:
             'unknown': status_counts.get('unknown', 0)
         }
 
-    @classmethod
-    async def _get_current_alert_count(cls, db: AsyncSession, urgency_level: str) -> int:
-        """
-        获取当前指定紧急程度的告警数量
-        
-        Args:
-            db: 数据库会话
-            urgency_level: 紧急程度
-            
-        Returns:
-            int: 告警数量
-        """
-        from sqlalchemy import select, func, and_
-        from module_redfish.entity.do.alert_do import AlertInfoDO
-        
-        result = await db.execute(
-            select(func.count(AlertInfoDO.alert_id)).where(
-                and_(
-                    AlertInfoDO.alert_status == 'active',
-                    AlertInfoDO.urgency_level == urgency_level,
-                    AlertInfoDO.del_flag == 0  # 添加del_flag条件，排除逻辑删除的告警
-                )
-            )
-        )
-        return result.scalar() or 0
-    
     @classmethod
     def _calculate_duration(cls, start_time: datetime) -> str:
         """
@@ -4,7 +4,6 @@
 import asyncio
 import subprocess
 import socket
-import platform
 from datetime import datetime
 from typing import Dict, List, Any
 from sqlalchemy import select
@@ -13,6 +12,8 @@ from module_redfish.dao.device_dao import DeviceDao
 from module_redfish.entity.do.device_do import DeviceInfoDO
 from module_redfish.entity.vo.device_vo import DeviceConnectionResult
 from module_redfish.core.redfish_client import RedfishClient, decrypt_password
+from module_redfish.core.reachability import ReachabilityEngine
+from module_redfish.service.connectivity_service import ConnectivityService
 from utils.log_util import logger
 
 
@@ -62,7 +63,8 @@ class DeviceConnectionService:
                 username=device.redfish_username,
                 password=decrypted_password,
                 port=device.oob_port,
-                timeout=6
+                timeout=6,
+                use_session_cache=False  # 连接测试需真实校验凭据
             )
             
             # 尝试连接
@@ -142,42 +144,38 @@ class DeviceConnectionService:
         if not target_ip:
             return {"online": False, "error": "设备业务IP为空", "check_time": datetime.now().isoformat()}
         
-        # 并发执行多种检测方法
-        ping_task = asyncio.create_task(cls._ping_check(target_ip))
-        ssh_task = asyncio.create_task(cls._tcp_port_check(target_ip, 22, timeout=2))
-        http_task = asyncio.create_task(cls._tcp_port_check(target_ip, 80, timeout=2))
-        https_task = asyncio.create_task(cls._tcp_port_check(target_ip, 443, timeout=2))
+        if device_id:
+            probe_ports = ConnectivityService.resolve_probe_ports(device.business_type, device.probe_ports)
+        else:
+            probe_ports = ConnectivityService.resolve_probe_ports()
         
-        # 等待所有检测完成
-        ping_result, ssh_result, http_result, https_result = await asyncio.gather(
-            ping_task, ssh_task, http_task, https_task, return_exceptions=True
+        # ping与端口检测同时进行，端口之间竞速，任一端口连通即取消其余端口检测
+        ping_result, port_results = await asyncio.gather(
+            cls._ping_check(target_ip),
+            ConnectivityService._race_port_checks(target_ip, probe_ports, timeout=2),
+            return_exceptions=True
         )
         
         # 处理异常结果
-        def safe_result(result, method):
-            if isinstance(result, Exception):
-                return {"success": False, "method": method, "error": str(result)}
-            return result
-        
-        ping_result = safe_result(ping_result, "ping")
-        ssh_result = safe_result(ssh_result, "tcp_port_22")
-        http_result = safe_result(http_result, "tcp_port_80") 
-        https_result = safe_result(https_result, "tcp_port_443")
+        if isinstance(ping_result, Exception):
+            ping_result = {"success": False, "method": "ping", "error": str(ping_result)}
+        if isinstance(port_results, Exception):
+            port_results = {}
         
         # 综合判断：ping通或任一端口可达即认为在线
-        online = (ping_result.get("success", False) or 
-                 ssh_result.get("success", False) or 
-                 http_result.get("success", False) or 
-                 https_result.get("success", False))
+        online = ping_result.get("success", False) or any(
+            result.get("success", False) for result in port_results.values()
+        )
         
         return {
             "online": online,
             "hostname": hostname,
             "business_ip": target_ip,
             "ping": ping_result,
-            "ssh_port": ssh_result,
-            "http_port": http_result,
-            "https_port": https_result,
+            "ssh_port": port_results.get("ssh"),
+            "http_port": port_results.get("http"),
+            "https_port": port_results.get("https"),
+            "port_checks": port_results,
             "check_time": datetime.now().isoformat()
         }
     
@@ -254,33 +252,9 @@ class DeviceConnectionService:
     
     @classmethod
     async def _ping_check(cls, ip: str, timeout: int = 3, count: int = 1) -> Dict[str, Any]:
-        """跨平台Ping检测"""
+        """Ping检测（共用ICMP套接字，不启动ping子进程）"""
         try:
-            # 根据操作系统选择ping命令参数
-            system = platform.system().lower()
-            if system == 'windows':
-                cmd = ['ping', '-n', str(count), '-w', str(timeout * 1000), ip]
-            else:  # Linux/macOS
-                cmd = ['ping', '-c', str(count), '-W', str(timeout), ip]
-            
-            # 执行ping命令
-            result = await asyncio.create_subprocess_exec(
-                *cmd,
-                stdout=asyncio.subprocess.PIPE,
-                stderr=asyncio.subprocess.PIPE
-            )
-            stdout, stderr = await result.communicate()
-            
-            success = result.returncode == 0
-            output = stdout.decode() if stdout else stderr.decode()
-            
-            return {
-                "success": success,
-                "method": "ping",
-                "response_time": cls._extract_ping_time(output) if success else None,
-                "output": output if not success else None,
-                "error": None if success else f"Ping failed (code: {result.returncode})"
-            }
+            return await ReachabilityEngine.get().probe(ip, timeout=timeout, attempts=count)
         except Exception as e:
             return {
                 "success": False,
@@ -321,22 +295,3 @@ class DeviceConnectionService:
                 "port": port,
                 "error": str(e)
             }
-    
-    @classmethod
-    def _extract_ping_time(cls, ping_output: str) -> str:
-        """从ping输出中提取响应时间"""
-        try:
-            import re
-            patterns = [
-                r'时间[=<](\d+\.?\d*)ms',  # Windows中文
-                r'time[=<](\d+\.?\d*)\s*ms',  # Linux/macOS英文
-                r'time=(\d+\.?\d*)\s*ms',  # 通用格式
-            ]
-            
-            for pattern in patterns:
-                match = re.search(pattern, ping_output, re.IGNORECASE)
-                if match:
-                    return f"{match.group(1)}ms"
-        except:
-            pass
-        return None
@@ -2,6 +2,7 @@
 Redfish日志服务层
 """
 import asyncio
+import json
 from datetime import datetime, timedelta
 from typing import List, Optional, Dict, Any
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -12,9 +13,14 @@ from module_redfish.entity.vo.redfish_log_vo import (
     RedfishLogQueryModel, AddRedfishLogModel, RedfishLogModel, 
     RedfishLogDetailModel, RedfishLogStatsModel, DeviceLogCollectModel,
     RedfishLogCollectResultModel, RedfishLogCleanupResultModel,
-    RedfishLogTempCollectResultModel
+    RedfishLogTempCollectResultModel, RedfishLogCollectJobModel
 )
 from module_redfish.core.redfish_client import RedfishClient, decrypt_password
+from module_redfish.core.log_collection_job import LogCollectionJobStore
+from module_redfish.core.event_bus import EventBus
+from module_redfish.utils.log_payload_codec import decode_log_payload, encode_log_payload
+from config.database import AsyncSessionLocal
+from config.env import RedfishConfig
 from module_admin.entity.vo.common_vo import CrudResponseModel
 from utils.response_util import ResponseUtil
 from utils.page_util import PageResponseModel, PageUtil
@@ -189,13 +195,13 @@ class RedfishLogService:
                     force_refresh=collect_request.force_refresh
                 )
             
-            # 常规收集模式（原有逻辑）
-            # 获取要收集的设备列表
-            if collect_request.device_id:
-                devices = await DeviceDao.get_device_by_id(db, collect_request.device_id)
-                device_list = [devices] if devices else []
-            else:
-                device_list = await DeviceDao.get_monitoring_devices(db)
+            # 全量收集：提交后台任务，按分块并发收集，通过任务状态接口与WebSocket查看进度
+            if not collect_request.device_id:
+                return await cls.start_log_collection_job_services(db, collect_request, operator)
+            
+            # 单设备收集在请求内完成
+            devices = await DeviceDao.get_device_by_id(db, collect_request.device_id)
+            device_list = [devices] if devices else []
             
             if not device_list:
                 return RedfishLogCollectResultModel(
@@ -257,6 +263,176 @@ class RedfishLogService:
             logger.error(f"收集设备日志失败: {str(e)}")
             raise Exception(f"收集设备日志失败: {str(e)}")
     
+    @classmethod
+    async def start_log_collection_job_services(cls, db: AsyncSession,
+                                                collect_request: DeviceLogCollectModel,
+                                                operator: str):
+        """
+        创建批量日志收集任务并投递到Celery
+        
+        Args:
+            db: 数据库会话
+            collect_request: 收集请求
+            operator: 操作者
+            
+        Returns:
+            RedfishLogCollectJobModel: 任务状态（没有可收集设备时返回RedfishLogCollectResultModel）
+        """
+        from module_redfish.celery_tasks import dispatch_log_collection_chunks
+        
+        device_ids = await DeviceDao.get_monitoring_device_ids(db)
+        if not device_ids:
+            return RedfishLogCollectResultModel(
+                success=False,
+                device_count=0,
+                total_collected=0,
+                critical_collected=0,
+                warning_collected=0,
+                failed_devices=[],
+                message="没有找到可收集的设备"
+            )
+        
+        params = {
+            'log_type': collect_request.log_type,
+            'max_entries': collect_request.max_entries,
+            'force_refresh': collect_request.force_refresh,
+        }
+        job_id = await LogCollectionJobStore.create(device_ids, params, operator)
+        dispatch_log_collection_chunks(job_id, device_ids)
+        logger.info(f"已提交日志收集任务 {job_id}，共 {len(device_ids)} 台设备")
+        
+        job = await LogCollectionJobStore.get(job_id)
+        return RedfishLogCollectJobModel(**job, message=f"已提交 {len(device_ids)} 台设备的日志收集任务")
+    
+    @classmethod
+    async def get_log_collection_job_services(cls, job_id: str) -> RedfishLogCollectJobModel:
+        """
+        查询批量日志收集任务状态
+        
+        Args:
+            job_id: 任务ID
+            
+        Returns:
+            RedfishLogCollectJobModel: 任务状态
+        """
+        job = await LogCollectionJobStore.get(job_id)
+        if not job:
+            raise ValueError("日志收集任务不存在或已过期")
+        message = f"已完成 {job['completed']}/{job['total']} 台设备，失败 {job['failed']} 台"
+        return RedfishLogCollectJobModel(**job, message=message)
+    
+    @classmethod
+    async def resume_log_collection_job_services(cls, job_id: str) -> RedfishLogCollectJobModel:
+        """
+        恢复中断的批量日志收集任务（只重新投递尚未完成的设备）
+        
+        Args:
+            job_id: 任务ID
+            
+        Returns:
+            RedfishLogCollectJobModel: 任务状态
+        """
+        from module_redfish.celery_tasks import dispatch_log_collection_chunks
+        
+        job = await LogCollectionJobStore.get(job_id)
+        if not job:
+            raise ValueError("日志收集任务不存在或已过期")
+        if job['status'] == 'completed':
+            return RedfishLogCollectJobModel(**job, message="任务已完成，无需恢复")
+        if job['status'] == 'running':
+            raise ValueError("任务仍在执行中")
+        
+        pending = await LogCollectionJobStore.pending_devices(job_id)
+        await LogCollectionJobStore.mark_running(job_id)
+        dispatch_log_collection_chunks(job_id, pending)
+        logger.info(f"已恢复日志收集任务 {job_id}，剩余 {len(pending)} 台设备")
+        
+        job = await LogCollectionJobStore.get(job_id)
+        return RedfishLogCollectJobModel(**job, message=f"已重新提交剩余 {len(pending)} 台设备")
+    
+    @classmethod
+    async def collect_log_job_chunk(cls, job_id: str, device_ids: List[int]) -> Dict[str, int]:
+        """
+        执行批量日志收集任务的一个设备分块（在worker常驻事件循环中运行）
+        
+        每台设备使用独立的数据库会话，同时收集的设备数受配置限制；
+        检查点中已完成的设备直接跳过，每台设备完成后立即记录检查点并推送进度
+        
+        Args:
+            job_id: 任务ID
+            device_ids: 设备ID列表
+            
+        Returns:
+            Dict[str, int]: {'collected': 本次收集的设备数, 'skipped': 按检查点跳过的设备数}
+        """
+        job = await LogCollectionJobStore.get(job_id)
+        if not job:
+            logger.warning(f"日志收集任务 {job_id} 不存在或已过期")
+            return {'collected': 0, 'skipped': len(device_ids)}
+        
+        params = job['params']
+        done = await LogCollectionJobStore.done_devices(job_id)
+        pending = [device_id for device_id in device_ids if str(device_id) not in done]
+        semaphore = asyncio.Semaphore(max(1, RedfishConfig.redfish_log_collect_concurrency))
+        
+        async def collect(device_id: int):
+            async with semaphore:
+                device_ip = None
+                result = None
+                try:
+                    async with AsyncSessionLocal() as db:
+                        device = await DeviceDao.get_device_by_id(db, device_id)
+                        if device is None:
+                            raise ValueError(f"设备 {device_id} 不存在")
+                        device_ip = device.oob_ip
+                        result = await cls._collect_single_device_logs(
+                            db=db,
+                            device=device,
+                            log_type=params.get('log_type', 'all'),
+                            max_entries=params.get('max_entries', 100),
+                            force_refresh=params.get('force_refresh', False),
+                            operator=job['operator']
+                        )
+                except Exception as e:
+                    logger.error(f"日志收集任务 {job_id} 中设备 {device_ip or device_id} 收集失败: {str(e)}")
+                
+                try:
+                    progress = await LogCollectionJobStore.record_device(job_id, device_id, device_ip, result)
+                except Exception as e:
+                    logger.warning(f"日志收集任务 {job_id} 记录检查点失败: {str(e)}")
+                    return
+                if progress['added']:
+                    await cls._push_log_job_progress(job_id, device_ip, result is not None, progress)
+        
+        await asyncio.gather(*(collect(device_id) for device_id in pending))
+        return {'collected': len(pending), 'skipped': len(device_ids) - len(pending)}
+    
+    @classmethod
+    async def _push_log_job_progress(cls, job_id: str, device_ip: Optional[str], success: bool,
+                                     progress: Dict[str, int]):
+        """
+        通过dashboard频道推送批量日志收集进度
+        
+        Args:
+            job_id: 任务ID
+            device_ip: 刚完成的设备IP
+            success: 该设备是否收集成功
+            progress: {'completed', 'total'}
+        """
+        completed, total = progress['completed'], progress['total']
+        message = {
+            "type": "log_collection_progress",
+            "action": "log_collection_completed" if completed >= total else "progress_update",
+            "job_id": job_id,
+            "completed": completed,
+            "total": total,
+            "progress": round(completed / total * 100, 2) if total else 100.0,
+            "current_device": device_ip,
+            "device_success": success,
+            "timestamp": datetime.now().isoformat()
+        }
+        await EventBus.publish(["dashboard"], message)
+    
     @classmethod
     async def _collect_single_device_logs(cls, db: AsyncSession, device, log_type: str, 
                                          max_entries: int, force_refresh: bool, operator: str) -> Dict[str, int]:
@@ -296,11 +472,12 @@ class RedfishLogService:
             if not force_refresh:
                 since_timestamp = await RedfishLogDao.get_latest_log_time(db, device.device_id)
             
-            # 获取日志
+            # 获取日志（非强制刷新时按日志服务游标只拉取新条目）
             logs_data = await client.get_event_logs(
                 log_type=log_type,
                 max_entries=max_entries,
-                since_timestamp=since_timestamp
+                since_timestamp=since_timestamp,
+                incremental=not force_refresh
             )
             
             # 过滤并保存日志
@@ -336,16 +513,9 @@ class RedfishLogService:
                     created_time = datetime(1900, 1, 1)
                     is_time_valid = False
                 
-                # 检查是否已存在
-                exists = await RedfishLogDao.check_log_exists(db, device.device_id, entry_id, created_time)
-                if exists:
-                    continue
-                
+                # 已存在的日志在批量插入时由唯一索引跳过，不再逐条查询
                 # 创建日志对象
-                # 将完整的原始Redfish响应保存到备注中
-                import json
-                
-                # 只保存完整的Redfish响应
+                # 完整的原始Redfish响应以紧凑JSON压缩保存
                 original_log_info = log_entry.get('raw_data', {})
                 
                 log_model = AddRedfishLogModel(
@@ -357,23 +527,23 @@ class RedfishLogService:
                     severity=log_entry.get('severity', ''),
                     created_time=created_time,
                     message=log_entry.get('message', ''),
-                    remark=json.dumps(original_log_info, ensure_ascii=False, indent=2),
+                    raw_payload=encode_log_payload(original_log_info),
                     create_by=operator,
                     create_time=datetime.now()
                 )
                 
                 logs_to_save.append(log_model)
-                saved_count += 1
-                
-                if log_entry.get('severity', '').upper() == 'CRITICAL':
-                    critical_count += 1
-                elif log_entry.get('severity', '').upper() == 'WARNING':
-                    warning_count += 1
             
-            # 批量保存日志
+            # 批量保存日志（一次插入，重复日志由数据库跳过）
             if logs_to_save:
-                await RedfishLogDao.add_redfish_logs_batch(db, logs_to_save)
+                inserted_severities = await RedfishLogDao.add_redfish_logs_ignore_duplicates(db, logs_to_save)
                 await db.commit()
+                saved_count = len(inserted_severities)
+                critical_count = sum(1 for severity in inserted_severities if (severity or '').upper() == 'CRITICAL')
+                warning_count = sum(1 for severity in inserted_severities if (severity or '').upper() == 'WARNING')
+            
+            # 日志入库后再推进游标，入库失败时下次仍会重新拉取
+            await client.commit_log_cursors()
             
             return {
                 'total': saved_count,
@@ -600,7 +770,11 @@ class RedfishLogService:
     
     @classmethod
     def _convert_do_to_detail_vo(cls, log_do: RedfishLogDO, hostname: str = None) -> RedfishLogDetailModel:
-        """将数据对象转换为详细视图对象"""
+        """将数据对象转换为详细视图对象（原始条目解压后格式化到备注中，历史数据直接使用备注）"""
+        remark = log_do.remark
+        raw_data = decode_log_payload(log_do.raw_payload)
+        if raw_data is not None:
+            remark = json.dumps(raw_data, ensure_ascii=False, indent=2)
         return RedfishLogDetailModel(
             log_id=str(log_do.log_id),
             device_id=log_do.device_id,
@@ -613,7 +787,7 @@ class RedfishLogService:
             created_time=log_do.created_time,
             collected_time=log_do.collected_time,
             message=log_do.message,
-            remark=log_do.remark,
+            remark=remark,
             create_by=log_do.create_by,
             create_time=log_do.create_time,
             update_by=log_do.update_by,
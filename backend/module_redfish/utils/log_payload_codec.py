@@ -0,0 +1,68 @@
+"""
+Redfish日志原始报文编解码
+原始条目序列化为紧凑JSON后压缩存入二进制列，首字节标识压缩算法，切换算法后历史数据仍可解码
+"""
+import json
+import zlib
+from typing import Any, Optional
+from loguru import logger
+from config.env import RedfishConfig
+
+try:
+    import zstandard
+
+    _ZSTD_AVAILABLE = True
+except ImportError:  # pragma: no cover
+    _ZSTD_AVAILABLE = False
+
+
+_CODEC_ZLIB = 1
+_CODEC_ZSTD = 2
+
+
+def encode_log_payload(payload: Any) -> Optional[bytes]:
+    """
+    压缩日志原始报文
+
+    Args:
+        payload: 原始Redfish条目
+
+    Returns:
+        Optional[bytes]: 压缩后的报文（首字节为算法标识），报文为空时返回None
+    """
+    if not payload:
+        return None
+    data = json.dumps(payload, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+    if RedfishConfig.redfish_log_payload_codec == 'zstd' and _ZSTD_AVAILABLE:
+        return bytes([_CODEC_ZSTD]) + zstandard.ZstdCompressor(level=3).compress(data)
+    return bytes([_CODEC_ZLIB]) + zlib.compress(data, 6)
+
+
+def decode_log_payload(data: Optional[bytes]) -> Optional[Any]:
+    """
+    解压日志原始报文
+
+    Args:
+        data: encode_log_payload 的结果
+
+    Returns:
+        Optional[Any]: 原始Redfish条目，无法解码时返回None
+    """
+    if not data:
+        return None
+    codec, body = data[0], bytes(data[1:])
+    try:
+        if codec == _CODEC_ZSTD:
+            if not _ZSTD_AVAILABLE:
+                logger.warning('Redfish log payload is zstd-compressed but zstandard is not installed')
+                return None
+            body = zstandard.ZstdDecompressor().decompress(body)
+        elif codec == _CODEC_ZLIB:
+            body = zlib.decompress(body)
+        else:
+            logger.warning(f'Unknown Redfish log payload codec: {codec}')
+            return None
+        return json.loads(body)
+    except Exception as e:
+        logger.warning(f'Failed to decode Redfish log payload: {str(e)}')
+        return None
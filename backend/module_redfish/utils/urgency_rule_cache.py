@@ -0,0 +1,67 @@
+"""
+紧急度规则进程内缓存
+监控结果入库时按 (业务类型, 硬件类型) 查询紧急度，避免每台设备每次轮询都重新加载全部规则
+"""
+import threading
+import time
+from typing import Dict, Optional, Tuple
+from loguru import logger
+from sqlalchemy.orm import Session
+from config.env import RedfishConfig
+from module_redfish.entity.do import BusinessHardwareUrgencyRulesDO
+
+
+class UrgencyRuleCache:
+    """紧急度规则缓存（按TTL过期，规则变更任务执行时主动失效）"""
+
+    _rules: Optional[Dict[Tuple[str, str], str]] = None
+    _expires_at = 0.0
+    _lock = threading.Lock()
+
+    @classmethod
+    def get(cls, db: Session) -> Dict[Tuple[str, str], str]:
+        """
+        获取启用的紧急度规则
+
+        Args:
+            db: 同步数据库会话（缓存过期时用于重新加载）
+
+        Returns:
+            Dict[Tuple[str, str], str]: {(业务类型, 小写硬件类型): 紧急程度}
+        """
+        rules = cls._rules
+        if rules is not None and time.monotonic() < cls._expires_at:
+            return rules
+        with cls._lock:
+            if cls._rules is None or time.monotonic() >= cls._expires_at:
+                rows = db.query(
+                    BusinessHardwareUrgencyRulesDO.business_type,
+                    BusinessHardwareUrgencyRulesDO.hardware_type,
+                    BusinessHardwareUrgencyRulesDO.urgency_level
+                ).filter(BusinessHardwareUrgencyRulesDO.is_active == 1).all()
+                cls._rules = {(row.business_type, row.hardware_type.lower()): row.urgency_level for row in rows}
+                cls._expires_at = time.monotonic() + RedfishConfig.redfish_urgency_rules_cache_ttl
+                logger.debug(f'Loaded {len(cls._rules)} urgency rules into cache')
+            return cls._rules
+
+    @classmethod
+    def lookup(cls, db: Session, business_type: str, hardware_type: str) -> str:
+        """
+        查询紧急程度，未配置规则时为择期告警
+
+        Args:
+            db: 同步数据库会话
+            business_type: 业务类型
+            hardware_type: 硬件类型
+
+        Returns:
+            str: 紧急程度
+        """
+        return cls.get(db).get((business_type, (hardware_type or '').lower()), 'scheduled')
+
+    @classmethod
+    def invalidate(cls):
+        """使缓存失效，下次访问时重新加载"""
+        with cls._lock:
+            cls._rules = None
+            cls._expires_at = 0.0
@@ -7,8 +7,11 @@ import asyncio
 from datetime import datetime
 from typing import Dict, Any
 from loguru import logger
-from module_redfish.celery_tasks import monitor_all_devices, cleanup_old_logs
-from module_redfish.core.websocket_manager import websocket_manager
+from module_redfish.celery_tasks import (
+    monitor_all_devices, dispatch_due_devices, cleanup_old_logs, compact_redfish_log_payloads, maintain_partitions,
+    check_all_devices_availability, rollup_alert_daily
+)
+from module_redfish.core.event_bus import EventBus
 
 
 def redfish_device_monitor_job(*args, **kwargs):
@@ -33,18 +36,8 @@ def redfish_device_monitor_job(*args, **kwargs):
         
         logger.info(f"设备监控Celery任务已提交，任务ID: {monitor_result.id}")
         
-        # 创建异步任务进行WebSocket广播
-        try:
-            # 检查是否有运行的事件循环
-            loop = asyncio.get_running_loop()
-            # 在已有循环中创建任务
-            loop.create_task(_broadcast_monitor_start(execution_time, monitor_result.id))
-        except RuntimeError:
-            # 如果没有运行的事件循环，在线程中运行
-            import threading
-            def run_broadcast():
-                asyncio.run(_broadcast_monitor_start(execution_time, monitor_result.id))
-            threading.Thread(target=run_broadcast, daemon=True).start()
+        # 经事件总线广播（由持有WebSocket连接的进程投递）
+        _broadcast_monitor_start(execution_time, monitor_result.id)
         
         # 返回执行结果
         return {
@@ -59,55 +52,71 @@ def redfish_device_monitor_job(*args, **kwargs):
         logger.error(error_msg)
         
         # 广播错误通知
-        try:
-            # 检查是否有运行的事件循环
-            loop = asyncio.get_running_loop()
-            # 在已有循环中创建任务
-            loop.create_task(_broadcast_monitor_error(error_msg))
-        except RuntimeError:
-            # 如果没有运行的事件循环，在线程中运行
-            import threading
-            def run_broadcast():
-                asyncio.run(_broadcast_monitor_error(error_msg))
-            threading.Thread(target=run_broadcast, daemon=True).start()
+        _broadcast_monitor_error(error_msg)
         
         # 重新抛出异常，让APScheduler记录
         raise e
 
 
-def device_downtime_monitor_job(*args, **kwargs):
+def redfish_adaptive_monitor_job(*args, **kwargs):
     """
-    设备宕机检测定时任务执行函数
-    基于业务IP连通性检测设备是否宕机
+    设备自适应监控调度任务执行函数
+    按较短的cron周期（如每30秒）执行，只派发已到期的设备；
+    每台设备的下一次到期时间由其健康状况决定（健康设备长间隔、告警设备短间隔、不可达设备指数退避）。
+    启用本任务时应暂停“设备健康监控任务”，避免重复轮询
     
     Args:
         *args: 位置参数（来自sys_job.job_args）
         **kwargs: 关键字参数（来自sys_job.job_kwargs）
     """
     try:
-        logger.info("开始执行设备宕机检测定时任务")
+        result = dispatch_due_devices.delay()
+        logger.debug(f"设备自适应监控调度任务已提交，任务ID: {result.id}")
+        return {
+            "success": True,
+            "task_id": result.id,
+            "execution_time": datetime.now().isoformat(),
+            "message": "设备自适应监控调度任务执行成功"
+        }
+        
+    except Exception as e:
+        logger.error(f"执行设备自适应监控调度任务失败: {str(e)}")
+        raise e
+
+
+def device_downtime_monitor_job(*args, **kwargs):
+    """
+    设备连通性后台探测定时任务执行函数
+    探测业务IP连通性并刷新首页/连通性统计读取的连通性记录（监控周期刚检测过的设备跳过）
+    
+    Args:
+        *args: 位置参数（来自sys_job.job_args）
+        **kwargs: 关键字参数（来自sys_job.job_kwargs，可传 skip_seconds）
+    """
+    try:
+        logger.info("开始执行设备连通性探测定时任务")
         logger.info(f"接收到的参数 - args: {args}, kwargs: {kwargs}")
         
         # 记录任务执行时间
         execution_time = datetime.now()
         
         # 提交Celery异步任务
-        result = check_all_devices_availability.delay()
+        result = check_all_devices_availability.delay(kwargs.get('skip_seconds'))
         
-        logger.info(f"设备宕机检测Celery任务已提交，任务ID: {result.id}")
+        logger.info(f"设备连通性探测Celery任务已提交，任务ID: {result.id}")
         
-        # 注意: 已删除独立的宕机检测任务，现在统一在monitor_all_devices中处理
+        # 注意: 宕机告警仍统一在monitor_all_devices中生成，此任务只刷新连通性记录
         
         # 返回执行结果
         return {
             "success": True,
             "task_id": result.id,
             "execution_time": execution_time.isoformat(),
-            "message": "设备宕机检测任务执行成功"
+            "message": "设备连通性探测任务执行成功"
         }
         
     except Exception as e:
-        error_msg = f"执行设备宕机检测任务失败: {str(e)}"
+        error_msg = f"执行设备连通性探测任务失败: {str(e)}"
         logger.error(error_msg)
         
         # 错误处理: 已简化为统一监控任务
@@ -156,7 +165,85 @@ def cleanup_old_logs_job(*args, **kwargs):
         raise e
 
 
+def redfish_partition_maintenance_job(*args, **kwargs):
+    """
+    分区维护定时任务执行函数：提前创建 redfish_log / alert_info 的未来月分区
+    
+    Args:
+        *args: 位置参数，第一个参数为提前创建的月数，默认取配置
+        **kwargs: 关键字参数
+    """
+    try:
+        months_ahead = int(args[0]) if args and args[0] else None
+        logger.info("开始执行分区维护任务")
+        
+        result = maintain_partitions.delay(months_ahead)
+        logger.info(f"分区维护Celery任务已提交，任务ID: {result.id}")
+        
+        return {
+            "success": True,
+            "task_id": result.id,
+            "execution_time": datetime.now().isoformat(),
+            "message": "分区维护任务执行成功"
+        }
+        
+    except Exception as e:
+        logger.error(f"执行分区维护任务失败: {str(e)}")
+        raise e
+
 
+def compact_log_payloads_job(*args, **kwargs):
+    """
+    历史日志原始条目压缩定时任务执行函数
+    
+    Args:
+        *args: 位置参数，第一个参数为每批转换的日志数，默认1000
+        **kwargs: 关键字参数
+    """
+    try:
+        batch_size = int(args[0]) if args and args[0] else 1000
+        logger.info(f"开始执行日志原始条目压缩任务，每批 {batch_size} 条")
+        
+        result = compact_redfish_log_payloads.delay(batch_size)
+        logger.info(f"日志原始条目压缩Celery任务已提交，任务ID: {result.id}")
+        
+        return {
+            "success": True,
+            "task_id": result.id,
+            "execution_time": datetime.now().isoformat(),
+            "message": "日志原始条目压缩任务执行成功"
+        }
+        
+    except Exception as e:
+        logger.error(f"执行日志原始条目压缩任务失败: {str(e)}")
+        raise e
+
+
+def alert_daily_rollup_job(*args, **kwargs):
+    """
+    告警按天汇总定时任务执行函数：重算最近几个已结束日期的告警汇总
+    
+    Args:
+        *args: 位置参数，第一个参数为重算的天数，默认取配置（首次启用时可设为365回填历史）
+        **kwargs: 关键字参数
+    """
+    try:
+        days = int(args[0]) if args and args[0] else None
+        logger.info("开始执行告警按天汇总任务")
+        
+        result = rollup_alert_daily.delay(days)
+        logger.info(f"告警按天汇总Celery任务已提交，任务ID: {result.id}")
+        
+        return {
+            "success": True,
+            "task_id": result.id,
+            "execution_time": datetime.now().isoformat(),
+            "message": "告警按天汇总任务执行成功"
+        }
+        
+    except Exception as e:
+        logger.error(f"执行告警按天汇总任务失败: {str(e)}")
+        raise e
 
 
 def manual_trigger_monitor_job(*args, **kwargs):
@@ -186,7 +273,7 @@ def manual_trigger_monitor_job(*args, **kwargs):
         raise e
 
 
-async def _broadcast_monitor_start(execution_time: datetime, task_id: str):
+def _broadcast_monitor_start(execution_time: datetime, task_id: str):
     """
     广播监控任务开始通知
     
@@ -205,14 +292,14 @@ async def _broadcast_monitor_start(execution_time: datetime, task_id: str):
         }
         
         # 广播到dashboard房间
-        await websocket_manager.broadcast_to_room("dashboard", message)
+        EventBus.publish_sync(["dashboard"], message)
         logger.debug("已广播监控任务开始通知")
         
     except Exception as e:
         logger.error(f"广播监控任务开始通知失败: {str(e)}")
 
 
-async def _broadcast_monitor_error(error_message: str):
+def _broadcast_monitor_error(error_message: str):
     """
     广播监控任务错误通知
     
@@ -229,7 +316,7 @@ async def _broadcast_monitor_error(error_message: str):
         }
         
         # 广播到dashboard房间
-        await websocket_manager.broadcast_to_room("dashboard", message)
+        EventBus.publish_sync(["dashboard"], message)
         logger.debug("已广播监控任务错误通知")
         
     except Exception as e:
@@ -366,4 +453,4 @@ async def _async_cleanup_redfish_logs():
             'success': False,
             'message': f'日志清理启动失败: {str(e)}',
             'cleaned_count': 0
-        } 
\ No newline at end of file
+        } 
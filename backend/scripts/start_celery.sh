@@ -2,7 +2,7 @@
 # =====================================================
 # Celery 启动脚本（静默日志版）
 # Author: Zheng Lilin
-# 用法: bash scripts/start_celery.sh {start|stop|restart|status|worker|beat|flower}
+# 用法: bash scripts/start_celery.sh {start|stop|restart|status|worker|monitor|beat|flower}
 # =====================================================
 
 set -Eeuo pipefail
@@ -20,17 +20,20 @@ export PYTHONPATH="${PYTHONPATH}:$(pwd)"
 MODULE_PATH="${MODULE_PATH:-module_redfish.celery_config}"  # Celery 应用模块
 CONCURRENCY="${CONCURRENCY:-4}"      # 并发数
 POOL="${POOL:-threads}"              # 线程池类型：threads 或 prefork
-QUEUES="${QUEUES:-default,monitoring,batch,maintenance}"
+# 消费的队列；availability 为设备连通性探测队列（定时任务 111），缺少时首页连通性统计不会刷新
+QUEUES="${QUEUES:-default,monitoring,batch,availability,maintenance}"
 REDIS_HOST="${REDIS_HOST:-localhost}"
 REDIS_PORT="${REDIS_PORT:-6379}"
 REDIS_DB_BROKER="${REDIS_DB_BROKER:-1}"
 REDIS_DB_BACKEND="${REDIS_DB_BACKEND:-2}"
 FLOWER_PORT="${FLOWER_PORT:-5555}"
+MONITOR_CONCURRENCY="${MONITOR_CONCURRENCY:-2}"  # 监控worker线程数（设备并发由常驻事件循环控制）
 
 # --- 日志与PID目录 ---
 LOG_DIR="logs/celery"
 mkdir -p "$LOG_DIR"
 PID_WORKER="$LOG_DIR/worker.pid"
+PID_MONITOR="$LOG_DIR/monitor.pid"
 PID_BEAT="$LOG_DIR/beat.pid"
 PID_FLOWER="$LOG_DIR/flower.pid"
 SCHED_FILE="$LOG_DIR/celerybeat-schedule"
@@ -66,6 +69,23 @@ start_worker() {
   echo "✅ Worker 已启动 (节点: $NODE_NAME, 日志: $LOG_DIR/worker.log)"
 }
 
+# --- 启动监控专用 Worker ---
+# 只消费 monitoring 队列，每个进程一个常驻事件循环并发监控设备批次
+start_monitor_worker() {
+  echo "🚀 启动 Celery 监控 Worker ..."
+  local NODE_NAME="monitor_$(hostname)_$(date +%s)"
+  python3 -m celery -A "$MODULE_PATH" worker \
+    --loglevel=warning \
+    --concurrency="$MONITOR_CONCURRENCY" \
+    --pool=threads \
+    --queues=monitoring \
+    --hostname="$NODE_NAME" \
+    --logfile="$LOG_DIR/monitor.log" \
+    --pidfile="$PID_MONITOR" \
+    --detach
+  echo "✅ 监控 Worker 已启动 (节点: $NODE_NAME, 日志: $LOG_DIR/monitor.log)"
+}
+
 # --- 启动 Beat ---
 start_beat() {
   echo "⏰ 启动 Celery Beat 调度器 ..."
@@ -97,6 +117,7 @@ start_flower() {
 stop_all() {
   echo "🛑 停止 Celery 相关进程 ..."
   kill_safely "$PID_WORKER"
+  kill_safely "$PID_MONITOR"
   kill_safely "$PID_BEAT"
   kill_safely "$PID_FLOWER"
   pkill -f "celery.*-A ${MODULE_PATH}" 2>/dev/null || true
@@ -112,6 +133,11 @@ status() {
   else
     echo "✗ Worker 未运行"
   fi
+  if is_running "$PID_MONITOR"; then
+    echo "✓ 监控 Worker 运行中 (PID: $(cat "$PID_MONITOR"))"
+  else
+    echo "✗ 监控 Worker 未运行"
+  fi
   if is_running "$PID_BEAT"; then
     echo "✓ Beat 运行中 (PID: $(cat "$PID_BEAT"))"
   else
@@ -135,10 +161,11 @@ case "${1:-}" in
   restart) restart ;;
   status)  status ;;
   worker)  start_worker ;;
+  monitor) start_monitor_worker ;;
   beat)    start_beat ;;
   flower)  start_flower ;;
   *)
-    echo "使用方法: bash $0 {start|stop|restart|status|worker|beat|flower}"
+    echo "使用方法: bash $0 {start|stop|restart|status|worker|monitor|beat|flower}"
     echo "示例: bash scripts/start_celery.sh start"
     ;;
 esac
@@ -2,7 +2,7 @@ from contextlib import asynccontextmanager
 from fastapi import FastAPI, WebSocket
 from config.env import AppConfig
 from config.get_db import init_create_table
-from config.get_redis import RedisUtil
+from config.get_redis import RedisUtil, close_async_redis
 from config.get_scheduler import SchedulerUtil
 from exceptions.handle import handle_exception
 from middlewares.handle import handle_middleware
@@ -32,7 +32,10 @@ from module_redfish.controller.redfish_log_controller import redfishLogControlle
 from module_redfish.controller.connectivity_controller import connectivityController
 from module_redfish.controller.websocket_controller import WebSocketController
 from module_redfish.controller.monitor_config_controller import app3_monitor_config
-from module_redfish.core.websocket_manager import init_websocket_manager, cleanup_websocket_manager
+from module_redfish.core.websocket_manager import init_websocket_manager, cleanup_websocket_manager, websocket_manager
+from module_redfish.service.dashboard_service import DashboardService
+from module_redfish.core.redfish_transport import close_http_clients
+from module_redfish.core.reachability import close_reachability_engine
 # RedfishSchedulerTasks已迁移到APScheduler，由数据库管理
 from sub_applications.handle import handle_sub_applications
 from utils.common_util import worship
@@ -52,6 +55,8 @@ async def lifespan(app: FastAPI):
     
     # 初始化WebSocket管理器
     await init_websocket_manager()
+    # 首页数据变化时重算版本化状态并向客户端推送增量
+    websocket_manager.add_change_listener(DashboardService.request_dashboard_state_sync)
     
     # Redfish监控任务和日志清理任务现在由APScheduler管理，从数据库sys_job表自动加载
     logger.info("Redfish相关定时任务由APScheduler从数据库加载，无需手动初始化")
@@ -63,6 +68,11 @@ async def lifespan(app: FastAPI):
     
     # 清理WebSocket管理器
     await cleanup_websocket_manager()
+    
+    # 关闭Redfish连接池
+    await close_http_clients()
+    await close_async_redis()
+    await close_reachability_engine()
 
 
 # 初始化FastAPI对象
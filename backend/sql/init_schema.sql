@@ -21,6 +21,108 @@ SET default_tablespace = '';
 
 SET default_table_access_method = heap;
 
+--
+-- Name: alert_daily_rollup; Type: TABLE; Schema: public; Owner: -
+--
+
+CREATE TABLE public.alert_daily_rollup (
+    stat_date date NOT NULL,
+    urgency_level character varying(20) NOT NULL,
+    component_type character varying(50) NOT NULL,
+    location character varying(200) DEFAULT ''::character varying NOT NULL,
+    manufacturer character varying(100) DEFAULT ''::character varying NOT NULL,
+    alert_count integer DEFAULT 0 NOT NULL,
+    update_time timestamp(0) without time zone DEFAULT CURRENT_TIMESTAMP
+);
+
+
+--
+-- Name: TABLE alert_daily_rollup; Type: COMMENT; Schema: public; Owner: -
+--
+
+COMMENT ON TABLE public.alert_daily_rollup IS '告警按天汇总表';
+
+
+--
+-- Name: COLUMN alert_daily_rollup.stat_date; Type: COMMENT; Schema: public; Owner: -
+--
+
+COMMENT ON COLUMN public.alert_daily_rollup.stat_date IS '统计日期（告警首次发生日期）';
+
+
+--
+-- Name: COLUMN alert_daily_rollup.urgency_level; Type: COMMENT; Schema: public; Owner: -
+--
+
+COMMENT ON COLUMN public.alert_daily_rollup.urgency_level IS '紧急程度（urgent/scheduled）';
+
+
+--
+-- Name: COLUMN alert_daily_rollup.component_type; Type: COMMENT; Schema: public; Owner: -
+--
+
+COMMENT ON COLUMN public.alert_daily_rollup.component_type IS '组件类型';
+
+
+--
+-- Name: COLUMN alert_daily_rollup.location; Type: COMMENT; Schema: public; Owner: -
+--
+
+COMMENT ON COLUMN public.alert_daily_rollup.location IS '设备位置（设备已删除时为空字符串）';
+
+
+--
+-- Name: COLUMN alert_daily_rollup.manufacturer; Type: COMMENT; Schema: public; Owner: -
+--
+
+COMMENT ON COLUMN public.alert_daily_rollup.manufacturer IS '设备厂商（设备已删除时为空字符串）';
+
+
+--
+-- Name: COLUMN alert_daily_rollup.alert_count; Type: COMMENT; Schema: public; Owner: -
+--
+
+COMMENT ON COLUMN public.alert_daily_rollup.alert_count IS '新增告警数';
+
+
+--
+-- Name: COLUMN alert_daily_rollup.update_time; Type: COMMENT; Schema: public; Owner: -
+--
+
+COMMENT ON COLUMN public.alert_daily_rollup.update_time IS '汇总时间';
+
+
+--
+-- Name: alert_daily_rollup_day; Type: TABLE; Schema: public; Owner: -
+--
+
+CREATE TABLE public.alert_daily_rollup_day (
+    stat_date date NOT NULL,
+    update_time timestamp(0) without time zone DEFAULT CURRENT_TIMESTAMP
+);
+
+
+--
+-- Name: TABLE alert_daily_rollup_day; Type: COMMENT; Schema: public; Owner: -
+--
+
+COMMENT ON TABLE public.alert_daily_rollup_day IS '告警汇总日期标记表';
+
+
+--
+-- Name: COLUMN alert_daily_rollup_day.stat_date; Type: COMMENT; Schema: public; Owner: -
+--
+
+COMMENT ON COLUMN public.alert_daily_rollup_day.stat_date IS '已汇总日期';
+
+
+--
+-- Name: COLUMN alert_daily_rollup_day.update_time; Type: COMMENT; Schema: public; Owner: -
+--
+
+COMMENT ON COLUMN public.alert_daily_rollup_day.update_time IS '汇总时间';
+
+
 --
 -- Name: alert_info; Type: TABLE; Schema: public; Owner: -
 --
@@ -325,6 +427,85 @@ CREATE SEQUENCE public.business_type_dict_type_id_seq
 ALTER SEQUENCE public.business_type_dict_type_id_seq OWNED BY public.business_type_dict.type_id;
 
 
+--
+-- Name: device_health_rollup; Type: TABLE; Schema: public; Owner: -
+--
+
+CREATE TABLE public.device_health_rollup (
+    device_id bigint NOT NULL,
+    processor_health character varying(20) DEFAULT 'ok'::character varying NOT NULL,
+    memory_health character varying(20) DEFAULT 'ok'::character varying NOT NULL,
+    storage_health character varying(20) DEFAULT 'ok'::character varying NOT NULL,
+    thermal_health character varying(20) DEFAULT 'ok'::character varying NOT NULL,
+    power_health character varying(20) DEFAULT 'ok'::character varying NOT NULL,
+    alert_count integer DEFAULT 0 NOT NULL,
+    update_time timestamp(0) without time zone DEFAULT CURRENT_TIMESTAMP
+);
+
+
+--
+-- Name: TABLE device_health_rollup; Type: COMMENT; Schema: public; Owner: -
+--
+
+COMMENT ON TABLE public.device_health_rollup IS '设备组件健康汇总表';
+
+
+--
+-- Name: COLUMN device_health_rollup.device_id; Type: COMMENT; Schema: public; Owner: -
+--
+
+COMMENT ON COLUMN public.device_health_rollup.device_id IS '设备ID';
+
+
+--
+-- Name: COLUMN device_health_rollup.processor_health; Type: COMMENT; Schema: public; Owner: -
+--
+
+COMMENT ON COLUMN public.device_health_rollup.processor_health IS '处理器健康状态';
+
+
+--
+-- Name: COLUMN device_health_rollup.memory_health; Type: COMMENT; Schema: public; Owner: -
+--
+
+COMMENT ON COLUMN public.device_health_rollup.memory_health IS '内存健康状态';
+
+
+--
+-- Name: COLUMN device_health_rollup.storage_health; Type: COMMENT; Schema: public; Owner: -
+--
+
+COMMENT ON COLUMN public.device_health_rollup.storage_health IS '存储健康状态';
+
+
+--
+-- Name: COLUMN device_health_rollup.thermal_health; Type: COMMENT; Schema: public; Owner: -
+--
+
+COMMENT ON COLUMN public.device_health_rollup.thermal_health IS '温度/风扇健康状态';
+
+
+--
+-- Name: COLUMN device_health_rollup.power_health; Type: COMMENT; Schema: public; Owner: -
+--
+
+COMMENT ON COLUMN public.device_health_rollup.power_health IS '电源健康状态';
+
+
+--
+-- Name: COLUMN device_health_rollup.alert_count; Type: COMMENT; Schema: public; Owner: -
+--
+
+COMMENT ON COLUMN public.device_health_rollup.alert_count IS '活跃告警数';
+
+
+--
+-- Name: COLUMN device_health_rollup.update_time; Type: COMMENT; Schema: public; Owner: -
+--
+
+COMMENT ON COLUMN public.device_health_rollup.update_time IS '更新时间';
+
+
 --
 -- Name: device_info; Type: TABLE; Schema: public; Owner: -
 --
@@ -343,6 +524,7 @@ CREATE TABLE public.device_info (
     technical_system character varying(100),
     system_owner character varying(100),
     business_type character varying(50),
+    probe_ports character varying(100),
     redfish_username character varying(100),
     redfish_password character varying(255),
     monitor_enabled smallint DEFAULT 1,
@@ -447,6 +629,13 @@ COMMENT ON COLUMN public.device_info.system_owner IS '系统负责人';
 COMMENT ON COLUMN public.device_info.business_type IS '业务类型（OB/DB/WEB/APP等）';
 
 
+--
+-- Name: COLUMN device_info.probe_ports; Type: COMMENT; Schema: public; Owner: -
+--
+
+COMMENT ON COLUMN public.device_info.probe_ports IS '连通性检测的TCP端口（如 ssh:22,https:443），为空时按业务类型/默认配置';
+
+
 --
 -- Name: COLUMN device_info.redfish_username; Type: COMMENT; Schema: public; Owner: -
 --
@@ -1210,13 +1399,14 @@ CREATE TABLE public.redfish_log (
     log_id uuid DEFAULT gen_random_uuid() NOT NULL,
     device_id integer NOT NULL,
     device_ip character varying(45) NOT NULL,
-    entry_id character varying(100),
+    entry_id character varying(100) NOT NULL,
     entry_type character varying(50),
     log_source character varying(10) NOT NULL,
     severity character varying(20) NOT NULL,
     created_time timestamp without time zone NOT NULL,
     collected_time timestamp without time zone DEFAULT CURRENT_TIMESTAMP NOT NULL,
     message text,
+    raw_payload bytea,
     create_by character varying(50),
     create_time timestamp without time zone DEFAULT CURRENT_TIMESTAMP,
     update_by character varying(50),
@@ -1302,6 +1492,13 @@ COMMENT ON COLUMN public.redfish_log.collected_time IS '日志收集时间';
 COMMENT ON COLUMN public.redfish_log.message IS '日志消息';
 
 
+--
+-- Name: COLUMN redfish_log.raw_payload; Type: COMMENT; Schema: public; Owner: -
+--
+
+COMMENT ON COLUMN public.redfish_log.raw_payload IS '原始条目（压缩JSON）';
+
+
 --
 -- Name: COLUMN redfish_log.create_by; Type: COMMENT; Schema: public; Owner: -
 --
@@ -3406,6 +3603,22 @@ ALTER TABLE ONLY public.sys_role ALTER COLUMN role_id SET DEFAULT nextval('publi
 ALTER TABLE ONLY public.sys_user ALTER COLUMN user_id SET DEFAULT nextval('public.sys_user_user_id_seq'::regclass);
 
 
+--
+-- Name: alert_daily_rollup alert_daily_rollup_pkey; Type: CONSTRAINT; Schema: public; Owner: -
+--
+
+ALTER TABLE ONLY public.alert_daily_rollup
+    ADD CONSTRAINT alert_daily_rollup_pkey PRIMARY KEY (stat_date, urgency_level, component_type, location, manufacturer);
+
+
+--
+-- Name: alert_daily_rollup_day alert_daily_rollup_day_pkey; Type: CONSTRAINT; Schema: public; Owner: -
+--
+
+ALTER TABLE ONLY public.alert_daily_rollup_day
+    ADD CONSTRAINT alert_daily_rollup_day_pkey PRIMARY KEY (stat_date);
+
+
 --
 -- Name: alert_info alert_info_pkey; Type: CONSTRAINT; Schema: public; Owner: -
 --
@@ -3454,6 +3667,14 @@ ALTER TABLE ONLY public.business_type_dict
     ADD CONSTRAINT business_type_dict_type_code_key UNIQUE (type_code);
 
 
+--
+-- Name: device_health_rollup device_health_rollup_pkey; Type: CONSTRAINT; Schema: public; Owner: -
+--
+
+ALTER TABLE ONLY public.device_health_rollup
+    ADD CONSTRAINT device_health_rollup_pkey PRIMARY KEY (device_id);
+
+
 --
 -- Name: device_info device_info_pkey; Type: CONSTRAINT; Schema: public; Owner: -
 --
@@ -3510,6 +3731,14 @@ ALTER TABLE ONLY public.redfish_log
     ADD CONSTRAINT redfish_log_pkey PRIMARY KEY (log_id);
 
 
+--
+-- Name: redfish_log uq_redfish_log_entry; Type: CONSTRAINT; Schema: public; Owner: -
+--
+
+ALTER TABLE ONLY public.redfish_log
+    ADD CONSTRAINT uq_redfish_log_entry UNIQUE (device_id, entry_id, created_time);
+
+
 --
 -- Name: sys_config sys_config_pkey; Type: CONSTRAINT; Schema: public; Owner: -
 --
@@ -3646,6 +3875,13 @@ ALTER TABLE ONLY public.sys_user_role
     ADD CONSTRAINT sys_user_role_pkey PRIMARY KEY (user_id, role_id);
 
 
+--
+-- Name: idx_alert_daily_rollup_urgency; Type: INDEX; Schema: public; Owner: -
+--
+
+CREATE INDEX idx_alert_daily_rollup_urgency ON public.alert_daily_rollup USING btree (urgency_level, stat_date);
+
+
 --
 -- Name: idx_alert_info_del_flag; Type: INDEX; Schema: public; Owner: -
 --
@@ -3730,6 +3966,13 @@ CREATE INDEX idx_business_type_dict_code ON public.business_type_dict USING btre
 CREATE INDEX idx_business_type_dict_sort ON public.business_type_dict USING btree (sort_order);
 
 
+--
+-- Name: idx_device_health_rollup_alert_count; Type: INDEX; Schema: public; Owner: -
+--
+
+CREATE INDEX idx_device_health_rollup_alert_count ON public.device_health_rollup USING btree (alert_count);
+
+
 --
 -- Name: idx_device_info_business_ip; Type: INDEX; Schema: public; Owner: -
 --
@@ -3976,6 +4219,14 @@ ALTER TABLE ONLY public.alert_info
     ADD CONSTRAINT alert_info_device_id_fkey FOREIGN KEY (device_id) REFERENCES public.device_info(device_id) ON UPDATE CASCADE ON DELETE SET NULL;
 
 
+--
+-- Name: device_health_rollup device_health_rollup_device_id_fkey; Type: FK CONSTRAINT; Schema: public; Owner: -
+--
+
+ALTER TABLE ONLY public.device_health_rollup
+    ADD CONSTRAINT device_health_rollup_device_id_fkey FOREIGN KEY (device_id) REFERENCES public.device_info(device_id) ON DELETE CASCADE;
+
+
 --
 -- Name: maintenance_schedule maintenance_schedule_device_id_fkey; Type: FK CONSTRAINT; Schema: public; Owner: -
 --
@@ -4431,8 +4682,11 @@ INSERT INTO public.sys_role_menu (role_id, menu_id) VALUES (4, 200252);
 INSERT INTO public.sys_role_menu (role_id, menu_id) VALUES (4, 200260);
 
 INSERT INTO public.sys_job (job_id, job_name, job_group, job_executor, invoke_target, job_args, job_kwargs, cron_expression, misfire_policy, concurrent, status, create_by, create_time, update_by, update_time, remark) VALUES (104, '设备健康监控任务', 'default', 'default', 'module_task.redfish_monitor_tasks.redfish_device_monitor_job', '', '', '0 0/5 * * * *', '3', '1', '1', 'admin', '2025-07-02 20:03:58', 'admin', '2025-08-20 17:46:55', '设备监控任务每5分钟执行一次（包含硬件健康+宕机检测）');
+INSERT INTO public.sys_job (job_id, job_name, job_group, job_executor, invoke_target, job_args, job_kwargs, cron_expression, misfire_policy, concurrent, status, create_by, create_time, update_by, update_time, remark) VALUES (105, '设备自适应监控调度', 'default', 'default', 'module_task.redfish_monitor_tasks.redfish_adaptive_monitor_job', '', '', '0/30 * * * * *', '3', '1', '1', 'admin', '2026-10-18 00:00:00', '', NULL, '每30秒派发已到期的设备：健康设备长间隔、告警设备短间隔、不可达设备指数退避。启用时请暂停设备健康监控任务');
 INSERT INTO public.sys_job (job_id, job_name, job_group, job_executor, invoke_target, job_args, job_kwargs, cron_expression, misfire_policy, concurrent, status, create_by, create_time, update_by, update_time, remark) VALUES (106, '手动触发设备监控', 'default', 'default', 'module_task.redfish_monitor_tasks.manual_trigger_monitor_job', '', '{}', '', '1', '0', '1', 'admin', '2025-07-02 20:03:58', 'admin', '2025-07-02 20:03:58', '手动触发设备监控任务，用于测试或紧急检查。可通过定时任务管理界面手动执行。');
-INSERT INTO public.sys_job (job_id, job_name, job_group, job_executor, invoke_target, job_args, job_kwargs, cron_expression, misfire_policy, concurrent, status, create_by, create_time, update_by, update_time, remark) VALUES (111, '设备宕机检测任务', 'default', 'default', 'module_task.redfish_monitor_tasks.device_downtime_monitor_job', '', '', '0 */2 * * * *', '3', '1', '1', 'system', '2025-08-20 15:39:26', 'admin', '2025-08-20 17:19:37', '定期检测设备业务IP连通性，发现宕机立即告警，支持1000台设备');
+INSERT INTO public.sys_job (job_id, job_name, job_group, job_executor, invoke_target, job_args, job_kwargs, cron_expression, misfire_policy, concurrent, status, create_by, create_time, update_by, update_time, remark) VALUES (107, '日志与告警分区维护', 'default', 'default', 'module_task.redfish_monitor_tasks.redfish_partition_maintenance_job', '', '', '0 30 1 * * *', '3', '1', '1', 'admin', '2026-10-18 00:00:00', '', NULL, '每天提前创建redfish_log/alert_info未来几个月的分区。仅在执行sql/partition_tables_pg.sql并开启REDFISH_PARTITIONING_ENABLED后启用');
+INSERT INTO public.sys_job (job_id, job_name, job_group, job_executor, invoke_target, job_args, job_kwargs, cron_expression, misfire_policy, concurrent, status, create_by, create_time, update_by, update_time, remark) VALUES (108, '告警按天汇总', 'default', 'default', 'module_task.redfish_monitor_tasks.alert_daily_rollup_job', '', '', '0 10 0 * * *', '3', '1', '1', 'admin', '2026-10-18 00:00:00', '', NULL, '每天凌晨重算最近几个已结束日期的告警按天汇总，告警趋势与历史分布读取汇总表。首次启用时可将参数设为365回填历史');
+INSERT INTO public.sys_job (job_id, job_name, job_group, job_executor, invoke_target, job_args, job_kwargs, cron_expression, misfire_policy, concurrent, status, create_by, create_time, update_by, update_time, remark) VALUES (111, '设备连通性探测任务', 'default', 'default', 'module_task.redfish_monitor_tasks.device_downtime_monitor_job', '', '', '0 */2 * * * *', '3', '1', '0', 'system', '2025-08-20 15:39:26', 'admin', '2025-08-20 17:19:37', '后台探测设备业务IP连通性并刷新首页连通性统计（监控周期刚检测过的设备跳过），宕机告警由设备监控任务生成。默认启用，探测任务投递到availability队列，Celery Worker需消费该队列');
 INSERT INTO public.sys_job (job_id, job_name, job_group, job_executor, invoke_target, job_args, job_kwargs, cron_expression, misfire_policy, concurrent, status, create_by, create_time, update_by, update_time, remark) VALUES (112, '清理旧日志和告警', 'default', 'default', 'module_task.redfish_monitor_tasks.redfish_log_cleanup_job', '30', '', '0 0 2 * * *', '3', '1', '1', 'system', '2025-08-20 15:39:26', 'admin', '2025-08-20 17:19:40', '定期清理超过30天的旧Redfish日志和已解决的告警');
 INSERT INTO public.sys_job (job_id, job_name, job_group, job_executor, invoke_target, job_args, job_kwargs, cron_expression, misfire_policy, concurrent, status, create_by, create_time, update_by, update_time, remark) VALUES (113, 'Redfish日志清理任务', 'default', 'default', 'module_redfish.tasks.log_cleanup_task.cleanup_old_redfish_logs', '', '', '0 0 2 * * *', '2', '0', '1', 'admin', '2025-08-21 19:49:18', '', NULL, '自动清理30天前的Redfish日志记录，轻量版设计每日执行');
 
@@ -0,0 +1,123 @@
+--
+-- 将 redfish_log（按 created_time）与 alert_info（按 first_occurrence）转换为按月范围分区表
+-- 适用于 PostgreSQL 13+，请在维护窗口内执行一次（执行期间两张表被锁定）
+-- 旧库需先执行 upgrade_redfish_log_entry_key.sql，保证 redfish_log 中没有重复条目
+-- 执行后在 .env 中设置 REDFISH_PARTITIONING_ENABLED = true，并启用“日志与告警分区维护”定时任务
+--
+
+BEGIN;
+
+--
+-- 按数据覆盖的月份及未来若干个月创建分区，另建默认分区承接超出范围的数据（如未知时间的日志）
+--
+
+CREATE OR REPLACE FUNCTION pg_temp.create_month_partitions(parent text, first_month date, months_ahead integer)
+RETURNS void
+LANGUAGE plpgsql
+AS $function$
+DECLARE
+    month_start date;
+BEGIN
+    FOR month_start IN
+        SELECT generate_series(
+            date_trunc('month', first_month)::date,
+            (date_trunc('month', CURRENT_DATE) + make_interval(months => months_ahead))::date,
+            interval '1 month'
+        )::date
+    LOOP
+        EXECUTE format(
+            'CREATE TABLE IF NOT EXISTS public.%I PARTITION OF public.%I FOR VALUES FROM (%L) TO (%L)',
+            parent || '_p' || to_char(month_start, 'YYYYMM'), parent,
+            month_start, (month_start + interval '1 month')::date
+        );
+    END LOOP;
+    EXECUTE format('CREATE TABLE IF NOT EXISTS public.%I PARTITION OF public.%I DEFAULT', parent || '_default', parent);
+END;
+$function$;
+
+
+--
+-- redfish_log
+--
+
+ALTER TABLE public.redfish_log RENAME TO redfish_log_legacy;
+
+CREATE TABLE public.redfish_log (LIKE public.redfish_log_legacy INCLUDING DEFAULTS INCLUDING COMMENTS)
+    PARTITION BY RANGE (created_time);
+
+-- 早于2000年的日志为“未知时间”占位数据，进入默认分区
+SELECT pg_temp.create_month_partitions(
+    'redfish_log',
+    COALESCE((SELECT min(created_time) FROM public.redfish_log_legacy WHERE created_time >= '2000-01-01'), CURRENT_DATE)::date,
+    3
+);
+
+INSERT INTO public.redfish_log SELECT * FROM public.redfish_log_legacy;
+
+DROP TABLE public.redfish_log_legacy;
+
+-- 分区表的主键与唯一约束必须包含分区键
+ALTER TABLE ONLY public.redfish_log
+    ADD CONSTRAINT redfish_log_pkey PRIMARY KEY (log_id, created_time);
+
+ALTER TABLE ONLY public.redfish_log
+    ADD CONSTRAINT uq_redfish_log_entry UNIQUE (device_id, entry_id, created_time);
+
+CREATE INDEX idx_redfish_log_collected_time ON public.redfish_log USING btree (collected_time);
+CREATE INDEX idx_redfish_log_created_time ON public.redfish_log USING btree (created_time);
+CREATE INDEX idx_redfish_log_device_id ON public.redfish_log USING btree (device_id);
+CREATE INDEX idx_redfish_log_device_ip ON public.redfish_log USING btree (device_ip);
+CREATE INDEX idx_redfish_log_device_time ON public.redfish_log USING btree (device_id, created_time);
+CREATE INDEX idx_redfish_log_severity ON public.redfish_log USING btree (severity);
+CREATE INDEX idx_redfish_log_source ON public.redfish_log USING btree (log_source);
+
+
+--
+-- alert_info
+--
+
+ALTER TABLE public.alert_info RENAME TO alert_info_legacy;
+
+-- 序列归属旧表，删除旧表前先解除归属
+ALTER SEQUENCE public.alert_info_alert_id_seq OWNED BY NONE;
+
+CREATE TABLE public.alert_info (LIKE public.alert_info_legacy INCLUDING DEFAULTS INCLUDING COMMENTS)
+    PARTITION BY RANGE (first_occurrence);
+
+SELECT pg_temp.create_month_partitions(
+    'alert_info',
+    COALESCE((SELECT min(first_occurrence) FROM public.alert_info_legacy), CURRENT_DATE)::date,
+    3
+);
+
+INSERT INTO public.alert_info SELECT * FROM public.alert_info_legacy;
+
+DROP TABLE public.alert_info_legacy;
+
+ALTER SEQUENCE public.alert_info_alert_id_seq OWNED BY public.alert_info.alert_id;
+
+ALTER TABLE ONLY public.alert_info
+    ADD CONSTRAINT alert_info_pkey PRIMARY KEY (alert_id, first_occurrence);
+
+ALTER TABLE public.alert_info
+    ADD CONSTRAINT alert_info_device_id_fkey FOREIGN KEY (device_id) REFERENCES public.device_info(device_id) ON UPDATE CASCADE ON DELETE SET NULL;
+
+CREATE INDEX idx_alert_info_del_flag ON public.alert_info USING btree (del_flag);
+CREATE INDEX idx_alert_info_device_component ON public.alert_info USING btree (device_id, component_type);
+CREATE INDEX idx_alert_info_device_del_flag ON public.alert_info USING btree (device_id, del_flag) WHERE (del_flag = 0);
+CREATE INDEX idx_alert_info_device_id ON public.alert_info USING btree (device_id);
+CREATE INDEX idx_alert_info_first_occurrence ON public.alert_info USING btree (first_occurrence);
+CREATE INDEX idx_alert_info_health_status ON public.alert_info USING btree (health_status);
+CREATE INDEX idx_alert_info_status ON public.alert_info USING btree (alert_status);
+CREATE INDEX idx_alert_info_status_del_flag ON public.alert_info USING btree (alert_status, del_flag) WHERE (del_flag = 0);
+CREATE INDEX idx_alert_info_urgency_status ON public.alert_info USING btree (urgency_level, alert_status);
+CREATE INDEX ix_alert_info_display ON public.alert_info USING btree (alert_status, urgency_level, last_occurrence DESC);
+CREATE INDEX ix_alert_info_first_occurrence ON public.alert_info USING btree (first_occurrence);
+CREATE INDEX ix_alert_info_lifecycle ON public.alert_info USING btree (device_id, component_type, component_name, alert_status);
+
+CREATE TRIGGER trigger_alert_info_update_time BEFORE UPDATE ON public.alert_info FOR EACH ROW EXECUTE FUNCTION public.update_alert_info_updated_time();
+
+COMMIT;
+
+ANALYZE public.redfish_log;
+ANALYZE public.alert_info;
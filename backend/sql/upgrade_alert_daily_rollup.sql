@@ -0,0 +1,44 @@
+--
+-- 为已有库创建告警按天汇总表 alert_daily_rollup 与汇总日期标记表 alert_daily_rollup_day
+-- 适用于 PostgreSQL，可重复执行；未标记的日期实时统计，执行后可手动运行一次“告警按天汇总”任务（参数365）回填历史
+--
+
+BEGIN;
+
+CREATE TABLE IF NOT EXISTS public.alert_daily_rollup (
+    stat_date date NOT NULL,
+    urgency_level character varying(20) NOT NULL,
+    component_type character varying(50) NOT NULL,
+    location character varying(200) DEFAULT ''::character varying NOT NULL,
+    manufacturer character varying(100) DEFAULT ''::character varying NOT NULL,
+    alert_count integer DEFAULT 0 NOT NULL,
+    update_time timestamp(0) without time zone DEFAULT CURRENT_TIMESTAMP,
+    CONSTRAINT alert_daily_rollup_pkey PRIMARY KEY (stat_date, urgency_level, component_type, location, manufacturer)
+);
+
+CREATE INDEX IF NOT EXISTS idx_alert_daily_rollup_urgency ON public.alert_daily_rollup USING btree (urgency_level, stat_date);
+
+COMMENT ON TABLE public.alert_daily_rollup IS '告警按天汇总表';
+COMMENT ON COLUMN public.alert_daily_rollup.stat_date IS '统计日期（告警首次发生日期）';
+COMMENT ON COLUMN public.alert_daily_rollup.urgency_level IS '紧急程度（urgent/scheduled）';
+COMMENT ON COLUMN public.alert_daily_rollup.component_type IS '组件类型';
+COMMENT ON COLUMN public.alert_daily_rollup.location IS '设备位置（设备已删除时为空字符串）';
+COMMENT ON COLUMN public.alert_daily_rollup.manufacturer IS '设备厂商（设备已删除时为空字符串）';
+COMMENT ON COLUMN public.alert_daily_rollup.alert_count IS '新增告警数';
+COMMENT ON COLUMN public.alert_daily_rollup.update_time IS '汇总时间';
+
+CREATE TABLE IF NOT EXISTS public.alert_daily_rollup_day (
+    stat_date date NOT NULL,
+    update_time timestamp(0) without time zone DEFAULT CURRENT_TIMESTAMP,
+    CONSTRAINT alert_daily_rollup_day_pkey PRIMARY KEY (stat_date)
+);
+
+COMMENT ON TABLE public.alert_daily_rollup_day IS '告警汇总日期标记表';
+COMMENT ON COLUMN public.alert_daily_rollup_day.stat_date IS '已汇总日期';
+COMMENT ON COLUMN public.alert_daily_rollup_day.update_time IS '汇总时间';
+
+INSERT INTO public.sys_job (job_id, job_name, job_group, job_executor, invoke_target, job_args, job_kwargs, cron_expression, misfire_policy, concurrent, status, create_by, create_time, update_by, update_time, remark)
+SELECT 108, '告警按天汇总', 'default', 'default', 'module_task.redfish_monitor_tasks.alert_daily_rollup_job', '', '', '0 10 0 * * *', '3', '1', '1', 'admin', CURRENT_TIMESTAMP, '', NULL, '每天凌晨重算最近几个已结束日期的告警按天汇总，告警趋势与历史分布读取汇总表。首次启用时可将参数设为365回填历史'
+WHERE NOT EXISTS (SELECT 1 FROM public.sys_job WHERE job_id = 108);
+
+COMMIT;
@@ -0,0 +1,33 @@
+--
+-- 为已有库创建设备组件健康汇总表 device_health_rollup
+-- 适用于 PostgreSQL，可重复执行；汇总行由设备监控任务按需补齐（尚无汇总行的设备按健康处理）
+--
+
+BEGIN;
+
+CREATE TABLE IF NOT EXISTS public.device_health_rollup (
+    device_id bigint NOT NULL,
+    processor_health character varying(20) DEFAULT 'ok'::character varying NOT NULL,
+    memory_health character varying(20) DEFAULT 'ok'::character varying NOT NULL,
+    storage_health character varying(20) DEFAULT 'ok'::character varying NOT NULL,
+    thermal_health character varying(20) DEFAULT 'ok'::character varying NOT NULL,
+    power_health character varying(20) DEFAULT 'ok'::character varying NOT NULL,
+    alert_count integer DEFAULT 0 NOT NULL,
+    update_time timestamp(0) without time zone DEFAULT CURRENT_TIMESTAMP,
+    CONSTRAINT device_health_rollup_pkey PRIMARY KEY (device_id),
+    CONSTRAINT device_health_rollup_device_id_fkey FOREIGN KEY (device_id) REFERENCES public.device_info(device_id) ON DELETE CASCADE
+);
+
+CREATE INDEX IF NOT EXISTS idx_device_health_rollup_alert_count ON public.device_health_rollup USING btree (alert_count);
+
+COMMENT ON TABLE public.device_health_rollup IS '设备组件健康汇总表';
+COMMENT ON COLUMN public.device_health_rollup.device_id IS '设备ID';
+COMMENT ON COLUMN public.device_health_rollup.processor_health IS '处理器健康状态';
+COMMENT ON COLUMN public.device_health_rollup.memory_health IS '内存健康状态';
+COMMENT ON COLUMN public.device_health_rollup.storage_health IS '存储健康状态';
+COMMENT ON COLUMN public.device_health_rollup.thermal_health IS '温度/风扇健康状态';
+COMMENT ON COLUMN public.device_health_rollup.power_health IS '电源健康状态';
+COMMENT ON COLUMN public.device_health_rollup.alert_count IS '活跃告警数';
+COMMENT ON COLUMN public.device_health_rollup.update_time IS '更新时间';
+
+COMMIT;
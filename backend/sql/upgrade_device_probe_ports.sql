@@ -0,0 +1,8 @@
+--
+-- 为已有库的 device_info 增加设备级连通性检测端口列 probe_ports
+-- 适用于 PostgreSQL，可重复执行；为空时按 REDFISH_PROBE_PORTS_BY_BUSINESS_TYPE / REDFISH_PROBE_PORTS_BUSINESS 检测
+--
+
+ALTER TABLE public.device_info ADD COLUMN IF NOT EXISTS probe_ports character varying(100);
+
+COMMENT ON COLUMN public.device_info.probe_ports IS '连通性检测的TCP端口（如 ssh:22,https:443），为空时按业务类型/默认配置';
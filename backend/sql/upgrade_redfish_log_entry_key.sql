@@ -0,0 +1,46 @@
+--
+-- 为已有库的 redfish_log 补充去重键 uq_redfish_log_entry (device_id, entry_id, created_time)
+-- 适用于 PostgreSQL，可重复执行；请在维护窗口内执行（执行期间 redfish_log 被锁定）
+-- 步骤：为缺少条目ID的历史日志生成内容摘要ID -> 删除重复条目（保留最早收集的一条）-> entry_id 设为非空 -> 建唯一约束
+--
+
+BEGIN;
+
+LOCK TABLE public.redfish_log IN SHARE ROW EXCLUSIVE MODE;
+
+-- NULL 在唯一索引中互不冲突，缺少条目ID的日志用内容摘要作为稳定ID
+UPDATE public.redfish_log
+SET entry_id = 'md5:' || md5(concat_ws('|', log_source, entry_type, severity, message))
+WHERE entry_id IS NULL OR entry_id = '';
+
+DELETE FROM public.redfish_log
+WHERE log_id IN (
+    SELECT log_id
+    FROM (
+        SELECT log_id,
+               row_number() OVER (
+                   PARTITION BY device_id, entry_id, created_time
+                   ORDER BY collected_time, log_id
+               ) AS rn
+        FROM public.redfish_log
+    ) ranked
+    WHERE ranked.rn > 1
+);
+
+ALTER TABLE public.redfish_log ALTER COLUMN entry_id SET NOT NULL;
+
+DO $$
+BEGIN
+    IF NOT EXISTS (
+        SELECT 1 FROM pg_constraint
+        WHERE conname = 'uq_redfish_log_entry' AND conrelid = 'public.redfish_log'::regclass
+    ) THEN
+        ALTER TABLE ONLY public.redfish_log
+            ADD CONSTRAINT uq_redfish_log_entry UNIQUE (device_id, entry_id, created_time);
+    END IF;
+END
+$$;
+
+COMMIT;
+
+ANALYZE public.redfish_log;
@@ -0,0 +1,8 @@
+--
+-- 为已有库的 redfish_log 增加压缩原始条目列 raw_payload
+-- 适用于 PostgreSQL，可重复执行；历史日志的原始条目仍保存在 remark 中，读取时自动兼容
+--
+
+ALTER TABLE public.redfish_log ADD COLUMN IF NOT EXISTS raw_payload bytea;
+
+COMMENT ON COLUMN public.redfish_log.raw_payload IS '原始条目（压缩JSON）';
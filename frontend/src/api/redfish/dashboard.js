@@ -56,6 +56,15 @@ export function getDeviceHealthSummary(limit = 20) {
   })
 }
 
+// 分页获取设备健康汇总（query: pageNum, pageSize, sortBy, sortOrder）
+export function getDeviceHealthSummaryPage(query) {
+  return request({
+    url: '/redfish/dashboard/device/summary/page',
+    method: 'get',
+    params: query
+  })
+}
+
 // 获取系统健康指标
 export function getSystemHealthMetrics() {
   return request({
@@ -34,6 +34,22 @@ export function collectDeviceLogs(data) {
   })
 }
 
+// 查询批量日志收集任务状态
+export function getLogCollectJob(jobId) {
+  return request({
+    url: '/redfish/log/collect/job/' + jobId,
+    method: 'get'
+  })
+}
+
+// 恢复中断的批量日志收集任务
+export function resumeLogCollectJob(jobId) {
+  return request({
+    url: '/redfish/log/collect/job/' + jobId + '/resume',
+    method: 'post'
+  })
+}
+
 // 清理旧日志
 export function cleanupOldLogs(days) {
   return request({
@@ -33,6 +33,15 @@ class WebSocketService {
       subscriptionTimeout: null
     }
     
+    // 首页版本化状态（服务端推送增量，重连时按版本补齐）
+    this.dashboardSyncTimeout = 10000 // 同步请求10秒无响应视为失败
+    this.dashboardState = {
+      revision: null,
+      state: null,
+      syncPending: false,
+      syncTimeout: null  // 同步请求超时定时器（服务端无响应时允许再次请求）
+    }
+    
     // 获取WebSocket URL
     this.wsUrl = this.getWebSocketUrl()
   }
@@ -151,6 +160,7 @@ class WebSocketService {
     this.connectionState.connected = false
     this.connectionState.authenticated = false
     this.connectionState.roomsSubscribed = false
+    this.finishDashboardSync()
     
     // 清理房间订阅状态
     this.roomSubscription.joinedRooms.clear()
@@ -297,6 +307,9 @@ class WebSocketService {
         connectionState: { ...this.connectionState }
       })
       // ElMessage.success('实时推送已就绪，可以进行操作') // 已取消此提示
+      
+      // 按当前版本同步首页状态（重连时只补发缺失的增量）
+      this.requestDashboardSync()
     } else {
       console.log('[WebSocket] ⏳ WebSocket未完全就绪', this.connectionState)
     }
@@ -358,6 +371,27 @@ class WebSocketService {
         this.handleDashboardUpdate(message)
         break
         
+      case 'dashboard_batch':
+        this.handleDashboardBatch(message)
+        break
+        
+      case 'dashboard_state':
+        this.handleDashboardState(message)
+        break
+        
+      case 'dashboard_delta':
+        this.handleDashboardDelta(message)
+        break
+        
+      case 'dashboard_replay':
+        this.handleDashboardReplay(message)
+        break
+        
+      case 'dashboard_sync_error':
+        console.log('[WebSocket] Dashboard sync failed:', message.message)
+        this.finishDashboardSync()
+        break
+        
       case 'health_status_silent_update':
         this.handleHealthStatusSilentUpdate(message)
         break
@@ -489,6 +523,154 @@ class WebSocketService {
     this.emitEvent('dashboard_update', message)
   }
 
+  /**
+   * 处理Dashboard合并消息（服务端按时间窗口合并的进度、健康状态与告警变化）
+   */
+  handleDashboardBatch(message) {
+    const data = message.data || {}
+    console.log(`[WebSocket] Dashboard batch: ${data.event_count} events`)
+    
+    // 进度与告警统计只取窗口内最新一条，沿用原有事件
+    if (data.progress) {
+      this.handleMonitoringProgress(data.progress)
+    }
+    if (data.statistics) {
+      this.emitEvent('alert_statistics_update', data.statistics)
+    }
+    
+    // 一个窗口内的新告警合并为一条通知（紧急告警另有广播通知）
+    const alerts = data.alerts || {}
+    const scheduledCreated = (alerts.created || 0) - (alerts.urgent || 0)
+    if (scheduledCreated === 1 && alerts.latest && alerts.latest.length) {
+      const alertData = alerts.latest[alerts.latest.length - 1]
+      ElNotification({
+        title: '新告警',
+        message: `设备 ${alertData.hostname} 出现告警: ${alertData.alert_message}`,
+        type: 'warning',
+        duration: 5000,
+        position: 'top-right'
+      })
+    } else if (scheduledCreated > 1) {
+      ElNotification({
+        title: '新告警',
+        message: `${(data.devices || []).length} 台设备新增 ${scheduledCreated} 条告警`,
+        type: 'warning',
+        duration: 5000,
+        position: 'top-right'
+      })
+    }
+    
+    this.emitEvent('dashboard_batch', data)
+  }
+
+  /**
+   * 请求同步首页状态（携带当前版本）
+   */
+  requestDashboardSync() {
+    if (this.dashboardState.syncPending) {
+      return
+    }
+    this.dashboardState.syncPending = this.send({
+      type: 'dashboard_sync',
+      revision: this.dashboardState.revision
+    })
+    if (this.dashboardState.syncPending) {
+      this.dashboardState.syncTimeout = setTimeout(() => {
+        console.log('[WebSocket] Dashboard sync timed out')
+        this.finishDashboardSync()
+      }, this.dashboardSyncTimeout)
+    }
+  }
+
+  /**
+   * 结束同步请求（收到状态、失败或超时），之后可再次请求
+   */
+  finishDashboardSync() {
+    this.dashboardState.syncPending = false
+    if (this.dashboardState.syncTimeout) {
+      clearTimeout(this.dashboardState.syncTimeout)
+      this.dashboardState.syncTimeout = null
+    }
+  }
+
+  /**
+   * 按 JSON Patch 操作更新状态（返回新对象，不修改原状态）
+   */
+  applyStatePatch(document, ops) {
+    let result = JSON.parse(JSON.stringify(document))
+    for (const { op, path, value } of ops) {
+      if (path === '') {
+        result = op === 'remove' ? null : value
+        continue
+      }
+      const tokens = path.split('/').slice(1).map(token => token.replace(/~1/g, '/').replace(/~0/g, '~'))
+      const last = tokens.pop()
+      const parent = tokens.reduce((node, token) => node[token], result)
+      if (op === 'remove') {
+        Array.isArray(parent) ? parent.splice(Number(last), 1) : delete parent[last]
+      } else {
+        parent[last] = value
+      }
+    }
+    return result
+  }
+
+  /**
+   * 应用一条首页状态增量，版本不连续时返回false
+   */
+  applyDashboardDelta(delta) {
+    const { revision } = this.dashboardState
+    if (revision === null) {
+      return false
+    }
+    if (delta.revision <= revision) {
+      return true // 已应用过（同步与实时推送交错到达）
+    }
+    if (delta.base_revision !== revision) {
+      return false
+    }
+    this.dashboardState.state = this.applyStatePatch(this.dashboardState.state, delta.ops)
+    this.dashboardState.revision = delta.revision
+    return true
+  }
+
+  /**
+   * 处理完整首页状态
+   */
+  handleDashboardState(message) {
+    this.finishDashboardSync()
+    this.dashboardState.revision = message.revision
+    this.dashboardState.state = message.state
+    this.emitEvent('dashboard_state', message.state)
+  }
+
+  /**
+   * 处理首页状态增量
+   */
+  handleDashboardDelta(message) {
+    if (!this.applyDashboardDelta(message)) {
+      console.log(`[WebSocket] Dashboard revision gap: local=${this.dashboardState.revision}, base=${message.base_revision}`)
+      this.requestDashboardSync()
+      return
+    }
+    this.emitEvent('dashboard_state', this.dashboardState.state)
+  }
+
+  /**
+   * 处理重连后补发的首页状态增量
+   */
+  handleDashboardReplay(message) {
+    this.finishDashboardSync()
+    for (const delta of message.deltas || []) {
+      if (!this.applyDashboardDelta(delta)) {
+        this.dashboardState.revision = null
+        this.requestDashboardSync()
+        return
+      }
+    }
+    this.emitEvent('dashboard_state', this.dashboardState.state)
+  }
+
   /**
    * 处理设备健康状态静默更新（仅更新健康图，不显示通知）
    */